@@ -1,6 +1,8 @@
 """Creates/starts the bot and handles automated routines."""
 
+import asyncio
 import datetime
+from typing import Dict
 
 import aiocron
 import discord
@@ -19,7 +21,7 @@ from cogs.update_utils import UpdateUtils
 from cogs.vacation import Vacation
 
 # Config
-from config.config import GUILD_NAME
+from config.config import CACHE_PREWARM_LEAD_TIME, GUILD_NAME, PRIMARY_CLAN_TAG
 from config.credentials import BOT_TOKEN
 
 # Utils
@@ -27,8 +29,15 @@ import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
 import utils.db_utils as db_utils
 import utils.logging_utils as logging_utils
+import utils.race_log_utils as race_log_utils
+from utils.api_utils import CLASH_API
 from utils.channel_utils import CHANNEL, prepare_channels
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
+from utils.db_pool_utils import DB_POOL
 from utils.logging_utils import LOG
+from utils.polling_utils import BATTLELOG_SCHEDULER
+from utils.rate_limit_utils import REQUEST_PRIORITY, RequestPriority
+from utils.reset_utils import RESET_DETECTOR, RESET_WINDOW_END, RESET_WINDOW_START
 from utils.role_utils import prepare_roles
 from utils.util_types import ReminderTime
 
@@ -46,6 +55,19 @@ from utils.util_types import ReminderTime
 #                                                      #
 ########################################################
 
+class ClashBot(commands.Bot):
+    """Bot that also releases its Clash Royale API and database connections when shutting down."""
+
+    async def close(self):
+        """Close the shared API session, finish queued database work, and close idle database connections before disconnecting
+        from Discord.
+        """
+        await CLASH_API.close()
+        DB_EXECUTOR.shutdown()
+        DB_POOL.close()
+        await super().close()
+
+
 menu = DefaultMenu('◀️', '▶️', '❌')
 intents = discord.Intents.default()
 intents.members = True
@@ -53,10 +75,10 @@ activity = discord.Game(name="Clash Royale")
 help_command = PrettyHelp(navigation=menu,
                           color=discord.Colour.green(),
                           command_attrs={"checks": [bot_utils.not_welcome_or_rules_check_predicate]})
-bot = commands.Bot(command_prefix='!',
-                   activity=activity,
-                   help_command=help_command,
-                   intents=intents)
+bot = ClashBot(command_prefix='!',
+               activity=activity,
+               help_command=help_command,
+               intents=intents)
 
 bot.add_cog(AutomationTools(bot))
 bot.add_cog(LeaderUtils(bot))
@@ -68,12 +90,25 @@ bot.add_cog(UpdateUtils(bot))
 bot.add_cog(Vacation(bot))
 bot.add_cog(ErrorHandler(bot))
 
+@bot.before_invoke
+async def prioritize_commands(ctx: commands.Context):
+    """Send API requests made by commands ahead of any requests made by automated tasks."""
+    REQUEST_PRIORITY.set(RequestPriority.INTERACTIVE)
+
+
 @bot.event
 async def on_ready():
     """Get relevant channels and roles on bot startup."""
     guild = discord.utils.get(bot.guilds, name=GUILD_NAME)
     prepare_channels(guild)
     prepare_roles(guild)
+    await ASYNC_DB.prepare_tracked_clans(clash_utils.TRACKED_CLAN_TAGS)
+    await prewarm_cache()
+    await race_log_utils.sync_river_race_logs()
+
+    # Resume reset detection if the bot restarted during the detection window.
+    if RESET_WINDOW_START <= datetime.datetime.utcnow().time() < RESET_WINDOW_END:
+        asyncio.ensure_future(detect_reset())
 
     LOG.info("Bot started")
     print("Bot Ready")
@@ -92,19 +127,40 @@ async def on_ready():
 #########################################################################################
 
 
+# Minute before each job that users wait on: automated_reminder_eu, automated_reminder_us, last_call_automated_reminder, and
+# assign_strikes_and_clear_vacation. The cache is warmed CACHE_PREWARM_LEAD_TIME seconds before the end of that minute.
+# determine_reset_time isn't warmed since reset detection always requests the current river races.
+PREWARM_CRON_SPECS = ['59 18 * * 4,5,6,0', '59 1 * * 5,6,0,1', '59 7 * * 5,6,0,1', '59 17 * * 1']
+PREWARM_SECOND = 60 - min(max(CACHE_PREWARM_LEAD_TIME, 1), 59)
+
+
+async def prewarm_cache():
+    """Fetch the members and river races of each tracked clan ahead of the jobs above and on startup."""
+    LOG.automation_start("prewarm_cache")
+    await clash_utils.prewarm_cache()
+    LOG.automation_end()
+
+
+for prewarm_cron_spec in PREWARM_CRON_SPECS:
+    aiocron.crontab(f"{prewarm_cron_spec} {PREWARM_SECOND}", func=prewarm_cache)
+
+
 @aiocron.crontab('0 19 * * 4,5,6,0')
 async def automated_reminder_eu():
     """Send reminder every Thursday, Friday, Saturday, and Sunday at 19:00 UTC."""
     LOG.automation_start("automated_reminder_eu")
-    automated_reminders = db_utils.get_reminder_status()
-    completed = clash_utils.river_race_completed()
+    automated_reminders = await ASYNC_DB.get_reminder_status()
+    completed_races = await asyncio.gather(*[clash_utils.river_race_completed(clan_tag)
+                                             for clan_tag in clash_utils.TRACKED_CLAN_TAGS])
 
-    if automated_reminders and not completed:
-        await bot_utils.deck_usage_reminder(time_zone=ReminderTime.EU)
-    else:
-        LOG.info(logging_utils.log_message("Skipping EU reminder",
-                                           reminder_status=automated_reminders,
-                                           completed=completed))
+    for clan_tag, completed in zip(clash_utils.TRACKED_CLAN_TAGS, completed_races):
+        if automated_reminders and not completed:
+            await bot_utils.deck_usage_reminder(time_zone=ReminderTime.EU, clan_tag=clan_tag)
+        else:
+            LOG.info(logging_utils.log_message("Skipping EU reminder",
+                                               clan_tag=clan_tag,
+                                               reminder_status=automated_reminders,
+                                               completed=completed))
 
     LOG.automation_end()
 
@@ -112,15 +168,18 @@ async def automated_reminder_eu():
 async def automated_reminder_us():
     """Send reminder every Friday, Saturday, Sunday, and Monday at 02:00 UTC."""
     LOG.automation_start("automated_reminder_us")
-    automated_reminders = db_utils.get_reminder_status()
-    completed = clash_utils.river_race_completed()
+    automated_reminders = await ASYNC_DB.get_reminder_status()
+    completed_races = await asyncio.gather(*[clash_utils.river_race_completed(clan_tag)
+                                             for clan_tag in clash_utils.TRACKED_CLAN_TAGS])
 
-    if automated_reminders and not completed:
-        await bot_utils.deck_usage_reminder(time_zone=ReminderTime.US)
-    else:
-        LOG.info(logging_utils.log_message("Skipping US reminder",
-                                           reminder_status=automated_reminders,
-                                           completed=completed))
+    for clan_tag, completed in zip(clash_utils.TRACKED_CLAN_TAGS, completed_races):
+        if automated_reminders and not completed:
+            await bot_utils.deck_usage_reminder(time_zone=ReminderTime.US, clan_tag=clan_tag)
+        else:
+            LOG.info(logging_utils.log_message("Skipping US reminder",
+                                               clan_tag=clan_tag,
+                                               reminder_status=automated_reminders,
+                                               completed=completed))
 
     LOG.automation_end()
 
@@ -129,15 +188,18 @@ async def automated_reminder_us():
 async def last_call_automated_reminder():
     """Send a reminder every day ~1.5 hours before reset time (08:00 UTC)."""
     LOG.automation_start("last_call_automated_reminder")
-    automated_reminders = db_utils.get_reminder_status()
-    completed = clash_utils.river_race_completed()
+    automated_reminders = await ASYNC_DB.get_reminder_status()
+    completed_races = await asyncio.gather(*[clash_utils.river_race_completed(clan_tag)
+                                             for clan_tag in clash_utils.TRACKED_CLAN_TAGS])
 
-    if automated_reminders and not completed:
-        await bot_utils.deck_usage_reminder()
-    else:
-        LOG.info(logging_utils.log_message("Skipping last call reminder",
-                                           reminder_status=automated_reminders,
-                                           completed=completed))
+    for clan_tag, completed in zip(clash_utils.TRACKED_CLAN_TAGS, completed_races):
+        if automated_reminders and not completed:
+            await bot_utils.deck_usage_reminder(clan_tag=clan_tag)
+        else:
+            LOG.info(logging_utils.log_message("Skipping last call reminder",
+                                               clan_tag=clan_tag,
+                                               reminder_status=automated_reminders,
+                                               completed=completed))
 
     LOG.automation_end()
 
@@ -146,44 +208,66 @@ async def last_call_automated_reminder():
 async def record_race_completion_status():
     """Check if the race was completed on Saturday and save result to db."""
     LOG.automation_start("record_race_completion_status")
-    db_utils.set_completed_saturday_status(clash_utils.river_race_completed())
+
+    for clan_tag in clash_utils.TRACKED_CLAN_TAGS:
+        await ASYNC_DB.set_completed_saturday_status(await clash_utils.river_race_completed(clan_tag), clan_tag)
+
     LOG.automation_end()
 
 
 @aiocron.crontab('0 18 * * 1')
 async def assign_strikes_and_clear_vacation():
-    """Assign strikes and clear vacation every Monday 18:00 UTC (Monday 11:00am PDT)."""
+    """Assign strikes and clear vacation every Monday 18:00 UTC (Monday 11:00am PDT). Participants are judged by the river race
+    of the tracked clan they are in.
+    """
     LOG.automation_start("assign_strikes_and_clear_vacation")
-    completed_saturday = db_utils.is_completed_saturday()
+    completed_saturday = {clan_tag: await ASYNC_DB.is_completed_saturday(clan_tag) for clan_tag in clash_utils.TRACKED_CLAN_TAGS}
     message = ""
     send_missing_data_message = False
 
-    if completed_saturday:
-        message = "River Race completed Saturday. Participants with fewer than 12 decks have received strikes.\n"
-    else:
-        message = "River Race completed Sunday. Participants with fewer than 16 decks have received strikes.\n"
+    for clan_tag, completed in completed_saturday.items():
+        river_race = "River Race" if len(completed_saturday) == 1 else f"River Race of {clan_tag}"
 
-    if db_utils.get_strike_status():
+        if completed:
+            message += f"{river_race} completed Saturday. Participants with fewer than 12 decks have received strikes.\n"
+        else:
+            message += f"{river_race} completed Sunday. Participants with fewer than 16 decks have received strikes.\n"
+
+    if await ASYNC_DB.get_strike_status():
         LOG.info("Determining automated strikes")
-        users_on_vacation = db_utils.get_users_on_vacation()
-        deck_usage_list = db_utils.get_all_user_deck_usage_history()
-        active_members = clash_utils.get_active_members_in_clan()
-        former_participants = db_utils.get_non_active_participants()
+        users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
+        deck_usage_list = await ASYNC_DB.get_all_user_deck_usage_history()
+        clan_members = await asyncio.gather(*[clash_utils.get_active_members_in_clan(clan_tag)
+                                              for clan_tag in clash_utils.TRACKED_CLAN_TAGS])
+        former_participants = await ASYNC_DB.get_non_active_participants(await clash_utils.get_family_members())
         mention_string = ""
         perfect_week = True
         embed_one = discord.Embed(title="The following users have received strikes:")
         embed_two = discord.Embed(title="The following users have received strikes:")
         field_count = 0
-        reset_times = db_utils.get_river_race_reset_times()
+        reset_times = {clan_tag: await ASYNC_DB.get_river_race_reset_times(clan_tag) for clan_tag in clash_utils.TRACKED_CLAN_TAGS}
+        last_reset_times = {clan_tag: await ASYNC_DB.get_reset_time(clan_tag) for clan_tag in clash_utils.TRACKED_CLAN_TAGS}
+
+        # Each participant is judged by the river race of the clan they're tracked through. Former participants are no longer in
+        # any tracked clan, so they are tracked through the primary clan.
+        tracking_clan_tags = {player_tag: PRIMARY_CLAN_TAG for player_tag in former_participants}
+
+        for clan_tag, active_members in zip(clash_utils.TRACKED_CLAN_TAGS, clan_members):
+            tracking_clan_tags.update({player_tag: clan_tag for player_tag in active_members})
 
         for player_name, player_tag, discord_id, deck_usage_history, tracked_since in deck_usage_list:
-            if (player_tag not in active_members and player_tag not in former_participants) or (player_tag in users_on_vacation):
+            clan_tag = tracking_clan_tags.get(player_tag)
+
+            if clan_tag is None or player_tag in users_on_vacation:
                 continue
 
-            should_receive_strike, decks_used, decks_required, missing_data = bot_utils.should_receive_strike(deck_usage_history,
-                                                                                                              completed_saturday,
-                                                                                                              tracked_since,
-                                                                                                              reset_times)
+            should_receive_strike, decks_used, decks_required, missing_data = bot_utils.should_receive_strike(
+                deck_usage_history,
+                completed_saturday[clan_tag],
+                tracked_since,
+                reset_times[clan_tag],
+                last_reset_times[clan_tag]
+            )
 
             if missing_data:
                 send_missing_data_message = True
@@ -219,7 +303,7 @@ async def assign_strikes_and_clear_vacation():
             if member is not None:
                 mention_string += f"{member.mention} "
 
-            _, strikes, _, _ = db_utils.update_strikes(player_tag, 1)
+            _, strikes, _, _ = await db_utils.update_strikes(player_tag, 1)
 
             if strikes is None:
                 continue
@@ -237,6 +321,7 @@ async def assign_strikes_and_clear_vacation():
             LOG.debug(logging_utils.log_message("Assigning strike",
                                                 name=player_name,
                                                 tag=player_tag,
+                                                clan_tag=clan_tag,
                                                 decks=f"{decks_used}/{decks_required}",
                                                 tracked_since=tracked_since,
                                                 is_member=(member is not None)))
@@ -249,7 +334,7 @@ async def assign_strikes_and_clear_vacation():
         LOG.info("Automated strikes disabled")
         message = "Automated strikes are currently disabled, so no strikes have been given out for the previous River Race."
 
-    db_utils.clear_all_vacation()
+    await ASYNC_DB.clear_all_vacation()
     vacation_embed = discord.Embed(title="Vacation status has been reset for all users.",
                                    description="Make sure to use `!vacation` before the next war if you're going to miss it.")
     await CHANNEL.time_off().send(embed=vacation_embed)
@@ -270,93 +355,102 @@ async def assign_strikes_and_clear_vacation():
     LOG.automation_end()
 
 
-PREV_DECK_USAGE_SUM = -1
-PREV_DECK_USAGE = None
-RESET_OCCURRED = False
+def merge_deck_usage(deck_usage_lists: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """Combine the deck usage of each tracked clan into the deck usage of the whole clan family.
 
-@aiocron.crontab('20-58 9 * * *')
-async def determine_reset_time():
-    """Start routines that need to run at reset time.
+    Args:
+        deck_usage_lists: Dictionary mapping clan tags to the deck usage of that clan's participants.
 
-    Check every minute for a drop in total deck usage to determine that the daily reset has occurred. In addition to saving deck
-    usage and reset time each the, extra tasks are performed at the end of the following days:
+    Returns:
+        Dictionary mapping player tags to number of decks used today across all tracked clans, or None if no clan's deck usage
+        was retrieved.
+    """
+    if not deck_usage_lists:
+        return None
 
-    Wednesday:
-        - prepare_for_river_race: Sets up database to track upcoming river race.
+    deck_usage = {}
 
-    Thursday, Friday, Saturday:
-        - calculate_match_performance: Check match performance of clan members.
-        - save_clans_in_race: Save number of decks used by each clan in the river race and their current fame.
-    """
-    global PREV_DECK_USAGE_SUM
-    global PREV_DECK_USAGE
-    global RESET_OCCURRED
+    for usage_list in deck_usage_lists.values():
+        for player_tag, decks_used in usage_list.items():
+            deck_usage[player_tag] = deck_usage.get(player_tag, 0) + decks_used
 
-    if RESET_OCCURRED:
-        return
+    return deck_usage
 
-    LOG.automation_start("determine_reset_time")
 
+async def perform_reset_routines():
+    """Save deck usage and reset time of each tracked clan and run any tasks specific to the day that just ended. Clans whose
+    reset was not detected use the current time as their reset time.
+    """
     weekday = datetime.datetime.utcnow().date().weekday()
-    usage_list = clash_utils.get_deck_usage_today()
-    current_sum = 0
+    now = datetime.datetime.now(datetime.timezone.utc)
+    detected_reset_times = await RESET_DETECTOR.detected_reset_times(now)
+    reset_times = {clan_tag: detected_reset_times.get(clan_tag, now) for clan_tag in clash_utils.TRACKED_CLAN_TAGS}
+    deck_usage = merge_deck_usage(await RESET_DETECTOR.get_deck_usage())
 
-    if not usage_list:
-        LOG.automation_end("Couldn't get usage list")
-        return
+    # Members that did not participate used 0 decks.
+    if deck_usage is not None:
+        for player_tag in await clash_utils.get_family_members():
+            deck_usage.setdefault(player_tag, 0)
 
-    for decks_used in usage_list.values():
-        current_sum += decks_used
+    await db_utils.clean_up_db()
+    await db_utils.record_deck_usage_today(deck_usage)
 
-    if current_sum < PREV_DECK_USAGE_SUM:
-        LOG.info("Daily reset detected")
-        RESET_OCCURRED = True
-        db_utils.clean_up_db()
-        db_utils.record_deck_usage_today(PREV_DECK_USAGE)
+    if weekday == 0:
+        await race_log_utils.sync_river_race_logs()
+    elif weekday == 3:
+        await asyncio.gather(*[clash_utils.prepare_for_river_race(reset_time, clan_tag)
+                               for clan_tag, reset_time in reset_times.items()])
+        BATTLELOG_SCHEDULER.reset()
+    elif weekday in {4, 5, 6}:
+        await clash_utils.calculate_family_match_performance(False)
+        await asyncio.gather(*[clash_utils.save_clans_in_race_info(False, clan_tag) for clan_tag in reset_times])
 
-        if weekday == 3:
-            db_utils.prepare_for_river_race(datetime.datetime.now(datetime.timezone.utc))
-        elif weekday in {4, 5, 6}:
-            clash_utils.calculate_match_performance(False)
-            db_utils.save_clans_in_race_info(False)
+    for clan_tag, reset_time in reset_times.items():
+        await ASYNC_DB.set_reset_time(reset_time, clan_tag)
 
-        db_utils.set_reset_time(datetime.datetime.now(datetime.timezone.utc))
-    else:
-        PREV_DECK_USAGE_SUM = current_sum
-        PREV_DECK_USAGE = usage_list
+    await RESET_DETECTOR.reset()
 
-    LOG.automation_end()
 
+async def detect_reset():
+    """Start routines that need to run at reset time.
+
+    Poll each tracked clan for a drop in total deck usage to determine that the daily reset has occurred (see ResetDetector).
+    Once every tracked clan has reset, or the detection window ends, deck usage and reset times are saved. In addition, extra
+    tasks are performed at the end of the following days:
+
+    Sunday:
+        - sync_river_race_logs: Archive the river race that just ended.
 
-@aiocron.crontab('59 9 * * *')
-async def reset_globals():
-    """Reset globals used for daily reset tracking and perform reset tracking routine described above if reset has not occurred."""
-    global PREV_DECK_USAGE_SUM
-    global PREV_DECK_USAGE
-    global RESET_OCCURRED
+    Wednesday:
+        - prepare_for_river_race: Sets up database to track upcoming river race.
 
-    LOG.automation_start("reset_globals")
+    Thursday, Friday, Saturday:
+        - calculate_match_performance: Check match performance of clan members.
+        - save_clans_in_race: Save number of decks used by each clan in the river race and their current fame.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
 
-    if not RESET_OCCURRED:
-        LOG.warning("Daily reset not detected")
-        weekday = datetime.datetime.utcnow().date().weekday()
-        db_utils.clean_up_db()
-        db_utils.record_deck_usage_today(PREV_DECK_USAGE)
+    if RESET_DETECTOR.running or await RESET_DETECTOR.reset_handled(now):
+        return
 
-        if weekday == 3:
-            db_utils.prepare_for_river_race(datetime.datetime.now(datetime.timezone.utc))
-        elif weekday in {4, 5, 6}:
-            clash_utils.calculate_match_performance(False)
-            db_utils.save_clans_in_race_info(False)
+    LOG.automation_start("determine_reset_time")
+    undetected_clan_tags = await RESET_DETECTOR.run()
 
-        db_utils.set_reset_time(datetime.datetime.now(datetime.timezone.utc))
+    if undetected_clan_tags:
+        LOG.warning(logging_utils.log_message("Daily reset not detected", clan_tags=undetected_clan_tags))
 
-    PREV_DECK_USAGE_SUM = -1
-    PREV_DECK_USAGE = None
-    RESET_OCCURRED = False
+    await perform_reset_routines()
     LOG.automation_end()
 
 
+@aiocron.crontab('20 9 * * *')
+async def determine_reset_time():
+    """Detect the daily reset starting at 09:20 UTC. Detection gives up and the reset routines are performed at 09:59 UTC if
+    the reset of every tracked clan was not detected by then.
+    """
+    await detect_reset()
+
+
 @aiocron.crontab('30 7,15,23 * * *')
 async def update_members():
     """Update all members of the server at 07:30, 15:30, and 23:30 UTC everyday."""
@@ -366,29 +460,35 @@ async def update_members():
     LOG.automation_end()
 
 
-@aiocron.crontab('0 10-23 * * 4,5,6,0')
+@aiocron.crontab('*/10 10-23 * * 4,5,6,0')
 async def night_match_performance_tracker():
-    """Calculate match performance every hour between 10:00-23:00 Thursday-Sunday."""
+    """Poll the battlelogs of players that are due to be checked every 10 minutes between 10:00-23:59 Thursday-Sunday."""
     LOG.automation_start("night_match_performance_tracker")
-    clash_utils.calculate_match_performance(False)
+    await BATTLELOG_SCHEDULER.poll()
     LOG.automation_end()
 
 
-@aiocron.crontab('0 0-9 * * 5,6,0,1')
+@aiocron.crontab('*/10 0-8 * * 5,6,0,1')
 async def morning_match_performance_tracker():
-    """Calculate match performance every hour between 00:00-09:00 Friday-Monday."""
+    """Poll the battlelogs of players that are due to be checked every 10 minutes between 00:00-08:59 Friday-Monday. Polling
+    stops before the daily reset checks, which check every player.
+    """
     LOG.automation_start("morning_match_performance_tracker")
-    clash_utils.calculate_match_performance(False)
+    await BATTLELOG_SCHEDULER.poll()
     LOG.automation_end()
 
 
 @aiocron.crontab('02 10 * * 1')
 async def final_match_performance_check():
-    """Calculate match performance after the war concludes on Monday."""
+    """Archive the river race that concluded on Monday and calculate match performance from it."""
     LOG.automation_start("final_match_performance_check")
-    clash_utils.calculate_match_performance(True)
-    db_utils.save_clans_in_race_info(True)
-    db_utils.set_war_time_status(False)
+    await race_log_utils.sync_river_race_logs()
+    await clash_utils.calculate_family_match_performance(True)
+
+    for clan_tag in clash_utils.TRACKED_CLAN_TAGS:
+        await clash_utils.save_clans_in_race_info(True, clan_tag)
+        await ASYNC_DB.set_war_time_status(False, clan_tag)
+
     LOG.automation_end()
 
 
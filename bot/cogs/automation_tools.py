@@ -6,7 +6,7 @@ from prettytable import PrettyTable
 
 # Utils
 import utils.bot_utils as bot_utils
-import utils.db_utils as db_utils
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 
 
@@ -23,8 +23,8 @@ class AutomationTools(commands.Cog):
     async def automation_status(self, ctx: commands.Context):
         """Get status of automated strikes and reminders."""
         LOG.command_start(ctx)
-        reminder_status = "ENABLED" if db_utils.get_reminder_status() else "DISABLED"
-        strike_status = "ENABLED" if db_utils.get_strike_status() else "DISABLED"
+        reminder_status = "ENABLED" if await ASYNC_DB.get_reminder_status() else "DISABLED"
+        strike_status = "ENABLED" if await ASYNC_DB.get_strike_status() else "DISABLED"
 
         table = PrettyTable()
         table.field_names = ["Reminders", "Strikes"]
@@ -41,7 +41,7 @@ class AutomationTools(commands.Cog):
     async def set_automated_reminders(self, ctx: commands.Context, status: bool):
         """Set automated reminders on/off."""
         LOG.command_start(ctx, status=status)
-        db_utils.set_reminder_status(status)
+        await ASYNC_DB.set_reminder_status(status)
 
         if status:
             embed = discord.Embed(color=discord.Color.green())
@@ -59,7 +59,7 @@ class AutomationTools(commands.Cog):
     async def set_automated_strikes(self, ctx: commands.Context, status: bool):
         """Set automated strikes on/off."""
         LOG.command_start(ctx, status=status)
-        db_utils.set_strike_status(status)
+        await ASYNC_DB.set_strike_status(status)
 
         if status:
             embed = discord.Embed(color=discord.Color.green())
@@ -14,8 +14,12 @@ from config.config import DEFAULT_REMINDER_MESSAGE
 import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
 import utils.db_utils as db_utils
+from utils.api_utils import CLASH_API
 from utils.channel_utils import CHANNEL
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
+from utils.db_pool_utils import DB_POOL
 from utils.logging_utils import LOG, log_message
+from utils.metrics_utils import API_METRICS, METRICS_WINDOW
 from utils.role_utils import ROLE
 
 
@@ -32,7 +36,7 @@ class LeaderUtils(commands.Cog):
     async def export(self, ctx: commands.Context, primary_clan_only: bool=True, include_card_levels: bool=False):
         """Export database to Excel spreadsheet."""
         LOG.command_start(ctx, primary_clan_only=primary_clan_only, include_card_levels=include_card_levels)
-        path = db_utils.export(primary_clan_only, include_card_levels)
+        path = await db_utils.export(primary_clan_only, include_card_levels)
         await ctx.send(file=discord.File(path))
         LOG.command_end()
 
@@ -54,7 +58,7 @@ class LeaderUtils(commands.Cog):
             # These will be restored after reacting to rules message.
             roles_to_commit = [role.name for role in list(set(ROLE.normal_roles()).intersection(set(member.roles)))]
             LOG.debug(log_message(msg="Committing roles", member=member, roles=roles_to_commit))
-            db_utils.commit_roles(member.id, roles_to_commit)
+            await ASYNC_DB.commit_roles(member.id, roles_to_commit)
             await member.remove_roles(*roles_to_remove)
             await member.add_roles(ROLE.check_rules())
 
@@ -119,7 +123,7 @@ class LeaderUtils(commands.Cog):
     async def top_medals(self, ctx: commands.Context):
         """Send a list of top users by medals to the fame channel."""
         LOG.command_start(ctx)
-        top_members = clash_utils.get_top_medal_users()
+        top_members = await clash_utils.get_top_medal_users()
         table = PrettyTable()
         table.field_names = ["Member", "Medals"]
 
@@ -140,8 +144,8 @@ class LeaderUtils(commands.Cog):
     async def medals_check(self, ctx: commands.Context, threshold: int):
         """Mention users below the specified medals threshold."""
         LOG.command_start(ctx, threshold=threshold)
-        hall_of_shame = clash_utils.get_hall_of_shame(threshold)
-        users_on_vacation = db_utils.get_users_on_vacation()
+        hall_of_shame = await clash_utils.get_hall_of_shame(threshold)
+        users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
 
         member_string = ""
         non_member_string = ""
@@ -151,7 +155,7 @@ class LeaderUtils(commands.Cog):
                 continue
 
             member = None
-            discord_id = db_utils.get_member_id(player_tag)
+            discord_id = await ASYNC_DB.get_member_id(player_tag)
 
             if discord_id is not None:
                 member = discord.utils.get(CHANNEL.fame().members, id=discord_id)
@@ -175,13 +179,115 @@ class LeaderUtils(commands.Cog):
         await ctx.send(embed=embed)
         LOG.command_end()
 
+    @commands.command()
+    @bot_utils.is_leader_command_check()
+    @bot_utils.commands_channel_check()
+    async def api_stats(self, ctx: commands.Context, routine: str=None):
+        """Show Clash Royale API usage over the last hour, optionally only for a single command or automated routine."""
+        LOG.command_start(ctx, routine=routine)
+        endpoint_table = PrettyTable()
+        endpoint_table.field_names = ["Endpoint", "Calls", "Hit %", "p50", "p95", "p99", "Status codes"]
+
+        for stats in API_METRICS.endpoint_stats(routine):
+            hit_ratio = f"{100 * stats['cache_hits'] / stats['calls']:.0f}" if stats['calls'] else "-"
+            status_codes = " ".join(f"{status}:{count}" for status, count in sorted(stats['status_codes'].items()))
+            endpoint_table.add_row([stats['endpoint'],
+                                    stats['calls'],
+                                    hit_ratio,
+                                    round(stats['latency_p50'] * 1000),
+                                    round(stats['latency_p95'] * 1000),
+                                    round(stats['latency_p99'] * 1000),
+                                    status_codes])
+
+        title = f"API usage over the last {METRICS_WINDOW // 60} minutes" + (f" by {routine}" if routine else "")
+        embed = discord.Embed(title=title,
+                              description="Latencies in ms.\n```\n" + endpoint_table.get_string() + "```",
+                              color=discord.Color.blue())
+
+        if routine is None:
+            routine_table = PrettyTable()
+            routine_table.field_names = ["Routine", "Calls", "Hit %", "Requests"]
+
+            for stats in API_METRICS.routine_stats():
+                hit_ratio = f"{100 * stats['cache_hits'] / stats['calls']:.0f}" if stats['calls'] else "-"
+                routine_table.add_row([stats['routine'], stats['calls'], hit_ratio, stats['requests']])
+
+            embed.add_field(name="Calls by routine", value="```\n" + routine_table.get_string() + "```", inline=False)
+
+        key_status = "\n".join(f"{stats['key']}: {stats['requests']} requests" +
+                                (f", benched for {stats['benched_for']}s" if stats['benched_for'] else "")
+                                for stats in CLASH_API.key_pool.stats())
+        embed.add_field(name="API keys", value=key_status or "None", inline=False)
+        embed.add_field(name="Circuit", value=CLASH_API.circuit_breaker.state.value, inline=False)
+        await ctx.send(embed=embed)
+        LOG.command_end()
+
+    @commands.command()
+    @bot_utils.is_leader_command_check()
+    @bot_utils.commands_channel_check()
+    async def db_stats(self, ctx: commands.Context):
+        """Show how database connections have been opened and reused and how long database work has waited to run."""
+        LOG.command_start(ctx)
+        stats = DB_POOL.stats()
+        reuse_ratio = f"{100 * stats['reused'] / stats['acquired']:.0f}%" if stats['acquired'] else "-"
+        table = PrettyTable()
+        table.field_names = ["Stat", "Value"]
+        table.align["Stat"] = "l"
+        table.add_row(["Open", f"{stats['open']}/{stats['max_size']}"])
+        table.add_row(["Idle", stats['idle']])
+        table.add_row(["In use", stats['in_use']])
+        table.add_row(["Peak in use", stats['peak_in_use']])
+        table.add_row(["Acquired", stats['acquired']])
+        table.add_row(["Reused", f"{stats['reused']} ({reuse_ratio})"])
+        table.add_row(["Opened", stats['opened']])
+        table.add_row(["Closed", stats['closed']])
+        table.add_row(["Recycled", stats['recycled']])
+        table.add_row(["Failed health checks", stats['failed_health_checks']])
+        table.add_row(["Waits", stats['waits']])
+        table.add_row(["Timeouts", stats['timeouts']])
+
+        executor_stats = DB_EXECUTOR.stats()
+        executor_table = PrettyTable()
+        executor_table.field_names = ["Stat", "Value"]
+        executor_table.align["Stat"] = "l"
+        executor_table.add_row(["Queued", f"{executor_stats['queued']} (peak {executor_stats['peak_queued']})"])
+        executor_table.add_row(["Running", f"{executor_stats['running']}/{executor_stats['workers']}"])
+        executor_table.add_row(["Submitted", executor_stats['submitted']])
+        executor_table.add_row(["Failed", executor_stats['failed']])
+        executor_table.add_row(["Cancelled", executor_stats['cancelled']])
+        executor_table.add_row(["Wait p50/p95/max",
+                                f"{1000 * executor_stats['wait_p50']:.0f}/{1000 * executor_stats['wait_p95']:.0f}/"
+                                f"{1000 * executor_stats['wait_max']:.0f} ms"])
+        executor_table.add_row(["Run p50/p95/max",
+                                f"{1000 * executor_stats['run_p50']:.0f}/{1000 * executor_stats['run_p95']:.0f}/"
+                                f"{1000 * executor_stats['run_max']:.0f} ms"])
+
+        slowest_functions = DB_EXECUTOR.function_stats()
+        function_table = PrettyTable()
+        function_table.field_names = ["Function", "Calls", "Time"]
+        function_table.align["Function"] = "l"
+
+        for function_stats in slowest_functions:
+            function_table.add_row([function_stats['function'], function_stats['calls'], f"{function_stats['run_time']:.1f}s"])
+
+        embed = discord.Embed(title="Database connection pool",
+                              description="```\n" + table.get_string() + "```",
+                              color=discord.Color.blue())
+        embed.add_field(name="Executor", value="```\n" + executor_table.get_string() + "```", inline=False)
+
+        if slowest_functions:
+            embed.add_field(name="Slowest functions", value="```\n" + function_table.get_string() + "```", inline=False)
+
+        await ctx.send(embed=embed)
+        LOG.command_end()
+
     @commands.command()
     @bot_utils.is_elder_command_check()
     @bot_utils.kicks_channel_check()
     async def kick(self, ctx: commands.Context, member: discord.Member):
         """Log that the specified user was kicked from the clan."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -199,7 +305,7 @@ class LeaderUtils(commands.Cog):
     async def kick_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!kick error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, kick_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
@@ -219,7 +325,7 @@ class LeaderUtils(commands.Cog):
     async def undo_kick(self, ctx: commands.Context, member: discord.Member):
         """Undo the latest kick of the specified user."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -229,7 +335,7 @@ class LeaderUtils(commands.Cog):
         else:
             _, player_tag, _ = player_info[0]
 
-        embed = bot_utils.undo_kick(member.display_name, player_tag)
+        embed = await bot_utils.undo_kick(member.display_name, player_tag)
         await ctx.send(embed=embed)
         LOG.command_end()
 
@@ -237,14 +343,14 @@ class LeaderUtils(commands.Cog):
     async def undo_kick_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!undo_kick error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, undo_kick_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
                 embed = ErrorHandler.member_not_found_embed(False)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                embed = bot_utils.undo_kick(player_name, player_tag)
+                embed = await bot_utils.undo_kick(player_name, player_tag)
             else:
                 embed = bot_utils.duplicate_names_embed(player_info, "undo_kick")
 
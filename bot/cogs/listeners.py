@@ -14,9 +14,9 @@ from config.config import (
 # Utils
 import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
-import utils.db_utils as db_utils
 from utils.callback_utils import CallbackType, CALLBACK_MANAGER
 from utils.channel_utils import CHANNEL
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG, log_message
 from utils.role_utils import ROLE
 
@@ -41,7 +41,7 @@ class Listeners(commands.Cog):
     async def on_member_remove(self, member: discord.Member):
         """Remove user from database when they leave server."""
         LOG.info(f"{member.display_name} - {member} left the server")
-        db_utils.remove_user(member.id)
+        await ASYNC_DB.remove_user(member.id, await clash_utils.get_family_members())
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -65,9 +65,9 @@ class Listeners(commands.Cog):
                                                     "Please send your player tag instead."),
                                            delete_after=10)
             else:
-                user_data = bot_utils.get_combined_data(message.content, message.author)
+                user_data = await bot_utils.get_combined_data(message.content, message.author)
                 if user_data is not None:
-                    if db_utils.add_new_user(user_data):
+                    if await ASYNC_DB.add_new_user(user_data):
                         LOG.info(log_message("Added new user to database", User=message.author, user_data=user_data))
                         await message.channel.send(f"Player tag entered successfully! Please move on to {CHANNEL.rules().mention}.",
                                                    delete_after=15)
@@ -140,7 +140,7 @@ class Listeners(commands.Cog):
                 await payload.member.remove_roles(ROLE.visitor())
                 return
 
-            db_roles = db_utils.get_roles(payload.member.id)
+            db_roles = await ASYNC_DB.get_roles(payload.member.id)
             saved_roles = []
             LOG.info(log_message(f"{payload.member} reacted to the rules message", db_roles=db_roles))
 
@@ -7,7 +7,7 @@ from prettytable import PrettyTable
 # Utils
 import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
-import utils.db_utils as db_utils
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 from utils.util_types import ReminderTime
 
@@ -24,7 +24,7 @@ class MemberUtils(commands.Cog):
     async def river_race_status(self, ctx: commands.Context, show_predictions: bool=False):
         """Send a list of clans in the current river race and how many battles they can still do today."""
         LOG.command_start(ctx, show_predictions=show_predictions)
-        clans = clash_utils.get_clan_decks_remaining()
+        clans = await clash_utils.get_clan_decks_remaining()
         table = PrettyTable()
         table.field_names = ["Clan", "Decks"]
 
@@ -37,9 +37,9 @@ class MemberUtils(commands.Cog):
                               color=discord.Color.green())
         await ctx.send(embed=embed)
 
-        if show_predictions and db_utils.is_war_time():
-            predicted_outcomes, completed_clans, _ = bot_utils.predict_race_outcome(True, False)
-            embed, _, _ = bot_utils.create_prediction_embeds(predicted_outcomes, completed_clans, {})
+        if show_predictions and await ASYNC_DB.is_war_time():
+            predicted_outcomes, completed_clans, _ = await bot_utils.predict_race_outcome(True, False)
+            embed, _, _ = await bot_utils.create_prediction_embeds(predicted_outcomes, completed_clans, {})
             await ctx.send(embed=embed)
 
         LOG.command_end()
@@ -56,18 +56,18 @@ all possible remaining decks."""
                           use_historical_win_rates=use_historical_win_rates,
                           use_historical_deck_usage=use_historical_deck_usage)
 
-        if not db_utils.is_war_time():
+        if not await ASYNC_DB.is_war_time():
             embed = discord.Embed(title="Predictions can only be made on battle days.", color=discord.Color.red())
             await ctx.send(embed=embed)
             LOG.command_end("Attempted to make prediction during non-war time")
             return
 
-        predicted_outcomes, completed_clans, catch_up_info = bot_utils.predict_race_outcome(use_historical_win_rates,
-                                                                                            use_historical_deck_usage)
+        predicted_outcomes, completed_clans, catch_up_info = await bot_utils.predict_race_outcome(use_historical_win_rates,
+                                                                                                  use_historical_deck_usage)
 
-        predicted_embed, completed_embed, catch_up_embed = bot_utils.create_prediction_embeds(predicted_outcomes,
-                                                                                              completed_clans,
-                                                                                              catch_up_info)
+        predicted_embed, completed_embed, catch_up_embed = await bot_utils.create_prediction_embeds(predicted_outcomes,
+                                                                                                    completed_clans,
+                                                                                                    catch_up_info)
 
         await ctx.send(embed=predicted_embed)
 
@@ -100,7 +100,7 @@ all possible remaining decks."""
             LOG.command_end("Invalid time zone")
             return
 
-        db_utils.update_time_zone(ctx.author.id, time_zone)
+        await ASYNC_DB.update_time_zone(ctx.author.id, time_zone)
         success_embed = discord.Embed(color=discord.Color.green())
         success_embed.add_field(name="Your reminder time has updated", value=f"You will now receive {reminder_time} reminders")
         await ctx.send(embed=success_embed)
@@ -111,7 +111,7 @@ all possible remaining decks."""
     async def vacation(self, ctx: commands.Context):
         """Toggle your vacation status."""
         LOG.command_start(ctx)
-        vacation_status = db_utils.update_vacation_for_user(ctx.author.id)
+        vacation_status = await ASYNC_DB.update_vacation_for_user(ctx.author.id)
 
         if vacation_status:
             embed = discord.Embed(color=discord.Color.green())
@@ -150,7 +150,7 @@ all possible remaining decks."""
     async def strikes(self, ctx: commands.Context):
         """Check how many strikes you have."""
         LOG.command_start(ctx)
-        strikes = db_utils.get_strikes(ctx.author.id)
+        strikes = await ASYNC_DB.get_strikes(ctx.author.id)
 
         if strikes is None:
             embed = discord.Embed(color=discord.Color.red())
@@ -177,7 +177,7 @@ all possible remaining decks."""
     async def stats(self, ctx: commands.Context):
         """Check your river race statistics."""
         LOG.command_start(ctx)
-        player_info = db_utils.find_user_in_db(ctx.author.id)
+        player_info = await ASYNC_DB.find_user_in_db(ctx.author.id)
 
         if not player_info:
             embed = discord.Embed(color=discord.Color.red())
@@ -187,7 +187,27 @@ all possible remaining decks."""
             LOG.error("Discord member not found in database")
         else:
             _, player_tag, _ = player_info[0]
-            embed = bot_utils.create_match_performance_embed(ctx.author.display_name, player_tag)
+            embed = await bot_utils.create_match_performance_embed(ctx.author.display_name, player_tag)
+
+        await ctx.send(embed=embed)
+        LOG.command_end()
+
+    @commands.command()
+    @bot_utils.not_welcome_or_rules_check()
+    async def deck_times(self, ctx: commands.Context):
+        """Check when you used your decks since the last daily reset."""
+        LOG.command_start(ctx)
+        player_info = await ASYNC_DB.find_user_in_db(ctx.author.id)
+
+        if not player_info:
+            embed = discord.Embed(color=discord.Color.red())
+            embed.add_field(name="An unexpected error has occurred",
+                            value=("Your Discord ID is not in the database. This should not happen. "
+                                   "Contact a leader if you see this error."))
+            LOG.error("Discord member not found in database")
+        else:
+            _, player_tag, _ = player_info[0]
+            embed = await bot_utils.create_deck_usage_times_embed(ctx.author.display_name, player_tag)
 
         await ctx.send(embed=embed)
         LOG.command_end()
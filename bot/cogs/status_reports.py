@@ -13,7 +13,7 @@ from cogs.error_handler import ErrorHandler
 # Utils
 import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
-import utils.db_utils as db_utils
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 from utils.util_types import DatabaseDataExtended
 
@@ -31,8 +31,8 @@ class StatusReports(commands.Cog):
     async def decks_report(self, ctx: commands.Context):
         """Get a report of players with remaining battles today."""
         LOG.command_start(ctx)
-        usage_info = clash_utils.get_remaining_decks_today_dicts()
-        users_on_vacation = db_utils.get_users_on_vacation()
+        usage_info = await clash_utils.get_remaining_decks_today_dicts()
+        users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
 
         if not usage_info:
             embed = discord.Embed(title="Something went wrong. There might be issues accessing the Clash Royale API right now.",
@@ -86,11 +86,12 @@ class StatusReports(commands.Cog):
             await ctx.send(embed=embed)
 
         if len(users_on_vacation) > 0:
+            deck_usage = await clash_utils.get_deck_usage_today()
             table = PrettyTable()
             table.field_names = ["Member", "Decks"]
 
             for player_tag, player_name in users_on_vacation.items():
-                decks_remaining = 4 - clash_utils.get_user_decks_used_today(player_tag)
+                decks_remaining = 4 - deck_usage.get(player_tag, 0)
                 table.add_row([player_name, decks_remaining])
 
             embed = discord.Embed(title="Members currently on vacation", description="```\n" + table.get_string() + "```")
@@ -104,8 +105,8 @@ class StatusReports(commands.Cog):
     async def medals_report(self, ctx: commands.Context, threshold: int):
         """Get a report of players below the specified medal count."""
         LOG.command_start(ctx, threshold=threshold)
-        hall_of_shame = clash_utils.get_hall_of_shame(threshold)
-        users_on_vacation = db_utils.get_users_on_vacation()
+        hall_of_shame = await clash_utils.get_hall_of_shame(threshold)
+        users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
         table = PrettyTable()
         table.field_names = ["Member", "Medals"]
         embed = discord.Embed(title="Medals Report")
@@ -134,7 +135,7 @@ class StatusReports(commands.Cog):
             user_data: Data of user to send report about.
         """
         general_info_table = PrettyTable()
-        kicks = db_utils.get_kicks(user_data['player_tag'])
+        kicks = await ASYNC_DB.get_kicks(user_data['player_tag'])
         total_kicks = len(kicks)
         last_kicked = "Never"
         if total_kicks > 0:
@@ -159,7 +160,7 @@ class StatusReports(commands.Cog):
 
         await ctx.send(embed=general_info_embed)
 
-        clan_deck_usage = clash_utils.get_deck_usage_today()
+        clan_deck_usage = await clash_utils.get_deck_usage_today()
 
         if user_data['player_tag'] not in clan_deck_usage:
             decks_used_today = 0
@@ -167,7 +168,8 @@ class StatusReports(commands.Cog):
             decks_used_today = clan_deck_usage[user_data['player_tag']]
 
         usage_history_list = bot_utils.break_down_usage_history(user_data['usage_history'],
-                                                                datetime.datetime.now(datetime.timezone.utc))
+                                                                datetime.datetime.now(datetime.timezone.utc),
+                                                                await ASYNC_DB.get_reset_time())
 
         deck_usage_history_table = PrettyTable()
         deck_usage_history_table.field_names = ["Day", "Decks Used"]
@@ -187,7 +189,7 @@ class StatusReports(commands.Cog):
     async def player_report(self, ctx: commands.Context, member: discord.Member):
         """Get information about a member."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -196,7 +198,7 @@ class StatusReports(commands.Cog):
             return
 
         _, player_tag, _ = player_info[0]
-        user_data = db_utils.get_user_data(player_tag)
+        user_data = await ASYNC_DB.get_user_data(player_tag)
 
         if user_data is None:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -211,7 +213,7 @@ class StatusReports(commands.Cog):
     async def player_report_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!player_report error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, player_report_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
@@ -219,7 +221,7 @@ class StatusReports(commands.Cog):
                 await ctx.send(embed=embed)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                user_data = db_utils.get_user_data(player_tag)
+                user_data = await ASYNC_DB.get_user_data(player_tag)
 
                 if user_data is None:
                     embed = ErrorHandler.missing_db_info(player_name)
@@ -240,7 +242,7 @@ class StatusReports(commands.Cog):
     async def stats_report(self, ctx: commands.Context, member: discord.Member):
         """Get specified user's river race statistics."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -249,7 +251,7 @@ class StatusReports(commands.Cog):
 
         _, player_tag, _ = player_info[0]
 
-        embed = bot_utils.create_match_performance_embed(member.display_name, player_tag)
+        embed = await bot_utils.create_match_performance_embed(member.display_name, player_tag)
         await ctx.send(embed=embed)
         LOG.command_end()
 
@@ -257,14 +259,14 @@ class StatusReports(commands.Cog):
     async def stats_report_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!stats_report error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, stats_report_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
                 embed = ErrorHandler.member_not_found_embed(False)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                embed = bot_utils.create_match_performance_embed(player_name, player_tag)
+                embed = await bot_utils.create_match_performance_embed(player_name, player_tag)
             else:
                 embed = bot_utils.duplicate_names_embed(player_info, "stats_report")
 
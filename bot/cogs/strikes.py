@@ -14,6 +14,7 @@ import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
 import utils.db_utils as db_utils
 from utils.channel_utils import CHANNEL
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 
 
@@ -34,7 +35,7 @@ class Strikes(commands.Cog):
             delta: Number of strikes to give or remove.
             member (optional): Member object of user if they are on Discord.
         """
-        old_strikes, new_strikes, old_permanent_strikes, new_permanent_strikes = db_utils.update_strikes(player_tag, delta)
+        old_strikes, new_strikes, old_permanent_strikes, new_permanent_strikes = await db_utils.update_strikes(player_tag, delta)
 
         if old_strikes is None:
             embed = discord.Embed(title=f"Something went wrong while updating {player_name}'s strikes. This should not happen.",
@@ -76,20 +77,20 @@ class Strikes(commands.Cog):
 
             try:
                 member = await converter.convert(ctx, user)
-                player_info = db_utils.find_user_in_db(member.id)
+                player_info = await ASYNC_DB.find_user_in_db(member.id)
             except commands.errors.MemberNotFound:
-                player_info = db_utils.find_user_in_db(user)
+                player_info = await ASYNC_DB.find_user_in_db(user)
 
             if not player_info:
                 confirmation_embed.add_field(name=user, value="```Could not be found in database```", inline=False)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                old_strikes, new_strikes, old_permanent_strikes, new_permanent_strikes = db_utils.update_strikes(player_tag, delta)
+                old_strikes, new_strikes, old_permanent_strikes, new_permanent_strikes = await db_utils.update_strikes(player_tag, delta)
                 confirmation_embed.add_field(name=f"{player_name} updated",
                                              value=(f"```Strikes: {old_strikes} -> {new_strikes}\n"
                                                     f"Permanent Strikes: {old_permanent_strikes} -> {new_permanent_strikes}```"),
                                              inline=False)
-                discord_id = db_utils.get_member_id(player_tag)
+                discord_id = await ASYNC_DB.get_member_id(player_tag)
                 member = None
 
                 if discord_id is not None:
@@ -122,7 +123,7 @@ class Strikes(commands.Cog):
     async def give_strike(self, ctx: commands.Context, member: discord.Member):
         """Increment specified user's strikes by 1."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -138,7 +139,7 @@ class Strikes(commands.Cog):
     async def give_strike_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!give_strike error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, give_strike_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
@@ -146,7 +147,7 @@ class Strikes(commands.Cog):
                 await ctx.send(embed=embed)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                discord_id = db_utils.get_member_id(player_tag)
+                discord_id = await ASYNC_DB.get_member_id(player_tag)
                 member = ctx.guild.get_member(discord_id)
                 await self.strike_helper(ctx, player_name, player_tag, 1, member)
             else:
@@ -168,7 +169,7 @@ class Strikes(commands.Cog):
     async def remove_strike(self, ctx: commands.Context, member: discord.Member):
         """Decrement specified user's strikes by 1."""
         LOG.command_start(ctx, member=member)
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if not player_info:
             embed = ErrorHandler.missing_db_info(member.display_name)
@@ -185,7 +186,7 @@ class Strikes(commands.Cog):
     async def remove_strike_error(self, ctx: commands.Context, error: discord.DiscordException):
         """!remove_strike error handler."""
         if isinstance(error, commands.errors.MemberNotFound):
-            player_info = db_utils.find_user_in_db(error.argument)
+            player_info = await ASYNC_DB.find_user_in_db(error.argument)
             LOG.command_start(ctx, remove_strike_error_argument=error.argument, player_info=player_info)
 
             if not player_info:
@@ -193,7 +194,7 @@ class Strikes(commands.Cog):
                 await ctx.send(embed=embed)
             elif len(player_info) == 1:
                 player_name, player_tag, _ = player_info[0]
-                discord_id = db_utils.get_member_id(player_tag)
+                discord_id = await ASYNC_DB.get_member_id(player_tag)
                 member = ctx.guild.get_member(discord_id)
                 await self.strike_helper(ctx, player_name, player_tag, -1, member)
             else:
@@ -215,7 +216,7 @@ class Strikes(commands.Cog):
     async def reset_all_strikes(self, ctx: commands.Context):
         """Reset everyone's strikes to 0. Permanent strikes are not affected."""
         LOG.command_start(ctx)
-        db_utils.reset_strikes()
+        await ASYNC_DB.reset_strikes()
 
         strikes_channel_embed = discord.Embed(color=discord.Color.green())
         strikes_channel_embed.add_field(name="Strikes Reset", value="All users have been reset to 0 strikes")
@@ -231,8 +232,8 @@ class Strikes(commands.Cog):
     async def strikes_report(self, ctx: commands.Context):
         """Get a report of players with strikes."""
         LOG.command_start(ctx)
-        strikes = db_utils.get_users_with_strikes()
-        active_members = clash_utils.get_active_members_in_clan()
+        strikes = await ASYNC_DB.get_users_with_strikes()
+        active_members = await clash_utils.get_active_members_in_clan()
 
         active_table = PrettyTable()
         active_table.field_names = ["Member", "Strikes"]
@@ -282,12 +283,12 @@ class Strikes(commands.Cog):
     async def upcoming_strikes(self, ctx: commands.Context):
         """Get a list of users who will receive strikes for lack of participation in the current river race."""
         LOG.command_start(ctx)
-        upcoming_strikes_list = bot_utils.upcoming_strikes(True)
+        upcoming_strikes_list = await bot_utils.upcoming_strikes(True)
         embed_one = discord.Embed(title="Upcoming Strikes", color=discord.Color.green())
         embed_two = discord.Embed(title="Upcoming Strikes", color=discord.Color.green())
         send_second_embed = False
         field_count = 0
-        strikes_enabled = db_utils.get_strike_status()
+        strikes_enabled = await ASYNC_DB.get_strike_status()
 
         if not strikes_enabled:
             embed_one.set_footer(text="Automated strikes are currently disabled.")
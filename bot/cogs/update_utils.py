@@ -5,7 +5,8 @@ from discord.ext import commands
 
 # Utils
 import utils.bot_utils as bot_utils
-import utils.db_utils as db_utils
+import utils.clash_utils as clash_utils
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 from utils.role_utils import ROLE
 
@@ -31,7 +32,7 @@ class UpdateUtils(commands.Cog):
         roles_to_remove.append(ROLE.check_rules())
         await member.remove_roles(*roles_to_remove)
         await member.add_roles(ROLE.new())
-        db_utils.remove_user(member.id)
+        await ASYNC_DB.remove_user(member.id, await clash_utils.get_family_members())
 
     @commands.command()
     @bot_utils.is_leader_command_check()
@@ -96,7 +97,7 @@ class UpdateUtils(commands.Cog):
 
         embed = discord.Embed(title="Reseting all users. This will take a few minutes.", color=0xFFFF00)
         await ctx.send(embed=embed)
-        db_utils.remove_all_users()
+        await ASYNC_DB.remove_all_users()
 
         for member in ctx.guild.members:
             await self.reset_user_helper(member)
@@ -6,8 +6,9 @@ from prettytable import PrettyTable
 
 # Utils
 import utils.bot_utils as bot_utils
-import utils.db_utils as db_utils
+import utils.clash_utils as clash_utils
 from utils.channel_utils import CHANNEL
+from utils.db_executor_utils import ASYNC_DB
 from utils.logging_utils import LOG
 
 
@@ -24,7 +25,7 @@ class Vacation(commands.Cog):
     async def set_vacation(self, ctx: commands.Context, member: discord.Member, status: bool):
         """Set vacation status for the specified member."""
         LOG.command_start(ctx, member=member, status=status)
-        vacation_status = db_utils.update_vacation_for_user(member.id, status)
+        vacation_status = await ASYNC_DB.update_vacation_for_user(member.id, status)
         vacation_status_string = ("NOT " if not vacation_status else "") + "ON VACATION"
         await CHANNEL.time_off().send(f"Updated vacation status of {member.mention} to: {vacation_status_string}.")
 
@@ -40,7 +41,7 @@ class Vacation(commands.Cog):
     async def vacation_list(self, ctx: commands.Context):
         """Get a list of all users currently on vacation."""
         LOG.command_start(ctx)
-        users_on_vacation = db_utils.get_users_on_vacation()
+        users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
 
         if users_on_vacation:
             table = PrettyTable()
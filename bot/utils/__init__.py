@@ -1,10 +1,21 @@
 """Various utility files."""
 
+# bot_utils has to come first. logging_utils imports it, and most of what it imports needs logging_utils to have finished.
 from .bot_utils import *
+from .api_utils import *
+from .cache_utils import *
 from .callback_utils import *
 from .channel_utils import *
 from .clash_utils import *
+from .db_executor_utils import *
+from .db_pool_utils import *
 from .db_utils import *
 from .logging_utils import *
+from .metrics_utils import *
+from .polling_utils import *
+from .race_log_utils import *
+from .rate_limit_utils import *
+from .reset_utils import *
 from .role_utils import *
+from .snapshot_utils import *
 from .util_types import *
@@ -0,0 +1,370 @@
+"""Asynchronous client used to send requests to the Clash Royale API."""
+
+import asyncio
+import json
+import time
+from enum import auto
+from typing import Any, Dict, List, Union
+
+import aiohttp
+
+# Config
+from config.config import API_CACHE_PATH, CLASH_API_BASE_URL
+from config.credentials import CLASH_API_KEY, CLASH_API_KEYS
+
+# Utils
+from utils.cache_utils import ResponseCache, ResponseStore, StaleResponse
+from utils.logging_utils import LOG, log_message
+from utils.metrics_utils import API_METRICS
+from utils.rate_limit_utils import FORBIDDEN_KEY_COOLDOWN, ApiKeyPool
+from utils.util_types import AutoName
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Maximum number of simultaneous connections kept open to the API.
+CONNECTION_POOL_SIZE = 20
+
+# Seconds that an idle connection is kept alive for reuse.
+KEEP_ALIVE_TIMEOUT = 60
+
+# Seconds before a request is abandoned. The connect timeout is kept short so that an unreachable API fails fast.
+REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+
+# Responses with these status codes are retried up to MAX_RETRIES times. The wait before each retry honors the Retry-After
+# header if present, otherwise it doubles after each attempt starting from RETRY_BACKOFF seconds. A key that is rate limited
+# is taken out of rotation for that long instead, and the retry is sent with another key if one is available.
+RETRY_STATUS_CODES = {429, 503}
+
+# A key rejected with this status code is taken out of rotation and the request is retried with another key. Without another
+# key, the request fails immediately as the rejection is unlikely to go away on its own.
+FORBIDDEN_STATUS_CODE = 403
+
+# The circuit opens after this many consecutive requests fail because the API is unreachable, times out, or responds with a
+# server error. While open, no requests are sent and callers are served stale cached responses. After the open duration, a
+# single request is let through to probe the API. The open duration doubles each time a probe fails, up to the maximum.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_DURATION = 30
+MAX_CIRCUIT_OPEN_DURATION = 10 * 60
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1
+MAX_RETRY_WAIT = 60
+
+
+def encode_tag(tag: str) -> str:
+    """Encode a player or clan tag so that it can be used in a request path.
+
+    Args:
+        tag: Player or clan tag including the leading # symbol.
+
+    Returns:
+        Tag with the # symbol percent encoded.
+    """
+    return "%23" + tag[1:]
+
+
+def retry_delay(retry_after: Union[str, None], attempt: int) -> float:
+    """Determine how long to wait before retrying a request.
+
+    Args:
+        retry_after: Value of the Retry-After header, or None if the response did not include one.
+        attempt: Number of attempts already made, starting from 0.
+
+    Returns:
+        Seconds to wait before the next attempt.
+    """
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0), MAX_RETRY_WAIT)
+        except ValueError:
+            pass
+
+    return min(RETRY_BACKOFF * 2 ** attempt, MAX_RETRY_WAIT)
+
+
+class CircuitState(AutoName):
+    """States of the circuit breaker."""
+    CLOSED = auto()
+    OPEN = auto()
+    HALF_OPEN = auto()
+
+
+class CircuitBreaker:
+    """Stops sending requests to the API after repeated failures so that callers do not each wait out a timeout during an
+    outage.
+    """
+
+    def __init__(self,
+                 failure_threshold: int=CIRCUIT_FAILURE_THRESHOLD,
+                 open_duration: float=CIRCUIT_OPEN_DURATION,
+                 max_open_duration: float=MAX_CIRCUIT_OPEN_DURATION):
+        """Create a closed circuit.
+
+        Args:
+            failure_threshold (optional): Consecutive failures that open the circuit.
+            open_duration (optional): Seconds that the circuit stays open before it is probed.
+            max_open_duration (optional): Longest that the circuit stays open after repeated failed probes.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_open_duration = open_duration
+        self.max_open_duration = max_open_duration
+        self.open_duration = open_duration
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent. Once the circuit has been open long enough, exactly one request is allowed
+        through as a probe.
+
+        Returns:
+            Whether the request may be sent.
+        """
+        if self.state == CircuitState.OPEN and time.monotonic() >= self.opened_at + self.open_duration:
+            self.state = CircuitState.HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.state == CircuitState.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+
+        return self.state == CircuitState.CLOSED
+
+    def record_success(self):
+        """Close the circuit after the API responds."""
+        if self.state != CircuitState.CLOSED:
+            LOG.info(log_message("API circuit closed", open_for=round(time.monotonic() - self.opened_at, 1)))
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_duration = self.base_open_duration
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit if the threshold is reached or a probe failed."""
+        self.consecutive_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            self.open_duration = min(self.open_duration * 2, self.max_open_duration)
+        elif self.state == CircuitState.OPEN or self.consecutive_failures < self.failure_threshold:
+            return
+
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        LOG.warning(log_message("API circuit opened",
+                                consecutive_failures=self.consecutive_failures,
+                                seconds=self.open_duration))
+
+
+class ClashAPIClient:
+    """Sends requests to the Clash Royale API over a shared pool of keep-alive connections. Responses are cached according to
+    the TTL policy of the response cache, and concurrent requests for the same endpoint and parameters share a single request.
+    While the API is unavailable, the most recent cached response to a request is served instead (see StaleResponse). Every
+    call and request is recorded in API_METRICS.
+    """
+
+    def __init__(self,
+                 base_url: str=CLASH_API_BASE_URL,
+                 api_keys: List[str]=None,
+                 cache_path: str=API_CACHE_PATH):
+        """Save connection settings. The underlying session is created on the first request so that it is bound to the running
+        event loop.
+
+        Args:
+            base_url (optional): Root URL that request paths are appended to.
+            api_keys (optional): Keys used to authorize requests. Defaults to CLASH_API_KEY followed by CLASH_API_KEYS.
+            cache_path (optional): SQLite file to persist cached responses in. Responses are only cached in memory if empty.
+        """
+        if api_keys is None:
+            api_keys = [CLASH_API_KEY, *CLASH_API_KEYS]
+
+        self.base_url = base_url
+        self.key_pool = ApiKeyPool(api_keys)
+        self.session: aiohttp.ClientSession = None
+        self.cache = ResponseCache(store=ResponseStore(cache_path) if cache_path else None)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.circuit_breaker = CircuitBreaker()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared client session, creating it if necessary.
+
+        Returns:
+            Session used for all requests to the API.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=CONNECTION_POOL_SIZE, keepalive_timeout=KEEP_ALIVE_TIMEOUT)
+            timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+            headers = {"Accept": "application/json"}
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+        return self.session
+
+    async def get(self, path: str, params: Dict[str, Any]=None, ignore_cache: bool=False) -> Union[Dict[str, Any], None]:
+        """Send a GET request to the API, or return a cached response if a fresh one is available. If an identical request is
+        already in flight, wait for its response instead of sending another.
+
+        Args:
+            path: Request path relative to the base URL, e.g. "/clans/%23ABC123/members".
+            params (optional): Query string parameters.
+            ignore_cache (optional): Skip the cache lookup and force a request. The new response is still cached. An identical
+                request that is already in flight is still joined.
+
+        Returns:
+            Decoded JSON response, or None if the request failed. Responses may be shared with other callers and must not be
+                modified. If the API is unavailable, the most recent cached response is returned as a StaleResponse if there is
+                one.
+        """
+        if not ignore_cache:
+            cached_payload = self.cache.get(path, params)
+
+            if cached_payload is not None:
+                API_METRICS.record_call(path, True)
+                return cached_payload
+
+        key = ResponseCache.make_key(path, params)
+        request = self.in_flight.get(key)
+        API_METRICS.record_call(path, request is not None)
+
+        if request is None:
+            if not self.circuit_breaker.allow_request():
+                return self.stale_response(path, params)
+
+            request = asyncio.ensure_future(self.fetch(path, params))
+            self.in_flight[key] = request
+            request.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            LOG.debug(log_message("Joining in-flight request", key=key))
+
+        # While the API is being probed, serve the stale response right away and let the request revalidate it in the
+        # background.
+        if self.circuit_breaker.state != CircuitState.CLOSED:
+            stale_payload = self.stale_response(path, params)
+
+            if stale_payload is not None:
+                return stale_payload
+
+        # Shield the shared request so that one caller being cancelled does not cancel it for everyone else.
+        return await asyncio.shield(request)
+
+    async def fetch(self, path: str, params: Dict[str, Any]=None) -> Union[Dict[str, Any], None]:
+        """Send a GET request to the API and cache the response. Each attempt is sent with the key from the pool that has the
+        most remaining budget. Rate limited or unavailable responses are retried with backoff, and rejected keys are retried
+        with another key. Every attempt is reported to the circuit breaker.
+
+        Args:
+            path: Request path relative to the base URL.
+            params (optional): Query string parameters.
+
+        Returns:
+            Decoded JSON response, or None if the request failed. If the API is unavailable, the most recent cached response is
+                returned as a StaleResponse if there is one.
+        """
+        session = self.get_session()
+
+        for attempt in range(MAX_RETRIES + 1):
+            api_key = await self.key_pool.acquire()
+            headers = {"authorization": f"Bearer {api_key.key}"}
+            start_time = time.monotonic()
+
+            try:
+                async with session.get(self.base_url + path, params=params, headers=headers) as response:
+                    API_METRICS.record_request(path, response.status, time.monotonic() - start_time)
+                    self.key_pool.record_response(api_key, response.status)
+                    status_code = response.status
+
+                    if status_code >= 500:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+
+                    retry_with_other_key = status_code == FORBIDDEN_STATUS_CODE and len(self.key_pool.keys) > 1
+
+                    if (status_code not in RETRY_STATUS_CODES and not retry_with_other_key) or attempt == MAX_RETRIES:
+                        if status_code != 200:
+                            LOG.warning(log_message(msg="Bad request", path=path, status_code=status_code, key=api_key.name))
+                            return self.stale_response(path, params) if status_code >= 500 else None
+
+                        body = await response.read()
+                        payload = json.loads(body)
+                        self.cache.put(path, params, payload, len(body))
+                        return payload
+
+                    delay = retry_delay(response.headers.get("Retry-After"), attempt)
+            except asyncio.TimeoutError:
+                API_METRICS.record_request(path, "timeout", time.monotonic() - start_time)
+                self.key_pool.record_error(api_key)
+                self.circuit_breaker.record_failure()
+                LOG.warning(log_message(msg="Request timed out", path=path))
+                return self.stale_response(path, params)
+            except aiohttp.ClientError as error:
+                API_METRICS.record_request(path, "error", time.monotonic() - start_time)
+                self.key_pool.record_error(api_key)
+                self.circuit_breaker.record_failure()
+                LOG.warning(log_message(msg="Request failed", path=path, error=error))
+                return self.stale_response(path, params)
+            except ValueError:
+                LOG.warning(log_message(msg="Response could not be decoded", path=path))
+                return None
+
+            # Stop retrying once the API is considered down.
+            if self.circuit_breaker.state == CircuitState.OPEN:
+                return self.stale_response(path, params)
+
+            LOG.warning(log_message(msg="Retrying request",
+                                    path=path,
+                                    status_code=status_code,
+                                    key=api_key.name,
+                                    attempt=attempt + 1))
+
+            # Rejections apply to every request sent with the key, so take it out of rotation instead of only delaying this
+            # request. The retry goes to another key, or waits for this one to come back.
+            if status_code == FORBIDDEN_STATUS_CODE:
+                self.key_pool.bench(api_key, FORBIDDEN_KEY_COOLDOWN)
+            elif status_code == 429:
+                self.key_pool.bench(api_key, delay)
+            else:
+                await asyncio.sleep(delay)
+
+        return None
+
+    def stale_response(self, path: str, params: Dict[str, Any]=None) -> Union[StaleResponse, None]:
+        """Get the most recent cached response to a request, regardless of whether it has expired.
+
+        Args:
+            path: Request path relative to the base URL.
+            params (optional): Query string parameters.
+
+        Returns:
+            Cached response marked with its age, or None if there is no recent enough response.
+        """
+        entry = self.cache.get_stale(path, params)
+
+        if entry is None:
+            return None
+
+        LOG.info(log_message("Serving stale response", path=path, age=round(entry.age())))
+        return StaleResponse(entry.payload, entry.age())
+
+    async def close(self):
+        """Close the shared session and any open connections, and stop persisting cached responses."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+        self.session = None
+
+        if self.cache.store is not None:
+            store, self.cache.store = self.cache.store, None
+            await asyncio.get_running_loop().run_in_executor(None, store.close)
+
+
+CLASH_API = ClashAPIClient()
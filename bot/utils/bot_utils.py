@@ -4,7 +4,7 @@ import datetime
 import os
 import re
 from difflib import SequenceMatcher
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterable, List, Tuple, Union
 
 import cv2
 import discord
@@ -28,8 +28,10 @@ import utils.clash_utils as clash_utils
 import utils.db_utils as db_utils
 from utils.callback_utils import CallbackType, CALLBACK_MANAGER
 from utils.channel_utils import CHANNEL
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
 from utils.logging_utils import LOG, log_message
 from utils.role_utils import ROLE
+from utils.snapshot_utils import SNAPSHOT_STORE
 from utils.util_types import (
     ClashData,
     CombinedData,
@@ -191,13 +193,13 @@ def get_discord_data(player_tag: str,
 
     Args:
         player_tag: Player tag of user needed for determining status.
-        clan_tag: Clan tag of user.
+        clan_tag: Clan tag of user. Members of any tracked clan are active.
         member: Discord member if user is on Discord.
     Returns:
         Relevant Discord data. If no member is provided, then discord_id will be None and discord_name will utilize status and
         player tag.
     """
-    is_active_member = clan_tag == PRIMARY_CLAN_TAG
+    is_active_member = clan_tag in clash_utils.TRACKED_CLAN_TAGS
 
     if member is None:
         status = Status.UNREGISTERED if is_active_member else Status.DEPARTED
@@ -212,7 +214,7 @@ def get_discord_data(player_tag: str,
     return discord_data
 
 
-def get_combined_data(player_tag: str, member: discord.Member=None) -> Union[CombinedData, None]:
+async def get_combined_data(player_tag: str, member: discord.Member=None) -> Union[CombinedData, None]:
     """Get user's Clash Royale and Discord data.
 
     Args:
@@ -222,7 +224,7 @@ def get_combined_data(player_tag: str, member: discord.Member=None) -> Union[Com
     Returns:
         Clash Royale and Discord data of user, or None if error occurs.
     """
-    clash_data = clash_utils.get_clash_data(player_tag)
+    clash_data = await clash_utils.get_clash_data(player_tag)
 
     if clash_data is None:
         return None
@@ -232,6 +234,21 @@ def get_combined_data(player_tag: str, member: discord.Member=None) -> Union[Com
     return combined_data
 
 
+async def get_combined_data_many(player_tags: Iterable[str]) -> Dict[str, CombinedData]:
+    """Get Clash Royale and Discord data of several users that are not on Discord. Their Clash Royale data is requested
+    concurrently.
+
+    Args:
+        player_tags: Player tags of users to get data of.
+
+    Returns:
+        Dictionary mapping player tags to Clash Royale and Discord data. Users whose data could not be retrieved are left out.
+    """
+    all_clash_data = await clash_utils.get_clash_data_many(player_tags)
+    return {player_tag: {**clash_data, **get_discord_data(player_tag, clash_data['clan_tag'])}
+            for player_tag, clash_data in all_clash_data.items()}
+
+
 def royale_api_url(player_tag: str) -> str:
     """Get url of Royale API page of specified player.
 
@@ -258,16 +275,18 @@ async def send_rules_message(user_to_purge: discord.ClientUser):
 
 async def deck_usage_reminder(time_zone: ReminderTime=ReminderTime.ALL,
                               message: str=DEFAULT_REMINDER_MESSAGE,
-                              automated: bool=True):
+                              automated: bool=True,
+                              clan_tag: str=PRIMARY_CLAN_TAG):
     """Send message to reminders channel mentioning users that have remaining decks today.
 
     Args:
         time_zone (optional): Which time zone of users to mention. Defaults to reminding users in all time zones.
         message (optional): Message to be sent with reminder. Defaults to message set in config.
         automated (optional): Whether to send message indicating this was an automated reminder. Defaults to true.
+        clan_tag (optional): Clan whose participants to remind. Defaults to primary clan.
     """
-    reminder_list = clash_utils.get_remaining_decks_today()
-    users_on_vacation = db_utils.get_users_on_vacation()
+    reminder_list = await clash_utils.get_remaining_decks_today(clan_tag)
+    users_on_vacation = await ASYNC_DB.get_users_on_vacation(await clash_utils.get_family_members())
     reminder_channel = CHANNEL.reminder()
     member_string = ""
     non_member_string = ""
@@ -275,7 +294,7 @@ async def deck_usage_reminder(time_zone: ReminderTime=ReminderTime.ALL,
     time_zone_set = set()
 
     if check_time_zones:
-        time_zone_set = db_utils.get_members_in_time_zone(time_zone)
+        time_zone_set = await ASYNC_DB.get_members_in_time_zone(time_zone)
         if not time_zone_set:
             check_time_zones = False
 
@@ -287,7 +306,7 @@ async def deck_usage_reminder(time_zone: ReminderTime=ReminderTime.ALL,
             continue
 
         member = None
-        discord_id = db_utils.get_member_id(player_tag)
+        discord_id = await ASYNC_DB.get_member_id(player_tag)
 
         if discord_id is not None:
             member = discord.utils.get(reminder_channel.members, id=discord_id)
@@ -306,12 +325,18 @@ async def deck_usage_reminder(time_zone: ReminderTime=ReminderTime.ALL,
         else:
             no_reminder_string = "Everyone has already used all their decks today. Good job!"
 
+        if len(clash_utils.TRACKED_CLAN_TAGS) > 1:
+            no_reminder_string = f"{await get_clan_name(clan_tag)}: {no_reminder_string}"
+
         no_reminder_embed = discord.Embed(title=no_reminder_string, color=discord.Color.green())
         await reminder_channel.send(embed=no_reminder_embed)
         return
 
     reminder_string = message + "\n" + member_string + non_member_string
 
+    if len(clash_utils.TRACKED_CLAN_TAGS) > 1:
+        reminder_string = f"**{await get_clan_name(clan_tag)}**\n" + reminder_string
+
     if automated:
         if time_zone == ReminderTime.US:
             automated_message = (
@@ -334,6 +359,26 @@ async def deck_usage_reminder(time_zone: ReminderTime=ReminderTime.ALL,
     await reminder_channel.send(reminder_string)
 
 
+async def get_clan_name(clan_tag: str) -> str:
+    """Get the name of a clan to label messages about it with.
+
+    Args:
+        clan_tag: Clan to get name of.
+
+    Returns:
+        Name of clan, or its tag if the name could not be retrieved.
+    """
+    if clan_tag == PRIMARY_CLAN_TAG:
+        return PRIMARY_CLAN_NAME
+
+    river_race = await clash_utils.get_current_river_race(clan_tag)
+
+    if river_race is None:
+        return clan_tag
+
+    return river_race['clan']['name']
+
+
 async def update_member(member: discord.Member, player_tag: str=None) -> bool:
     """Update a member's database information and adjust their relevant roles as necessary.
 
@@ -350,7 +395,7 @@ async def update_member(member: discord.Member, player_tag: str=None) -> bool:
         return False
 
     if player_tag is None:
-        player_info = db_utils.find_user_in_db(member.id)
+        player_info = await ASYNC_DB.find_user_in_db(member.id)
 
         if len(player_info) != 1:
             LOG.warning(log_message("Attempted update of player not in database", member=member, player_tag=player_tag))
@@ -358,14 +403,14 @@ async def update_member(member: discord.Member, player_tag: str=None) -> bool:
 
         _, player_tag, _ = player_info[0]
 
-    user_data = get_combined_data(player_tag, member)
+    user_data = await get_combined_data(player_tag, member)
 
     if user_data is None:
         LOG.warning(log_message("Failed to get data during member update", member=member, player_tag=player_tag))
         return False
 
     LOG.info(log_message("Updating member", member=member, player_tag=player_tag))
-    db_utils.update_user(user_data)
+    await ASYNC_DB.update_user(user_data)
 
     current_roles = set(member.roles).intersection({ROLE.member(), ROLE.visitor(), ROLE.elder()})
     correct_roles = {ROLE.member() if (user_data['status'] == Status.ACTIVE) else ROLE.visitor()}
@@ -395,17 +440,17 @@ async def update_member(member: discord.Member, player_tag: str=None) -> bool:
 async def update_all_members(guild: discord.Guild):
     """Update all members of the Discord server that need to be updated.
 
-    This does not guarantee all members will actually be updated. For example, visitors are only updated if they have joined the
-    primary clan. A visitor that has switched player names or clans (non primary clan to non primary clan) would not be updated.
-    Changes in a member's Discord name, moving from/to the primary clan, and primary clan members that have changed their player
+    This does not guarantee all members will actually be updated. For example, visitors are only updated if they have joined a
+    tracked clan. A visitor that has switched player names or clans (untracked clan to untracked clan) would not be updated.
+    Changes in a member's Discord name, moving from/to a tracked clan, and tracked clan members that have changed their player
     names or clan role will trigger an update.
 
     Args:
         guild: Update members of this Discord server.
     """
     LOG.info("Starting update on all Discord members")
-    active_members = clash_utils.get_active_members_in_clan()
-    db_info = db_utils.get_server_members_info()
+    active_members = await clash_utils.get_family_members()
+    db_info = await ASYNC_DB.get_server_members_info()
 
     for member in guild.members:
         if member.bot or member.id not in db_info:
@@ -427,16 +472,20 @@ async def update_all_members(guild: discord.Guild):
             LOG.debug(log_message("Updating member that is now a visitor", member=member))
             await update_member(member, player_tag)
 
-    db_utils.clean_up_db()
+    await db_utils.clean_up_db()
     LOG.info("Update all members complete")
 
 
-def break_down_usage_history(deck_usage: int, command_time: datetime.datetime=None) -> List[Tuple[int, str]]:
+def break_down_usage_history(deck_usage: int,
+                             command_time: datetime.datetime=None,
+                             reset_time: datetime.datetime=None) -> List[Tuple[int, str]]:
     """Break down concatenated deck usage into usage per day.
 
     Args:
         deck_usage: Last 7 days of deck usage bitwise shifted and or'd together.
         command_time (optional): Time to base day associated with each usage with. If not provided, use current time.
+        reset_time (optional): Time of the most recent daily reset. If not provided, it is read from the database, so callers
+            on the event loop should pass it.
 
     Returns:
         Last 7 days of deck usage in the form [(decks_used, day), ...] where index 0 represents the most recent day and index 6
@@ -445,9 +494,12 @@ def break_down_usage_history(deck_usage: int, command_time: datetime.datetime=No
     if command_time is None:
         command_time = datetime.datetime.now(datetime.timezone.utc)
 
+    if reset_time is None:
+        reset_time = db_utils.get_reset_time()
+
     time_delta = None
 
-    if command_time.time() > db_utils.get_reset_time().time():
+    if command_time.time() > reset_time.time():
         time_delta = datetime.timedelta(days=1)
     else:
         time_delta = datetime.timedelta(days=2)
@@ -468,7 +520,8 @@ def break_down_usage_history(deck_usage: int, command_time: datetime.datetime=No
 def should_receive_strike(deck_usage: int,
                           completed_saturday: bool,
                           tracked_since: datetime.datetime,
-                          reset_times: ResetTimes) -> Tuple[bool, int, int, bool]:
+                          reset_times: ResetTimes,
+                          last_reset_time: datetime.datetime) -> Tuple[bool, int, int, bool]:
     """Based on deck usage and race completion date, determine whether user should receive strike.
 
     Args:
@@ -476,12 +529,13 @@ def should_receive_strike(deck_usage: int,
         completed_saturday: Whether race completed early or not.
         tracked_since: Time that bot started tracking user.
         reset_times: Dictionary of river race reset times.
+        last_reset_time: Time of the most recent daily reset.
 
     Returns:
         Whether the user should receive a strike, how many decks they used and should have used, and whether any data was missing.
             (should_receive_strike, decks_used, decks_required, missing_data)
     """
-    usage_history_list = break_down_usage_history(deck_usage)
+    usage_history_list = break_down_usage_history(deck_usage, reset_time=last_reset_time)
     decks_required = 0
     decks_used = 0
     missing_data = False
@@ -521,7 +575,7 @@ def should_receive_strike(deck_usage: int,
     return (decks_used < decks_required, decks_used, decks_required, missing_data)
 
 
-def upcoming_strikes(use_race_reset_times: bool) -> List[Tuple[str, str, int, int, int]]:
+async def upcoming_strikes(use_race_reset_times: bool) -> List[Tuple[str, str, int, int, int]]:
     """Get a list of all users who will receive strike or who would have received strikes in the previous war.
 
     Args:
@@ -532,12 +586,12 @@ def upcoming_strikes(use_race_reset_times: bool) -> List[Tuple[str, str, int, in
         A list of users who will receive or have received a strike in the current/most recent river race.
             (player_name, player_tag, decks_used, decks_required, current_strikes)
     """
-    deck_usage_list = db_utils.get_all_user_deck_usage_history()
-    strikes_dict = db_utils.get_users_with_strikes_dict()
-    active_members = clash_utils.get_active_members_in_clan()
-    is_war_time = db_utils.is_war_time()
-    completed_saturday = db_utils.is_completed_saturday()
-    last_reset_time = db_utils.get_reset_time()
+    deck_usage_list = await ASYNC_DB.get_all_user_deck_usage_history()
+    strikes_dict = await ASYNC_DB.get_users_with_strikes_dict()
+    active_members = await clash_utils.get_active_members_in_clan()
+    is_war_time = await ASYNC_DB.is_war_time()
+    completed_saturday = await ASYNC_DB.is_completed_saturday()
+    last_reset_time = await ASYNC_DB.get_reset_time()
     now = datetime.datetime.now(datetime.timezone.utc)
     upcoming_strikes_list = []
     race_reset_times: ResetTimes
@@ -548,7 +602,7 @@ def upcoming_strikes(use_race_reset_times: bool) -> List[Tuple[str, str, int, in
         return []
 
     if use_race_reset_times:
-        race_reset_times = db_utils.get_river_race_reset_times()
+        race_reset_times = await ASYNC_DB.get_river_race_reset_times()
 
     if not is_war_time:
         if now.time() < last_reset_time.time():
@@ -578,7 +632,7 @@ def upcoming_strikes(use_race_reset_times: bool) -> List[Tuple[str, str, int, in
         if player_tag not in active_members:
             continue
 
-        usage_history = break_down_usage_history(history, now)
+        usage_history = break_down_usage_history(history, now, last_reset_time)
         decks_required: int
         decks_used: int
 
@@ -652,7 +706,7 @@ def get_current_battletime() -> str:
     return datetime_to_battletime(datetime.datetime.utcnow())
 
 
-def create_match_performance_embed(player_name: str, player_tag: str) -> discord.Embed:
+async def create_match_performance_embed(player_name: str, player_tag: str) -> discord.Embed:
     """Create a Discord Embed displaying a user's River Race stats.
 
     Args:
@@ -662,7 +716,7 @@ def create_match_performance_embed(player_name: str, player_tag: str) -> discord
     Returns:
         Embed containing the specified user's stats.
     """
-    history = db_utils.get_match_performance_dict(player_tag)
+    history = await ASYNC_DB.get_match_performance_dict(player_tag)
     embed = discord.Embed(title=f"{player_name}'s River Race Stats")
 
     embed.add_field(name="Regular PvP",
@@ -718,6 +772,42 @@ def create_match_performance_embed(player_name: str, player_tag: str) -> discord
     return embed
 
 
+async def create_deck_usage_times_embed(player_name: str, player_tag: str) -> discord.Embed:
+    """Create a Discord Embed displaying when a user used their decks since the most recent daily reset.
+
+    Args:
+        player_name: Player name of player to display deck usage of.
+        player_tag: Player tag of player to display deck usage of.
+
+    Returns:
+        Embed containing the times the specified user was seen using decks today.
+    """
+    user_data = await ASYNC_DB.get_user_data(player_tag)
+
+    if user_data is None or user_data['clan_tag'] not in clash_utils.TRACKED_CLAN_TAGS:
+        return discord.Embed(title=f"{player_name} is not participating in a tracked clan's river race.",
+                             color=discord.Color.red())
+
+    reset_time = await ASYNC_DB.get_reset_time(user_data['clan_tag'])
+    usage_times = await DB_EXECUTOR.run(SNAPSHOT_STORE.get_deck_usage_times, player_tag, reset_time, None, user_data['clan_tag'])
+
+    if not usage_times:
+        return discord.Embed(title=f"{player_name} has not used any decks since the last reset.", color=discord.Color.blue())
+
+    table = PrettyTable()
+    table.field_names = ["Time (UTC)", "Decks Used"]
+
+    for usage_time, decks_used in usage_times:
+        table.add_row([usage_time.strftime("%H:%M"), decks_used])
+
+    embed = discord.Embed(title=f"{player_name}'s deck usage today",
+                          description="```\n" + table.get_string() + "```",
+                          color=discord.Color.green())
+    embed.set_footer(text="Times are when the usage was first seen by the bot, which polls the river race every 10 minutes.")
+
+    return embed
+
+
 def average_fame_per_deck(win_rate: float) -> float:
     """Get the average fame per deck value at the specified win rate.
 
@@ -761,7 +851,7 @@ def calculate_win_rate_from_average_fame(avg_fame_per_deck: float) -> float:
     return win_rate
 
 
-def predict_race_outcome(
+async def predict_race_outcome(
     use_historical_win_rates: bool,
     use_historical_deck_usage: bool) -> Tuple[List[Tuple[str, str, int, float, int]], Dict[str, str], Dict[str, Union[int, float]]]:
     """Predict the final standings at the end of the day.
@@ -783,8 +873,8 @@ def predict_race_outcome(
 
             Catch up requirements: { "decks": int, "win_rate": float }
     """
-    clans = clash_utils.get_clans_in_race(False)
-    saved_clan_info = db_utils.get_saved_clans_in_race_info()
+    clans = await clash_utils.get_clans_in_race(False)
+    saved_clan_info = await ASYNC_DB.get_saved_clans_in_race_info()
 
     if use_historical_win_rates:
         win_rates = {}
@@ -835,7 +925,7 @@ def predict_race_outcome(
     predicted_outcomes = []
     completed_clans = {}
     catch_up_requirements = {}
-    is_colosseum_week = db_utils.is_colosseum_week()
+    is_colosseum_week = await ASYNC_DB.is_colosseum_week()
 
     for clan in clans:
         clan_tag = clan['clan_tag']
@@ -873,7 +963,7 @@ def predict_race_outcome(
     return (predicted_outcomes, completed_clans, catch_up_requirements)
 
 
-def create_prediction_embeds(
+async def create_prediction_embeds(
     predicted_outcomes: List[Tuple[str, str, int, float, int]],
     completed_clans: Dict[str, str],
     catch_up_requirements: Dict[str, Union[int, float]]) -> Tuple[discord.Embed, discord.Embed, discord.Embed]:
@@ -892,7 +982,7 @@ def create_prediction_embeds(
         Tuple of predicted outcomes embed, completed clans embed, and catch up requirements embed.
     """
     primary_clan_placement = 1
-    is_colosseum_week = db_utils.is_colosseum_week()
+    is_colosseum_week = await ASYNC_DB.is_colosseum_week()
 
     for _, tag, _, _, _ in predicted_outcomes:
         if tag == PRIMARY_CLAN_TAG:
@@ -962,14 +1052,14 @@ async def kick(player_tag: str, player_name: str, ) -> discord.Embed:
     Returns:
         Embed with details about the kick.
     """
-    total_kicks, last_kick_date = db_utils.kick_user(player_tag)
+    total_kicks, last_kick_date = await db_utils.kick_user(player_tag)
     embed = discord.Embed(title="Kick Logged", color=discord.Color.green())
     embed.add_field(name=player_name, value=f"```Times kicked: {total_kicks}\nLast kicked: {last_kick_date}```")
 
     return embed
 
 
-def undo_kick(player_name: str, player_tag: str) -> discord.Embed:
+async def undo_kick(player_name: str, player_tag: str) -> discord.Embed:
     """Undo the latest kick of the specified user and return an embed with details about the kick.
 
     Args:
@@ -979,7 +1069,7 @@ def undo_kick(player_name: str, player_tag: str) -> discord.Embed:
     Returns:
         Embed with info about the kick that was undone.
     """
-    removed_kick = db_utils.undo_kick(player_tag)
+    removed_kick = await ASYNC_DB.undo_kick(player_tag)
     embed = discord.Embed(title="Kick Undone", color=discord.Color.green())
 
     if removed_kick is None:
@@ -1025,10 +1115,10 @@ async def get_player_info_from_image(image: discord.Attachment) -> Tuple[str, st
     Returns:
         Tuple of closest matching player tag and player name from screenshot.
     """
-    if db_utils.is_war_time():
-        participants = clash_utils.get_river_race_participants()
+    if await ASYNC_DB.is_war_time():
+        participants = await clash_utils.get_river_race_participants()
     else:
-        participants = clash_utils.get_last_river_race_participants()
+        participants = await clash_utils.get_last_river_race_participants()
 
     file_path = 'kick_images'
 
@@ -1143,12 +1233,12 @@ async def strike_former_participant(player_tag: str,
     Returns:
         Embed confirming the strike was given.
     """
-    _, strikes, _, _ = db_utils.update_strikes(player_tag, 1)
+    _, strikes, _, _ = await db_utils.update_strikes(player_tag, 1)
     strikes_embed = discord.Embed(title=player_name,
                                   description=(f"```Decks: {decks_used}/{decks_required}\n"
                                                f"Strikes: {strikes}\nDate: {tracked_since}```"))
 
-    discord_id = db_utils.get_member_id(player_tag)
+    discord_id = await ASYNC_DB.get_member_id(player_tag)
     member: discord.Member = None
 
     if discord_id is not None:
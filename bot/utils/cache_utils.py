@@ -0,0 +1,501 @@
+"""Cache of Clash Royale API responses, optionally persisted to disk."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Pattern, Tuple, Union
+
+# Config
+from config.config import PLAYER_PROFILE_TTL
+
+# Utils
+from utils.logging_utils import LOG, log_message
+from utils.util_types import ClashData
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Seconds that a response to each endpoint stays fresh. Paths are matched against each pattern in order and the first match
+# wins. Endpoints with a TTL of 0 are never cached.
+ENDPOINT_TTLS: List[Tuple[Pattern, int]] = [
+    (re.compile(r"^/clans/[^/]+/members$"), 60),
+    (re.compile(r"^/clans/[^/]+/currentriverrace$"), 60),
+    (re.compile(r"^/clans/[^/]+/riverracelog$"), 60),
+    (re.compile(r"^/cards$"), 24 * 60 * 60),
+    (re.compile(r"^/players/[^/]+/battlelog$"), 0),
+    (re.compile(r"^/players/[^/]+$"), 0),
+]
+
+# Upper bounds on the number of cached responses and the total size of their raw response bodies.
+MAX_CACHE_ENTRIES = 256
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+# Responses that have expired are kept for this many seconds so that they can still be served while the API is unavailable.
+MAX_STALE_AGE = 24 * 60 * 60
+
+# Seconds between writes of cached responses to disk. Responses cached in between are written together in one transaction.
+STORE_FLUSH_INTERVAL = 5
+
+# Upper bound on the number of parsed player profiles cached by ProfileCache. How long they stay fresh is set by
+# PLAYER_PROFILE_TTL in the config.
+MAX_PLAYER_PROFILES = 512
+
+
+class CacheEntry:
+    """A cached response along with when it expires."""
+
+    def __init__(self, payload: Any, size: int, ttl: int, stored_at: float=None):
+        """Save a response.
+
+        Args:
+            payload: Decoded response.
+            size: Size in bytes of the raw response body.
+            ttl: Seconds that the response stays fresh.
+            stored_at (optional): Unix time when the response was fetched. Defaults to now.
+        """
+        self.payload = payload
+        self.size = size
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.expires_at = self.stored_at + ttl
+
+    def is_fresh(self) -> bool:
+        """Check whether the entry has not yet expired.
+
+        Returns:
+            Whether the entry can still be served.
+        """
+        return time.time() < self.expires_at
+
+    def age(self) -> float:
+        """Get how long ago the response was fetched.
+
+        Returns:
+            Age of the entry in seconds.
+        """
+        return time.time() - self.stored_at
+
+
+class StaleResponse(dict):
+    """Expired response served because a fresh one could not be fetched. Only the top level of the response is copied, so
+    nested values are still shared with the cache and must not be modified.
+    """
+
+    def __init__(self, payload: Dict[str, Any], age: float):
+        """Wrap a cached response.
+
+        Args:
+            payload: Decoded response.
+            age: Seconds since the response was fetched.
+        """
+        super().__init__(payload)
+        self.age = age
+
+
+def response_age(payload: Any) -> float:
+    """Get how old a response returned by the API client is.
+
+    Args:
+        payload: Response returned by the API client.
+
+    Returns:
+        Seconds since a stale response was fetched, or 0 if the response is fresh.
+    """
+    return payload.age if isinstance(payload, StaleResponse) else 0.0
+
+
+class ResponseStore:
+    """SQLite file that cached responses are written to so that they survive restarts. Writes are queued and written by a
+    background thread every few seconds, so caching a response never waits on the disk. Only the latest write of each key is
+    kept in the queue.
+    """
+
+    def __init__(self, path: str, flush_interval: float=STORE_FLUSH_INTERVAL):
+        """Open the file, creating it if it does not exist, and start the thread that writes to it.
+
+        Args:
+            path: Path of the SQLite file.
+            flush_interval (optional): Seconds between writes to disk.
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (\
+                                     cache_key TEXT PRIMARY KEY,\
+                                     payload TEXT NOT NULL,\
+                                     size INTEGER NOT NULL,\
+                                     stored_at REAL NOT NULL,\
+                                     expires_at REAL NOT NULL)")
+        self.connection.commit()
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending: Dict[str, Union[CacheEntry, None]] = {}
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_periodically, name="response-store", daemon=True)
+        self.flusher.start()
+
+    def save(self, key: str, entry: CacheEntry):
+        """Queue an entry to be written to disk, replacing any existing entry with the same key.
+
+        Args:
+            key: Key that the entry is cached under.
+            entry: Entry to write. Its payload must not be modified afterwards, since it is encoded when it is written.
+        """
+        with self.lock:
+            self.pending[key] = entry
+
+    def delete(self, keys: List[str]):
+        """Queue entries to be removed from disk.
+
+        Args:
+            keys: Keys of the entries to remove.
+        """
+        with self.lock:
+            for key in keys:
+                self.pending[key] = None
+
+    def flush(self) -> int:
+        """Write every queued save and delete in a single transaction.
+
+        Returns:
+            Number of keys written or removed.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+        if not pending:
+            return 0
+
+        saves = [(key, json.dumps(entry.payload), entry.size, entry.stored_at, entry.expires_at)
+                 for key, entry in pending.items() if entry is not None]
+        deletes = [(key,) for key, entry in pending.items() if entry is None]
+
+        try:
+            with self.connection:
+                self.connection.executemany("DELETE FROM responses WHERE cache_key = ?", deletes)
+                self.connection.executemany("REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", saves)
+        except sqlite3.Error as error:
+            LOG.warning(log_message("Cached responses could not be written to disk", error=error, keys=len(pending)))
+            return 0
+
+        return len(pending)
+
+    def flush_periodically(self):
+        """Write queued changes every flush_interval seconds until the store is closed."""
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+    def load(self) -> Iterator[Tuple[str, CacheEntry]]:
+        """Read every entry that is recent enough to be served while the API is unavailable and discard the rest.
+
+        Returns:
+            Iterator of (key, entry) pairs, from least to most recently stored.
+        """
+        now = time.time()
+        self.connection.execute("DELETE FROM responses WHERE stored_at <= ?", (now - MAX_STALE_AGE,))
+        self.connection.commit()
+        rows = self.connection.execute("SELECT cache_key, payload, size, stored_at, expires_at FROM responses\
+                                        ORDER BY stored_at").fetchall()
+
+        for key, payload, size, stored_at, expires_at in rows:
+            yield key, CacheEntry(json.loads(payload), size, expires_at - stored_at, stored_at)
+
+    def close(self):
+        """Stop the background thread, write anything still queued, and close the file."""
+        self.closed.set()
+        self.flusher.join()
+        self.flush()
+        self.connection.close()
+
+
+class ResponseCache:
+    """Least recently used cache of API responses keyed by endpoint and query parameters.
+
+    Cached payloads are shared between callers and must not be modified.
+    """
+
+    def __init__(self,
+                 ttl_policy: List[Tuple[Pattern, int]]=ENDPOINT_TTLS,
+                 max_entries: int=MAX_CACHE_ENTRIES,
+                 max_bytes: int=MAX_CACHE_BYTES,
+                 store: ResponseStore=None):
+        """Create a cache. If a store is provided, any responses in it that are recent enough to serve are loaded immediately.
+
+        Args:
+            ttl_policy (optional): List of (path pattern, TTL in seconds) pairs used to determine how long responses stay fresh.
+            max_entries (optional): Maximum number of responses to keep.
+            max_bytes (optional): Maximum combined size of the raw response bodies being kept.
+            store (optional): Store that entries are saved to.
+        """
+        self.ttl_policy = ttl_policy
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store = store
+
+        if self.store is not None:
+            for key, entry in self.store.load():
+                self.insert(key, entry)
+
+            LOG.info(log_message("Loaded cached responses from disk", entries=len(self.entries)))
+
+    @staticmethod
+    def make_key(path: str, params: Dict[str, Any]=None) -> str:
+        """Build the key that a request is stored under.
+
+        Args:
+            path: Request path relative to the API base URL.
+            params (optional): Query string parameters.
+
+        Returns:
+            Key unique to the endpoint and parameters.
+        """
+        if not params:
+            return path
+
+        return path + "?" + "&".join(f"{key}={params[key]}" for key in sorted(params))
+
+    def ttl_for(self, path: str) -> int:
+        """Get how long responses from an endpoint stay fresh.
+
+        Args:
+            path: Request path relative to the API base URL.
+
+        Returns:
+            TTL in seconds, or 0 if responses from this endpoint should not be cached.
+        """
+        for pattern, ttl in self.ttl_policy:
+            if pattern.match(path):
+                return ttl
+
+        return 0
+
+    def get(self, path: str, params: Dict[str, Any]=None) -> Union[Any, None]:
+        """Look up a fresh response.
+
+        Args:
+            path: Request path relative to the API base URL.
+            params (optional): Query string parameters.
+
+        Returns:
+            Cached payload, or None if there is no fresh response for this request. Expired responses are kept until they are
+                evicted so that they can be served by get_stale.
+        """
+        key = self.make_key(path, params)
+        entry = self.entries.get(key)
+
+        if entry is None or not entry.is_fresh():
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        LOG.debug(log_message("Serving cached response", key=key))
+        return entry.payload
+
+    def get_stale(self, path: str, params: Dict[str, Any]=None) -> Union[CacheEntry, None]:
+        """Look up the most recent response to a request, even if it has expired.
+
+        Args:
+            path: Request path relative to the API base URL.
+            params (optional): Query string parameters.
+
+        Returns:
+            Cached entry, or None if there is no response for this request that was fetched within MAX_STALE_AGE.
+        """
+        entry = self.entries.get(self.make_key(path, params))
+
+        if entry is None or entry.age() > MAX_STALE_AGE:
+            return None
+
+        return entry
+
+    def put(self, path: str, params: Dict[str, Any], payload: Any, size: int):
+        """Store a response if its endpoint is cacheable.
+
+        Args:
+            path: Request path relative to the API base URL.
+            params: Query string parameters.
+            payload: Decoded response.
+            size: Size in bytes of the raw response body.
+        """
+        ttl = self.ttl_for(path)
+
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        key = self.make_key(path, params)
+        entry = CacheEntry(payload, size, ttl)
+        self.insert(key, entry)
+
+        if self.store is not None:
+            self.store.save(key, entry)
+
+    def insert(self, key: str, entry: CacheEntry):
+        """Add an entry as the most recently used, evicting the least recently used entries to stay within bounds.
+
+        Args:
+            key: Key to store the entry under.
+            entry: Entry to add.
+        """
+        self.remove(key)
+        self.entries[key] = entry
+        self.total_bytes += entry.size
+        evicted_keys = []
+
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            evicted_key, evicted_entry = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_entry.size
+            self.evictions += 1
+            evicted_keys.append(evicted_key)
+            LOG.debug(log_message("Evicted cached response", key=evicted_key))
+
+        if evicted_keys and self.store is not None:
+            self.store.delete(evicted_keys)
+
+    def remove(self, key: str):
+        """Remove a single entry if it exists.
+
+        Args:
+            key: Key of the entry to remove.
+        """
+        entry = self.entries.pop(key, None)
+
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def invalidate(self, path_prefix: str=None) -> int:
+        """Remove cached responses.
+
+        Args:
+            path_prefix (optional): Only remove responses whose key starts with this prefix. Removes everything if not specified.
+
+        Returns:
+            Number of entries removed.
+        """
+        if path_prefix is None:
+            keys = list(self.entries)
+        else:
+            keys = [key for key in self.entries if key.startswith(path_prefix)]
+
+        for key in keys:
+            self.remove(key)
+
+        if self.store is not None:
+            self.store.delete(keys)
+
+        LOG.debug(log_message("Invalidated cached responses", path_prefix=path_prefix, removed=len(keys)))
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache usage counters.
+
+        Returns:
+            Dictionary of hits, misses, evictions, number of entries, and bytes in use.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes
+        }
+
+
+class ProfileCache:
+    """Least recently used cache of parsed player profiles keyed by player tag. Every profile stays fresh for the same number of
+    seconds. Cached profiles are shared between callers and must not be modified.
+    """
+
+    def __init__(self, ttl: int=PLAYER_PROFILE_TTL, max_entries: int=MAX_PLAYER_PROFILES):
+        """Create an empty cache.
+
+        Args:
+            ttl (optional): Seconds that a profile stays fresh. Profiles are not cached if this is 0.
+            max_entries (optional): Maximum number of profiles to keep.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, player_tag: str) -> Union[ClashData, None]:
+        """Look up a fresh profile. Expired profiles are removed when they are looked up.
+
+        Args:
+            player_tag: Player tag of the profile.
+
+        Returns:
+            Cached profile, or None if there is no fresh profile of this player.
+        """
+        entry = self.entries.get(player_tag)
+
+        if entry is None or not entry.is_fresh():
+            self.entries.pop(player_tag, None)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(player_tag)
+        self.hits += 1
+        return entry.payload
+
+    def put(self, player_tag: str, profile: ClashData):
+        """Add a profile as the most recently used, evicting the least recently used profiles to stay within bounds.
+
+        Args:
+            player_tag: Player tag of the profile.
+            profile: Profile to cache.
+        """
+        if self.ttl <= 0:
+            return
+
+        self.entries.pop(player_tag, None)
+        self.entries[player_tag] = CacheEntry(profile, 0, self.ttl)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, player_tag: str=None) -> int:
+        """Remove cached profiles.
+
+        Args:
+            player_tag (optional): Only remove the profile of this player. Removes everything if not specified.
+
+        Returns:
+            Number of profiles removed.
+        """
+        if player_tag is None:
+            removed = len(self.entries)
+            self.entries.clear()
+            return removed
+
+        return 0 if self.entries.pop(player_tag, None) is None else 1
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache usage counters.
+
+        Returns:
+            Dictionary of hits, misses, evictions, and number of profiles.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries)
+        }
@@ -1,20 +1,30 @@
 """Miscellaneous utility functions that get data from the Clash Royale API."""
 
+import asyncio
 import datetime
+import hashlib
 import re
-from typing import Dict, List, Tuple, Union
+import time
+from typing import Any, Dict, Iterable, List, Tuple, Union
 
-import requests
+import pymysql
 
 # Config
-from config.config import PRIMARY_CLAN_TAG
-from config.credentials import CLASH_API_KEY
+from config.config import CLAN_FAMILY_TAGS, PRIMARY_CLAN_TAG
 
 # Utils
 import utils.bot_utils as bot_utils
 import utils.db_utils as db_utils
+import utils.race_log_utils as race_log_utils
+from utils.api_utils import CLASH_API, encode_tag
+from utils.cache_utils import ProfileCache
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
 from utils.logging_utils import LOG, log_message
+from utils.rate_limit_utils import RequestPriority, request_priority
 from utils.util_types import (
+    BattlelogCheck,
+    BattlelogScanStats,
+    ClanMember,
     ClashData,
     DecksReport,
     Participant,
@@ -23,7 +33,34 @@ from utils.util_types import (
 )
 
 
-def get_active_members_in_clan(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> Dict[str, ClashData]:
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Clans whose members, river races, and match performance are tracked. The primary clan is always tracked first.
+TRACKED_CLAN_TAGS = [PRIMARY_CLAN_TAG] + [clan_tag for clan_tag in CLAN_FAMILY_TAGS if clan_tag != PRIMARY_CLAN_TAG]
+
+# Default number of battlelogs requested at once when calculating match performance.
+MATCH_PERFORMANCE_CONCURRENCY = 10
+
+# Number of player profiles requested at once by get_clash_data_many.
+PLAYER_LOOKUP_CONCURRENCY = 10
+
+# Parsed player profiles returned by get_clash_data, keyed by player tag.
+PLAYER_PROFILE_CACHE = ProfileCache()
+
+# Total number of cards in the game from the most recent successful request, or 0 if there hasn't been one yet.
+LAST_TOTAL_CARDS = 0
+
+
+async def get_active_members_in_clan(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> Dict[str, ClanMember]:
     """Get a dictionary containing information about members currently in a clan.
 
     Args:
@@ -31,55 +68,82 @@ def get_active_members_in_clan(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: boo
         ignore_cache (optional): Ignore cached data and force API request.
 
     Returns:
-        Dictionary of active members, or empty dict if API request fails. best_trophies, cards, found_cards, total_cards, and
-            clan_name fields are all populated but do not contain actual data.
+        Dictionary mapping player tags to active members, or empty dict if API request fails.
     """
-    if not hasattr(get_active_members_in_clan, 'cached_members'):
-        get_active_members_in_clan.cached_members = {}
-        get_active_members_in_clan.cached_clan_tag = ""
-        get_active_members_in_clan.last_check_time = None
-
-    now = datetime.datetime.utcnow()
-
-    if (get_active_members_in_clan.last_check_time is None
-            or (now - get_active_members_in_clan.last_check_time).seconds > 60
-            or get_active_members_in_clan.cached_clan_tag != clan_tag
-            or ignore_cache):
-        LOG.info(f"Getting active members of clan {clan_tag}")
-        req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/members",
-                            headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
-
-        if req.status_code != 200:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-            return {}
-
-        json_obj = req.json()
-        get_active_members_in_clan.cached_members = {}
-        get_active_members_in_clan.cached_clan_tag = clan_tag
-
-        for member in json_obj['items']:
-            get_active_members_in_clan.cached_members[member['tag']] = {
-                'player_tag': member['tag'],
-                'player_name': member['name'],
-                'role': member['role'],
-                'exp_level': member['expLevel'],
-                'trophies': member['trophies'],
-                'best_trophies': -1,
-                'cards': {},
-                'found_cards': -1,
-                'total_cards': -1,
-                'clan_name': "",
-                'clan_tag': clan_tag
-            }
-
-        get_active_members_in_clan.last_check_time = now
-    else:
-        LOG.info(f"Getting cached active members of clan {clan_tag}")
+    LOG.info(f"Getting active members of clan {clan_tag}")
+    json_obj = await CLASH_API.get(f"/clans/{encode_tag(clan_tag)}/members", ignore_cache=ignore_cache)
+
+    if json_obj is None:
+        return {}
+
+    active_members = {}
+
+    for member in json_obj['items']:
+        active_members[member['tag']] = ClanMember(player_tag=member['tag'],
+                                                   player_name=member['name'],
+                                                   role=member['role'],
+                                                   exp_level=member['expLevel'],
+                                                   trophies=member['trophies'],
+                                                   clan_tag=clan_tag)
+
+    return active_members
+
+
+async def get_family_members(ignore_cache: bool=False) -> Dict[str, ClanMember]:
+    """Get a dictionary containing information about members currently in any tracked clan. Each clan is requested concurrently.
+
+    Args:
+        ignore_cache (optional): Ignore cached data and force API requests.
+
+    Returns:
+        Dictionary mapping player tags to members of tracked clans, or empty dict if any API request fails.
+    """
+    clans = await asyncio.gather(*[get_active_members_in_clan(clan_tag, ignore_cache) for clan_tag in TRACKED_CLAN_TAGS])
+
+    if not all(clans):
+        return {}
+
+    family_members = {}
+
+    for active_members in clans:
+        family_members.update(active_members)
 
-    return get_active_members_in_clan.cached_members
+    return family_members
 
 
-def get_river_race_participants(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> List[Participant]:
+def parse_participant(participant: dict) -> Participant:
+    """Convert a river race participant returned by the API into a Participant.
+
+    Args:
+        participant: Participant as returned by the API. Not modified.
+
+    Returns:
+        Participant with field names converted to the ones used by the bot.
+    """
+    return Participant(player_tag=participant['tag'],
+                       player_name=participant['name'],
+                       fame=participant['fame'],
+                       repair_points=participant['repairPoints'],
+                       boat_attacks=participant['boatAttacks'],
+                       decks_used=participant['decksUsed'],
+                       decks_used_today=participant['decksUsedToday'])
+
+
+async def get_current_river_race(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> Union[Dict[str, Any], None]:
+    """Get the raw current river race of a clan. Callers that need the current river race at the same time share a single
+    request and payload, so the payload must not be modified.
+
+    Args:
+        clan_tag (optional): Clan to get the current river race of. Defaults to primary clan.
+        ignore_cache (optional): Ignore cached data and force API request.
+
+    Returns:
+        Current river race as returned by the API, or None if API request fails.
+    """
+    return await CLASH_API.get(f"/clans/{encode_tag(clan_tag)}/currentriverrace", ignore_cache=ignore_cache)
+
+
+async def get_river_race_participants(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> List[Participant]:
     """Get a list of participants in the current river race.
 
     Args:
@@ -89,102 +153,57 @@ def get_river_race_participants(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bo
     Returns:
         List of participants in specified clan's current river race, or empty list if API request fails.
     """
-    if not hasattr(get_river_race_participants, 'cached_participants'):
-        get_river_race_participants.cached_participants = []
-        get_river_race_participants.cached_clan_tag = ""
-        get_river_race_participants.last_check_time = None
-
-    now = datetime.datetime.utcnow()
-
-    if (get_river_race_participants.last_check_time is None
-            or (now - get_river_race_participants.last_check_time).seconds > 60
-            or get_river_race_participants.cached_clan_tag != clan_tag
-            or ignore_cache):
-        LOG.info(f"Getting river race participants of clan {clan_tag}")
-        req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/currentriverrace",
-                        headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
-
-        if req.status_code != 200:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-            return []
+    LOG.info(f"Getting river race participants of clan {clan_tag}")
+    json_obj = await get_current_river_race(clan_tag, ignore_cache)
 
-        get_river_race_participants.cached_participants = []
-        get_river_race_participants.cached_clan_tag = clan_tag
-        json_obj = req.json()
-        participants = json_obj['clan']['participants']
-
-        for participant in participants:
-            participant['player_tag'] = participant.pop('tag')
-            participant['player_name'] = participant.pop('name')
-            participant['repair_points'] = participant.pop('repairPoints')
-            participant['boat_attacks'] = participant.pop('boatAttacks')
-            participant['decks_used'] = participant.pop('decksUsed')
-            participant['decks_used_today'] = participant.pop('decksUsedToday')
-            get_river_race_participants.cached_participants.append(participant)
-
-        get_river_race_participants.last_check_time = now
-    else:
-        LOG.info(f"Getting cached river race participants of clan {clan_tag}")
+    if json_obj is None:
+        return []
 
-    return get_river_race_participants.cached_participants
+    return [parse_participant(participant) for participant in json_obj['clan']['participants']]
 
 
-def get_last_river_race_participants(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> List[Participant]:
-    """Get participants in most recently completed river race.
+async def archive_last_river_race(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> bool:
+    """Make sure that a clan's most recently completed river race, the one that started at its saved Thursday reset, is in the
+    river race log archive. The archive is only synced if it doesn't have that race yet.
 
     Args:
-        clan_tag (optional): Clan to get participants of. Defaults to primary clan.
-        ignore_cache (optional): Ignore cached data and force API request.
+        clan_tag (optional): Clan whose river race to archive. Defaults to primary clan.
+        ignore_cache (optional): Sync the archive even if it already has the race.
 
     Returns:
-        List of participants in specified clan's most recently completed river race, or empty list if API request fails.
+        Whether the race is archived. If not, the newest archived race is an older one and must not be used in its place.
     """
-    if not hasattr(get_last_river_race_participants, 'cached_participants'):
-        get_last_river_race_participants.cached_participants = []
-        get_last_river_race_participants.cached_clan_tag = ""
-        get_last_river_race_participants.last_check_time = None
-
-    now = datetime.datetime.utcnow()
-
-    if (get_last_river_race_participants.last_check_time is None
-            or (now - get_last_river_race_participants.last_check_time).seconds > 60
-            or get_last_river_race_participants.cached_clan_tag != clan_tag
-            or ignore_cache):
-        LOG.info(f"Getting participants from most recent river race of clan {clan_tag}")
-        req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/riverracelog?limit=1",
-                        headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
-
-        if req.status_code != 200:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-            return []
+    race_start = bot_utils.datetime_to_battletime((await ASYNC_DB.get_river_race_reset_times(clan_tag))['thursday'])
+    latest_created_date = await DB_EXECUTOR.run(race_log_utils.get_latest_created_date, clan_tag)
 
-        get_last_river_race_participants.cached_participants = []
-        get_last_river_race_participants.cached_clan_tag = clan_tag
-        json_obj = req.json()
-        clan_index = 0
+    if ignore_cache or latest_created_date is None or latest_created_date <= race_start:
+        await race_log_utils.sync_river_race_log(clan_tag)
+        latest_created_date = await DB_EXECUTOR.run(race_log_utils.get_latest_created_date, clan_tag)
 
-        for clan in json_obj['items'][0]['standings']:
-            if clan['clan']['tag'] == clan_tag:
-                break
+    if latest_created_date is None or latest_created_date <= race_start:
+        LOG.warning(log_message("Most recent river race isn't archived", clan_tag=clan_tag, race_start=race_start))
+        return False
 
-            clan_index += 1
+    return True
 
-        participants = json_obj['items'][0]['standings'][clan_index]['clan']['participants']
 
-        for participant in participants:
-            participant['player_tag'] = participant.pop('tag')
-            participant['player_name'] = participant.pop('name')
-            participant['repair_points'] = participant.pop('repairPoints')
-            participant['boat_attacks'] = participant.pop('boatAttacks')
-            participant['decks_used'] = participant.pop('decksUsed')
-            participant['decks_used_today'] = participant.pop('decksUsedToday')
-            get_last_river_race_participants.cached_participants.append(participant)
+async def get_last_river_race_participants(clan_tag: str=PRIMARY_CLAN_TAG, ignore_cache: bool=False) -> List[Participant]:
+    """Get participants in most recently completed river race. Participants are read from the river race log archive, which is
+    only synced first if it doesn't have that race yet (see archive_last_river_race).
 
-        get_last_river_race_participants.last_check_time = now
-    else:
-        LOG.info(f"Getting cached participants from most recent river race of clan {clan_tag}")
+    Args:
+        clan_tag (optional): Clan to get participants of. Defaults to primary clan.
+        ignore_cache (optional): Sync the archive before reading it.
 
-    return get_last_river_race_participants.cached_participants
+    Returns:
+        List of participants in specified clan's most recently completed river race, or empty list if that race isn't archived.
+    """
+    LOG.info(f"Getting participants from most recent river race of clan {clan_tag}")
+
+    if not await archive_last_river_race(clan_tag, ignore_cache):
+        return []
+
+    return await DB_EXECUTOR.run(race_log_utils.get_last_race_participants, clan_tag)
 
 
 def parse_player_tag(message: str) -> str:
@@ -203,54 +222,94 @@ def parse_player_tag(message: str) -> str:
     return None
 
 
-def get_clash_data(message: str) -> Union[ClashData, None]:
-    """Get a user's relevant Clash Royale information.
+async def get_clash_data(message: str, ignore_cache: bool=False) -> Union[ClashData, None]:
+    """Get a user's relevant Clash Royale information. Profiles are cached by player tag for PLAYER_PROFILE_TTL seconds.
 
     Args:
         message: Message that should contain a valid player tag.
+        ignore_cache (optional): Ignore cached data and force API request.
 
     Returns:
-        A dictionary of relevant Clash Royale information, or None if an error occurs.
+        Record of relevant Clash Royale information, or None if an error occurs.
     """
     player_tag = parse_player_tag(message)
 
     if player_tag is None:
         return None
 
+    if not ignore_cache:
+        cached_data = PLAYER_PROFILE_CACHE.get(player_tag)
+
+        if cached_data is not None:
+            LOG.info(f"Getting cached Clash Royale data of user {player_tag}")
+            clash_data = cached_data.copy()
+            clash_data.cards = cached_data.cards.copy()
+            return clash_data
+
     LOG.info(f"Getting Clash Royale data of user {player_tag}")
-    req = requests.get(url=f"https://api.clashroyale.com/v1/players/%23{player_tag[1:]}",
-                       headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
+    json_obj = await CLASH_API.get(f"/players/{encode_tag(player_tag)}")
 
-    if req.status_code != 200:
-        LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
+    if json_obj is None:
         return None
 
-    json_obj = req.json()
     user_in_clan = 'clan' in json_obj
-
-    clash_data: ClashData = {
-        'player_tag': json_obj['tag'],
-        'player_name': json_obj['name'],
-        'role': json_obj.get('role', "None"),
-        'exp_level': json_obj['expLevel'],
-        'trophies': json_obj['trophies'],
-        'best_trophies': json_obj['bestTrophies'],
-        'cards': {i: 0 for i in range(1, 15)},
-        'found_cards': 0,
-        'total_cards': get_total_cards(),
-        'clan_name': json_obj['clan']['name'] if user_in_clan else "None",
-        'clan_tag': json_obj['clan']['tag'] if user_in_clan else "None"
-    }
+    cards = {i: 0 for i in range(1, 15)}
+    total_cards = await request_total_cards()
 
     for card in json_obj['cards']:
         card_level = 14 - (card['maxLevel'] - card['level'])
-        clash_data['cards'][card_level] += 1
-        clash_data['found_cards'] += 1
-
+        cards[card_level] += 1
+
+    clash_data = ClashData(player_tag=json_obj['tag'],
+                           player_name=json_obj['name'],
+                           role=json_obj.get('role', "None"),
+                           exp_level=json_obj['expLevel'],
+                           trophies=json_obj['trophies'],
+                           best_trophies=json_obj['bestTrophies'],
+                           cards=cards,
+                           found_cards=len(json_obj['cards']),
+                           total_cards=LAST_TOTAL_CARDS if total_cards is None else total_cards,
+                           clan_name=json_obj['clan']['name'] if user_in_clan else "None",
+                           clan_tag=json_obj['clan']['tag'] if user_in_clan else "None")
+
+    # Profiles with a fallback card count are not cached, so that the next lookup tries to get the real count.
+    if total_cards is None:
+        return clash_data
+
+    cached_data = clash_data.copy()
+    cached_data.cards = cards.copy()
+    PLAYER_PROFILE_CACHE.put(player_tag, cached_data)
     return clash_data
 
 
-def get_remaining_decks_today(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, str, int]]:
+async def get_clash_data_many(player_tags: Iterable[str],
+                              ignore_cache: bool=False,
+                              concurrency: int=PLAYER_LOOKUP_CONCURRENCY) -> Dict[str, ClashData]:
+    """Get the relevant Clash Royale information of several users at once. Profiles are requested concurrently.
+
+    Args:
+        player_tags: Player tags of users to get information of.
+        ignore_cache (optional): Ignore cached data and force API requests.
+        concurrency (optional): Maximum number of profiles requested at once.
+
+    Returns:
+        Dictionary mapping player tags to records of relevant Clash Royale information. Users whose information could not be
+            retrieved are left out.
+    """
+    player_tags = list(dict.fromkeys(player_tags))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_lookup(player_tag: str) -> Union[ClashData, None]:
+        async with semaphore:
+            return await get_clash_data(player_tag, ignore_cache)
+
+    with request_priority(RequestPriority.BULK):
+        results = await asyncio.gather(*[bounded_lookup(player_tag) for player_tag in player_tags])
+
+    return {player_tag: clash_data for player_tag, clash_data in zip(player_tags, results) if clash_data is not None}
+
+
+async def get_remaining_decks_today(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, str, int]]:
     """Retrieve a list of players in a clan who have not used 4 war decks today.
 
     Args:
@@ -260,8 +319,8 @@ def get_remaining_decks_today(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str,
         List of player names, player tags, and remaining decks of users in the specified clan that have not used 4 decks today.
     """
     LOG.info(f"Getting list of users who have not used 4 decks today in clan {clan_tag}")
-    participants = get_river_race_participants(clan_tag)
-    active_members = get_active_members_in_clan(clan_tag).copy()
+    participants = await get_river_race_participants(clan_tag)
+    active_members = await get_active_members_in_clan(clan_tag)
     decks_remaining_list = []
 
     if not active_members:
@@ -283,7 +342,7 @@ def get_remaining_decks_today(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str,
     return decks_remaining_list
 
 
-def get_remaining_decks_today_dicts(clan_tag: str=PRIMARY_CLAN_TAG) -> DecksReport:
+async def get_remaining_decks_today_dicts(clan_tag: str=PRIMARY_CLAN_TAG) -> DecksReport:
     """Retrieve a dictionary containing detailed information about deck usage today.
 
     Args:
@@ -300,8 +359,8 @@ def get_remaining_decks_today_dicts(clan_tag: str=PRIMARY_CLAN_TAG) -> DecksRepo
             locked_out_active_members: List of members in clan that are locked out of battling today.
     """
     LOG.info(f"Getting dictionary of users who have not used 4 decks today in clan {clan_tag}")
-    active_members = get_active_members_in_clan(clan_tag)
-    participants = get_river_race_participants(clan_tag)
+    active_members = await get_active_members_in_clan(clan_tag)
+    participants = await get_river_race_participants(clan_tag)
 
     if not participants or not active_members:
         return {}
@@ -345,7 +404,7 @@ def get_remaining_decks_today_dicts(clan_tag: str=PRIMARY_CLAN_TAG) -> DecksRepo
     return return_info
 
 
-def get_deck_usage_today(clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, int]:
+async def get_deck_usage_today(clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, int]:
     """Get a list of players in a clan and how many decks each player used today.
 
     Args:
@@ -355,8 +414,8 @@ def get_deck_usage_today(clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, int]:
         Dictionary mapping player tags to their deck usage today.
     """
     LOG.info(f"Getting dictionary of users and how many decks they've used in clan {clan_tag}")
-    participants = get_river_race_participants(clan_tag, True)
-    active_members = get_active_members_in_clan(clan_tag, True).copy()
+    participants = await get_river_race_participants(clan_tag, True)
+    active_members = await get_active_members_in_clan(clan_tag, True)
 
     if not participants or not active_members:
         return {}
@@ -373,7 +432,7 @@ def get_deck_usage_today(clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, int]:
     return usage_list
 
 
-def get_top_medal_users(top_n: int=3, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, int]]:
+async def get_top_medal_users(top_n: int=3, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, int]]:
     """Get the top n users in a clan by medals. Can possible return more than n if players are tied for the same amount of medals.
 
     Args:
@@ -384,12 +443,12 @@ def get_top_medal_users(top_n: int=3, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tu
         List of player names and their medals.
     """
     LOG.info(log_message("Getting list of users in clan with most medals", top_n=top_n, clan_tag=clan_tag))
-    if db_utils.is_war_time():
-        participants = get_river_race_participants(clan_tag)
+    if await ASYNC_DB.is_war_time(clan_tag):
+        participants = await get_river_race_participants(clan_tag)
     else:
-        participants = get_last_river_race_participants(clan_tag)
+        participants = await get_last_river_race_participants(clan_tag)
 
-    active_members = get_active_members_in_clan(clan_tag)
+    active_members = await get_active_members_in_clan(clan_tag)
 
     if not active_members:
         return []
@@ -413,7 +472,7 @@ def get_top_medal_users(top_n: int=3, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tu
     return return_list
 
 
-def get_hall_of_shame(threshold: int, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, str, int]]:
+async def get_hall_of_shame(threshold: int, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[str, str, int]]:
     """Get a list of players below a specified medal count.
 
     Args:
@@ -424,12 +483,12 @@ def get_hall_of_shame(threshold: int, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tu
         List of player names and medals below specified threshold.
     """
     LOG.info(log_message("Getting list of users in clan below medals threshold", threshold=threshold, clan_tag=clan_tag))
-    if db_utils.is_war_time():
-        participants = get_river_race_participants(clan_tag)
+    if await ASYNC_DB.is_war_time(clan_tag):
+        participants = await get_river_race_participants(clan_tag)
     else:
-        participants = get_last_river_race_participants(clan_tag)
+        participants = await get_last_river_race_participants(clan_tag)
 
-    active_members = get_active_members_in_clan(clan_tag)
+    active_members = await get_active_members_in_clan(clan_tag)
     hall_of_shame = []
 
     for participant in participants:
@@ -442,7 +501,7 @@ def get_hall_of_shame(threshold: int, clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tu
     return hall_of_shame
 
 
-def get_clan_decks_remaining(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[Tuple[str, str], int]]:
+async def get_clan_decks_remaining(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[Tuple[str, str], int]]:
     """Get the number of available war decks remaining for all clans in a race with specified clan.
 
     Args:
@@ -452,14 +511,11 @@ def get_clan_decks_remaining(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[Tuple
         List of ((clan tag, clan name), remaining decks) tuples.
     """
     LOG.info(f"Getting list of clans in river race of clan {clan_tag} and number of available decks")
-    req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/currentriverrace",
-                       headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
+    json_obj = await get_current_river_race(clan_tag)
 
-    if req.status_code != 200:
-        LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
+    if json_obj is None:
         return []
 
-    json_obj = req.json()
     return_list = []
 
     for clan in json_obj["clans"]:
@@ -474,7 +530,7 @@ def get_clan_decks_remaining(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[Tuple
     return return_list
 
 
-def river_race_completed(clan_tag: str=PRIMARY_CLAN_TAG) -> bool:
+async def river_race_completed(clan_tag: str=PRIMARY_CLAN_TAG) -> bool:
     """Check if a clan has crossed the finish line. Always false during colosseum week.
 
     Args:
@@ -484,67 +540,125 @@ def river_race_completed(clan_tag: str=PRIMARY_CLAN_TAG) -> bool:
         Whether the specified clan has accumulated 10,000 fame and crossed the finish line.
     """
     LOG.info(f"Checking if clan {clan_tag} has crossed finish line")
-    if db_utils.is_colosseum_week():
+    if await ASYNC_DB.is_colosseum_week(clan_tag):
         LOG.debug("Colosseum week detected so no finish line")
         return False
 
-    req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/currentriverrace",
-                       headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
+    json_obj = await get_current_river_race(clan_tag)
 
-    if req.status_code != 200:
-        LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
+    if json_obj is None:
         return False
 
-    json_obj = req.json()
     return json_obj["clan"]["fame"] >= 10000
 
 
-def calculate_player_win_rate(player_tag: str,
-                              fame: int,
-                              current_check_time: datetime.datetime) -> RaceStats:
-    """Look at a player's battle log and break down their performance in recent river race battles.
+async def calculate_player_win_rate(player_tag: str,
+                                    fame: int,
+                                    current_check_time: datetime.datetime,
+                                    clan_tag: str=PRIMARY_CLAN_TAG) -> Tuple[BattlelogCheck, bool]:
+    """Look at a player's battle log and find their river race battles since they were last checked. Nothing is saved here, so a
+    check that fails partway can simply be repeated.
 
     Args:
         player_tag: Player to check match history of.
         fame: Total fame they've accumulated in the current river race.
-        current_check_time: Time to set last_check_time after this check.
+        current_check_time: Only include battles before this time.
+        clan_tag (optional): Only include battles fought for this clan. Defaults to primary clan.
 
     Returns:
-        Number of wins and losses in each river race battle type for the specified player.
+        Player's current fame and river race battles, or empty dict if their battlelog could not be checked, and whether their
+            battlelog was requested. A battlelog can be requested even if the check fails.
     """
-    prev_fame, last_check_time = db_utils.get_and_update_match_history_info(player_tag, fame, current_check_time)
+    prev_fame, last_check_time = await db_utils.get_match_history_info(player_tag, clan_tag)
 
     # This should only happen when an unregistered user is added but their information can't be retrieved from the API.
     if prev_fame is None:
-        return {}
-
-    # If no fame has been acquired since last check, no point in grabbing battlelog.
-    if fame - prev_fame == 0:
-        return {}
+        return {}, False
 
     LOG.debug(log_message("Getting battlelog of user to check win rate",
                           player_tag=player_tag,
                           fame=fame,
                           prev_fame=prev_fame,
                           last_check_time=last_check_time))
-    req = requests.get(url=f"https://api.clashroyale.com/v1/players/%23{player_tag[1:]}/battlelog",
-                       headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
+    battles = await CLASH_API.get(f"/players/{encode_tag(player_tag)}/battlelog")
 
-    if req.status_code != 200:
-        LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-        db_utils.undo_match_history_info_update(player_tag, fame, prev_fame, last_check_time)
-        return {}
+    if battles is None:
+        return {}, True
 
-    battles = req.json()
+    river_race_battles, scan_stats = get_river_race_battles(battles, last_check_time, current_check_time, clan_tag)
+    LOG.debug(log_message("Scanned battlelog", player_tag=player_tag, **scan_stats))
+    return {"player_tag": player_tag, "fame": fame, "battles": river_race_battles, "scan_stats": scan_stats}, True
+
+
+def battle_fingerprint(player_tag: str, battle: dict) -> str:
+    """Get a key that identifies a battle from the point of view of one player. The same battle always has the same
+    fingerprint, no matter which battlelog request it was found in.
+
+    Args:
+        player_tag: Player whose battlelog contains the battle.
+        battle: Battle from the battlelog.
+
+    Returns:
+        Hex digest of the battle time, player tag, and opponent tag.
+    """
+    opponent_tag = battle["opponent"][0].get("tag", "") if battle.get("opponent") else ""
+    return hashlib.sha1(f"{battle['battleTime']}|{player_tag}|{opponent_tag}".encode()).hexdigest()
+
+
+def get_river_race_battles(battles: List[dict],
+                           last_check_time: datetime.datetime,
+                           current_check_time: datetime.datetime,
+                           clan_tag: str=PRIMARY_CLAN_TAG) -> Tuple[List[dict], BattlelogScanStats]:
+    """Get the river race battles fought for a clan between two check times. The battlelog is ordered from newest to oldest, so
+    scanning stops at the first battle older than the last check time. battleTime strings are fixed width, which allows them to
+    be compared directly instead of being converted to datetimes.
+
+    Args:
+        battles: Battlelog returned by the API.
+        last_check_time: Only include battles at or after this time.
+        current_check_time: Only include battles before this time.
+        clan_tag (optional): Only include battles fought for this clan. Defaults to primary clan.
+
+    Returns:
+        River race battles in the specified window, and how many battles were scanned and skipped to find them.
+    """
+    start_time = bot_utils.datetime_to_battletime(last_check_time)
+    end_time = bot_utils.datetime_to_battletime(current_check_time)
     river_race_battle_list = []
+    scanned = 0
 
     for battle in battles:
-        battle_time = bot_utils.battletime_to_datetime(battle["battleTime"])
+        battle_time = battle["battleTime"]
+
+        if battle_time < start_time:
+            break
+
+        scanned += 1
+
         if ((battle["type"].startswith("riverRace") or battle["type"] == "boatBattle")
-                and last_check_time <= battle_time < current_check_time
-                and battle["team"][0]["clan"]["tag"] == PRIMARY_CLAN_TAG):
+                and battle_time < end_time
+                and battle["team"][0]["clan"]["tag"] == clan_tag):
             river_race_battle_list.append(battle)
 
+    return river_race_battle_list, {"scanned": scanned, "skipped": len(battles) - scanned}
+
+
+def classify_battles(player_tag: str,
+                     river_race_battle_list: List[dict],
+                     clan_tag: str=PRIMARY_CLAN_TAG,
+                     cursor: pymysql.cursors.DictCursor=None) -> RaceStats:
+    """Tally a player's river race battles.
+
+    Args:
+        player_tag: Player that the battles belong to.
+        river_race_battle_list: River race battles to tally (see get_river_race_battles).
+        clan_tag (optional): Clan that the battles were fought for. Defaults to primary clan.
+        cursor (optional): Cursor of an open transaction to record colosseum week in. A connection is borrowed from the pool if
+            omitted.
+
+    Returns:
+        Number of wins and losses in each river race battle type for the specified player.
+    """
     player_dict: RaceStats = {
         "player_tag": player_tag,
         "battle_wins": 0,
@@ -584,7 +698,7 @@ def calculate_player_win_rate(player_tag: str,
         elif battle["type"].startswith("riverRaceDuel"):
             # During colosseum week, clan fame will exceed 10,000 so this ensures that strikes/reminders go out correctly.
             if battle["type"] == "riverRaceDuelColosseum":
-                db_utils.set_colosseum_week_status(True)
+                db_utils.set_colosseum_week_status(True, clan_tag, cursor)
 
             # Determine duel series outcome by result of final game
             team_king_hit_points = battle["team"][0].get("kingTowerHitPoints")
@@ -623,74 +737,96 @@ def calculate_player_win_rate(player_tag: str,
     return player_dict
 
 
-def calculate_match_performance(post_race: bool, clan_tag: str=PRIMARY_CLAN_TAG):
-    """Get the match performance of each player in the specified clan. Saves results in match_history table.
+async def calculate_match_performance(post_race: bool,
+                                      clan_tag: str=PRIMARY_CLAN_TAG,
+                                      concurrency: int=MATCH_PERFORMANCE_CONCURRENCY):
+    """Get the match performance of each player in the specified clan. Saves results in match_history table. Battlelogs are
+    fetched concurrently and all results are written in a single batch once every player has been checked. Battles that were
+    already counted are skipped, so checks can overlap or be retried without counting a battle twice. Users should be cleaned up
+    and added to the database first (see calculate_family_match_performance).
 
     Args:
         post_race: Whether this check is occuring during or after the river race.
         clan_tag (optional): Check player match performance of players in this clan. Defaults to primary clan.
+        concurrency (optional): Maximum number of battlelogs to fetch at once. Use 1 to check players one at a time.
     """
     LOG.info(log_message("Calculating match performance of all users in clan", post_race=post_race, clan_tag=clan_tag))
-    clean_up_successful = db_utils.clean_up_db()
-    add_unregistered_users_successful = db_utils.add_unregistered_users()
-
-    if not clean_up_successful or not add_unregistered_users_successful:
-        return
-
-    performance_list = []
 
     if post_race:
-        participants = get_last_river_race_participants(clan_tag)
-        check_time = db_utils.get_reset_time()
+        participants = await get_last_river_race_participants(clan_tag)
+        check_time = await ASYNC_DB.get_reset_time(clan_tag)
     else:
-        participants = get_river_race_participants(clan_tag)
+        participants = await get_river_race_participants(clan_tag)
         check_time = datetime.datetime.now(datetime.timezone.utc)
 
     if not participants:
         return
 
-    for participant in participants:
-        performance_list.append(calculate_player_win_rate(participant['player_tag'], participant['fame'], check_time))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded_win_rate(participant: Participant) -> BattlelogCheck:
+        async with semaphore:
+            check, _ = await calculate_player_win_rate(participant['player_tag'], participant['fame'], check_time, clan_tag)
+            return check
+
+    start_time = time.perf_counter()
 
-    db_utils.update_match_history(performance_list)
-    db_utils.set_last_check_time(check_time)
+    # Battlelog sweeps yield to any interactive commands waiting on the API.
+    with request_priority(RequestPriority.BULK):
+        performance_list = await asyncio.gather(*[bounded_win_rate(participant) for participant in participants])
 
+    await ASYNC_DB.update_match_history(performance_list, check_time, clan_tag)
+    await ASYNC_DB.set_last_check_time(check_time, clan_tag)
+    LOG.info(log_message("Finished calculating match performance",
+                         clan_tag=clan_tag,
+                         participants=len(participants),
+                         concurrency=concurrency,
+                         elapsed_seconds=round(time.perf_counter() - start_time, 3)))
 
-def get_clans_in_race(post_race: bool, clan_tag: str=PRIMARY_CLAN_TAG) -> List[RiverRaceClan]:
-    """Get a list of clans in the specified clan's river race along with their current fame and decks used.
+
+async def calculate_family_match_performance(post_race: bool):
+    """Bring the database up to date with the members of every tracked clan, then get the match performance of each tracked
+    clan concurrently.
+
+    Args:
+        post_race: Whether this check is occuring during or after the river race.
+    """
+    clean_up_successful = await db_utils.clean_up_db()
+    add_unregistered_users_successful = await db_utils.add_unregistered_users()
+
+    if not clean_up_successful or not add_unregistered_users_successful:
+        return
+
+    await asyncio.gather(*[calculate_match_performance(post_race, clan_tag) for clan_tag in TRACKED_CLAN_TAGS])
+
+
+async def get_clans_in_race(post_race: bool, clan_tag: str=PRIMARY_CLAN_TAG) -> List[RiverRaceClan]:
+    """Get a list of clans in the specified clan's river race along with their current fame and decks used. After the river race,
+    clans are read from the river race log archive, which is only synced first if it doesn't have that race yet (see
+    archive_last_river_race).
 
     Args:
         post_race: Whether this check is happening during or after river race.
         clan_tag (optional): Clan tag of clan to get river race info for. Defaults to primary clan.
 
     Returns:
-        List of clans in the river race and their relevant information.
+        List of clans in the river race and their relevant information, or empty list if they can't be determined.
     """
     LOG.info(log_message("Get info of clans in a river race", post_race=post_race, clan_tag=clan_tag))
     if post_race:
-        req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/riverracelog?limit=1",
-                           headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
-
-        if req.status_code != 200:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
+        if not await archive_last_river_race(clan_tag):
             return []
 
-        json_obj = req.json()
-        clans = [clan['clan'] for clan in json_obj['items'][0]['standings']]
-    else:
-        req = requests.get(url=f"https://api.clashroyale.com/v1/clans/%23{clan_tag[1:]}/currentriverrace",
-                           headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
+        return await DB_EXECUTOR.run(race_log_utils.get_last_race_clans, clan_tag)
 
-        if req.status_code != 200:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-            return []
+    json_obj = await get_current_river_race(clan_tag)
 
-        json_obj = req.json()
-        clans = json_obj['clans']
+    if json_obj is None:
+        return []
 
     clans_info = []
 
-    for clan in clans:
+    for clan in json_obj['clans']:
         fame = 0
         decks_used_total = 0
         decks_used_today = 0
@@ -700,42 +836,84 @@ def get_clans_in_race(post_race: bool, clan_tag: str=PRIMARY_CLAN_TAG) -> List[R
             decks_used_total += participant['decksUsed']
             decks_used_today += participant['decksUsedToday']
 
-        clans_info.append({'clan_tag': clan['tag'],
-                           'clan_name': clan['name'],
-                           'fame': fame,
-                           'total_decks_used': decks_used_total,
-                           'decks_used_today': decks_used_today,
-                           'completed': clan['fame'] >= 10000})
+        clans_info.append(RiverRaceClan(clan_tag=clan['tag'],
+                                        clan_name=clan['name'],
+                                        fame=fame,
+                                        total_decks_used=decks_used_total,
+                                        decks_used_today=decks_used_today,
+                                        completed=clan['fame'] >= race_log_utils.FINISH_LINE_FAME))
 
     return clans_info
 
 
-def get_total_cards() -> int:
-    """Get total number of cards available in the game.
+async def prepare_for_river_race(last_check_time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG):
+    """Set up the database to track a clan's upcoming river race (see db_utils.prepare_for_river_race).
+
+    Args:
+        last_check_time: Do not look at games before this time when match performance is next calculated.
+        clan_tag (optional): Clan whose river race is starting. Defaults to primary clan.
+    """
+    clans = await get_clans_in_race(False, clan_tag)
+    await ASYNC_DB.prepare_for_river_race(last_check_time, clans, clan_tag)
+
+
+async def save_clans_in_race_info(post_race: bool, clan_tag: str=PRIMARY_CLAN_TAG):
+    """Save the current fame and deck usage of the clans in a clan's river race (see db_utils.save_clans_in_race_info).
+
+    Args:
+        post_race: Whether this info is being saved after the river race has concluded.
+        clan_tag (optional): Clan whose river race to save. Defaults to primary clan.
+    """
+    clans = await get_clans_in_race(post_race, clan_tag)
+    await ASYNC_DB.save_clans_in_race_info(post_race, clans, clan_tag)
+
 
-    Return a cached value. Cached value is updated when this function is called after 24 hours have passed since the last time the
-    total number of cards was calculated.
+async def request_total_cards() -> Union[int, None]:
+    """Get total number of cards available in the game and save it as LAST_TOTAL_CARDS. The response is cached for 24 hours.
 
     Returns:
-        Total number of cards in the game.
+        Total number of cards in the game, or None if API request fails.
     """
-    if not hasattr(get_total_cards, 'cached_total'):
-        get_total_cards.cached_total = 0
-        get_total_cards.last_check_time = None
-
-    now = datetime.datetime.utcnow()
-
-    if get_total_cards.last_check_time is None or (now - get_total_cards.last_check_time).days > 0:
-        LOG.info("Getting total cards available in game")
-        req = requests.get(url="https://api.clashroyale.com/v1/cards",
-                           headers={"Accept": "application/json", "authorization": f"Bearer {CLASH_API_KEY}"})
-
-        if req.status_code == 200:
-            get_total_cards.cached_total = len(req.json()["items"])
-            get_total_cards.last_check_time = now
-        else:
-            LOG.warning(log_message(msg="Bad request", status_code=req.status_code))
-    else:
-        LOG.info("Getting cached total cards available in game")
+    global LAST_TOTAL_CARDS
+    LOG.info("Getting total cards available in game")
+    json_obj = await CLASH_API.get("/cards")
+
+    if json_obj is None:
+        return None
+
+    LAST_TOTAL_CARDS = len(json_obj["items"])
+    return LAST_TOTAL_CARDS
+
+
+async def get_total_cards() -> int:
+    """Get total number of cards available in the game.
+
+    Returns:
+        Total number of cards in the game. If API request fails, the count from the most recent successful request is returned
+            instead, or 0 if there hasn't been one.
+    """
+    total_cards = await request_total_cards()
+    return LAST_TOTAL_CARDS if total_cards is None else total_cards
+
+
+async def prewarm_cache(clan_tags: List[str]=None):
+    """Fetch the members and river race of each clan so that they are served from the cache afterwards. Responses are always
+    requested from the API so that they stay fresh for their full TTL. Past races are read from the river race log archive, so
+    the river race log is not fetched.
+
+    Args:
+        clan_tags (optional): Clans to warm the cache for. Defaults to all tracked clans.
+    """
+    if clan_tags is None:
+        clan_tags = TRACKED_CLAN_TAGS
+
+    requests = [request_total_cards()]
+
+    for clan_tag in clan_tags:
+        requests.append(get_active_members_in_clan(clan_tag, True))
+        requests.append(get_current_river_race(clan_tag, True))
+
+    with request_priority(RequestPriority.BULK):
+        responses = await asyncio.gather(*requests)
 
-    return get_total_cards.cached_total
+    LOG.info(log_message("Prewarmed cache", clan_tags=clan_tags, failed=sum(1 for response in responses if not response)))
@@ -0,0 +1,201 @@
+"""Dedicated threads that run database work off of the event loop."""
+
+import asyncio
+import collections
+import concurrent.futures
+import contextvars
+import functools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, List, TypeVar
+
+# Utils
+import utils.db_utils as db_utils
+from utils.db_pool_utils import DB_POOL_SIZE
+from utils.metrics_utils import percentile
+from utils.util_types import ExecutorFunctionStats, ExecutorStats
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Number of threads that run database work. db_utils functions hold one pooled connection at a time, since helpers called inside
+# a transaction are passed its cursor, so every thread can have a connection without waiting on the others.
+DB_EXECUTOR_WORKERS = DB_POOL_SIZE
+
+# Number of most recent jobs whose queue wait and run time are kept for percentiles.
+DB_EXECUTOR_HISTORY = 1000
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    """Bounded pool of threads that run blocking database functions so that the event loop keeps handling commands and Discord
+    events while they run. Jobs wait in a queue while every thread is busy. The depth of that queue, how long jobs waited in it,
+    and how long they ran are tracked.
+    """
+
+    def __init__(self, workers: int=DB_EXECUTOR_WORKERS, history: int=DB_EXECUTOR_HISTORY):
+        """Create an executor. Threads are started as jobs are submitted.
+
+        Args:
+            workers (optional): Number of threads.
+            history (optional): Number of most recent jobs whose timings are kept.
+        """
+        self.workers = workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.counters = collections.Counter()
+        self.wait_times: Deque[float] = collections.deque(maxlen=history)
+        self.run_times: Deque[float] = collections.deque(maxlen=history)
+        self.function_calls = collections.Counter()
+        self.function_run_times: Dict[str, float] = collections.defaultdict(float)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function on one of the executor's threads. The function runs in a copy of the caller's context, so
+        logging and request priority are attributed to the caller.
+
+        Args:
+            func: Function to run.
+            args: Positional arguments to pass to the function.
+            kwargs: Keyword arguments to pass to the function.
+
+        Returns:
+            Value returned by the function. Exceptions raised by the function are raised here.
+        """
+        submit_time = time.monotonic()
+        name = getattr(func, "__name__", repr(func))
+
+        with self.lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            self.counters["submitted"] += 1
+
+        def call() -> T:
+            start_time = time.monotonic()
+
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_times.append(start_time - submit_time)
+
+            outcome = "failed"
+
+            try:
+                result = func(*args, **kwargs)
+                outcome = "completed"
+                return result
+            finally:
+                run_time = time.monotonic() - start_time
+
+                with self.lock:
+                    self.running -= 1
+                    self.counters[outcome] += 1
+                    self.run_times.append(run_time)
+                    self.function_calls[name] += 1
+                    self.function_run_times[name] += run_time
+
+        future = self.executor.submit(contextvars.copy_context().run, call)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Jobs that were cancelled before they started never leave the queue on their own.
+            if future.cancel():
+                with self.lock:
+                    self.queued -= 1
+                    self.counters["cancelled"] += 1
+
+            raise
+
+    def shutdown(self):
+        """Wait for running and queued jobs to finish, then stop the threads."""
+        self.executor.shutdown(wait=True)
+
+    def function_stats(self, top_n: int=5) -> List[ExecutorFunctionStats]:
+        """Get the functions that spent the most time running on the executor.
+
+        Args:
+            top_n (optional): Number of functions to return.
+
+        Returns:
+            Statistics of each function, ordered by total run time. Times are in seconds.
+        """
+        with self.lock:
+            totals = sorted(self.function_run_times.items(), key=lambda item: item[1], reverse=True)[:top_n]
+            return [{"function": name, "calls": self.function_calls[name], "run_time": run_time} for name, run_time in totals]
+
+    def stats(self) -> ExecutorStats:
+        """Get the current queue depth and timings of recent jobs.
+
+        Returns:
+            Statistics of the executor. Times are in seconds.
+        """
+        with self.lock:
+            wait_times = sorted(self.wait_times)
+            run_times = sorted(self.run_times)
+            stats: ExecutorStats = {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "submitted": self.counters["submitted"],
+                "completed": self.counters["completed"],
+                "failed": self.counters["failed"],
+                "cancelled": self.counters["cancelled"],
+                "wait_p50": percentile(wait_times, 0.5),
+                "wait_p95": percentile(wait_times, 0.95),
+                "wait_max": wait_times[-1] if wait_times else 0.0,
+                "run_p50": percentile(run_times, 0.5),
+                "run_p95": percentile(run_times, 0.95),
+                "run_max": run_times[-1] if run_times else 0.0
+            }
+
+        return stats
+
+
+DB_EXECUTOR = DatabaseExecutor()
+
+
+class AsyncDatabase:
+    """Awaitable versions of the synchronous functions in db_utils that run on DB_EXECUTOR, e.g.
+    await ASYNC_DB.get_user_data(player_tag). Functions in db_utils that are already coroutines should be awaited directly.
+    """
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        """Get the awaitable version of a db_utils function. Each wrapper is created once and then reused.
+
+        Args:
+            name: Name of a synchronous function in db_utils.
+
+        Returns:
+            Coroutine function that runs the db_utils function on DB_EXECUTOR.
+
+        Raises:
+            AttributeError: db_utils has no synchronous function with that name.
+        """
+        func = getattr(db_utils, name, None)
+
+        if not callable(func) or asyncio.iscoroutinefunction(func):
+            raise AttributeError(f"db_utils has no synchronous function named {name}")
+
+        @functools.wraps(func)
+        async def run_on_executor(*args: Any, **kwargs: Any) -> Any:
+            return await DB_EXECUTOR.run(func, *args, **kwargs)
+
+        setattr(self, name, run_on_executor)
+        return run_on_executor
+
+
+ASYNC_DB = AsyncDatabase()
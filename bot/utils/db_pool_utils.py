@@ -0,0 +1,280 @@
+"""Pool of reusable connections to the database."""
+
+import collections
+import contextlib
+import threading
+import time
+from typing import Callable, Deque, Iterator
+
+import pymysql
+
+# Config
+from config.credentials import (
+    IP,
+    USERNAME,
+    PASSWORD,
+    DB_NAME
+)
+
+# Utils
+from utils.util_types import PoolStats
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Maximum number of connections open at once, whether idle or in use.
+DB_POOL_SIZE = 10
+
+# Connections older than this many seconds are closed and replaced instead of being reused, so that they are never dropped by
+# the server's wait_timeout or left holding stale session state.
+DB_POOL_RECYCLE = 60 * 60
+
+# Connections that have been idle for this many seconds are pinged before being reused.
+DB_POOL_HEALTH_CHECK_INTERVAL = 30
+
+# Seconds to wait for a connection when every connection is in use.
+DB_POOL_TIMEOUT = 30
+
+
+def connect() -> pymysql.Connection:
+    """Open a new connection to the database.
+
+    Returns:
+        New database connection.
+    """
+    return pymysql.connect(host=IP, user=USERNAME, password=PASSWORD, database=DB_NAME, charset='utf8mb4')
+
+
+class PooledConnection:
+    """A database connection along with when it was opened and last returned to the pool."""
+    __slots__ = ("connection", "created_time", "released_time")
+
+    def __init__(self, connection: pymysql.Connection):
+        """Wrap a newly opened connection.
+
+        Args:
+            connection: Connection to wrap.
+        """
+        self.connection = connection
+        self.created_time = time.monotonic()
+        self.released_time = self.created_time
+
+
+class ConnectionPool:
+    """Bounded pool of database connections that can be used from any thread.
+
+    Idle connections are reused most recently released first. Connections are closed instead of reused once they are older than
+    the recycle age or fail a ping after being idle. When every connection is in use, callers wait for one to be released.
+    """
+
+    def __init__(self,
+                 connect_func: Callable[[], pymysql.Connection]=connect,
+                 max_size: int=DB_POOL_SIZE,
+                 recycle: float=DB_POOL_RECYCLE,
+                 health_check_interval: float=DB_POOL_HEALTH_CHECK_INTERVAL,
+                 timeout: float=DB_POOL_TIMEOUT):
+        """Create an empty pool. Connections are opened as they are needed.
+
+        Args:
+            connect_func (optional): Function that opens a new connection.
+            max_size (optional): Maximum number of connections open at once.
+            recycle (optional): Seconds after which a connection is replaced.
+            health_check_interval (optional): Seconds a connection can be idle before it is pinged.
+            timeout (optional): Seconds to wait for a connection before giving up.
+        """
+        self.connect_func = connect_func
+        self.max_size = max_size
+        self.recycle = recycle
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.idle: Deque[PooledConnection] = collections.deque()
+        self.open_connections = 0
+        self.condition = threading.Condition()
+        self.counters = collections.Counter()
+        self.peak_in_use = 0
+
+    def count(self, event: str):
+        """Increment the counter of an event.
+
+        Args:
+            event: Name of the event.
+        """
+        with self.condition:
+            self.counters[event] += 1
+
+    def discard(self, pooled: PooledConnection):
+        """Close a connection and free its slot in the pool.
+
+        Args:
+            pooled: Connection to close.
+        """
+        try:
+            pooled.connection.close()
+        except pymysql.Error:
+            pass
+
+        with self.condition:
+            self.open_connections -= 1
+            self.counters["closed"] += 1
+            self.condition.notify()
+
+    def is_usable(self, pooled: PooledConnection) -> bool:
+        """Check whether an idle connection can be reused.
+
+        Args:
+            pooled: Idle connection to check.
+
+        Returns:
+            Whether the connection is young enough and, if it has been idle for a while, still answers a ping.
+        """
+        now = time.monotonic()
+
+        if now - pooled.created_time >= self.recycle:
+            self.count("recycled")
+            return False
+
+        if now - pooled.released_time >= self.health_check_interval:
+            try:
+                pooled.connection.ping(reconnect=False)
+            except pymysql.Error:
+                self.count("failed_health_checks")
+                return False
+
+        return True
+
+    def acquire(self) -> PooledConnection:
+        """Take a connection out of the pool, opening a new one if none of the idle connections can be reused.
+
+        Returns:
+            Connection that must be passed to release once it is no longer needed.
+
+        Raises:
+            TimeoutError: No connection was released within the timeout.
+            pymysql.Error: A new connection couldn't be opened.
+        """
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            with self.condition:
+                if not self.idle and self.open_connections >= self.max_size:
+                    self.counters["waits"] += 1
+
+                    while not self.idle and self.open_connections >= self.max_size:
+                        remaining = deadline - time.monotonic()
+
+                        if remaining <= 0:
+                            self.counters["timeouts"] += 1
+                            raise TimeoutError(f"No database connection available after {self.timeout} seconds")
+
+                        self.condition.wait(remaining)
+
+                pooled = self.idle.pop() if self.idle else None
+
+                if pooled is None:
+                    self.open_connections += 1
+
+            if pooled is None:
+                try:
+                    pooled = PooledConnection(self.connect_func())
+                except BaseException:
+                    with self.condition:
+                        self.open_connections -= 1
+                        self.condition.notify()
+                    raise
+
+                self.count("opened")
+            elif not self.is_usable(pooled):
+                self.discard(pooled)
+                continue
+            else:
+                self.count("reused")
+
+            with self.condition:
+                self.counters["acquired"] += 1
+                self.peak_in_use = max(self.peak_in_use, self.open_connections - len(self.idle))
+
+            return pooled
+
+    def release(self, pooled: PooledConnection):
+        """Return a connection to the pool so that it can be reused.
+
+        Args:
+            pooled: Connection returned by acquire.
+        """
+        pooled.released_time = time.monotonic()
+
+        with self.condition:
+            self.idle.append(pooled)
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def cursor(self) -> Iterator[pymysql.cursors.DictCursor]:
+        """Borrow a connection for the duration of a transaction. The transaction is committed when the context exits normally
+        and rolled back if an exception is raised, so the connection is always returned to the pool without an open transaction.
+        Connections that fail to roll back are closed instead.
+
+        Yields:
+            Cursor of the borrowed connection.
+        """
+        pooled = self.acquire()
+
+        try:
+            yield pooled.connection.cursor(pymysql.cursors.DictCursor)
+            pooled.connection.commit()
+        except BaseException:
+            try:
+                pooled.connection.rollback()
+            except pymysql.Error:
+                self.discard(pooled)
+            else:
+                self.release(pooled)
+
+            raise
+
+        self.release(pooled)
+
+    def close(self):
+        """Close every idle connection."""
+        with self.condition:
+            idle = list(self.idle)
+            self.idle.clear()
+
+        for pooled in idle:
+            self.discard(pooled)
+
+    def stats(self) -> PoolStats:
+        """Get the current state of the pool and counts of what it has done since it was created.
+
+        Returns:
+            Statistics of the pool.
+        """
+        with self.condition:
+            stats: PoolStats = {
+                "max_size": self.max_size,
+                "open": self.open_connections,
+                "idle": len(self.idle),
+                "in_use": self.open_connections - len(self.idle),
+                "peak_in_use": self.peak_in_use,
+                "acquired": self.counters["acquired"],
+                "reused": self.counters["reused"],
+                "opened": self.counters["opened"],
+                "closed": self.counters["closed"],
+                "recycled": self.counters["recycled"],
+                "failed_health_checks": self.counters["failed_health_checks"],
+                "waits": self.counters["waits"],
+                "timeouts": self.counters["timeouts"]
+            }
+
+        return stats
+
+
+DB_POOL = ConnectionPool()
@@ -10,19 +10,19 @@ import xlsxwriter
 # Config
 from config.blacklist import BLACKLIST
 from config.config import PRIMARY_CLAN_TAG
-from config.credentials import (
-    IP,
-    USERNAME,
-    PASSWORD,
-    DB_NAME
-)
 
 # Utils
 import utils.bot_utils as bot_utils
 import utils.clash_utils as clash_utils
+import utils.db_executor_utils as db_executor_utils
+import utils.race_log_utils as race_log_utils
+from utils.db_pool_utils import DB_POOL
 from utils.logging_utils import LOG, log_message
 from utils.role_utils import RoleNames
 from utils.util_types import (
+    BattlelogCheck,
+    ClanMember,
+    ClashData,
     CombinedData,
     DatabaseClan,
     DatabaseData,
@@ -30,6 +30,7 @@ from utils.util_types import (
     RaceStats,
     ReminderTime,
     ResetTimes,
+    RiverRaceClan,
     RiverRaceStats,
     Status
 )
@@ -50,17 +51,6 @@ SIX_DAY_MASK = 0x3FFFF
 ONE_DAY_MASK = 0x7
 
 
-def connect_to_db() -> Tuple[pymysql.Connection, pymysql.cursors.DictCursor]:
-    """Establish connection to database.
-
-    Returns:
-        Database connection and cursor.
-    """
-    database = pymysql.connect(host=IP, user=USERNAME, password=PASSWORD, database=DB_NAME, charset='utf8mb4')
-    cursor = database.cursor(pymysql.cursors.DictCursor)
-    return (database, cursor)
-
-
 def get_clan_id(clan_tag: str, clan_name: str, cursor: pymysql.cursors.DictCursor) -> int:
     """Get id of clan from clans table. If the clan doesn't exist, insert it.
 
@@ -94,94 +84,93 @@ def add_new_user(user_data: CombinedData) -> bool:
     Returns:
         Whether player was successfully inserted into database.
     """
-    database, cursor = connect_to_db()
-
-    # Add extra fields to user_data needed for query.
-    user_data['clan_id'] = get_clan_id(user_data['clan_tag'], user_data['clan_name'], cursor)
-    user_data['status_str'] = user_data['status'].value
-    user_data['first_joined'] = bot_utils.get_current_battletime() if user_data['status'] == Status.ACTIVE else None
-
-    # Check if the user has previously joined the server with a different player tag.
-    # If they have, set their previous associated account's discord_id to NULL and create a new entry.
-    cursor.execute("SELECT * FROM users WHERE discord_id = %(discord_id)s", user_data)
-    query_result = cursor.fetchone()
-
-    if query_result is not None:
-        LOG.debug(log_message("User rejoined server with different player tag", previous_player_tag=query_result['player_tag']))
-        cursor.execute("UPDATE users SET discord_id = NULL WHERE discord_id = %(discord_id)s", user_data)
-
-    # Check if player already exists in table.
-    cursor.execute("SELECT * FROM users WHERE player_tag = %(player_tag)s", user_data)
-    query_result = cursor.fetchone()
-
-    if query_result is not None:
-        if Status(query_result['status']) in {Status.ACTIVE, Status.INACTIVE}:
-            database.rollback()
-            database.close()
-            return False
+    with DB_POOL.cursor() as cursor:
+        # Add extra fields to user_data needed for query.
+        user_data['clan_id'] = get_clan_id(user_data['clan_tag'], user_data['clan_name'], cursor)
+        user_data['status_str'] = user_data['status'].value
+        user_data['first_joined'] = bot_utils.get_current_battletime() if user_data['status'] == Status.ACTIVE else None
+
+        # Check if the user has previously joined the server with a different player tag.
+        # If they have, set their previous associated account's discord_id to NULL and create a new entry.
+        cursor.execute("SELECT * FROM users WHERE discord_id = %(discord_id)s", user_data)
+        query_result = cursor.fetchone()
 
-        LOG.debug(log_message("User joined as a previously UNREGISTERED/DEPARTED user", previous_status=query_result['status']))
-        cursor.execute("UPDATE users SET\
-                        player_name = %(player_name)s,\
-                        discord_name = %(discord_name)s,\
-                        discord_id = %(discord_id)s,\
-                        clan_role = %(role)s,\
-                        clan_id = %(clan_id)s,\
-                        status = %(status_str)s\
-                        WHERE player_tag = %(player_tag)s",
-                        user_data)
-        cursor.execute("UPDATE users SET first_joined = %(first_joined)s\
-                        WHERE first_joined IS NULL AND player_tag = %(player_tag)s",
-                        user_data)
-    else:
-        cursor.execute("INSERT INTO users VALUES\
-                        (DEFAULT, %(player_tag)s, %(player_name)s, %(discord_name)s, %(discord_id)s,\
-                        %(role)s, 'US', FALSE, 0, 0, 0, %(status_str)s, %(first_joined)s, %(clan_id)s)",
-                        user_data)
+        if query_result is not None:
+            LOG.debug(log_message("User rejoined server with different player tag", previous_player_tag=query_result['player_tag']))
+            cursor.execute("UPDATE users SET discord_id = NULL WHERE discord_id = %(discord_id)s", user_data)
 
-    # Get id of newly inserted user.
-    cursor.execute("SELECT id FROM users WHERE player_tag = %(player_tag)s", user_data)
-    query_result = cursor.fetchone()
-    user_id = query_result['id']
+        # Check if player already exists in table.
+        cursor.execute("SELECT * FROM users WHERE player_tag = %(player_tag)s", user_data)
+        query_result = cursor.fetchone()
 
-    # Check for match_history and create entries if necessary.
-    cursor.execute("SELECT user_id FROM match_history_all WHERE user_id = %s", (user_id))
-    query_result = cursor.fetchone()
+        if query_result is not None:
+            if Status(query_result['status']) in {Status.ACTIVE, Status.INACTIVE}:
+                cursor.connection.rollback()
+                return False
+
+            LOG.debug(log_message("User joined as a previously UNREGISTERED/DEPARTED user", previous_status=query_result['status']))
+            cursor.execute("UPDATE users SET\
+                            player_name = %(player_name)s,\
+                            discord_name = %(discord_name)s,\
+                            discord_id = %(discord_id)s,\
+                            clan_role = %(role)s,\
+                            clan_id = %(clan_id)s,\
+                            status = %(status_str)s\
+                            WHERE player_tag = %(player_tag)s",
+                            user_data)
+            cursor.execute("UPDATE users SET first_joined = %(first_joined)s\
+                            WHERE first_joined IS NULL AND player_tag = %(player_tag)s",
+                            user_data)
+        else:
+            cursor.execute("INSERT INTO users VALUES\
+                            (DEFAULT, %(player_tag)s, %(player_name)s, %(discord_name)s, %(discord_id)s,\
+                            %(role)s, 'US', FALSE, 0, 0, 0, %(status_str)s, %(first_joined)s, %(clan_id)s)",
+                            user_data)
 
-    if query_result is None:
-        last_check_time = get_last_check_time()
-        tracked_since = bot_utils.get_current_battletime() if (is_war_time() and (user_data['status'] == Status.ACTIVE)) else None
-        cursor.execute("INSERT INTO match_history_recent VALUES (%s, %s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
-                       (user_id, last_check_time, tracked_since))
-        cursor.execute("INSERT INTO match_history_season VALUES (%s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
-                       (user_id, tracked_since))
-        cursor.execute("INSERT INTO match_history_all VALUES (%s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)", (user_id))
-
-    # Check if new user is member or visitor. Get id of relevant discord_role.
-    role_string = RoleNames.MEMBER.value if (user_data['status'] == Status.ACTIVE) else RoleNames.VISITOR.value
-    cursor.execute("SELECT id FROM discord_roles WHERE role_name = %s", (role_string))
-    query_result = cursor.fetchone()
-    discord_role_id = query_result['id']
+        # Get id of newly inserted user.
+        cursor.execute("SELECT id FROM users WHERE player_tag = %(player_tag)s", user_data)
+        query_result = cursor.fetchone()
+        user_id = query_result['id']
 
-    # Add new role into assigned_roles table.
-    insert_assigned_roles_query = "INSERT INTO assigned_roles VALUES (%s, %s)"
-    cursor.execute(insert_assigned_roles_query, (user_id, discord_role_id))
+        # Check for match_history and create entries if necessary.
+        cursor.execute("SELECT user_id FROM match_history_all WHERE user_id = %s", (user_id))
+        query_result = cursor.fetchone()
 
-    if (user_data["role"] in {"elder", "coLeader", "leader"}
-            and user_data["status"] == Status.ACTIVE
-            and user_data["player_tag"] not in BLACKLIST):
-        role_string = "Elder"
+        if query_result is None:
+            clan_tag = tracking_clan_tag(user_data['clan_tag'])
+            last_check_time = get_last_check_time(clan_tag, cursor)
+            tracked = is_war_time(clan_tag, cursor) and (user_data['status'] == Status.ACTIVE)
+            tracked_since = bot_utils.get_current_battletime() if tracked else None
+            cursor.execute("INSERT INTO match_history_recent VALUES (%s, %s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
+                           (user_id, last_check_time, tracked_since))
+            cursor.execute("INSERT INTO match_history_season VALUES (%s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
+                           (user_id, tracked_since))
+            cursor.execute("INSERT INTO match_history_all VALUES (%s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)", (user_id))
+
+        # Check if new user is member or visitor. Get id of relevant discord_role.
+        role_string = RoleNames.MEMBER.value if (user_data['status'] == Status.ACTIVE) else RoleNames.VISITOR.value
         cursor.execute("SELECT id FROM discord_roles WHERE role_name = %s", (role_string))
         query_result = cursor.fetchone()
         discord_role_id = query_result['id']
+
+        # Add new role into assigned_roles table.
+        insert_assigned_roles_query = "INSERT INTO assigned_roles VALUES (%s, %s)"
         cursor.execute(insert_assigned_roles_query, (user_id, discord_role_id))
 
-    database.commit()
-    database.close()
+        if (user_data["role"] in {"elder", "coLeader", "leader"}
+                and user_data["status"] == Status.ACTIVE
+                and user_data["clan_tag"] == PRIMARY_CLAN_TAG
+                and user_data["player_tag"] not in BLACKLIST):
+            role_string = "Elder"
+            cursor.execute("SELECT id FROM discord_roles WHERE role_name = %s", (role_string))
+            query_result = cursor.fetchone()
+            discord_role_id = query_result['id']
+            cursor.execute(insert_assigned_roles_query, (user_id, discord_role_id))
+
     return True
 
 
-def add_new_unregistered_user(player_tag: str) -> bool:
+async def add_new_unregistered_user(player_tag: str) -> bool:
     """Add an unregistered player (active in clan but not Discord) to the database.
 
     Args:
@@ -190,41 +179,91 @@ def add_new_unregistered_user(player_tag: str) -> bool:
     Returns:
         Whether the user was successfully added.
     """
-    database, cursor = connect_to_db()
+    return player_tag in await add_new_unregistered_users([player_tag])
+
+
+async def add_new_unregistered_users(player_tags: List[str]) -> Set[str]:
+    """Add unregistered players (active in clan but not Discord) to the database. Their data is requested concurrently and they
+    are all inserted in a single transaction.
+
+    Args:
+        player_tags: Player tags of players to insert. Players already in the database are skipped.
+
+    Returns:
+        Player tags of the users that were successfully added.
+    """
+    if not player_tags:
+        return set()
 
     # Get their data.
-    user_data = bot_utils.get_combined_data(player_tag)
-    LOG.debug(log_message("Inserting new unregistered user", user_data=user_data))
+    all_user_data = await bot_utils.get_combined_data_many(player_tags)
+    LOG.debug(log_message("Inserting new unregistered users", player_tags=player_tags, found=list(all_user_data)))
 
-    if user_data is None:
-        return False
+    if not all_user_data:
+        return set()
 
-    # Add extra fields to user_data needed for query.
-    user_data['clan_id'] = get_clan_id(user_data['clan_tag'], user_data['clan_name'], cursor)
-    user_data['status_str'] = user_data['status'].value
-    user_data['first_joined'] = bot_utils.get_current_battletime()
+    return await db_executor_utils.DB_EXECUTOR.run(insert_unregistered_users, all_user_data)
 
-    # Insert them
-    cursor.execute("INSERT INTO users VALUES\
-                    (DEFAULT, %(player_tag)s, %(player_name)s, %(discord_name)s, NULL,\
-                    %(role)s, 'US', FALSE, 0, 0, 0, %(status_str)s, %(first_joined)s, %(clan_id)s)",
-                    user_data)
 
-    # Create match_history entries.
-    cursor.execute("SELECT id FROM users WHERE player_tag = %(player_tag)s", user_data)
-    query_result = cursor.fetchone()
-    last_check_time = get_last_check_time()
-    tracked_since = bot_utils.get_current_battletime() if (is_war_time() and user_data['status'] == Status.UNREGISTERED) else None
-    cursor.execute("INSERT INTO match_history_recent VALUES (%s, %s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
-                   (query_result['id'], last_check_time, tracked_since))
-    cursor.execute("INSERT INTO match_history_season VALUES (%s, %s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
-                   (query_result['id'], tracked_since))
-    cursor.execute("INSERT INTO match_history_all VALUES (%s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
-                   (query_result['id']))
-
-    database.commit()
-    database.close()
-    return True
+def insert_unregistered_users(all_user_data: Dict[str, CombinedData]) -> Set[str]:
+    """Insert unregistered players in a single transaction.
+
+    Args:
+        all_user_data: Dictionary mapping player tags to the current data of players to insert. Players already in the database
+            are skipped.
+
+    Returns:
+        Player tags of the users that were inserted.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag FROM users WHERE player_tag IN %s", (list(all_user_data),))
+
+        for user in cursor.fetchall():
+            all_user_data.pop(user['player_tag'], None)
+
+        if not all_user_data:
+            return set()
+
+        # Add extra fields to each user's data needed for queries.
+        current_battletime = bot_utils.get_current_battletime()
+        tracking_info = {}
+
+        for user_data in all_user_data.values():
+            clan_tag = tracking_clan_tag(user_data['clan_tag'])
+
+            if clan_tag not in tracking_info:
+                tracking_info[clan_tag] = (get_last_check_time(clan_tag, cursor), is_war_time(clan_tag, cursor))
+
+            last_check_time, war_time = tracking_info[clan_tag]
+            tracked = war_time and user_data['status'] == Status.UNREGISTERED
+            user_data['clan_id'] = get_clan_id(user_data['clan_tag'], user_data['clan_name'], cursor)
+            user_data['status_str'] = user_data['status'].value
+            user_data['first_joined'] = current_battletime
+            user_data['last_check_time'] = last_check_time
+            user_data['tracked_since'] = current_battletime if tracked else None
+
+        # Insert them
+        cursor.executemany("INSERT INTO users VALUES\
+                            (DEFAULT, %(player_tag)s, %(player_name)s, %(discord_name)s, NULL,\
+                            %(role)s, 'US', FALSE, 0, 0, 0, %(status_str)s, %(first_joined)s, %(clan_id)s)",
+                           list(all_user_data.values()))
+
+        # Create match_history entries.
+        cursor.execute("SELECT id, player_tag FROM users WHERE player_tag IN %s", (list(all_user_data),))
+
+        for user in cursor.fetchall():
+            all_user_data[user['player_tag']]['user_id'] = user['id']
+
+        cursor.executemany("INSERT INTO match_history_recent VALUES\
+                            (%(user_id)s, %(last_check_time)s, %(tracked_since)s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
+                           list(all_user_data.values()))
+        cursor.executemany("INSERT INTO match_history_season VALUES\
+                            (%(user_id)s, %(tracked_since)s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
+                           list(all_user_data.values()))
+        cursor.executemany("INSERT INTO match_history_all VALUES (%(user_id)s, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)",
+                           list(all_user_data.values()))
+
+    return set(all_user_data)
 
 
 def update_user(user_data: CombinedData):
@@ -233,8 +272,30 @@ def update_user(user_data: CombinedData):
     Args:
         user_data: Relevant Clash Royale and Discord data.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        apply_user_update(user_data, cursor)
+
+
+def update_users(all_user_data: List[CombinedData]):
+    """Update multiple users in the database in a single transaction.
+
+    Args:
+        all_user_data: Relevant Clash Royale and Discord data of each user.
+    """
+    with DB_POOL.cursor() as cursor:
+        for user_data in all_user_data:
+            apply_user_update(user_data, cursor)
+
+
+def apply_user_update(user_data: CombinedData, cursor: pymysql.cursors.DictCursor):
+    """Update a user in the database to reflect any changes to their Clash Royale or Discord statuses.
 
+    Requires an existing database connection. Does not commit changes to database.
+
+    Args:
+        user_data: Relevant Clash Royale and Discord data.
+        cursor: Cursor of existing database connection.
+    """
     LOG.debug(log_message("Updating user in database", user_data=user_data))
 
     # Add extra fields to user_data needed for query.
@@ -257,8 +318,10 @@ def update_user(user_data: CombinedData):
                         WHERE first_joined IS NULL AND player_tag = %(player_tag)s",
                         user_data)
 
-        if is_war_time():
-            last_check_time = get_last_check_time()
+        clan_tag = tracking_clan_tag(user_data['clan_tag'])
+
+        if is_war_time(clan_tag, cursor):
+            last_check_time = get_last_check_time(clan_tag, cursor)
             tracked_since = bot_utils.get_current_battletime()
             cursor.execute("UPDATE match_history_recent SET\
                             last_check_time = %s,\
@@ -269,9 +332,6 @@ def update_user(user_data: CombinedData):
                             WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s) AND tracked_since IS NULL",
                             (tracked_since, user_data['player_tag']))
 
-    database.commit()
-    database.close()
-
 
 def get_user_data(player_tag: str) -> DatabaseDataExtended:
     """Get a user's information from the users table.
@@ -282,45 +342,42 @@ def get_user_data(player_tag: str) -> DatabaseDataExtended:
     Returns:
         Dictionary of user's info from database.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT * FROM users WHERE player_tag = %s", (player_tag))
-    query_result = cursor.fetchone()
-
-    if query_result is None:
-        return None
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT * FROM users WHERE player_tag = %s", (player_tag))
+        query_result = cursor.fetchone()
 
-    user_data: DatabaseDataExtended = {
-        'player_tag': query_result['player_tag'],
-        'player_name': query_result['player_name'],
-        'discord_name': query_result['discord_name'],
-        'discord_id': query_result['discord_id'],
-        'role': query_result['clan_role'],
-        'clan_tag': "",
-        'clan_name': "",
-        'vacation': query_result['vacation'],
-        'strikes': query_result['strikes'],
-        'permanent_strikes': query_result['permanent_strikes'],
-        'usage_history': query_result['usage_history'],
-        'status': Status(query_result['status'])
-    }
+        if query_result is None:
+            return None
+
+        user_data: DatabaseDataExtended = {
+            'player_tag': query_result['player_tag'],
+            'player_name': query_result['player_name'],
+            'discord_name': query_result['discord_name'],
+            'discord_id': query_result['discord_id'],
+            'role': query_result['clan_role'],
+            'clan_tag': "",
+            'clan_name': "",
+            'vacation': query_result['vacation'],
+            'strikes': query_result['strikes'],
+            'permanent_strikes': query_result['permanent_strikes'],
+            'usage_history': query_result['usage_history'],
+            'status': Status(query_result['status'])
+        }
 
-    clan_id = query_result["clan_id"]
-    cursor.execute("SELECT * FROM clans WHERE id = %s", (clan_id))
-    query_result = cursor.fetchone()
+        clan_id = query_result["clan_id"]
+        cursor.execute("SELECT * FROM clans WHERE id = %s", (clan_id))
+        query_result = cursor.fetchone()
 
-    if query_result is None:
-        database.close()
-        return None
+        if query_result is None:
+            return None
 
-    user_data['clan_tag'] = query_result['clan_tag']
-    user_data['clan_name'] = query_result['clan_name']
+        user_data['clan_tag'] = query_result['clan_tag']
+        user_data['clan_name'] = query_result['clan_name']
 
-    database.close()
     return user_data
 
 
-def update_strikes(player_tag: str, delta: int) -> Tuple[int, int, int, int]:
+async def update_strikes(player_tag: str, delta: int) -> Tuple[int, int, int, int]:
     """Add or remove strikes from user. If player tag does not exist in database, add them as an unregistered user.
 
     Args:
@@ -331,30 +388,35 @@ def update_strikes(player_tag: str, delta: int) -> Tuple[int, int, int, int]:
         Tuple of old strike count, new strike count, old permanent strike count, and new permanent strike count. All values will be
             None if an error occurred.
     """
-    database, cursor = connect_to_db()
+    strike_counts = await db_executor_utils.DB_EXECUTOR.run(apply_strikes, player_tag, delta)
 
-    old_strike_count = None
-    new_strike_count = None
-    old_permanent_strike_count = None
-    new_permanent_strike_count = None
-    cursor.execute("SELECT strikes, permanent_strikes FROM users WHERE player_tag = %s", (player_tag))
-    query_result = cursor.fetchone()
+    if strike_counts is None:
+        if not await add_new_unregistered_user(player_tag):
+            return (None, None, None, None)
 
-    if query_result is None:
-        if not add_new_unregistered_user(player_tag):
-            database.close()
-            return (old_strike_count, new_strike_count, old_permanent_strike_count, new_permanent_strike_count)
+        strike_counts = await db_executor_utils.DB_EXECUTOR.run(apply_strikes, player_tag, delta)
 
-        old_strike_count = 0
-        old_permanent_strike_count = 0
+    return strike_counts
+
+
+def apply_strikes(player_tag: str, delta: int) -> Union[Tuple[int, int, int, int], None]:
+    """Add or remove strikes from a user in the database.
+
+    Args:
+        player_tag: Player to give strike to.
+        delta: Number of strikes to add or remove from current strikes for user.
+
+    Returns:
+        Tuple of old strike count, new strike count, old permanent strike count, and new permanent strike count, or None if the
+            user is not in the database.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT strikes, permanent_strikes FROM users WHERE player_tag = %s", (player_tag))
+        query_result = cursor.fetchone()
+
+        if query_result is None:
+            return None
 
-        if delta < 0:
-            new_strike_count = 0
-            new_permanent_strike_count = 0
-        else:
-            new_strike_count = delta
-            new_permanent_strike_count = delta
-    else:
         old_strike_count = query_result["strikes"]
         old_permanent_strike_count = query_result["permanent_strikes"]
 
@@ -368,11 +430,9 @@ def update_strikes(player_tag: str, delta: int) -> Tuple[int, int, int, int]:
         else:
             new_permanent_strike_count = old_permanent_strike_count + delta
 
-    cursor.execute("UPDATE users SET strikes = %s, permanent_strikes = %s WHERE player_tag = %s",
-                   (new_strike_count, new_permanent_strike_count, player_tag))
+        cursor.execute("UPDATE users SET strikes = %s, permanent_strikes = %s WHERE player_tag = %s",
+                       (new_strike_count, new_permanent_strike_count, player_tag))
 
-    database.commit()
-    database.close()
     LOG.debug(log_message("Updated strikes for user",
                           player_tag=player_tag,
                           delta=delta,
@@ -391,12 +451,9 @@ def get_strikes(discord_id: int) -> int:
     Returns:
         Number of non-permanent strikes the specified user currently has.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT strikes FROM users WHERE discord_id = %s", (discord_id))
-    query_result = cursor.fetchone()
-
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT strikes FROM users WHERE discord_id = %s", (discord_id))
+        query_result = cursor.fetchone()
 
     if query_result is None:
         return None
@@ -406,11 +463,8 @@ def get_strikes(discord_id: int) -> int:
 
 def reset_strikes():
     """Reset non-permanent strikes for all users"""
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE users SET strikes = 0")
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE users SET strikes = 0")
 
 
 def get_users_with_strikes() -> List[Tuple[str, str, int]]:
@@ -419,11 +473,9 @@ def get_users_with_strikes() -> List[Tuple[str, str, int]]:
     Returns:
         List of player tags, player names, and non-permanent strikes.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_name, player_tag, strikes FROM users WHERE strikes > 0")
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_name, player_tag, strikes FROM users WHERE strikes > 0")
+        query_result = cursor.fetchall()
 
     if query_result is None:
         return {}
@@ -440,11 +492,9 @@ def get_users_with_strikes_dict() -> Dict[str, int]:
     Returns:
         Dictionary mapping player tag to non-permanent strikes.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag, strikes FROM users WHERE strikes > 0")
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag, strikes FROM users WHERE strikes > 0")
+        query_result = cursor.fetchall()
 
     if query_result is None:
         return {}
@@ -453,163 +503,281 @@ def get_users_with_strikes_dict() -> Dict[str, int]:
     return strikes_dict
 
 
-def set_completed_saturday_status(status: bool):
-    """Update database to indicate whether the primary clan has crossed the finish line early.
+def column_exists(table: str, column: str, cursor: pymysql.cursors.DictCursor) -> bool:
+    """Check whether a table in the database has a column.
 
     Args:
-        status: New status to set completed_saturday to.
+        table: Name of the table.
+        column: Name of the column.
+        cursor: Cursor of existing database connection.
+
+    Returns:
+        Whether the column exists.
+    """
+    cursor.execute("SELECT COUNT(*) AS count FROM information_schema.COLUMNS\
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                   (table, column))
+    return cursor.fetchone()['count'] > 0
+
+
+def index_exists(table: str, index: str, cursor: pymysql.cursors.DictCursor) -> bool:
+    """Check whether a table in the database has an index.
+
+    Args:
+        table: Name of the table.
+        index: Name of the index.
+        cursor: Cursor of existing database connection.
+
+    Returns:
+        Whether the index exists.
+    """
+    cursor.execute("SELECT COUNT(*) AS count FROM information_schema.STATISTICS\
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+                   (table, index))
+    return cursor.fetchone()['count'] > 0
+
+
+def migrate_tracked_clan_tables(cursor: pymysql.cursors.DictCursor):
+    """Key the race_status, race_reset_times and river_race_clans tables of databases created before clan families were
+    supported by the tracked clan. Their existing rows are assigned to the primary clan. Tables that are already keyed by the
+    tracked clan are left alone, so this is safe to run on every startup.
+
+    Args:
+        cursor: Cursor of existing database connection.
     """
-    database, cursor = connect_to_db()
+    for table, column, primary_key in [("race_status", "clan_tag", "clan_tag"),
+                                       ("race_reset_times", "clan_tag", "clan_tag"),
+                                       ("river_race_clans", "tracked_clan_tag", "tracked_clan_tag, clan_tag")]:
+        if column_exists(table, column, cursor):
+            continue
+
+        LOG.info(log_message("Migrating table to be keyed by tracked clan", table=table))
+
+        # The old river_race_clans table allowed each clan to appear only once.
+        if table == "river_race_clans" and index_exists(table, "clan_tag", cursor):
+            cursor.execute("ALTER TABLE river_race_clans DROP INDEX clan_tag")
 
-    cursor.execute("UPDATE race_status SET completed_saturday = %s", (status))
+        # Adding the column with the primary clan as its default backfills the existing rows.
+        cursor.execute(f"ALTER TABLE {table}\
+                         ADD COLUMN {column} varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL\
+                         DEFAULT %s FIRST,\
+                         DROP PRIMARY KEY,\
+                         ADD PRIMARY KEY ({primary_key})",
+                       (PRIMARY_CLAN_TAG))
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+
+
+def prepare_tracked_clans(clan_tags: List[str]):
+    """Migrate tables from before clan families were supported, then create the race_status and race_reset_times rows of any
+    tracked clans that do not have them yet.
+
+    Args:
+        clan_tags: Clans to track.
+    """
+    with DB_POOL.cursor() as cursor:
+        migrate_tracked_clan_tables(cursor)
+        cursor.executemany("INSERT IGNORE INTO race_status VALUES\
+                            (%s, 0, 0, 0, '21000101T000000.000Z', '21000101T000000.000Z', NULL)",
+                           clan_tags)
+        cursor.executemany("INSERT IGNORE INTO race_reset_times VALUES (%s, '21000101T000000.000Z', '21000101T000000.000Z',\
+                            '21000101T000000.000Z', '21000101T000000.000Z')",
+                           clan_tags)
 
-    database.commit()
-    database.close()
 
+def tracked_users_query(clan_tag: str) -> Tuple[str, tuple]:
+    """Build a subquery that selects the ids of users whose river race progress is tracked through a clan. Users who are not in
+    any tracked clan are tracked through the primary clan.
 
-def is_completed_saturday() -> bool:
-    """Return whether the primary clan crossed the finish line early.
+    Args:
+        clan_tag: Tracked clan to select users of.
 
     Returns:
-        Completed Saturday status.
+        Subquery and its parameters.
     """
-    database, cursor = connect_to_db()
+    other_clan_tags = tuple(tag for tag in clash_utils.TRACKED_CLAN_TAGS if tag != clan_tag)
 
-    cursor.execute("SELECT completed_saturday FROM race_status")
-    query_result = cursor.fetchone()
+    if clan_tag != PRIMARY_CLAN_TAG:
+        return ("SELECT users.id FROM users INNER JOIN clans ON users.clan_id = clans.id WHERE clans.clan_tag = %s",
+                (clan_tag,))
+
+    if not other_clan_tags:
+        return "SELECT id FROM users", ()
+
+    return ("SELECT users.id FROM users INNER JOIN clans ON users.clan_id = clans.id WHERE clans.clan_tag NOT IN %s",
+            (other_clan_tags,))
+
+
+def tracking_clan_tag(clan_tag: str) -> str:
+    """Get the tracked clan that a user's river race progress is tracked through.
+
+    Args:
+        clan_tag: Clan that the user is currently in.
+
+    Returns:
+        The user's clan if it is tracked, otherwise the primary clan.
+    """
+    return clan_tag if clan_tag in clash_utils.TRACKED_CLAN_TAGS else PRIMARY_CLAN_TAG
+
+
+def set_completed_saturday_status(status: bool, clan_tag: str=PRIMARY_CLAN_TAG):
+    """Update database to indicate whether a clan has crossed the finish line early.
+
+    Args:
+        status: New status to set completed_saturday to.
+        clan_tag (optional): Clan to update the status of. Defaults to primary clan.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE race_status SET completed_saturday = %s WHERE clan_tag = %s", (status, clan_tag))
+
+
+def is_completed_saturday(clan_tag: str=PRIMARY_CLAN_TAG) -> bool:
+    """Return whether a clan crossed the finish line early.
+
+    Args:
+        clan_tag (optional): Clan to get the status of. Defaults to primary clan.
+
+    Returns:
+        Completed Saturday status.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT completed_saturday FROM race_status WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
 
-    database.close()
     return query_result["completed_saturday"]
 
 
-def set_colosseum_week_status(status: bool):
+def set_colosseum_week_status(status: bool, clan_tag: str=PRIMARY_CLAN_TAG, cursor: pymysql.cursors.DictCursor=None):
     """Update database to indicate whether or not it's colosseum week.
 
     Args:
         status: New status to set colosseum_week to.
+        clan_tag (optional): Clan to update the status of. Defaults to primary clan.
+        cursor (optional): Cursor of an open transaction to make the update in. A connection is borrowed from the pool if omitted.
     """
-    database, cursor = connect_to_db()
+    if cursor is None:
+        with DB_POOL.cursor() as cursor:
+            set_colosseum_week_status(status, clan_tag, cursor)
+            return
 
-    cursor.execute("UPDATE race_status SET colosseum_week = %s", (status))
+    cursor.execute("UPDATE race_status SET colosseum_week = %s WHERE clan_tag = %s", (status, clan_tag))
 
-    database.commit()
-    database.close()
 
-
-def is_colosseum_week() -> bool:
+def is_colosseum_week(clan_tag: str=PRIMARY_CLAN_TAG) -> bool:
     """Return whether it's colosseum week.
 
+    Args:
+        clan_tag (optional): Clan to get the status of. Defaults to primary clan.
+
     Returns:
         Colosseum week status.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT colosseum_week FROM race_status")
-    query_result = cursor.fetchone()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT colosseum_week FROM race_status WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
 
-    database.close()
     return query_result["colosseum_week"]
 
 
-def set_war_time_status(status: bool):
+def set_war_time_status(status: bool, clan_tag: str=PRIMARY_CLAN_TAG):
     """Update database to indicate whether or not it's war time.
 
     Args:
         status: New status to set war_time to.
+        clan_tag (optional): Clan to update the status of. Defaults to primary clan.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE race_status SET war_time = %s", (status))
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE race_status SET war_time = %s WHERE clan_tag = %s", (status, clan_tag))
 
 
-def is_war_time() -> bool:
+def is_war_time(clan_tag: str=PRIMARY_CLAN_TAG, cursor: pymysql.cursors.DictCursor=None) -> bool:
     """Return whether it's war time.
 
+    Args:
+        clan_tag (optional): Clan to get the status of. Defaults to primary clan.
+        cursor (optional): Cursor of an open transaction to read the status in. A connection is borrowed from the pool if omitted.
+
     Returns:
         War time status.
     """
-    database, cursor = connect_to_db()
+    if cursor is None:
+        with DB_POOL.cursor() as cursor:
+            return is_war_time(clan_tag, cursor)
 
-    cursor.execute("SELECT war_time FROM race_status")
-    query_result = cursor.fetchone()
+    cursor.execute("SELECT war_time FROM race_status WHERE clan_tag = %s", (clan_tag))
+    return cursor.fetchone()["war_time"]
 
-    database.close()
-    return query_result["war_time"]
 
-
-def set_last_check_time(last_check_time: datetime.datetime):
+def set_last_check_time(last_check_time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG):
     """Update database to indicate when the last win rate tracking check occurred.
 
     Args:
         last_check_time: Last check time in datetime format.
+        clan_tag (optional): Clan that was checked. Defaults to primary clan.
     """
-    database, cursor = connect_to_db()
-
-    last_check_time = bot_utils.datetime_to_battletime(last_check_time)
-    cursor.execute("UPDATE race_status SET last_check_time = %s", (last_check_time))
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        last_check_time = bot_utils.datetime_to_battletime(last_check_time)
+        cursor.execute("UPDATE race_status SET last_check_time = %s WHERE clan_tag = %s", (last_check_time, clan_tag))
 
 
-def get_last_check_time() -> str:
+def get_last_check_time(clan_tag: str=PRIMARY_CLAN_TAG, cursor: pymysql.cursors.DictCursor=None) -> str:
     """Get the time when the last win rate tracking check occurred.
 
+    Args:
+        clan_tag (optional): Clan to get the last check time of. Defaults to primary clan.
+        cursor (optional): Cursor of an open transaction to read the time in. A connection is borrowed from the pool if omitted.
+
     Returns:
         Time of last win rate tracking check, formatted as Clash Royale API battleTime.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT last_check_time FROM race_status")
-    query_result = cursor.fetchone()
+    if cursor is None:
+        with DB_POOL.cursor() as cursor:
+            return get_last_check_time(clan_tag, cursor)
 
-    database.close()
-    return query_result["last_check_time"]
+    cursor.execute("SELECT last_check_time FROM race_status WHERE clan_tag = %s", (clan_tag))
+    return cursor.fetchone()["last_check_time"]
 
 
-def set_reset_time(reset_time: datetime.datetime):
+def set_reset_time(reset_time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG):
     """Save most recent daily reset time to database.
 
     Args:
         reset_time: Most recent reset time.
+        clan_tag (optional): Clan whose river race reset. Defaults to primary clan.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        reset_time_str = bot_utils.datetime_to_battletime(reset_time)
+        cursor.execute("UPDATE race_status SET reset_time = %s WHERE clan_tag = %s", (reset_time_str, clan_tag))
 
-    reset_time_str = bot_utils.datetime_to_battletime(reset_time)
-    cursor.execute("UPDATE race_status SET reset_time = %s", (reset_time_str))
+        river_race_days = {4: 'thursday', 5: 'friday', 6: 'saturday', 0: 'sunday'}
+        weekday = river_race_days.get(reset_time.weekday(), None)
 
-    river_race_days = {4: 'thursday', 5: 'friday', 6: 'saturday', 0: 'sunday'}
-    weekday = river_race_days.get(reset_time.weekday(), None)
+        if weekday is not None:
+            cursor.execute(f"UPDATE race_reset_times SET {weekday} = %s WHERE clan_tag = %s", (reset_time_str, clan_tag))
 
-    if weekday is not None:
-        cursor.execute(f"UPDATE race_reset_times SET {weekday} = %s", (reset_time_str))
 
-    database.commit()
-    database.close()
-
-
-def get_reset_time() -> datetime.datetime:
+def get_reset_time(clan_tag: str=PRIMARY_CLAN_TAG) -> datetime.datetime:
     """Get the most recent daily reset time from the database.
 
+    Args:
+        clan_tag (optional): Clan to get the reset time of. Defaults to primary clan.
+
     Returns:
         Most recent reset time.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT reset_time FROM race_status")
-    query_result = cursor.fetchone()
-    reset_time = bot_utils.battletime_to_datetime(query_result["reset_time"])
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT reset_time FROM race_status WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
+        reset_time = bot_utils.battletime_to_datetime(query_result["reset_time"])
 
-    database.close()
     return reset_time
 
 
-def get_river_race_reset_times() -> ResetTimes:
+def get_river_race_reset_times(clan_tag: str=PRIMARY_CLAN_TAG) -> ResetTimes:
     """Get the reset time of each day during the most recent river race.
 
+    Args:
+        clan_tag (optional): Clan to get the reset times of. Defaults to primary clan.
+
     Returns:
         Dictionary of weekday and reset time pairs.
             {
@@ -619,11 +787,9 @@ def get_river_race_reset_times() -> ResetTimes:
                 "sunday": datetime.datetime
             }
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT * FROM race_reset_times")
-    query_result = cursor.fetchone()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT * FROM race_reset_times WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
 
     reset_times: ResetTimes = {
         "thursday":  bot_utils.battletime_to_datetime(query_result["thursday"]),
@@ -635,6 +801,80 @@ def get_river_race_reset_times() -> ResetTimes:
     return reset_times
 
 
+def set_detected_reset_time(reset_time: Union[datetime.datetime, None], clan_tag: str=PRIMARY_CLAN_TAG):
+    """Save when the daily reset of a clan was detected, before the reset routines have been performed.
+
+    Args:
+        reset_time: Time that the reset was detected, or None to clear it once the reset routines are done.
+        clan_tag (optional): Clan whose river race reset. Defaults to primary clan.
+    """
+    with DB_POOL.cursor() as cursor:
+        reset_time_str = bot_utils.datetime_to_battletime(reset_time) if reset_time is not None else None
+        cursor.execute("UPDATE race_status SET detected_reset_time = %s WHERE clan_tag = %s", (reset_time_str, clan_tag))
+
+
+def get_detected_reset_time(clan_tag: str=PRIMARY_CLAN_TAG) -> Union[datetime.datetime, None]:
+    """Get when the daily reset of a clan was detected if its reset routines have not been performed yet.
+
+    Args:
+        clan_tag (optional): Clan to get the detected reset time of. Defaults to primary clan.
+
+    Returns:
+        Time that the reset was detected, or None if no reset is waiting on the reset routines.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT detected_reset_time FROM race_status WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
+
+    if query_result is None or query_result["detected_reset_time"] is None:
+        return None
+
+    return bot_utils.battletime_to_datetime(query_result["detected_reset_time"])
+
+
+def save_reset_snapshot(deck_usage: Dict[str, int], snapshot_time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG):
+    """Replace the saved deck usage of a clan's participants with their usage from the most recent poll before the daily reset.
+
+    Args:
+        deck_usage: Dictionary mapping player tags to number of decks used today.
+        snapshot_time: Time of the poll.
+        clan_tag (optional): Clan that the participants belong to. Defaults to primary clan.
+    """
+    with DB_POOL.cursor() as cursor:
+        snapshot_time_str = bot_utils.datetime_to_battletime(snapshot_time)
+        cursor.execute("DELETE FROM reset_snapshots WHERE clan_tag = %s", (clan_tag))
+        cursor.executemany("INSERT INTO reset_snapshots VALUES (%s, %s, %s, %s)",
+                           [(clan_tag, player_tag, decks_used, snapshot_time_str) for player_tag, decks_used in deck_usage.items()])
+
+
+def get_reset_snapshot(clan_tag: str=PRIMARY_CLAN_TAG) -> Tuple[Dict[str, int], Union[datetime.datetime, None]]:
+    """Get the saved deck usage of a clan's participants from the most recent poll before the daily reset.
+
+    Args:
+        clan_tag (optional): Clan to get the deck usage of. Defaults to primary clan.
+
+    Returns:
+        Dictionary mapping player tags to number of decks used today, and the time of the poll. The time is None if no poll has
+            been saved.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag, decks_used_today, snapshot_time FROM reset_snapshots WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchall()
+
+    if not query_result:
+        return ({}, None)
+
+    deck_usage = {row["player_tag"]: row["decks_used_today"] for row in query_result}
+    return (deck_usage, bot_utils.battletime_to_datetime(query_result[0]["snapshot_time"]))
+
+
+def clear_reset_detection():
+    """Delete the saved deck usage and detected reset times of every clan once the reset routines are done."""
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("DELETE FROM reset_snapshots")
+        cursor.execute("UPDATE race_status SET detected_reset_time = NULL")
+
+
 def find_user_in_db(search_key: Union[int, str]) -> List[Tuple[str, str, str]]:
     """Find a user(s) in the database corresponding to the search key.
 
@@ -648,28 +888,26 @@ def find_user_in_db(search_key: Union[int, str]) -> List[Tuple[str, str, str]]:
     Returns:
         List of tuples of (player_name, player_tag, clan_name).
     """
-    database, cursor = connect_to_db()
-
-    if isinstance(search_key, int):
-        cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
-                        INNER JOIN clans ON users.clan_id = clans.id WHERE discord_id = %s",
-                        (search_key))
-        query_result = cursor.fetchall()
-    else:
-        cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
-                        INNER JOIN clans ON users.clan_id = clans.id WHERE player_tag = %s",
-                        (search_key))
-        query_result = cursor.fetchall()
+    with DB_POOL.cursor() as cursor:
+        if isinstance(search_key, int):
+            cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
+                            INNER JOIN clans ON users.clan_id = clans.id WHERE discord_id = %s",
+                            (search_key))
+            query_result = cursor.fetchall()
+        else:
+            cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
+                            INNER JOIN clans ON users.clan_id = clans.id WHERE player_tag = %s",
+                            (search_key))
+            query_result = cursor.fetchall()
 
-    if not query_result:
-        cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
-                        INNER JOIN clans ON users.clan_id = clans.id WHERE player_name = %s",
-                        (search_key))
-        query_result = cursor.fetchall()
+        if not query_result:
+            cursor.execute("SELECT users.player_name, users.player_tag, clans.clan_name FROM users\
+                            INNER JOIN clans ON users.clan_id = clans.id WHERE player_name = %s",
+                            (search_key))
+            query_result = cursor.fetchall()
 
-    search_results = [(user["player_name"], user["player_tag"], user["clan_name"]) for user in query_result]
+        search_results = [(user["player_name"], user["player_tag"], user["clan_name"]) for user in query_result]
 
-    database.close()
     return search_results
 
 
@@ -682,11 +920,9 @@ def get_member_id(player_tag: str) -> int:
     Returns:
         Discord ID of specified user, or None if not found.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT discord_id FROM users WHERE player_tag = %s", (player_tag))
-    query_result = cursor.fetchone()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT discord_id FROM users WHERE player_tag = %s", (player_tag))
+        query_result = cursor.fetchone()
 
     if query_result is None:
         return None
@@ -694,55 +930,46 @@ def get_member_id(player_tag: str) -> int:
     return query_result["discord_id"]
 
 
-def remove_user(discord_id: int):
+def remove_user(discord_id: int, active_members: Dict[str, ClanMember]):
     """Remove a user's assigned roles and change their status to either UNREGISTERED or DEPARTED.
 
     Args:
         discord_id: Unique Discord id of a member.
+        active_members: Dictionary mapping player tags to active members of the tracked clans.
     """
-    database, cursor = connect_to_db()
-
-    # Get id and player_tag of user.
-    cursor.execute("SELECT id, player_tag FROM users WHERE discord_id = %s", (discord_id))
-    query_result = cursor.fetchone()
-
-    if query_result is None:
-        database.close()
-        return
+    with DB_POOL.cursor() as cursor:
+        # Get id and player_tag of user.
+        cursor.execute("SELECT id, player_tag FROM users WHERE discord_id = %s", (discord_id))
+        query_result = cursor.fetchone()
 
-    user_id = query_result['id']
-    player_tag = query_result['player_tag']
+        if query_result is None:
+            return
 
-    # Delete any assigned Discord roles associated with the user.
-    cursor.execute("DELETE FROM assigned_roles WHERE user_id = %s", (user_id))
-    active_members = clash_utils.get_active_members_in_clan()
+        user_id = query_result['id']
+        player_tag = query_result['player_tag']
 
-    # If the user is still an active member of the primary clan, change their status to UNREGISTERED.
-    # Otherwise change it to DEPARTED.
-    if player_tag in active_members:
-        new_status = Status.UNREGISTERED
-    else:
-        new_status = Status.DEPARTED
+        # Delete any assigned Discord roles associated with the user.
+        cursor.execute("DELETE FROM assigned_roles WHERE user_id = %s", (user_id))
 
-    cursor.execute("UPDATE users SET discord_name = %s, status = %s WHERE id = %s",
-                   (f"{new_status.value}{player_tag}", new_status.value, user_id))
+        # If the user is still an active member of the primary clan, change their status to UNREGISTERED.
+        # Otherwise change it to DEPARTED.
+        if player_tag in active_members:
+            new_status = Status.UNREGISTERED
+        else:
+            new_status = Status.DEPARTED
 
-    database.commit()
-    database.close()
+        cursor.execute("UPDATE users SET discord_name = %s, status = %s WHERE id = %s",
+                       (f"{new_status.value}{player_tag}", new_status.value, user_id))
 
 
 def remove_all_users():
     """Remove all users and their data from the database."""
-    database, cursor = connect_to_db()
-
-    cursor.execute("DELETE FROM assigned_roles")
-    cursor.execute("DELETE FROM match_history_recent")
-    cursor.execute("DELETE FROM match_history_all")
-    cursor.execute("DELETE FROM kicks")
-    cursor.execute("DELETE FROM users")
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("DELETE FROM assigned_roles")
+        cursor.execute("DELETE FROM match_history_recent")
+        cursor.execute("DELETE FROM match_history_all")
+        cursor.execute("DELETE FROM kicks")
+        cursor.execute("DELETE FROM users")
 
 
 def update_vacation_for_user(discord_id: int, status: bool=None) -> bool:
@@ -755,53 +982,45 @@ def update_vacation_for_user(discord_id: int, status: bool=None) -> bool:
     Returns:
         The specified user's updated vacation status.
     """
-    database, cursor = connect_to_db()
-
-    if isinstance(status, bool):
-        cursor.execute("UPDATE users SET vacation = %s WHERE discord_id = %s", (status, discord_id))
-    else:
-        cursor.execute("UPDATE users SET vacation = NOT vacation WHERE discord_id = %s", (discord_id))
+    with DB_POOL.cursor() as cursor:
+        if isinstance(status, bool):
+            cursor.execute("UPDATE users SET vacation = %s WHERE discord_id = %s", (status, discord_id))
+        else:
+            cursor.execute("UPDATE users SET vacation = NOT vacation WHERE discord_id = %s", (discord_id))
 
-    cursor.execute("SELECT vacation FROM users WHERE discord_id = %s", (discord_id))
-    query_result = cursor.fetchone()
+        cursor.execute("SELECT vacation FROM users WHERE discord_id = %s", (discord_id))
+        query_result = cursor.fetchone()
 
-    if query_result is None:
-        database.close()
-        return False
+        if query_result is None:
+            return False
 
-    database.commit()
-    database.close()
     return query_result["vacation"]
 
 
-def get_users_on_vacation() -> Dict[str, str]:
+def get_users_on_vacation(active_members: Dict[str, ClanMember]) -> Dict[str, str]:
     """Get a dict of active members that are currently on vacation.
 
+    Args:
+        active_members: Dictionary mapping player tags to active members of the tracked clans.
+
     Returns:
         Dictionary mapping player tags to player names of users that are on vacation.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_name, player_tag FROM users WHERE vacation = TRUE")
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_name, player_tag FROM users WHERE vacation = TRUE")
+        query_result = cursor.fetchall()
 
     if query_result is None:
         return {}
 
-    active_members = clash_utils.get_active_members_in_clan()
     users_on_vacation = {user['player_tag']: user['player_name'] for user in query_result if user['player_tag'] in active_members}
     return users_on_vacation
 
 
 def clear_all_vacation():
     """Set all users to not on vacation."""
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE users SET vacation = FALSE")
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE users SET vacation = FALSE")
 
 
 def set_reminder_status(status: bool):
@@ -810,12 +1029,8 @@ def set_reminder_status(status: bool):
     Args:
         status: Whether automated reminders should be on or off.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE automation_status SET send_reminders = %s", (status))
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE automation_status SET send_reminders = %s", (status))
 
 
 def get_reminder_status() -> bool:
@@ -824,17 +1039,15 @@ def get_reminder_status() -> bool:
     Returns:
         Whether automated reminders are on or off.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT send_reminders FROM automation_status")
+        query_result = cursor.fetchone()
 
-    cursor.execute("SELECT send_reminders FROM automation_status")
-    query_result = cursor.fetchone()
+        if query_result is None:
+            return False
 
-    if query_result is None:
-        database.close()
-        return False
+        status = query_result["send_reminders"]
 
-    status = query_result["send_reminders"]
-    database.close()
     return status
 
 
@@ -844,12 +1057,8 @@ def set_strike_status(status: bool):
     Args:
         status: Whether automated strikes should be on or off.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE automation_status SET send_strikes = %s", (status))
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE automation_status SET send_strikes = %s", (status))
 
 
 def get_strike_status() -> bool:
@@ -858,13 +1067,12 @@ def get_strike_status() -> bool:
     Returns:
         Whether automated strikes are on or off.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT send_strikes FROM automation_status")
+        query_result = cursor.fetchone()
 
-    cursor.execute("SELECT send_strikes FROM automation_status")
-    query_result = cursor.fetchone()
+        status = query_result["send_strikes"]
 
-    status = query_result["send_strikes"]
-    database.close()
     return status
 
 
@@ -877,16 +1085,14 @@ def get_roles(discord_id: int) -> List[str]:
     Returns:
         List of role names assigned to the specified user.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT discord_roles.role_name FROM discord_roles\
+                        INNER JOIN assigned_roles on discord_roles.id = assigned_roles.discord_role_id\
+                        INNER JOIN users ON assigned_roles.user_id = users.id\
+                        WHERE users.discord_id = %s",
+                        (discord_id))
 
-    cursor.execute("SELECT discord_roles.role_name FROM discord_roles\
-                    INNER JOIN assigned_roles on discord_roles.id = assigned_roles.discord_role_id\
-                    INNER JOIN users ON assigned_roles.user_id = users.id\
-                    WHERE users.discord_id = %s",
-                    (discord_id))
-
-    query_result = cursor.fetchall()
-    database.close()
+        query_result = cursor.fetchall()
 
     roles = [role["role_name"] for role in query_result]
     return roles
@@ -899,17 +1105,13 @@ def commit_roles(discord_id: int, roles: List[str]):
         discord_id: Unique Discord id of a member.
         roles: List of new roles to assign to user.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("DELETE FROM assigned_roles WHERE user_id IN (SELECT id FROM users WHERE discord_id = %s)", (discord_id))
-
-    for role in roles:
-        cursor.execute("INSERT INTO assigned_roles VALUES\
-                        ((SELECT id FROM users WHERE discord_id = %s), (SELECT id FROM discord_roles WHERE role_name = %s))",
-                        (discord_id, role))
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("DELETE FROM assigned_roles WHERE user_id IN (SELECT id FROM users WHERE discord_id = %s)", (discord_id))
 
-    database.commit()
-    database.close()
+        for role in roles:
+            cursor.execute("INSERT INTO assigned_roles VALUES\
+                            ((SELECT id FROM users WHERE discord_id = %s), (SELECT id FROM discord_roles WHERE role_name = %s))",
+                            (discord_id, role))
 
 def update_time_zone(discord_id: int, time_zone: ReminderTime):
     """Change a user's preferred time for receiving automated reminders.
@@ -918,12 +1120,8 @@ def update_time_zone(discord_id: int, time_zone: ReminderTime):
         discord_id: Unique Discord id of a member.
         time_zone (ReminderTime): Preferred time zone.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("UPDATE users SET time_zone = %s WHERE discord_id = %s", (time_zone.value, discord_id))
-
-    database.commit()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE users SET time_zone = %s WHERE discord_id = %s", (time_zone.value, discord_id))
 
 
 def get_members_in_time_zone(time_zone: ReminderTime) -> Set[str]:
@@ -935,11 +1133,9 @@ def get_members_in_time_zone(time_zone: ReminderTime) -> Set[str]:
     Returns:
         Set of player tags of users in specified time zone.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag FROM users WHERE time_zone = %s", (time_zone.value))
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag FROM users WHERE time_zone = %s", (time_zone.value))
+        query_result = cursor.fetchall()
 
     if query_result is None:
         return set()
@@ -948,53 +1144,67 @@ def get_members_in_time_zone(time_zone: ReminderTime) -> Set[str]:
     return members
 
 
-def record_deck_usage_today(deck_usage: Dict[str, int]):
+def get_unknown_player_tags(player_tags: List[str]) -> List[str]:
+    """Get which players are not in the database.
+
+    Args:
+        player_tags: Player tags to look up.
+
+    Returns:
+        Player tags that don't belong to any user in the database.
+    """
+    if not player_tags:
+        return []
+
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag FROM users WHERE player_tag IN %s", (player_tags,))
+        known_player_tags = {user['player_tag'] for user in cursor.fetchall()}
+
+    return [player_tag for player_tag in player_tags if player_tag not in known_player_tags]
+
+
+def apply_deck_usage_today(deck_usage: Dict[str, int], default_deck_usage: int):
+    """Shift every user's usage history back a day and record today's deck usage in a single transaction.
+
+    Today's usage is loaded into a temporary table in batched inserts, then every user is updated by one UPDATE joined against
+    it, so the number of round trips doesn't grow with the number of users.
+
+    Args:
+        deck_usage: Dictionary mapping player tags to number of decks used by that player today.
+        default_deck_usage: Number of decks recorded for users that aren't in deck_usage.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS deck_usage_today")
+        cursor.execute("CREATE TEMPORARY TABLE deck_usage_today (\
+                        player_tag varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL PRIMARY KEY,\
+                        decks_used int NOT NULL) ENGINE=MEMORY")
+        cursor.executemany("INSERT INTO deck_usage_today VALUES (%s, %s)", list(deck_usage.items()))
+        cursor.execute("UPDATE users LEFT JOIN deck_usage_today ON deck_usage_today.player_tag = users.player_tag\
+                        SET users.usage_history = ((users.usage_history & %s) << 3)\
+                                                  | (COALESCE(deck_usage_today.decks_used, %s) & %s)",
+                       (SIX_DAY_MASK, default_deck_usage, ONE_DAY_MASK))
+        cursor.execute("DROP TEMPORARY TABLE deck_usage_today")
+
+
+async def record_deck_usage_today(deck_usage: Dict[str, int]):
     """Record deck usage for each user in the database.
 
-    Users in the passed in dictionary from the primary clan have their usage from the dictionary recorded. All other users in the
+    Users in the passed in dictionary from the tracked clans have their usage from the dictionary recorded. All other users in the
     database have 0 decks used recorded. If deck_usage is empty, then each user in the database will have 7 decks recorded to
     indicate that real data is missing for that day.
 
     Args:
         Dictionary mapping player tags to number of decks used by that player today.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag FROM users")
-    query_result = cursor.fetchall()
-    db_users = set()
-
-    if query_result is not None:
-        db_users = {user["player_tag"] for user in query_result}
-
     default_deck_usage = 0
 
     if deck_usage is None:
         deck_usage = {}
         default_deck_usage = 7
 
-    for player_tag in deck_usage:
-        db_users.discard(player_tag)
-        cursor.execute("SELECT player_tag, usage_history FROM users WHERE player_tag = %s", (player_tag))
-        query_result = cursor.fetchone()
-
-        if query_result is None:
-            if not add_new_unregistered_user(player_tag):
-                continue
-            query_result = {"usage_history": 0}
-
-        updated_history = ((query_result["usage_history"] & SIX_DAY_MASK) << 3) | (deck_usage[player_tag] & ONE_DAY_MASK)
-        cursor.execute("UPDATE users SET usage_history = %s WHERE player_tag = %s", (updated_history, player_tag))
-
-    for player_tag in db_users:
-        cursor.execute("SELECT usage_history FROM users WHERE player_tag = %s", (player_tag))
-        query_result = cursor.fetchone()
-
-        updated_history = ((query_result["usage_history"] & SIX_DAY_MASK) << 3) | (default_deck_usage & ONE_DAY_MASK)
-        cursor.execute("UPDATE users SET usage_history = %s WHERE player_tag = %s", (updated_history, player_tag))
-
-    database.commit()
-    database.close()
+    unknown_player_tags = await db_executor_utils.DB_EXECUTOR.run(get_unknown_player_tags, list(deck_usage))
+    await add_new_unregistered_users(unknown_player_tags)
+    await db_executor_utils.DB_EXECUTOR.run(apply_deck_usage_today, deck_usage, default_deck_usage)
 
 
 def get_all_user_deck_usage_history() -> List[Tuple[str, str, int, int, datetime.datetime]]:
@@ -1003,49 +1213,40 @@ def get_all_user_deck_usage_history() -> List[Tuple[str, str, int, int, datetime
     Returns:
         List of player names, player tags, discord IDs, usage histories, and tracked since dates.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT id, player_name, player_tag, discord_id, usage_history FROM users")
+        users = cursor.fetchall()
 
-    cursor.execute("SELECT id, player_name, player_tag, discord_id, usage_history FROM users")
-    users = cursor.fetchall()
+        usage_list = []
 
-    usage_list = []
+        for user in users:
+            cursor.execute("SELECT tracked_since FROM match_history_recent WHERE user_id = %s", (user["id"]))
+            tracked_since = cursor.fetchone()["tracked_since"]
 
-    for user in users:
-        cursor.execute("SELECT tracked_since FROM match_history_recent WHERE user_id = %s", (user["id"]))
-        tracked_since = cursor.fetchone()["tracked_since"]
+            if tracked_since is not None:
+                tracked_since = bot_utils.battletime_to_datetime(tracked_since)
 
-        if tracked_since is not None:
-            tracked_since = bot_utils.battletime_to_datetime(tracked_since)
+            usage_list.append((user["player_name"], user["player_tag"], user["discord_id"], user["usage_history"], tracked_since))
 
-        usage_list.append((user["player_name"], user["player_tag"], user["discord_id"], user["usage_history"], tracked_since))
+        usage_list.sort(key = lambda x : x[0].lower())
 
-    usage_list.sort(key = lambda x : x[0].lower())
-    database.close()
     return usage_list
 
 
-def clean_up_db() -> bool:
-    """Updates database to ensure status column is up to date.
+def get_status_changes(active_members: Dict[str, ClanMember]) -> Dict[str, Tuple[str, Status]]:
+    """Find users whose status doesn't match whether they are currently an active member of a tracked clan.
 
-    Checks that every user in the database has an appropriate status.
-    ACTIVE users that are no longer active members of the clan are moved to INACTIVE.
-    UNREGISTERED users that are no longer active members of the clan are moved to DEPARTED.
-    INACTIVE users that are now part of the clan are moved to ACTIVE.
-    DEPARTED users that are now part of the clan are moved to UNREGISTERED.
+    Args:
+        active_members: Dictionary of members currently in any tracked clan.
 
     Returns:
-        Whether clean up operation was successful.
+        Dictionary mapping player tags to the Discord name and status that each user with an incorrect status should have.
     """
-    database, cursor = connect_to_db()
-
-    LOG.info("Cleaning up database")
-    active_members = clash_utils.get_active_members_in_clan()
-
-    if not active_members:
-        return False
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_name, player_tag, discord_name, status FROM users")
+        query_result = cursor.fetchall()
 
-    cursor.execute("SELECT player_name, player_tag, discord_name, status FROM users")
-    query_result = cursor.fetchall()
+    new_statuses: Dict[str, Tuple[str, Status]] = {}
 
     for user in query_result:
         player_tag = user['player_tag']
@@ -1055,39 +1256,50 @@ def clean_up_db() -> bool:
         if player_tag in active_members:
             if status in {Status.INACTIVE, Status.DEPARTED}:
                 LOG.debug(log_message("Active user with incorrect status detected", player_tag=player_tag, status=status))
-                user_data = bot_utils.get_combined_data(player_tag)
-                user_data['discord_name'] = discord_name
-
-                if user_data is None:
-                    continue
 
                 if status == Status.DEPARTED:
-                    user_data['discord_name'] = f"{Status.UNREGISTERED.value}{player_tag}"
-                    user_data['status'] = Status.UNREGISTERED
+                    new_statuses[player_tag] = (f"{Status.UNREGISTERED.value}{player_tag}", Status.UNREGISTERED)
                 else:
-                    user_data['discord_name'] = discord_name
-                    user_data['status'] = Status.ACTIVE
-
-                update_user(user_data)
+                    new_statuses[player_tag] = (discord_name, Status.ACTIVE)
         else:
             if status in {Status.ACTIVE, Status.UNREGISTERED}:
                 LOG.debug(log_message("Non active user with incorrect status detected", player_tag=player_tag, status=status))
-                user_data = bot_utils.get_combined_data(player_tag)
-
-                if user_data is None:
-                    continue
 
                 if status == Status.UNREGISTERED:
-                    user_data['discord_name'] = f"{Status.DEPARTED.value}{player_tag}"
-                    user_data['status'] = Status.DEPARTED
+                    new_statuses[player_tag] = (f"{Status.DEPARTED.value}{player_tag}", Status.DEPARTED)
                 else:
-                    user_data['discord_name'] = discord_name
-                    user_data['status'] = Status.INACTIVE
+                    new_statuses[player_tag] = (discord_name, Status.INACTIVE)
+
+    return new_statuses
+
+
+async def clean_up_db() -> bool:
+    """Updates database to ensure status column is up to date.
+
+    Checks that every user in the database has an appropriate status.
+    ACTIVE users that are no longer active members of the clan are moved to INACTIVE.
+    UNREGISTERED users that are no longer active members of the clan are moved to DEPARTED.
+    INACTIVE users that are now part of the clan are moved to ACTIVE.
+    DEPARTED users that are now part of the clan are moved to UNREGISTERED.
+
+    Returns:
+        Whether clean up operation was successful.
+    """
+    LOG.info("Cleaning up database")
+    active_members = await clash_utils.get_family_members()
+
+    if not active_members:
+        return False
+
+    new_statuses = await db_executor_utils.DB_EXECUTOR.run(get_status_changes, active_members)
 
-                update_user(user_data)
+    # Get the current data of every user whose status changed at once, then update them together.
+    all_user_data = await bot_utils.get_combined_data_many(new_statuses)
 
-    database.commit()
-    database.close()
+    for player_tag, user_data in all_user_data.items():
+        user_data['discord_name'], user_data['status'] = new_statuses[player_tag]
+
+    await db_executor_utils.DB_EXECUTOR.run(update_users, list(all_user_data.values()))
     LOG.info("Database cleanup complete")
     return True
 
@@ -1107,11 +1319,10 @@ def get_server_members_info() -> Dict[int, DatabaseData]:
                 }
             }
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag, player_name, discord_id, discord_name, clan_role FROM users WHERE discord_id IS NOT NULL")
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag, player_name, discord_id, discord_name, clan_role FROM users\
+                        WHERE discord_id IS NOT NULL")
+        query_result = cursor.fetchall()
 
     if query_result is None:
         return {}
@@ -1130,182 +1341,212 @@ def get_server_members_info() -> Dict[int, DatabaseData]:
     return player_info
 
 
-def get_and_update_match_history_info(player_tag: str,
-                                      fame: int,
-                                      new_check_time: datetime.datetime) -> Tuple[int, datetime.datetime]:
-    """Get a user's fame and time when their battlelog was last checked. Then store their updated fame and current time.
+async def get_match_history_info(player_tag: str, clan_tag: str=PRIMARY_CLAN_TAG) -> Tuple[int, datetime.datetime]:
+    """Get a user's fame and time when their battlelog was last checked. Users that are not in the database yet are added as
+    unregistered users.
 
     Args:
-        player_tag: Player to get/set fame for.
-        fame: Current fame value.
-        new_check_time: Current time to set last_check_time to.
+        player_tag: Player to get fame for.
+        clan_tag (optional): Clan that the player is participating in. Defaults to primary clan.
 
     Returns:
-        Specified user's previous fame and check time.
+        Specified user's saved fame and last check time, or (None, None) if the user could not be added to the database.
     """
-    database, cursor = connect_to_db()
+    match_history_info = await db_executor_utils.DB_EXECUTOR.run(get_saved_match_history_info, player_tag)
 
-    cursor.execute("SELECT user_id, last_check_time, tracked_since, fame FROM match_history_recent\
-                    WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
-                    (player_tag))
-    query_result = cursor.fetchone()
-    fame_and_time = (None, None)
+    if match_history_info is not None:
+        return match_history_info
 
-    if query_result is None:
-        if not add_new_unregistered_user(player_tag):
-            database.close()
-            return fame_and_time
-        database.close()
-        database, cursor = connect_to_db()
-        cursor.execute("SELECT id FROM users WHERE player_tag = %s")
+    if not await add_new_unregistered_user(player_tag):
+        return (None, None)
+
+    return await db_executor_utils.DB_EXECUTOR.run(track_new_participant, player_tag, clan_tag)
+
+
+def get_saved_match_history_info(player_tag: str) -> Union[Tuple[int, datetime.datetime], None]:
+    """Get a user's saved fame and time when their battlelog was last checked.
+
+    Args:
+        player_tag: Player to get fame for.
+
+    Returns:
+        Specified user's saved fame and last check time, or None if the user is not in the database.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT last_check_time, fame FROM match_history_recent\
+                        WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
+                        (player_tag))
         query_result = cursor.fetchone()
-        query_result['user_id'] = query_result.pop('id')
-        query_result['tracked_since'] = "19700101T000000.000Z"
-        query_result['fame'] = 0
-        fame_and_time = (0, bot_utils.battletime_to_datetime(get_last_check_time()))
-    else:
-        fame_and_time = (query_result['fame'], bot_utils.battletime_to_datetime(query_result['last_check_time']))
 
-    user_id = query_result['user_id']
-    recent_tracked_since = query_result['tracked_since']
+    if query_result is None:
+        return None
+
+    return (query_result['fame'], bot_utils.battletime_to_datetime(query_result['last_check_time']))
 
-    if recent_tracked_since is None and fame > query_result['fame']:
-        recent_tracked_since = bot_utils.get_current_battletime()
-        cursor.execute("UPDATE users SET first_joined = %s WHERE player_tag = %s AND first_joined IS NULL",
-                       (recent_tracked_since, player_tag))
 
-    cursor.execute("UPDATE match_history_recent SET last_check_time = %s, tracked_since = %s, fame = %s WHERE user_id = %s",
-                   (bot_utils.datetime_to_battletime(new_check_time), recent_tracked_since, fame, user_id))
+def track_new_participant(player_tag: str, clan_tag: str=PRIMARY_CLAN_TAG) -> Tuple[int, datetime.datetime]:
+    """Start tracking a user that was just added to the database after being found in a river race.
 
-    cursor.execute("SELECT tracked_since FROM match_history_season WHERE user_id = %s", (user_id))
-    season_tracked_since = cursor.fetchone()['tracked_since']
+    Args:
+        player_tag: Player that was added.
+        clan_tag (optional): Clan that the player is participating in. Defaults to primary clan.
 
-    if season_tracked_since is None and fame > query_result['fame']:
-        season_tracked_since = bot_utils.get_current_battletime()
+    Returns:
+        The user's fame, which is 0, and the clan's last check time.
+    """
+    with DB_POOL.cursor() as cursor:
+        # Users found partway through a river race have been participating since before they were added.
+        cursor.execute("UPDATE match_history_recent SET tracked_since = %s\
+                        WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
+                       ("19700101T000000.000Z", player_tag))
 
-    cursor.execute("UPDATE match_history_season SET tracked_since = %s, fame = fame + %s WHERE user_id = %s",
-                   (season_tracked_since, fame - query_result['fame'], user_id))
+        return (0, bot_utils.battletime_to_datetime(get_last_check_time(clan_tag, cursor)))
 
-    database.commit()
-    database.close()
-    return fame_and_time
 
+def record_processed_battles(cursor: pymysql.cursors.DictCursor, player_tag: str, battles: List[dict]) -> List[dict]:
+    """Add battles to the ledger of battles that have been counted towards match history.
 
-def undo_match_history_info_update(player_tag: str, current_fame: int, prev_fame: int, last_check_time: datetime.datetime):
-    """Use to revert an update to a user's fame and last check time.
+    Each battle is inserted separately so that a battle claimed by an overlapping check is detected. The insert blocks until the
+    other check's transaction ends, then is ignored as a duplicate.
 
     Args:
-        player_tag: Player to update.
-        current_fame: Current fame of user to revert.
-        prev_fame: Fame of user before changes were made.
-        last_check_time: Time to set for specified user.
+        cursor: Cursor of the open transaction that match history is being updated in.
+        player_tag: Player whose battlelog contains the battles.
+        battles: River race battles found in the player's battlelog.
+
+    Returns:
+        Battles that had not been counted before.
     """
-    database, cursor = connect_to_db()
+    new_battles = []
 
-    fame_to_subtract = current_fame - prev_fame
-    last_check_time = bot_utils.datetime_to_battletime(last_check_time)
-    cursor.execute("UPDATE match_history_recent SET last_check_time = %s, fame = %s\
-                    WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
-                   (last_check_time, prev_fame, player_tag))
-    cursor.execute("UPDATE match_history_season SET fame = fame - %s WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
-                   (fame_to_subtract, player_tag))
-
-    database.commit()
-    database.close()
-
-
-def update_match_history(user_performance_list: List[RaceStats]):
-    """Add each player's game stats to the match_history tables.
-
-    Args:
-        List of user dictionaries with their river race results.
-    """
-    database, cursor = connect_to_db()
-
-    user_performance_list = [user for user in user_performance_list if user]
-
-    cursor.executemany("UPDATE match_history_recent SET\
-                        battle_wins = battle_wins + %(battle_wins)s,\
-                        battle_losses = battle_losses + %(battle_losses)s,\
-                        special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
-                        special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
-                        boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
-                        boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
-                        duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
-                        duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
-                        duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
-                        duel_series_losses = duel_series_losses + %(duel_series_losses)s\
-                        WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
-
-    cursor.executemany("UPDATE match_history_season SET\
-                        battle_wins = battle_wins + %(battle_wins)s,\
-                        battle_losses = battle_losses + %(battle_losses)s,\
-                        special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
-                        special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
-                        boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
-                        boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
-                        duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
-                        duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
-                        duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
-                        duel_series_losses = duel_series_losses + %(duel_series_losses)s\
-                        WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
-
-    cursor.executemany("UPDATE match_history_all SET\
-                        battle_wins = battle_wins + %(battle_wins)s,\
-                        battle_losses = battle_losses + %(battle_losses)s,\
-                        special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
-                        special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
-                        boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
-                        boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
-                        duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
-                        duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
-                        duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
-                        duel_series_losses = duel_series_losses + %(duel_series_losses)s\
-                        WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
-
-    database.commit()
-    database.close()
-
-
-def prepare_for_river_race(last_check_time: datetime.datetime):
+    for battle in battles:
+        cursor.execute("INSERT IGNORE INTO processed_battles VALUES (%s, %s, %s)",
+                       (clash_utils.battle_fingerprint(player_tag, battle), player_tag, battle["battleTime"]))
+
+        if cursor.rowcount == 1:
+            new_battles.append(battle)
+
+    return new_battles
+
+
+def update_match_history(battlelog_checks: List[BattlelogCheck], check_time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG):
+    """Save each player's fame and add the outcomes of their newly found river race battles to the match_history tables. Battles
+    that are already in the processed_battles ledger are not counted again, so saving the same check twice has no effect.
+
+    Args:
+        battlelog_checks: Results of checking each player's battlelog. Empty results are ignored.
+        check_time: Time that the battlelogs were checked. Players' last check times are only ever moved forward.
+        clan_tag (optional): Clan that the battles were fought for. Defaults to primary clan.
+    """
+    with DB_POOL.cursor() as cursor:
+        check_time = bot_utils.datetime_to_battletime(check_time)
+        user_performance_list: List[RaceStats] = []
+
+        for check in battlelog_checks:
+            if not check:
+                continue
+
+            player_tag = check['player_tag']
+            fame = check['fame']
+            cursor.execute("SELECT user_id, tracked_since, fame FROM match_history_recent\
+                            WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s) FOR UPDATE",
+                           (player_tag))
+            query_result = cursor.fetchone()
+
+            if query_result is None:
+                continue
+
+            user_id = query_result['user_id']
+            fame_gained = fame - query_result['fame']
+            recent_tracked_since = query_result['tracked_since']
+
+            if recent_tracked_since is None and fame_gained > 0:
+                recent_tracked_since = bot_utils.get_current_battletime()
+                cursor.execute("UPDATE users SET first_joined = %s WHERE player_tag = %s AND first_joined IS NULL",
+                               (recent_tracked_since, player_tag))
+
+            cursor.execute("UPDATE match_history_recent SET last_check_time = GREATEST(last_check_time, %s), tracked_since = %s,\
+                            fame = %s WHERE user_id = %s",
+                           (check_time, recent_tracked_since, fame, user_id))
+
+            cursor.execute("SELECT tracked_since FROM match_history_season WHERE user_id = %s", (user_id))
+            season_tracked_since = cursor.fetchone()['tracked_since']
+
+            if season_tracked_since is None and fame_gained > 0:
+                season_tracked_since = bot_utils.get_current_battletime()
+
+            cursor.execute("UPDATE match_history_season SET tracked_since = %s, fame = fame + %s WHERE user_id = %s",
+                           (season_tracked_since, fame_gained, user_id))
+
+            new_battles = record_processed_battles(cursor, player_tag, check['battles'])
+
+            if new_battles:
+                user_performance_list.append(clash_utils.classify_battles(player_tag, new_battles, clan_tag, cursor))
+
+        cursor.executemany("UPDATE match_history_recent SET\
+                            battle_wins = battle_wins + %(battle_wins)s,\
+                            battle_losses = battle_losses + %(battle_losses)s,\
+                            special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
+                            special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
+                            boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
+                            boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
+                            duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
+                            duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
+                            duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
+                            duel_series_losses = duel_series_losses + %(duel_series_losses)s\
+                            WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
+
+        cursor.executemany("UPDATE match_history_season SET\
+                            battle_wins = battle_wins + %(battle_wins)s,\
+                            battle_losses = battle_losses + %(battle_losses)s,\
+                            special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
+                            special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
+                            boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
+                            boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
+                            duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
+                            duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
+                            duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
+                            duel_series_losses = duel_series_losses + %(duel_series_losses)s\
+                            WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
+
+        cursor.executemany("UPDATE match_history_all SET\
+                            battle_wins = battle_wins + %(battle_wins)s,\
+                            battle_losses = battle_losses + %(battle_losses)s,\
+                            special_battle_wins = special_battle_wins + %(special_battle_wins)s,\
+                            special_battle_losses = special_battle_losses + %(special_battle_losses)s,\
+                            boat_attack_wins = boat_attack_wins + %(boat_attack_wins)s,\
+                            boat_attack_losses = boat_attack_losses + %(boat_attack_losses)s,\
+                            duel_match_wins = duel_match_wins + %(duel_match_wins)s,\
+                            duel_match_losses = duel_match_losses + %(duel_match_losses)s,\
+                            duel_series_wins  = duel_series_wins + %(duel_series_wins)s,\
+                            duel_series_losses = duel_series_losses + %(duel_series_losses)s\
+                            WHERE user_id IN (SELECT id FROM users WHERE player_tag = %(player_tag)s)", user_performance_list)
+
+
+def prepare_for_river_race(last_check_time: datetime.datetime, clans: List[RiverRaceClan], clan_tag: str=PRIMARY_CLAN_TAG):
     """Configure the database at the start of a river race.
 
     Needs to run every Thursday when river race starts. Resets fame to 0 and sets last_check_time to current time. Set tracked_since
-    to current time for active members and NULL for everyone else. Also sets the relevant race_status fields.
+    to current time for active members and NULL for everyone else. Also sets the relevant race_status fields. Only users tracked
+    through the specified clan are reset (see tracked_users_query).
 
     Args:
         last_check_time: Do not look at games before this time when match performance is next calculated
+        clans: Clans in the river race that is starting.
+        clan_tag (optional): Clan whose river race is starting. Defaults to primary clan.
     """
-    LOG.info("Preparing for river race")
-    set_completed_saturday_status(False)
-    set_war_time_status(True)
-    set_last_check_time(last_check_time)
-
-    database, cursor = connect_to_db()
-
+    LOG.info(log_message("Preparing for river race", clan_tag=clan_tag))
+    set_completed_saturday_status(False, clan_tag)
+    set_war_time_status(True, clan_tag)
+    set_last_check_time(last_check_time, clan_tag)
+    clans_args = [{**clan, 'tracked_clan_tag': clan_tag} for clan in clans]
     last_check_time = bot_utils.datetime_to_battletime(last_check_time)
-    colosseum_week = is_colosseum_week()
-    cursor.execute("UPDATE match_history_recent SET\
-                    last_check_time = %s,\
-                    tracked_since = NULL,\
-                    fame = 0,\
-                    battle_wins = 0,\
-                    battle_losses = 0,\
-                    special_battle_wins = 0,\
-                    special_battle_losses = 0,\
-                    boat_attack_wins = 0,\
-                    boat_attack_losses = 0,\
-                    duel_match_wins = 0,\
-                    duel_match_losses = 0,\
-                    duel_series_wins  = 0,\
-                    duel_series_losses = 0", (last_check_time))
-
-    cursor.execute("UPDATE match_history_recent SET tracked_since = %s WHERE\
-                    user_id IN (SELECT id FROM users WHERE status IN (%s, %s))",
-                    (last_check_time, Status.ACTIVE.value, Status.UNREGISTERED.value))
-
-    if colosseum_week:
-        cursor.execute("UPDATE match_history_season SET\
+    colosseum_week = is_colosseum_week(clan_tag)
+    tracked_users, tracked_users_args = tracked_users_query(clan_tag)
+
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("UPDATE match_history_recent SET\
+                        last_check_time = %s,\
                         tracked_since = NULL,\
                         fame = 0,\
                         battle_wins = 0,\
@@ -1317,85 +1558,118 @@ def prepare_for_river_race(last_check_time: datetime.datetime):
                         duel_match_wins = 0,\
                         duel_match_losses = 0,\
                         duel_series_wins  = 0,\
-                        duel_series_losses = 0")
-
-        cursor.execute("UPDATE match_history_season SET tracked_since = %s WHERE\
-                        user_id IN (SELECT id FROM users WHERE status IN (%s, %s))",
-                        (last_check_time, Status.ACTIVE.value, Status.UNREGISTERED.value))
-
-    clans = clash_utils.get_clans_in_race(False)
-    reset_clans = False
-
-    for clan in clans:
-        cursor.execute("SELECT clan_tag FROM river_race_clans WHERE clan_tag = %s", (clan['clan_tag']))
-        if cursor.fetchone() is None:
-            reset_clans = True
-            break
-
-    if colosseum_week or reset_clans:
-        LOG.debug(log_message("Resetting saved clan data", colosseum_week=colosseum_week, reset_clans=reset_clans))
-        cursor.execute("DELETE FROM river_race_clans")
-        cursor.executemany("INSERT INTO river_race_clans VALUES (%(clan_tag)s, %(clan_name)s, 0, 0, %(total_decks_used)s, 0, 0)",
-                           clans)
-    else:
-        cursor.executemany("UPDATE river_race_clans SET fame = 0, total_decks_used = %(total_decks_used)s\
-                            WHERE clan_tag = %(clan_tag)s",
-                            clans)
+                        duel_series_losses = 0\
+                        WHERE user_id IN (" + tracked_users + ")",
+                        (last_check_time, *tracked_users_args))
+
+        cursor.execute("UPDATE match_history_recent SET tracked_since = %s WHERE\
+                        user_id IN (SELECT id FROM users WHERE status IN (%s, %s)) AND user_id IN (" + tracked_users + ")",
+                        (last_check_time, Status.ACTIVE.value, Status.UNREGISTERED.value, *tracked_users_args))
+
+        if colosseum_week:
+            cursor.execute("UPDATE match_history_season SET\
+                            tracked_since = NULL,\
+                            fame = 0,\
+                            battle_wins = 0,\
+                            battle_losses = 0,\
+                            special_battle_wins = 0,\
+                            special_battle_losses = 0,\
+                            boat_attack_wins = 0,\
+                            boat_attack_losses = 0,\
+                            duel_match_wins = 0,\
+                            duel_match_losses = 0,\
+                            duel_series_wins  = 0,\
+                            duel_series_losses = 0\
+                            WHERE user_id IN (" + tracked_users + ")",
+                            tracked_users_args)
+
+            cursor.execute("UPDATE match_history_season SET tracked_since = %s WHERE\
+                            user_id IN (SELECT id FROM users WHERE status IN (%s, %s)) AND user_id IN (" + tracked_users + ")",
+                            (last_check_time, Status.ACTIVE.value, Status.UNREGISTERED.value, *tracked_users_args))
+
+        # Battles before the race starts are never checked again, so they no longer need to be in the ledger.
+        cursor.execute("DELETE FROM processed_battles WHERE battle_time < %s AND\
+                        player_tag IN (SELECT player_tag FROM users WHERE id IN (" + tracked_users + "))",
+                       (last_check_time, *tracked_users_args))
+
+        reset_clans = False
+
+        for clan in clans:
+            cursor.execute("SELECT clan_tag FROM river_race_clans WHERE tracked_clan_tag = %s AND clan_tag = %s",
+                           (clan_tag, clan['clan_tag']))
+            if cursor.fetchone() is None:
+                reset_clans = True
+                break
+
+        if colosseum_week or reset_clans:
+            LOG.debug(log_message("Resetting saved clan data", colosseum_week=colosseum_week, reset_clans=reset_clans))
+            cursor.execute("DELETE FROM river_race_clans WHERE tracked_clan_tag = %s", (clan_tag))
+            cursor.executemany("INSERT INTO river_race_clans VALUES\
+                                (%(tracked_clan_tag)s, %(clan_tag)s, %(clan_name)s, 0, 0, %(total_decks_used)s, 0, 0)",
+                               clans_args)
+        else:
+            cursor.executemany("UPDATE river_race_clans SET fame = 0, total_decks_used = %(total_decks_used)s\
+                                WHERE tracked_clan_tag = %(tracked_clan_tag)s AND clan_tag = %(clan_tag)s",
+                                clans_args)
 
-    database.commit()
-    database.close()
-    set_colosseum_week_status(False)
-    LOG.info("Preparations for river race complete")
+    set_colosseum_week_status(False, clan_tag)
+    LOG.info(log_message("Preparations for river race complete", clan_tag=clan_tag))
 
 
-def save_clans_in_race_info(post_race: bool):
-    """Update river_race_clans table with clans' current fame and deck usage.
+def save_clans_in_race_info(post_race: bool, clans: List[RiverRaceClan], clan_tag: str=PRIMARY_CLAN_TAG):
+    """Update river_race_clans table with clans' current fame and deck usage. Clans that aren't in river_race_clans are skipped.
 
     Args:
         post_race: Whether this info is being saved after the river race has concluded.
+        clans: Clans in the river race and their current fame and deck usage.
+        clan_tag (optional): Clan whose river race to save. Defaults to primary clan.
     """
-    database, cursor = connect_to_db()
-    clans = clash_utils.get_clans_in_race(post_race)
-    saved_clan_info = get_saved_clans_in_race_info()
-    colosseum_week = is_colosseum_week()
+    saved_clan_info = get_saved_clans_in_race_info(clan_tag)
+    colosseum_week = is_colosseum_week(clan_tag)
 
-    for clan in clans:
-        tag = clan['clan_tag']
-        current_fame = clan['fame']
-        fame_earned_today = clan['fame'] - saved_clan_info[tag]['fame']
-        total_decks_used = clan['total_decks_used']
-        war_decks_used_today = total_decks_used - saved_clan_info[tag]['total_decks_used']
+    with DB_POOL.cursor() as cursor:
+        for clan in clans:
+            tag = clan['clan_tag']
 
-        if post_race and clan['completed'] and not colosseum_week:
-            continue
+            if tag not in saved_clan_info:
+                LOG.warning(log_message("Clan in river race has no saved info", clan_tag=clan_tag, opponent_tag=tag))
+                continue
+
+            current_fame = clan['fame']
+            fame_earned_today = clan['fame'] - saved_clan_info[tag]['fame']
+            total_decks_used = clan['total_decks_used']
+            war_decks_used_today = total_decks_used - saved_clan_info[tag]['total_decks_used']
 
-        cursor.execute("UPDATE river_race_clans SET\
-                        fame = %s,\
-                        total_fame = total_fame + %s,\
-                        total_decks_used = %s,\
-                        war_decks_used = war_decks_used + %s,\
-                        num_days = num_days + 1\
-                        WHERE clan_tag = %s",
-                        (current_fame, fame_earned_today, total_decks_used, war_decks_used_today, tag))
+            if post_race and clan['completed'] and not colosseum_week:
+                continue
 
-    database.commit()
-    database.close()
+            cursor.execute("UPDATE river_race_clans SET\
+                            fame = %s,\
+                            total_fame = total_fame + %s,\
+                            total_decks_used = %s,\
+                            war_decks_used = war_decks_used + %s,\
+                            num_days = num_days + 1\
+                            WHERE tracked_clan_tag = %s AND clan_tag = %s",
+                            (current_fame, fame_earned_today, total_decks_used, war_decks_used_today, clan_tag, tag))
 
 
-def get_saved_clans_in_race_info() -> Dict[str, DatabaseClan]:
+def get_saved_clans_in_race_info(clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, DatabaseClan]:
     """Get saved clans fame and decks used.
 
+    Args:
+        clan_tag (optional): Clan whose river race opponents to get. Defaults to primary clan.
+
     Returns:
         Dictionary mapping clan tags to dictionary containing saved data from that clan.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT * FROM river_race_clans")
-    query_result = cursor.fetchall()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT clan_tag, clan_name, fame, total_fame, total_decks_used, war_decks_used, num_days\
+                        FROM river_race_clans WHERE tracked_clan_tag = %s",
+                       (clan_tag))
+        query_result = cursor.fetchall()
 
-    clans_info = {clan['clan_tag']: clan for clan in query_result}
+        clans_info = {clan['clan_tag']: clan for clan in query_result}
 
-    database.close()
     return clans_info
 
 
@@ -1408,19 +1682,20 @@ def get_match_performance_dict(player_tag: str) -> RiverRaceStats:
     Returns:
         Dictionary containing specified users's stats.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT * FROM match_history_recent WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)", (player_tag))
-    match_performance_recent = cursor.fetchone()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT * FROM match_history_recent WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
+                       (player_tag))
+        match_performance_recent = cursor.fetchone()
 
-    cursor.execute("SELECT * FROM match_history_season WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)", (player_tag))
-    match_performance_season = cursor.fetchone()
+        cursor.execute("SELECT * FROM match_history_season WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
+                       (player_tag))
+        match_performance_season = cursor.fetchone()
 
-    cursor.execute("SELECT * FROM match_history_all WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)", (player_tag))
-    match_performance_all = cursor.fetchone()
+        cursor.execute("SELECT * FROM match_history_all WHERE user_id IN (SELECT id FROM users WHERE player_tag = %s)",
+                       (player_tag))
+        match_performance_all = cursor.fetchone()
 
     if not all([match_performance_recent, match_performance_season, match_performance_all]):
-        database.close()
         return None
 
     db_info_dict = {'recent': match_performance_recent, 'season': match_performance_season, 'all': match_performance_all}
@@ -1498,27 +1773,25 @@ def get_match_performance_dict(player_tag: str) -> RiverRaceStats:
                                                      'total': total_pvp_matches,
                                                      'win_rate': overall_win_rate}
 
-    database.close()
     return match_performance_dict
 
 
-def get_non_active_participants() -> Set[str]:
+def get_non_active_participants(active_members: Dict[str, ClanMember]) -> Set[str]:
     """Get a set of player tags of users who were tracked in the most recent river race but are not currently active members.
 
+    Args:
+        active_members: Dictionary mapping player tags to active members of the tracked clans.
+
     Returns:
         Set of player tags.
     """
-    active_members = clash_utils.get_active_members_in_clan(PRIMARY_CLAN_TAG)
-
     if not active_members:
         return set()
 
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag FROM users\
-                    WHERE id IN (SELECT user_id FROM match_history_recent WHERE tracked_since IS NOT NULL)")
-    query_result = cursor.fetchall()
-    database.close()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag FROM users\
+                        WHERE id IN (SELECT user_id FROM match_history_recent WHERE tracked_since IS NOT NULL)")
+        query_result = cursor.fetchall()
 
     former_participants = set()
 
@@ -1529,41 +1802,27 @@ def get_non_active_participants() -> Set[str]:
     return former_participants
 
 
-def add_unregistered_users() -> bool:
+async def add_unregistered_users() -> bool:
     """Add any active members of the primary clan not in the database as UNREGISTERED users.
 
     Returns:
         Whether adding users was successful.
     """
     LOG.info("Adding any unregistered users to database")
-    active_members = clash_utils.get_active_members_in_clan().copy()
+    active_members = await clash_utils.get_family_members()
 
     if not active_members:
         return False
 
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT player_tag FROM users")
-    query_result = cursor.fetchall()
-    database.close()
-
-    if query_result is None:
-        return False
-
-    for user in query_result:
-        active_members.pop(user['player_tag'], None)
-
-    all_users_successfully_inserted = True
-
-    for player_tag in active_members:
-        if not add_new_unregistered_user(player_tag):
-            all_users_successfully_inserted = False
+    unknown_player_tags = await db_executor_utils.DB_EXECUTOR.run(get_unknown_player_tags, list(active_members))
+    added_player_tags = await add_new_unregistered_users(unknown_player_tags)
+    all_users_successfully_inserted = len(added_player_tags) == len(unknown_player_tags)
 
     LOG.info(log_message("All unregistered users added", all_users_successfully_inserted=all_users_successfully_inserted))
     return all_users_successfully_inserted
 
 
-def kick_user(player_tag: str) -> Tuple[int, str]:
+async def kick_user(player_tag: str) -> Tuple[int, str]:
     """Insert a kick entry for the specified user.
 
     Args:
@@ -1573,23 +1832,33 @@ def kick_user(player_tag: str) -> Tuple[int, str]:
         Tuple of total number of kicks and last time user was kicked.
     """
     kick_time = bot_utils.get_current_battletime()
-    database, cursor = connect_to_db()
+    kick_info = await db_executor_utils.DB_EXECUTOR.run(insert_kick, player_tag, kick_time)
 
-    cursor.execute("SELECT id FROM users WHERE player_tag = %s", (player_tag))
-    query_result = cursor.fetchone()
+    if kick_info is None:
+        await add_new_unregistered_user(player_tag)
+        kick_info = await db_executor_utils.DB_EXECUTOR.run(insert_kick, player_tag, kick_time)
 
-    if query_result is None:
-        database.close()
-        add_new_unregistered_user(player_tag)
-        database, cursor = connect_to_db()
+    return kick_info
+
+
+def insert_kick(player_tag: str, kick_time: str) -> Union[Tuple[int, str], None]:
+    """Insert a kick entry for the specified user if they are in the database.
+
+    Args:
+        player_tag: Player tag of user to kick.
+        kick_time: Time of the kick as a battleTime string.
+
+    Returns:
+        Tuple of total number of kicks and last time user was kicked, or None if the user is not in the database.
+    """
+    with DB_POOL.cursor() as cursor:
         cursor.execute("SELECT id FROM users WHERE player_tag = %s", (player_tag))
         query_result = cursor.fetchone()
 
-    user_id = query_result['id']
-    cursor.execute("INSERT INTO kicks VALUES (%s, %s)", (user_id, kick_time))
+        if query_result is None:
+            return None
 
-    database.commit()
-    database.close()
+        cursor.execute("INSERT INTO kicks VALUES (%s, %s)", (query_result['id'], kick_time))
 
     kicks = get_kicks(player_tag)
     total_kicks = len(kicks)
@@ -1612,28 +1881,24 @@ def undo_kick(player_tag: str) -> str:
     Returns:
         Time of undone kick, or None if user has not been kicked before.
     """
-    database, cursor = connect_to_db()
-
-    cursor.execute("SELECT id FROM users WHERE player_tag = %s", (player_tag))
-    query_result = cursor.fetchone()
-    user_id = query_result["id"]
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT id FROM users WHERE player_tag = %s", (player_tag))
+        query_result = cursor.fetchone()
+        user_id = query_result["id"]
 
-    cursor.execute("SELECT kick_time FROM kicks WHERE user_id = %s", (user_id))
-    query_result = cursor.fetchall()
+        cursor.execute("SELECT kick_time FROM kicks WHERE user_id = %s", (user_id))
+        query_result = cursor.fetchall()
 
-    if not query_result:
-        database.close()
-        return None
+        if not query_result:
+            return None
 
-    kicks = [kick["kick_time"] for kick in query_result]
-    kicks.sort()
-    latest_kick_time = kicks[-1]
+        kicks = [kick["kick_time"] for kick in query_result]
+        kicks.sort()
+        latest_kick_time = kicks[-1]
 
-    cursor.execute("DELETE FROM kicks WHERE user_id = %s AND kick_time = %s", (user_id, latest_kick_time))
-    latest_kick_time = bot_utils.battletime_to_datetime(latest_kick_time).strftime("%Y-%m-%d")
+        cursor.execute("DELETE FROM kicks WHERE user_id = %s AND kick_time = %s", (user_id, latest_kick_time))
+        latest_kick_time = bot_utils.battletime_to_datetime(latest_kick_time).strftime("%Y-%m-%d")
 
-    database.commit()
-    database.close()
     return latest_kick_time
 
 
@@ -1646,18 +1911,17 @@ def get_kicks(player_tag: str) -> List[str]:
     Returns:
         List of times the user was kicked.
     """
-    database, cursor = connect_to_db()
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT kick_time FROM kicks WHERE user_id = (SELECT id FROM users WHERE player_tag = %s)", (player_tag))
+        query_result = cursor.fetchall()
+        kicks = []
 
-    cursor.execute("SELECT kick_time FROM kicks WHERE user_id = (SELECT id FROM users WHERE player_tag = %s)", (player_tag))
-    query_result = cursor.fetchall()
-    kicks = []
+        for kick in query_result:
+            kick_time = bot_utils.battletime_to_datetime(kick["kick_time"])
+            kicks.append(kick_time.strftime("%Y-%m-%d"))
 
-    for kick in query_result:
-        kick_time = bot_utils.battletime_to_datetime(kick["kick_time"])
-        kicks.append(kick_time.strftime("%Y-%m-%d"))
+        kicks.sort()
 
-    kicks.sort()
-    database.close()
     return kicks
 
 
@@ -1684,55 +1948,64 @@ def get_file_path() -> str:
     return new_path
 
 
-def export(primary_clan_only: bool, include_card_levels: bool) -> str:
-    """Create Excel spreadsheet containing relevant information from the database.
+def get_export_data(primary_clan_only: bool) -> Tuple[List[dict], List[dict]]:
+    """Get the clans and users to include in a spreadsheet.
 
     Args:
         primary_clan_only: Whether to include only members of the primary clan or all users in database.
-        include_card_levels: Whether to include sheet containing information about each user's card levels.
 
     Returns:
-        Path to generated spreadsheet.
+        Rows of the clans and users tables to export, or (None, None) if they couldn't be retrieved.
     """
-    LOG.info(log_message("Exporting relevant data from database to spreadsheet",
-                         primary_clan_only=primary_clan_only,
-                         include_card_levels=include_card_levels))
-    # Clean up the database and add any members of the clan to it that aren't already in it.
-    clean_up_db()
-    add_unregistered_users()
+    with DB_POOL.cursor() as cursor:
+        # Get clan info.
+        clans = None
 
-    database, cursor = connect_to_db()
+        if primary_clan_only:
+            cursor.execute("SELECT * FROM clans WHERE clan_tag = %s", (PRIMARY_CLAN_TAG))
+            clans = cursor.fetchall()
+        else:
+            cursor.execute("SELECT * FROM clans")
+            clans = cursor.fetchall()
 
-    # Get clan info.
-    clans = None
+        if clans is None:
+            return (None, None)
 
-    if primary_clan_only:
-        cursor.execute("SELECT * FROM clans WHERE clan_tag = %s", (PRIMARY_CLAN_TAG))
-        clans = cursor.fetchall()
-    else:
-        cursor.execute("SELECT * FROM clans")
-        clans = cursor.fetchall()
+        # Get users.
+        if primary_clan_only:
+            cursor.execute("SELECT * FROM users WHERE status IN (%s, %s)", (Status.ACTIVE.value, Status.UNREGISTERED.value))
+        else:
+            cursor.execute("SELECT * FROM users")
 
-    if clans is None:
-        return None
+        users = cursor.fetchall()
 
-    clans_dict = {}
+        if users is None:
+            return (None, None)
 
-    for clan in clans:
-        clans_dict[clan['id']] = clan
+    return (clans, users)
 
-    # Get users.
-    if primary_clan_only:
-        cursor.execute("SELECT * FROM users WHERE status IN (%s, %s)", (Status.ACTIVE.value, Status.UNREGISTERED.value))
-    else:
-        cursor.execute("SELECT * FROM users")
 
-    users = cursor.fetchall()
+def write_export(clans: List[dict],
+                 users: List[dict],
+                 deck_usage_today: Dict[str, int],
+                 card_levels: Dict[str, ClashData]=None) -> str:
+    """Write data from the database to an Excel spreadsheet.
 
-    if users is None:
-        return None
+    Args:
+        clans: Rows of the clans table to export.
+        users: Rows of the users table to export.
+        deck_usage_today: Dictionary mapping player tags to number of decks used today.
+        card_levels (optional): Dictionary mapping player tags to card levels of that player. If provided, sheets containing
+            information about each user's card levels are included.
+
+    Returns:
+        Path to generated spreadsheet.
+    """
+    include_card_levels = card_levels is not None
+    clans_dict = {}
 
-    database.close()
+    for clan in clans:
+        clans_dict[clan['id']] = clan
 
     # Create Excel workbook
     file_path = get_file_path()
@@ -1743,6 +2016,7 @@ def export(primary_clan_only: bool, include_card_levels: bool) -> str:
     recent_stats_sheet = workbook.add_worksheet("Recent Stats")
     season_stats_sheet = workbook.add_worksheet("Season Stats")
     all_stats_sheet = workbook.add_worksheet("All Stats")
+    race_log_sheet = workbook.add_worksheet("Race Log")
     card_levels_quantity_sheet = None
     card_levels_percentile_sheet = None
     LOG.debug(f"Exporting data to {file_path}")
@@ -1809,15 +2083,17 @@ def export(primary_clan_only: bool, include_card_levels: bool) -> str:
 
     all_stats_sheet.write_row(0, 0, all_stats_headers)
 
+    # Race log sheet headers
+    race_log_headers = ["Player Name", "Player Tag", "Clan Name", "Clan Tag", "Races", "Fame", "Decks Used", "Boat Attacks",
+                        "Fame Per Deck"]
+    race_log_sheet.write_row(0, 0, race_log_headers)
+
     # Card levels headers
     if include_card_levels:
         card_levels_headers = ["Player Name", "Player Tag"] + list(range(14, 0, -1))
         card_levels_quantity_sheet.write_row(0, 0, card_levels_headers)
         card_levels_percentile_sheet.write_row(0, 0, card_levels_headers)
 
-    # Get data
-    deck_usage_today = clash_utils.get_deck_usage_today()
-
     # Write data
     row = 1
 
@@ -1949,7 +2225,7 @@ def export(primary_clan_only: bool, include_card_levels: bool) -> str:
         card_levels_percentiles_row = [user['player_name'], user['player_tag']]
 
         if include_card_levels:
-            clash_data = clash_utils.get_clash_data(user['player_tag'])
+            clash_data = card_levels.get(user['player_tag'])
 
             if clash_data is not None:
                 percentile = 0
@@ -1974,6 +2250,50 @@ def export(primary_clan_only: bool, include_card_levels: bool) -> str:
 
         row += 1
 
+    # Season totals from the river race log archive
+    row = 1
+
+    for clan in clans:
+        for participation in race_log_utils.get_season_participation(clan['clan_tag']):
+            race_log_row = [participation['player_name'], participation['player_tag'], clan['clan_name'], clan['clan_tag'],
+                            participation['races'], participation['fame'], participation['decks_used'],
+                            participation['boat_attacks'], round(participation['fame'] / participation['decks_used'], 2)]
+            race_log_sheet.write_row(row, 0, race_log_row)
+            row += 1
+
     workbook.close()
+    return file_path
+
+
+async def export(primary_clan_only: bool, include_card_levels: bool) -> str:
+    """Create Excel spreadsheet containing relevant information from the database.
+
+    Args:
+        primary_clan_only: Whether to include only members of the primary clan or all users in database.
+        include_card_levels: Whether to include sheet containing information about each user's card levels.
+
+    Returns:
+        Path to generated spreadsheet.
+    """
+    LOG.info(log_message("Exporting relevant data from database to spreadsheet",
+                         primary_clan_only=primary_clan_only,
+                         include_card_levels=include_card_levels))
+    # Clean up the database and add any members of the clan to it that aren't already in it.
+    await clean_up_db()
+    await add_unregistered_users()
+
+    clans, users = await db_executor_utils.DB_EXECUTOR.run(get_export_data, primary_clan_only)
+
+    if clans is None or users is None:
+        return None
+
+    deck_usage_today = await clash_utils.get_deck_usage_today()
+    card_levels = None
+
+    if include_card_levels:
+        card_levels = await clash_utils.get_clash_data_many([user['player_tag'] for user in users])
+
+    # Writing the spreadsheet reads kicks and match history of every user, so it is done off of the event loop.
+    file_path = await db_executor_utils.DB_EXECUTOR.run(write_export, clans, users, deck_usage_today, card_levels)
     LOG.info("Export complete")
     return file_path
@@ -1,5 +1,6 @@
 """Utilities for logging."""
 
+import contextvars
 import json
 import logging
 import logging.config
@@ -44,6 +45,11 @@ command_start_num = logging.DEBUG + 3
 command_end_name = "COMMAND_END"
 command_end_num = logging.DEBUG + 4
 
+# Name of the command or automated routine that the current task is running, as marked by LOG.command_start() and
+# LOG.automation_start(). Each command and automated routine runs in its own task, so the name is only visible to that task and
+# any tasks it creates.
+CURRENT_ROUTINE: contextvars.ContextVar = contextvars.ContextVar("current_routine", default="other")
+
 
 # Define custom functions in logger associated with the levels defined above.
 def automation_start_log(self, msg: str, *args, **kwargs):
@@ -54,6 +60,8 @@ def automation_start_log(self, msg: str, *args, **kwargs):
         args: Unused.
         kwargs: Unused.
     """
+    CURRENT_ROUTINE.set(msg)
+
     if self.isEnabledFor(automation_start_num):
         self._log(automation_start_num, msg, args, **kwargs)
 
@@ -76,6 +84,8 @@ def command_start_log(self, ctx: commands.Context, *args, **kwargs):
         args: Unused.
         kwargs: Provide any other keyword arguments such as command parameters to log.
     """
+    CURRENT_ROUTINE.set(ctx.command.name if ctx.command is not None else ctx.invoked_with)
+
     if self.isEnabledFor(command_start_num):
         msg = log_message(Command=ctx.invoked_with,
                           Initiator=f"{ctx.author.display_name} - {ctx.author},",
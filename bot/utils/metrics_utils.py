@@ -0,0 +1,219 @@
+"""Rolling statistics about the calls made to the Clash Royale API by each command and automated routine."""
+
+import collections
+import math
+import re
+import time
+from typing import Deque, Dict, List, Union
+
+# Utils
+from utils.logging_utils import CURRENT_ROUTINE
+from utils.util_types import EndpointStats, RoutineStats
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Statistics cover the calls made within this many seconds.
+METRICS_WINDOW = 60 * 60
+
+# Upper bound on the number of calls and requests remembered, regardless of how recent they are.
+MAX_METRIC_EVENTS = 20000
+
+# Player and clan tags in request paths are replaced with a placeholder so that calls are grouped by endpoint.
+ENCODED_TAG_PATTERN = re.compile(r"%23[^/]+")
+
+
+def endpoint_name(path: str) -> str:
+    """Get the endpoint that a request path belongs to.
+
+    Args:
+        path: Request path relative to the API base URL, e.g. "/clans/%23ABC123/members".
+
+    Returns:
+        Path with any tags replaced by a placeholder, e.g. "/clans/{tag}/members".
+    """
+    return ENCODED_TAG_PATTERN.sub("{tag}", path)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a percentile of a list of values using the nearest rank method.
+
+    Args:
+        values: Values sorted in ascending order.
+        fraction: Percentile to get as a fraction between 0 and 1.
+
+    Returns:
+        Smallest value that at least the given fraction of values are less than or equal to, or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class ApiCall:
+    """A response requested from the API client."""
+    __slots__ = ("time", "routine", "endpoint", "cache_hit")
+
+    def __init__(self, endpoint: str, cache_hit: bool):
+        """Record a call made now by the current routine.
+
+        Args:
+            endpoint: Endpoint that the call was made to.
+            cache_hit: Whether the call was answered without sending a new request.
+        """
+        self.time = time.monotonic()
+        self.routine = CURRENT_ROUTINE.get()
+        self.endpoint = endpoint
+        self.cache_hit = cache_hit
+
+
+class ApiRequest:
+    """A single request sent to the API."""
+    __slots__ = ("time", "routine", "endpoint", "status", "latency")
+
+    def __init__(self, endpoint: str, status: str, latency: float):
+        """Record a request completed now by the current routine.
+
+        Args:
+            endpoint: Endpoint that the request was sent to.
+            status: Status code of the response, or "timeout" or "error" if there was no response.
+            latency: Seconds until the response status was received or the request failed.
+        """
+        self.time = time.monotonic()
+        self.routine = CURRENT_ROUTINE.get()
+        self.endpoint = endpoint
+        self.status = status
+        self.latency = latency
+
+
+class ApiMetrics:
+    """Keeps the calls made to the API client over a rolling window. A call is counted as a cache hit if it was answered from
+    the cache or by joining an identical request already in flight. Each call that is not a cache hit leads to one or more
+    requests, whose status codes and latencies are kept too. Calls and requests are attributed to the command or automated
+    routine that made them (see CURRENT_ROUTINE).
+    """
+
+    def __init__(self, window: float=METRICS_WINDOW, max_events: int=MAX_METRIC_EVENTS):
+        """Create an empty set of metrics.
+
+        Args:
+            window (optional): Seconds that calls and requests are kept for.
+            max_events (optional): Maximum number of calls and of requests kept.
+        """
+        self.window = window
+        self.calls: Deque[ApiCall] = collections.deque(maxlen=max_events)
+        self.requests: Deque[ApiRequest] = collections.deque(maxlen=max_events)
+
+    def prune(self):
+        """Forget calls and requests older than the window."""
+        cutoff = time.monotonic() - self.window
+
+        for events in (self.calls, self.requests):
+            while events and events[0].time < cutoff:
+                events.popleft()
+
+    def record_call(self, path: str, cache_hit: bool):
+        """Record a call to the API client.
+
+        Args:
+            path: Request path relative to the API base URL.
+            cache_hit: Whether the call was answered without sending a new request.
+        """
+        self.calls.append(ApiCall(endpoint_name(path), cache_hit))
+
+    def record_request(self, path: str, status: Union[int, str], latency: float):
+        """Record a request sent to the API.
+
+        Args:
+            path: Request path relative to the API base URL.
+            status: Status code of the response, or "timeout" or "error" if there was no response.
+            latency: Seconds until the response status was received or the request failed.
+        """
+        self.requests.append(ApiRequest(endpoint_name(path), str(status), latency))
+
+    def endpoint_stats(self, routine: str=None) -> List[EndpointStats]:
+        """Summarize the calls made to each endpoint within the window.
+
+        Args:
+            routine (optional): Only include calls made by this command or automated routine. Defaults to all calls.
+
+        Returns:
+            Statistics of each endpoint, ordered by number of calls. Latencies are in seconds.
+        """
+        self.prune()
+        stats: Dict[str, EndpointStats] = {}
+        latencies: Dict[str, List[float]] = collections.defaultdict(list)
+
+        def endpoint_entry(endpoint: str) -> EndpointStats:
+            if endpoint not in stats:
+                stats[endpoint] = {
+                    "endpoint": endpoint,
+                    "calls": 0,
+                    "cache_hits": 0,
+                    "requests": 0,
+                    "latency_p50": 0.0,
+                    "latency_p95": 0.0,
+                    "latency_p99": 0.0,
+                    "status_codes": {}
+                }
+
+            return stats[endpoint]
+
+        for call in self.calls:
+            if routine is None or call.routine == routine:
+                entry = endpoint_entry(call.endpoint)
+                entry["calls"] += 1
+                entry["cache_hits"] += call.cache_hit
+
+        for request in self.requests:
+            if routine is None or request.routine == routine:
+                entry = endpoint_entry(request.endpoint)
+                entry["requests"] += 1
+                entry["status_codes"][request.status] = entry["status_codes"].get(request.status, 0) + 1
+                latencies[request.endpoint].append(request.latency)
+
+        for endpoint, values in latencies.items():
+            values.sort()
+            stats[endpoint]["latency_p50"] = percentile(values, 0.5)
+            stats[endpoint]["latency_p95"] = percentile(values, 0.95)
+            stats[endpoint]["latency_p99"] = percentile(values, 0.99)
+
+        return sorted(stats.values(), key=lambda entry: (entry["calls"], entry["requests"]), reverse=True)
+
+    def routine_stats(self) -> List[RoutineStats]:
+        """Summarize the calls made by each command and automated routine within the window.
+
+        Returns:
+            Statistics of each routine, ordered by number of calls.
+        """
+        self.prune()
+        stats: Dict[str, RoutineStats] = {}
+
+        def routine_entry(routine: str) -> RoutineStats:
+            if routine not in stats:
+                stats[routine] = {"routine": routine, "calls": 0, "cache_hits": 0, "requests": 0}
+
+            return stats[routine]
+
+        for call in self.calls:
+            entry = routine_entry(call.routine)
+            entry["calls"] += 1
+            entry["cache_hits"] += call.cache_hit
+
+        for request in self.requests:
+            routine_entry(request.routine)["requests"] += 1
+
+        return sorted(stats.values(), key=lambda entry: (entry["calls"], entry["requests"]), reverse=True)
+
+
+API_METRICS = ApiMetrics()
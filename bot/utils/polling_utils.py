@@ -0,0 +1,257 @@
+"""Scheduling of battlelog checks based on how active each player is."""
+
+import asyncio
+import collections
+import datetime
+import time
+from typing import Deque, Dict, List, Tuple
+
+# Utils
+import utils.clash_utils as clash_utils
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
+from utils.logging_utils import LOG, log_message
+from utils.rate_limit_utils import RequestPriority, request_priority
+from utils.snapshot_utils import SNAPSHOT_STORE
+from utils.util_types import BattlelogCheck, Participant
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Number of battles returned by the battlelog endpoint.
+BATTLELOG_SIZE = 25
+
+# Players are polled again before this fraction of their battlelog is expected to fill up with new battles.
+BATTLELOG_FILL_TARGET = 0.5
+
+# Bounds on the time between polls of a player. Players still earning fame are polled at least every ACTIVE_MAX_INTERVAL so that
+# their stats stay as fresh as they were with hourly sweeps. Players whose poll failed wait MIN_POLL_INTERVAL doubled for each
+# poll in a row that failed, up to MAX_POLL_INTERVAL, so that they aren't requested on every poll during an API outage.
+MIN_POLL_INTERVAL = datetime.timedelta(minutes=10)
+ACTIVE_MAX_INTERVAL = datetime.timedelta(hours=1)
+MAX_POLL_INTERVAL = datetime.timedelta(hours=3)
+
+# Maximum number of battlelog requests made by the scheduler in any hour.
+BATTLELOG_REQUESTS_PER_HOUR = 600
+
+# Weight given to the newest measurement of a player's battle rate and fame velocity.
+RATE_SMOOTHING = 0.5
+
+
+class PlayerPollState:
+    """Activity of a single player, as measured by previous polls of their battlelog."""
+    __slots__ = ("clan_tag", "last_poll_time", "next_poll_time", "polled_fame", "battles_per_hour", "fame_per_hour", "retry_time",
+                 "failed_polls")
+
+    def __init__(self, clan_tag: str, now: datetime.datetime):
+        """Create the state of a player who has not been polled yet. They are due immediately.
+
+        Args:
+            clan_tag: Clan that the player is participating in.
+            now: Current time.
+        """
+        self.clan_tag = clan_tag
+        self.last_poll_time: datetime.datetime = None
+        self.next_poll_time = now
+        self.polled_fame: int = None
+        self.battles_per_hour = 0.0
+        self.fame_per_hour = 0.0
+        self.retry_time: datetime.datetime = None
+        self.failed_polls = 0
+
+
+class BattlelogPollScheduler:
+    """Decides when to check each river race participant's battlelog.
+
+    A player's next poll is scheduled from how quickly new battles have been filling their battlelog and how quickly they are
+    earning fame. Players who play a lot are polled often so that river race battles are not pushed out of their battlelog before
+    they are counted, and players who are not earning fame are not polled at all. Polls are limited to a fixed number of
+    battlelog requests per hour, with the most overdue players polled first.
+    """
+
+    def __init__(self, requests_per_hour: int=BATTLELOG_REQUESTS_PER_HOUR):
+        """Create a scheduler with no player state.
+
+        Args:
+            requests_per_hour (optional): Maximum number of battlelog requests made in any hour.
+        """
+        self.requests_per_hour = requests_per_hour
+        self.players: Dict[str, PlayerPollState] = {}
+        self.request_times: Deque[float] = collections.deque()
+
+    def reset(self):
+        """Forget the state of every player, e.g. when a new river race starts and everyone's fame goes back to 0."""
+        self.players.clear()
+
+    def remaining_budget(self) -> int:
+        """Get the number of battlelog requests that can be made right now without exceeding the hourly budget.
+
+        Returns:
+            Number of requests available.
+        """
+        hour_ago = time.monotonic() - 60 * 60
+
+        while self.request_times and self.request_times[0] < hour_ago:
+            self.request_times.popleft()
+
+        return max(0, self.requests_per_hour - len(self.request_times))
+
+    def get_due_players(self, participants: List[Participant], clan_tag: str, now: datetime.datetime) -> List[Participant]:
+        """Get the participants of a clan that should be polled now.
+
+        Args:
+            participants: Current participants of the clan's river race.
+            clan_tag: Clan that the participants belong to.
+            now: Current time.
+
+        Returns:
+            Participants whose fame changed since they were last polled and whose next poll time has passed. Players who start
+            earning fame again are due no later than ACTIVE_MAX_INTERVAL after their last poll, unless their last poll failed.
+        """
+        due_players = []
+
+        for participant in participants:
+            state = self.players.get(participant['player_tag'])
+
+            if state is None or state.clan_tag != clan_tag:
+                state = PlayerPollState(clan_tag, now)
+                self.players[participant['player_tag']] = state
+
+            if participant['fame'] == state.polled_fame:
+                continue
+
+            next_poll_time = state.next_poll_time
+
+            if state.last_poll_time is not None:
+                next_poll_time = min(next_poll_time, state.last_poll_time + ACTIVE_MAX_INTERVAL)
+
+            if state.retry_time is not None:
+                next_poll_time = max(next_poll_time, state.retry_time)
+
+            if next_poll_time <= now:
+                due_players.append(participant)
+
+        return due_players
+
+    def update(self, check: BattlelogCheck, now: datetime.datetime):
+        """Update a player's activity from a completed poll and schedule their next poll.
+
+        Args:
+            check: Result of checking the player's battlelog.
+            now: Time of the poll.
+        """
+        state = self.players[check['player_tag']]
+
+        if state.last_poll_time is not None and state.polled_fame is not None:
+            hours = max((now - state.last_poll_time).total_seconds() / 3600, MIN_POLL_INTERVAL.total_seconds() / 3600)
+            fame_per_hour = max(0, check['fame'] - state.polled_fame) / hours
+            state.fame_per_hour = RATE_SMOOTHING * fame_per_hour + (1 - RATE_SMOOTHING) * state.fame_per_hour
+
+            battles_per_hour = check['scan_stats']['scanned'] / hours
+
+            # Every battle in the log is new, so more battles may have been pushed out of it since the last poll.
+            if check['scan_stats']['skipped'] == 0 and check['scan_stats']['scanned'] >= BATTLELOG_SIZE:
+                battles_per_hour *= 2
+
+            state.battles_per_hour = RATE_SMOOTHING * battles_per_hour + (1 - RATE_SMOOTHING) * state.battles_per_hour
+
+        state.last_poll_time = now
+        state.polled_fame = check['fame']
+        state.next_poll_time = now + self.poll_interval(state)
+        state.retry_time = None
+        state.failed_polls = 0
+
+    def postpone(self, player_tag: str, now: datetime.datetime):
+        """Push back the next poll of a player whose poll failed. The delay doubles with each poll in a row that fails.
+
+        Args:
+            player_tag: Player whose poll failed.
+            now: Time of the poll.
+        """
+        state = self.players[player_tag]
+        state.failed_polls += 1
+        state.retry_time = now + min(MIN_POLL_INTERVAL * 2 ** state.failed_polls, MAX_POLL_INTERVAL)
+
+    @staticmethod
+    def poll_interval(state: PlayerPollState) -> datetime.timedelta:
+        """Get how long to wait before polling a player again.
+
+        Args:
+            state: Activity of the player.
+
+        Returns:
+            Time until the player's next poll.
+        """
+        max_interval = ACTIVE_MAX_INTERVAL if state.fame_per_hour > 0 else MAX_POLL_INTERVAL
+
+        if state.battles_per_hour <= 0:
+            return max_interval
+
+        fill_time = datetime.timedelta(hours=BATTLELOG_SIZE * BATTLELOG_FILL_TARGET / state.battles_per_hour)
+        return max(MIN_POLL_INTERVAL, min(fill_time, max_interval))
+
+    async def poll(self, clan_tags: List[str]=None):
+        """Check the battlelogs of every participant that is due to be polled and save their match performance.
+
+        Args:
+            clan_tags (optional): Clans to poll participants of. Defaults to all tracked clans.
+        """
+        if clan_tags is None:
+            clan_tags = clash_utils.TRACKED_CLAN_TAGS
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        due_players = []
+
+        for clan_tag in clan_tags:
+            participants = await clash_utils.get_river_race_participants(clan_tag)
+
+            if participants:
+                await DB_EXECUTOR.run(SNAPSHOT_STORE.record, participants, clan_tag, now)
+
+            due_players.extend((clan_tag, participant) for participant in self.get_due_players(participants, clan_tag, now))
+
+        due_players.sort(key=lambda due_player: self.players[due_player[1]['player_tag']].next_poll_time)
+        selected_players = due_players[:self.remaining_budget()]
+        semaphore = asyncio.Semaphore(clash_utils.MATCH_PERFORMANCE_CONCURRENCY)
+
+        async def bounded_check(clan_tag: str, participant: Participant) -> Tuple[BattlelogCheck, bool]:
+            async with semaphore:
+                return await clash_utils.calculate_player_win_rate(participant['player_tag'], participant['fame'], now, clan_tag)
+
+        with request_priority(RequestPriority.BULK):
+            results = await asyncio.gather(*[bounded_check(clan_tag, participant) for clan_tag, participant in selected_players])
+
+        polled = {clan_tag: [] for clan_tag in clan_tags}
+
+        for (clan_tag, participant), (check, requested) in zip(selected_players, results):
+            # Failed requests count against the budget too.
+            if requested:
+                self.request_times.append(time.monotonic())
+
+            if not check:
+                self.postpone(participant['player_tag'], now)
+                continue
+
+            self.update(check, now)
+            polled[clan_tag].append(check)
+
+        for clan_tag, checks in polled.items():
+            if checks:
+                await ASYNC_DB.update_match_history(checks, now, clan_tag)
+
+        LOG.info(log_message("Polled battlelogs",
+                             due=len(due_players),
+                             polled=sum(len(checks) for checks in polled.values()),
+                             failed=sum(not check for check, _ in results),
+                             remaining_budget=self.remaining_budget()))
+
+
+BATTLELOG_SCHEDULER = BattlelogPollScheduler()
@@ -0,0 +1,272 @@
+"""Local archive of the river race log of each tracked clan."""
+
+import asyncio
+from typing import Any, Dict, List, Union
+
+# Config
+from config.config import PRIMARY_CLAN_TAG
+
+# Utils
+import utils.clash_utils as clash_utils
+import utils.db_executor_utils as db_executor_utils
+from utils.api_utils import CLASH_API, encode_tag
+from utils.cache_utils import response_age
+from utils.db_pool_utils import DB_POOL
+from utils.logging_utils import LOG, log_message
+from utils.util_types import Participant, RiverRaceClan, SeasonParticipation
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Number of races requested per page once a sync finds that the newest race is not archived yet. The first page of every sync
+# only contains the newest race, since that is usually the only one missing.
+RACE_LOG_PAGE_SIZE = 10
+
+# Upper bound on the number of pages requested by a single sync.
+MAX_RACE_LOG_PAGES = 10
+
+# Fame needed to cross the finish line of a regular river race.
+FINISH_LINE_FAME = 10000
+
+
+def get_latest_created_date(clan_tag: str=PRIMARY_CLAN_TAG) -> Union[str, None]:
+    """Get when the newest archived race of a clan ended.
+
+    Args:
+        clan_tag (optional): Clan whose river race log to check. Defaults to primary clan.
+
+    Returns:
+        Battletime of the newest archived race, or None if none of the clan's races have been archived.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT MAX(created_date) AS created_date FROM river_race_log WHERE clan_tag = %s", (clan_tag))
+        query_result = cursor.fetchone()
+
+    return query_result['created_date']
+
+
+def save_races(races: List[Dict[str, Any]], clan_tag: str=PRIMARY_CLAN_TAG) -> int:
+    """Archive races from a clan's river race log, along with the standings and participants of every clan in them. All races
+    are saved in a single transaction. Races that are already archived are skipped.
+
+    Args:
+        races: Races as returned by the API.
+        clan_tag (optional): Clan whose river race log the races came from. Defaults to primary clan.
+
+    Returns:
+        Number of races archived.
+    """
+    with DB_POOL.cursor() as cursor:
+        saved = 0
+
+        for race in sorted(races, key=lambda race: race['createdDate']):
+            cursor.execute("INSERT IGNORE INTO river_race_log VALUES (DEFAULT, %s, %s, %s, %s)",
+                           (clan_tag, race['seasonId'], race['sectionIndex'], race['createdDate']))
+
+            if cursor.rowcount == 0:
+                continue
+
+            race_id = cursor.lastrowid
+            standings = []
+            participants = []
+
+            for standing in race['standings']:
+                clan = standing['clan']
+                standings.append((race_id, clan['tag'], clan['name'], standing['rank'], standing['trophyChange'], clan['fame']))
+                participants.extend((race_id, clan['tag'], participant['tag'], participant['name'], participant['fame'],
+                                     participant['repairPoints'], participant['boatAttacks'], participant['decksUsed'],
+                                     participant['decksUsedToday'])
+                                    for participant in clan['participants'])
+
+            cursor.executemany("INSERT INTO river_race_log_standings VALUES (%s, %s, %s, %s, %s, %s)", standings)
+            cursor.executemany("INSERT INTO river_race_log_participants VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)", participants)
+            saved += 1
+
+    return saved
+
+
+async def sync_river_race_log(clan_tag: str=PRIMARY_CLAN_TAG) -> int:
+    """Archive the races in a clan's river race log that ended after its newest archived race. The log is read newest first and
+    only until an archived race is reached, so a sync usually takes a single request for one race. Nothing is archived if any
+    page can't be fetched, so that the archive never skips over a race.
+
+    Args:
+        clan_tag (optional): Clan whose river race log to sync. Defaults to primary clan.
+
+    Returns:
+        Number of races archived.
+    """
+    latest_created_date = await db_executor_utils.DB_EXECUTOR.run(get_latest_created_date, clan_tag)
+    path = f"/clans/{encode_tag(clan_tag)}/riverracelog"
+    params = {"limit": 1}
+    new_races = []
+
+    for _ in range(MAX_RACE_LOG_PAGES):
+        json_obj = await CLASH_API.get(path, params, True)
+
+        if json_obj is None or response_age(json_obj) > 0:
+            LOG.warning(log_message("Couldn't sync river race log", clan_tag=clan_tag))
+            return 0
+
+        caught_up = False
+
+        for race in json_obj['items']:
+            if latest_created_date is not None and race['createdDate'] <= latest_created_date:
+                caught_up = True
+                break
+
+            new_races.append(race)
+
+        after = json_obj.get('paging', {}).get('cursors', {}).get('after')
+
+        if caught_up or after is None:
+            break
+
+        params = {"limit": RACE_LOG_PAGE_SIZE, "after": after}
+
+    if not new_races:
+        return 0
+
+    saved = await db_executor_utils.DB_EXECUTOR.run(save_races, new_races, clan_tag)
+    LOG.info(log_message("Synced river race log", clan_tag=clan_tag, races=saved))
+    return saved
+
+
+async def sync_river_race_logs(clan_tags: List[str]=None):
+    """Sync the river race log of each clan concurrently.
+
+    Args:
+        clan_tags (optional): Clans whose river race logs to sync. Defaults to all tracked clans.
+    """
+    if clan_tags is None:
+        clan_tags = clash_utils.TRACKED_CLAN_TAGS
+
+    await asyncio.gather(*[sync_river_race_log(clan_tag) for clan_tag in clan_tags])
+
+
+def get_last_race_id(clan_tag: str=PRIMARY_CLAN_TAG) -> Union[int, None]:
+    """Get the id of a clan's newest archived race.
+
+    Args:
+        clan_tag (optional): Clan whose river race log to check. Defaults to primary clan.
+
+    Returns:
+        Id of the newest archived race, or None if none of the clan's races have been archived.
+    """
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT id FROM river_race_log WHERE clan_tag = %s ORDER BY created_date DESC LIMIT 1", (clan_tag))
+        query_result = cursor.fetchone()
+
+    if query_result is None:
+        return None
+
+    return query_result['id']
+
+
+def get_last_race_participants(clan_tag: str=PRIMARY_CLAN_TAG) -> List[Participant]:
+    """Get the participants of a clan in its newest archived race.
+
+    Args:
+        clan_tag (optional): Clan to get participants of. Defaults to primary clan.
+
+    Returns:
+        List of participants in specified clan's newest archived race, or empty list if none of its races have been archived.
+    """
+    race_id = get_last_race_id(clan_tag)
+
+    if race_id is None:
+        return []
+
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT player_tag, player_name, fame, repair_points, boat_attacks, decks_used, decks_used_today\
+                        FROM river_race_log_participants WHERE race_id = %s AND clan_tag = %s",
+                       (race_id, clan_tag))
+        query_result = cursor.fetchall()
+
+    return [Participant(**row) for row in query_result]
+
+
+def get_last_race_clans(clan_tag: str=PRIMARY_CLAN_TAG) -> List[RiverRaceClan]:
+    """Get the fame and deck usage of each clan in a clan's newest archived race.
+
+    Args:
+        clan_tag (optional): Clan whose newest archived race to get. Defaults to primary clan.
+
+    Returns:
+        List of clans in the race ordered by rank, or empty list if none of the clan's races have been archived.
+    """
+    race_id = get_last_race_id(clan_tag)
+
+    if race_id is None:
+        return []
+
+    with DB_POOL.cursor() as cursor:
+        cursor.execute("SELECT s.clan_tag, s.clan_name, s.fame AS race_fame,\
+                        COALESCE(SUM(p.fame), 0) AS fame,\
+                        COALESCE(SUM(p.decks_used), 0) AS total_decks_used,\
+                        COALESCE(SUM(p.decks_used_today), 0) AS decks_used_today\
+                        FROM river_race_log_standings s\
+                        LEFT JOIN river_race_log_participants p ON p.race_id = s.race_id AND p.clan_tag = s.clan_tag\
+                        WHERE s.race_id = %s\
+                        GROUP BY s.clan_tag, s.clan_name, s.fame, s.clan_rank\
+                        ORDER BY s.clan_rank",
+                       (race_id))
+        query_result = cursor.fetchall()
+
+    return [RiverRaceClan(clan_tag=row['clan_tag'],
+                          clan_name=row['clan_name'],
+                          fame=int(row['fame']),
+                          total_decks_used=int(row['total_decks_used']),
+                          decks_used_today=int(row['decks_used_today']),
+                          completed=row['race_fame'] >= FINISH_LINE_FAME)
+            for row in query_result]
+
+
+def get_season_participation(clan_tag: str=PRIMARY_CLAN_TAG, season_id: int=None) -> List[SeasonParticipation]:
+    """Get the total fame and deck usage of each player across a clan's archived races in a season.
+
+    Args:
+        clan_tag (optional): Clan to get participation in. Defaults to primary clan.
+        season_id (optional): Season to get participation in. Defaults to the season of the clan's newest archived race.
+
+    Returns:
+        List of players that participated in at least one of the season's races, ordered by fame.
+    """
+    with DB_POOL.cursor() as cursor:
+        if season_id is None:
+            cursor.execute("SELECT MAX(season_id) AS season_id FROM river_race_log WHERE clan_tag = %s", (clan_tag))
+            season_id = cursor.fetchone()['season_id']
+
+        if season_id is None:
+            return []
+
+        cursor.execute("SELECT p.player_tag, MAX(p.player_name) AS player_name,\
+                        SUM(p.decks_used > 0) AS races,\
+                        SUM(p.fame) AS fame,\
+                        SUM(p.decks_used) AS decks_used,\
+                        SUM(p.boat_attacks) AS boat_attacks\
+                        FROM river_race_log r\
+                        INNER JOIN river_race_log_participants p ON p.race_id = r.id AND p.clan_tag = r.clan_tag\
+                        WHERE r.clan_tag = %s AND r.season_id = %s\
+                        GROUP BY p.player_tag\
+                        HAVING decks_used > 0\
+                        ORDER BY fame DESC",
+                       (clan_tag, season_id))
+        query_result = cursor.fetchall()
+
+    return [{'player_tag': row['player_tag'],
+             'player_name': row['player_name'],
+             'races': int(row['races']),
+             'fame': int(row['fame']),
+             'decks_used': int(row['decks_used']),
+             'boat_attacks': int(row['boat_attacks'])}
+            for row in query_result]
@@ -0,0 +1,266 @@
+"""Client side rate limiting of Clash Royale API requests."""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, List, Tuple
+
+# Utils
+from utils.logging_utils import LOG, log_message
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Sustained number of requests per second allowed for each API key, and how many requests can be sent in a burst after being
+# idle.
+REQUESTS_PER_SECOND = 10
+BURST_SIZE = 20
+
+# Seconds that a key is taken out of rotation after the API rejects it with 403. Keys that are rate limited with 429 are taken
+# out of rotation for the duration of the Retry-After header instead.
+FORBIDDEN_KEY_COOLDOWN = 5 * 60
+
+
+class RequestPriority(IntEnum):
+    """Order in which waiting requests are sent. Lower values are sent first."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+# Priority of requests sent from the current task. Tasks started from a task inherit its priority.
+REQUEST_PRIORITY: ContextVar[RequestPriority] = ContextVar("request_priority", default=RequestPriority.NORMAL)
+
+
+@contextlib.contextmanager
+def request_priority(priority: RequestPriority):
+    """Send all requests made within this context at the specified priority.
+
+    Args:
+        priority: Priority to send requests at.
+    """
+    token = REQUEST_PRIORITY.set(priority)
+
+    try:
+        yield
+    finally:
+        REQUEST_PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """Token bucket shared by all API requests. When no tokens are available, waiting requests are released in priority order
+    and then in the order they arrived.
+    """
+
+    def __init__(self, rate: float=REQUESTS_PER_SECOND, capacity: int=BURST_SIZE):
+        """Create a full bucket.
+
+        Args:
+            rate (optional): Tokens added per second.
+            capacity (optional): Maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.counter = itertools.count()
+        self.release_task: asyncio.Task = None
+
+    def refill(self):
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self, priority: RequestPriority=None):
+        """Wait until a token is available and take it.
+
+        Args:
+            priority (optional): Priority of the request. Defaults to the priority of the current context.
+        """
+        if priority is None:
+            priority = REQUEST_PRIORITY.get()
+
+        self.refill()
+
+        if not self.waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), waiter))
+
+        if self.release_task is None or self.release_task.done():
+            self.release_task = asyncio.ensure_future(self.release_waiters())
+
+        await waiter
+
+    async def release_waiters(self):
+        """Hand out tokens to waiting requests as they become available."""
+        while self.waiters:
+            self.refill()
+
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            _, _, waiter = heapq.heappop(self.waiters)
+
+            # Skip requests that were cancelled while waiting.
+            if waiter.done():
+                continue
+
+            self.tokens -= 1
+            waiter.set_result(None)
+
+    def remaining(self) -> float:
+        """Get the number of tokens available after every waiting request has been served.
+
+        Returns:
+            Tokens available, which is negative if requests are waiting.
+        """
+        self.refill()
+        return self.tokens - len(self.waiters)
+
+
+class ApiKey:
+    """A single API key along with its own rate limiter and usage counters."""
+
+    def __init__(self, key: str, rate: float=REQUESTS_PER_SECOND, capacity: int=BURST_SIZE):
+        """Create a key that is in rotation.
+
+        Args:
+            key: Key used to authorize requests.
+            rate (optional): Requests per second allowed with this key.
+            capacity (optional): Burst size allowed with this key.
+        """
+        self.key = key
+        self.rate_limiter = TokenBucket(rate, capacity)
+        self.benched_until = 0.0
+        self.requests = 0
+        self.status_codes: Dict[int, int] = {}
+        self.errors = 0
+        self.times_benched = 0
+
+    @property
+    def name(self) -> str:
+        """Identifier of the key that is safe to log."""
+        return "..." + self.key[-4:]
+
+    def is_benched(self) -> bool:
+        """Return whether the key is currently out of rotation.
+
+        Returns:
+            True if the key should not be used right now.
+        """
+        return time.monotonic() < self.benched_until
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the usage counters of the key.
+
+        Returns:
+            Dictionary containing the key's name, number of requests sent, responses by status code, requests that failed
+            without a response, number of times taken out of rotation, and seconds until it is back in rotation.
+        """
+        return {
+            "key": self.name,
+            "requests": self.requests,
+            "status_codes": dict(self.status_codes),
+            "errors": self.errors,
+            "times_benched": self.times_benched,
+            "benched_for": round(max(0.0, self.benched_until - time.monotonic()), 1)
+        }
+
+
+class ApiKeyPool:
+    """Spreads requests across several API keys. Each key has its own token bucket, and each request is sent with the key that
+    has the most tokens left. Keys that the API rejects are taken out of rotation for a while.
+    """
+
+    def __init__(self, keys: List[str], rate: float=REQUESTS_PER_SECOND, capacity: int=BURST_SIZE):
+        """Create a pool with every key in rotation.
+
+        Args:
+            keys: Keys used to authorize requests. Duplicate and empty keys are ignored.
+            rate (optional): Requests per second allowed with each key.
+            capacity (optional): Burst size allowed with each key.
+        """
+        self.keys = [ApiKey(key, rate, capacity) for key in dict.fromkeys(keys) if key]
+
+    async def acquire(self, priority: RequestPriority=None) -> ApiKey:
+        """Pick the key in rotation with the most remaining budget and wait for a token from it. If every key is out of rotation,
+        wait for the first one to come back.
+
+        Args:
+            priority (optional): Priority of the request. Defaults to the priority of the current context.
+
+        Returns:
+            Key to send the request with.
+        """
+        while True:
+            available_keys = [key for key in self.keys if not key.is_benched()]
+
+            if available_keys:
+                break
+
+            delay = min(key.benched_until for key in self.keys) - time.monotonic()
+            LOG.warning(log_message("All API keys are out of rotation", seconds=round(delay, 1)))
+            await asyncio.sleep(max(delay, 0))
+
+        api_key = max(available_keys, key=lambda key: key.rate_limiter.remaining())
+        await api_key.rate_limiter.acquire(priority)
+        api_key.requests += 1
+        return api_key
+
+    def record_response(self, api_key: ApiKey, status_code: int):
+        """Count a response received with a key.
+
+        Args:
+            api_key: Key that the request was sent with.
+            status_code: Status code of the response.
+        """
+        api_key.status_codes[status_code] = api_key.status_codes.get(status_code, 0) + 1
+
+    def record_error(self, api_key: ApiKey):
+        """Count a request that failed without a response.
+
+        Args:
+            api_key: Key that the request was sent with.
+        """
+        api_key.errors += 1
+
+    def bench(self, api_key: ApiKey, seconds: float):
+        """Take a key out of rotation.
+
+        Args:
+            api_key: Key to take out of rotation.
+            seconds: How long to keep the key out of rotation.
+        """
+        api_key.benched_until = max(api_key.benched_until, time.monotonic() + seconds)
+        api_key.times_benched += 1
+        LOG.warning(log_message("Taking API key out of rotation",
+                                key=api_key.name,
+                                seconds=seconds,
+                                keys_in_rotation=sum(not key.is_benched() for key in self.keys)))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get the usage counters of each key.
+
+        Returns:
+            List of counters of each key (see ApiKey.stats).
+        """
+        return [key.stats() for key in self.keys]
@@ -0,0 +1,270 @@
+"""Detection of the daily river race reset."""
+
+import asyncio
+import datetime
+import statistics
+from typing import Dict, List, Tuple, Union
+
+# Utils
+import utils.clash_utils as clash_utils
+from utils.cache_utils import response_age
+from utils.db_executor_utils import ASYNC_DB, DB_EXECUTOR
+from utils.logging_utils import LOG, log_message
+from utils.snapshot_utils import SNAPSHOT_STORE
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Time of day (UTC) when detection starts and gives up. The reset routines are performed at the end of the window for any clan
+# whose reset was not detected.
+RESET_WINDOW_START = datetime.time(9, 20)
+RESET_WINDOW_END = datetime.time(9, 59)
+
+# Bounds in seconds on the time between polls. Within these bounds, the time between polls is RESET_POLL_FRACTION of the time
+# left until the predicted reset time (or since it, if the reset is late), e.g. a poll 10 minutes before the predicted reset
+# waits a minute and a poll 30 seconds before it waits 5 seconds.
+MIN_RESET_POLL_INTERVAL = 5
+MAX_RESET_POLL_INTERVAL = 60
+RESET_POLL_FRACTION = 0.1
+
+
+class ResetDetector:
+    """Detects the daily reset of each tracked clan from a drop in the total number of decks its participants used today. Only
+    the current river race of each clan is polled.
+
+    Polls get closer together around the time of day when previous resets happened, so the deck usage from the last poll before
+    a reset is only seconds old. That usage is what gets recorded for the day that ended. It is saved after every poll along with
+    when each clan's reset was detected, so detection picks up where it left off after a restart.
+    """
+
+    def __init__(self):
+        """Create a detector with no state loaded. Saved deck usage is loaded the first time a clan is polled."""
+        self.deck_usage: Dict[str, Dict[str, int]] = {}
+        self.running = False
+
+    @staticmethod
+    def get_window(now: datetime.datetime) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Get today's detection window.
+
+        Args:
+            now: Current time.
+
+        Returns:
+            Start and end of the window on the same day as the current time.
+        """
+        return (datetime.datetime.combine(now.date(), RESET_WINDOW_START, now.tzinfo),
+                datetime.datetime.combine(now.date(), RESET_WINDOW_END, now.tzinfo))
+
+    async def reset_handled(self, now: datetime.datetime) -> bool:
+        """Check whether the reset routines have already been performed today for every tracked clan.
+
+        Args:
+            now: Current time.
+
+        Returns:
+            Whether every tracked clan's reset time was saved since the start of today's window.
+        """
+        window_start, _ = self.get_window(now)
+
+        for clan_tag in clash_utils.TRACKED_CLAN_TAGS:
+            if not window_start <= await ASYNC_DB.get_reset_time(clan_tag) <= now:
+                return False
+
+        return True
+
+    async def detected_reset_times(self, now: datetime.datetime) -> Dict[str, datetime.datetime]:
+        """Get when the reset of each tracked clan was detected today.
+
+        Args:
+            now: Current time.
+
+        Returns:
+            Dictionary mapping clan tags to the time their reset was detected. Clans whose reset has not been detected yet are
+                left out.
+        """
+        window_start, _ = self.get_window(now)
+        reset_times = {}
+
+        for clan_tag in clash_utils.TRACKED_CLAN_TAGS:
+            reset_time = await ASYNC_DB.get_detected_reset_time(clan_tag)
+
+            if reset_time is not None and window_start <= reset_time <= now:
+                reset_times[clan_tag] = reset_time
+
+        return reset_times
+
+    async def predict_reset_time(self, clan_tag: str, now: datetime.datetime) -> Union[datetime.datetime, None]:
+        """Predict when a clan will reset today from the time of day of its previous resets.
+
+        Args:
+            clan_tag: Clan to predict the reset of.
+            now: Current time.
+
+        Returns:
+            Predicted reset time, or None if there are no previous resets to predict from.
+        """
+        previous_resets = [await ASYNC_DB.get_reset_time(clan_tag),
+                           *(await ASYNC_DB.get_river_race_reset_times(clan_tag)).values()]
+        return self.median_reset_time(previous_resets, now)
+
+    @staticmethod
+    def median_reset_time(previous_resets: List[datetime.datetime], now: datetime.datetime) -> Union[datetime.datetime, None]:
+        """Get today's reset time at the median time of day of previous resets. Resets that were not detected within the window
+        are ignored.
+
+        Args:
+            previous_resets: Times of previous resets.
+            now: Current time.
+
+        Returns:
+            Predicted reset time, or None if none of the previous resets happened within the window.
+        """
+        seconds_since_midnight = [reset_time.hour * 3600 + reset_time.minute * 60 + reset_time.second
+                                  for reset_time in previous_resets
+                                  if RESET_WINDOW_START <= reset_time.time() < RESET_WINDOW_END]
+
+        if not seconds_since_midnight:
+            return None
+
+        midnight = datetime.datetime.combine(now.date(), datetime.time(), now.tzinfo)
+        return midnight + datetime.timedelta(seconds=statistics.median(seconds_since_midnight))
+
+    @staticmethod
+    def poll_interval(now: datetime.datetime, predicted_reset_time: Union[datetime.datetime, None]) -> float:
+        """Get how long to wait before polling a clan again.
+
+        Args:
+            now: Current time.
+            predicted_reset_time: When the clan is predicted to reset, or None if there is no prediction.
+
+        Returns:
+            Seconds until the next poll.
+        """
+        if predicted_reset_time is None:
+            return MAX_RESET_POLL_INTERVAL
+
+        distance = abs((predicted_reset_time - now).total_seconds())
+        return min(MAX_RESET_POLL_INTERVAL, max(MIN_RESET_POLL_INTERVAL, distance * RESET_POLL_FRACTION))
+
+    async def load_deck_usage(self, clan_tag: str, now: datetime.datetime) -> Dict[str, int]:
+        """Load a clan's saved deck usage if it was saved during today's window.
+
+        Args:
+            clan_tag: Clan to load deck usage of.
+            now: Current time.
+
+        Returns:
+            Dictionary mapping player tags to number of decks used today, or empty dict if nothing was saved today.
+        """
+        deck_usage, snapshot_time = await ASYNC_DB.get_reset_snapshot(clan_tag)
+        window_start, _ = self.get_window(now)
+
+        if snapshot_time is None or snapshot_time < window_start:
+            return {}
+
+        LOG.info(log_message("Loaded saved deck usage", clan_tag=clan_tag, snapshot_time=snapshot_time))
+        return deck_usage
+
+    async def check(self, clan_tag: str, now: datetime.datetime) -> bool:
+        """Poll a clan's current river race and check whether its daily reset happened since the previous poll. If it did,
+        the reset is saved and the deck usage from the previous poll is kept. Otherwise the deck usage from this poll is saved.
+
+        Args:
+            clan_tag: Clan to check.
+            now: Time of the poll.
+
+        Returns:
+            Whether the reset was detected.
+        """
+        river_race = await clash_utils.get_current_river_race(clan_tag, True)
+
+        # A stale response says nothing about whether the reset happened since the previous poll.
+        if river_race is None or response_age(river_race) > 0:
+            LOG.info(log_message("Couldn't get river race", clan_tag=clan_tag))
+            return False
+
+        participants = [clash_utils.parse_participant(participant) for participant in river_race['clan']['participants']]
+        await DB_EXECUTOR.run(SNAPSHOT_STORE.record, participants, clan_tag, now)
+        deck_usage = {participant['player_tag']: participant['decks_used_today'] for participant in participants}
+
+        if clan_tag not in self.deck_usage:
+            self.deck_usage[clan_tag] = await self.load_deck_usage(clan_tag, now)
+
+        previous_deck_usage = self.deck_usage[clan_tag]
+
+        if previous_deck_usage and sum(deck_usage.values()) < sum(previous_deck_usage.values()):
+            LOG.info(log_message("Daily reset detected", clan_tag=clan_tag, decks_used=sum(previous_deck_usage.values())))
+            await ASYNC_DB.set_detected_reset_time(now, clan_tag)
+            return True
+
+        if deck_usage != previous_deck_usage:
+            await ASYNC_DB.save_reset_snapshot(deck_usage, now, clan_tag)
+            self.deck_usage[clan_tag] = deck_usage
+
+        return False
+
+    async def run(self) -> List[str]:
+        """Poll each tracked clan until every clan's reset is detected or the window ends. Only one run happens at a time.
+        Deck usage is reloaded from the database at the start of each run.
+
+        Returns:
+            Tags of the clans whose reset was not detected.
+        """
+        self.running = True
+        self.deck_usage.clear()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        _, window_end = self.get_window(now)
+        detected_reset_times = await self.detected_reset_times(now)
+        pending_clan_tags = [clan_tag for clan_tag in clash_utils.TRACKED_CLAN_TAGS if clan_tag not in detected_reset_times]
+        predicted_reset_times = {clan_tag: await self.predict_reset_time(clan_tag, now) for clan_tag in pending_clan_tags}
+        LOG.info(log_message("Starting reset detection", predicted_reset_times=predicted_reset_times))
+
+        try:
+            while pending_clan_tags and now < window_end:
+                detected = await asyncio.gather(*[self.check(clan_tag, now) for clan_tag in pending_clan_tags])
+                pending_clan_tags = [clan_tag for clan_tag, reset in zip(pending_clan_tags, detected) if not reset]
+
+                if not pending_clan_tags:
+                    break
+
+                interval = min(self.poll_interval(now, predicted_reset_times[clan_tag]) for clan_tag in pending_clan_tags)
+                now = datetime.datetime.now(datetime.timezone.utc)
+                await asyncio.sleep(max(0, min(interval, (window_end - now).total_seconds())))
+                now = datetime.datetime.now(datetime.timezone.utc)
+        finally:
+            self.running = False
+
+        return pending_clan_tags
+
+    async def get_deck_usage(self) -> Dict[str, Dict[str, int]]:
+        """Get the deck usage of each tracked clan from its last poll before the reset, or from its last poll if its reset was
+        not detected.
+
+        Returns:
+            Dictionary mapping clan tags to the deck usage of that clan's participants. Clans without any saved deck usage are
+                left out.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        for clan_tag in clash_utils.TRACKED_CLAN_TAGS:
+            if clan_tag not in self.deck_usage:
+                self.deck_usage[clan_tag] = await self.load_deck_usage(clan_tag, now)
+
+        return {clan_tag: deck_usage for clan_tag, deck_usage in self.deck_usage.items() if deck_usage}
+
+    async def reset(self):
+        """Forget the saved deck usage and detected reset times once the reset routines are done."""
+        self.deck_usage.clear()
+        await ASYNC_DB.clear_reset_detection()
+
+
+RESET_DETECTOR = ResetDetector()
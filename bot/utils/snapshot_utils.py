@@ -0,0 +1,309 @@
+"""Delta encoded history of river race participant progress."""
+
+import datetime
+import threading
+from typing import Dict, List, Tuple
+
+# Config
+from config.config import PRIMARY_CLAN_TAG
+
+# Utils
+import utils.bot_utils as bot_utils
+from utils.db_pool_utils import DB_POOL
+from utils.logging_utils import LOG, log_message
+from utils.util_types import Participant, ParticipantSnapshot
+
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Fields tracked for each participant.
+SNAPSHOT_FIELDS = ("fame", "decks_used", "decks_used_today")
+
+# A keyframe containing every participant's full values is written at least this often. Other snapshots only contain the
+# participants that changed since the previous snapshot, stored as differences from their previous values.
+KEYFRAME_INTERVAL = datetime.timedelta(hours=24)
+
+# Snapshots older than this are deleted whenever a keyframe is written.
+SNAPSHOT_RETENTION = datetime.timedelta(days=35)
+
+ParticipantValues = Tuple[int, int, int]
+
+
+class ParticipantSnapshotStore:
+    """Records each poll of the current river race as the differences from the previous poll.
+
+    Each snapshot is stored as a row in participant_snapshots, and each participant whose values changed is stored as a row in
+    participant_deltas. The values of a participant at any time are the sum of their rows since the most recent keyframe.
+
+    Snapshots are recorded by the pollers (BATTLELOG_SCHEDULER and RESET_DETECTOR) on DB_EXECUTOR. Recording is serialized, since
+    each snapshot is the difference from the one before it.
+    """
+
+    def __init__(self):
+        """Create a store with no state loaded. The latest state of a clan is loaded from the database the first time a
+        snapshot of it is recorded.
+        """
+        self.latest_state: Dict[str, Dict[str, ParticipantValues]] = {}
+        self.last_keyframe_time: Dict[str, datetime.datetime] = {}
+        self.lock = threading.Lock()
+
+    def load_latest_state(self, clan_tag: str):
+        """Load the most recent values of each participant in a clan from the database.
+
+        Args:
+            clan_tag: Clan to load state of.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        keyframe_time = self.get_keyframe_time(now, clan_tag)
+        self.latest_state[clan_tag] = {}
+
+        if keyframe_time is None:
+            return
+
+        self.last_keyframe_time[clan_tag] = keyframe_time
+
+        for player_tag, snapshot in self.get_state(now, clan_tag).items():
+            self.latest_state[clan_tag][player_tag] = tuple(snapshot[field] for field in SNAPSHOT_FIELDS)
+
+    def record(self, participants: List[Participant], clan_tag: str=PRIMARY_CLAN_TAG, snapshot_time: datetime.datetime=None) -> int:
+        """Save the participants that changed since the previous snapshot. Nothing is written if no participant changed.
+
+        Args:
+            participants: Participants from a poll of the current river race.
+            clan_tag (optional): Clan that the participants belong to. Defaults to primary clan.
+            snapshot_time (optional): Time of the poll. Defaults to now.
+
+        Returns:
+            Number of participant rows written.
+        """
+        if snapshot_time is None:
+            snapshot_time = datetime.datetime.now(datetime.timezone.utc)
+
+        with self.lock:
+            return self.record_locked(participants, clan_tag, snapshot_time)
+
+    def record_locked(self, participants: List[Participant], clan_tag: str, snapshot_time: datetime.datetime) -> int:
+        """Save the participants that changed since the previous snapshot. The caller must hold the lock.
+
+        Args:
+            participants: Participants from a poll of the current river race.
+            clan_tag: Clan that the participants belong to.
+            snapshot_time: Time of the poll.
+
+        Returns:
+            Number of participant rows written.
+        """
+        if clan_tag not in self.latest_state:
+            self.load_latest_state(clan_tag)
+
+        previous_state = self.latest_state[clan_tag]
+        current_state = dict(previous_state)
+
+        for participant in participants:
+            current_state[participant['player_tag']] = tuple(participant[field] for field in SNAPSHOT_FIELDS)
+
+        last_keyframe_time = self.last_keyframe_time.get(clan_tag)
+        is_keyframe = last_keyframe_time is None or snapshot_time - last_keyframe_time >= KEYFRAME_INTERVAL
+
+        if is_keyframe:
+            rows = [(player_tag, *values) for player_tag, values in current_state.items()]
+        else:
+            rows = []
+
+            for player_tag, values in current_state.items():
+                previous_values = previous_state.get(player_tag, (0,) * len(SNAPSHOT_FIELDS))
+
+                if values != previous_values:
+                    rows.append((player_tag, *(new - old for new, old in zip(values, previous_values))))
+
+        if not rows:
+            return 0
+
+        with DB_POOL.cursor() as cursor:
+            cursor.execute("INSERT INTO participant_snapshots VALUES (DEFAULT, %s, %s, %s)",
+                           (clan_tag, bot_utils.datetime_to_battletime(snapshot_time), is_keyframe))
+            snapshot_id = cursor.lastrowid
+            cursor.executemany("INSERT INTO participant_deltas VALUES (%s, %s, %s, %s, %s)",
+                               [(snapshot_id, *row) for row in rows])
+
+            if is_keyframe:
+                self.last_keyframe_time[clan_tag] = snapshot_time
+                self.prune(snapshot_time - SNAPSHOT_RETENTION, clan_tag, cursor)
+
+        self.latest_state[clan_tag] = current_state
+        LOG.debug(log_message("Recorded participant snapshot", clan_tag=clan_tag, is_keyframe=is_keyframe, rows=len(rows)))
+        return len(rows)
+
+    @staticmethod
+    def get_keyframe_time(time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG) -> datetime.datetime:
+        """Get the time of the most recent keyframe at or before a point in time.
+
+        Args:
+            time: Point in time to search back from.
+            clan_tag (optional): Clan to search snapshots of. Defaults to primary clan.
+
+        Returns:
+            Time of the keyframe, or None if there is no keyframe before the specified time.
+        """
+        with DB_POOL.cursor() as cursor:
+            cursor.execute("SELECT snapshot_time FROM participant_snapshots\
+                            WHERE clan_tag = %s AND is_keyframe = TRUE AND snapshot_time <= %s\
+                            ORDER BY snapshot_time DESC LIMIT 1",
+                           (clan_tag, bot_utils.datetime_to_battletime(time)))
+            query_result = cursor.fetchone()
+
+        if query_result is None:
+            return None
+
+        return bot_utils.battletime_to_datetime(query_result['snapshot_time'])
+
+    def get_state(self, time: datetime.datetime, clan_tag: str=PRIMARY_CLAN_TAG) -> Dict[str, ParticipantSnapshot]:
+        """Get the values of every participant in a clan at a point in time.
+
+        Args:
+            time: Point in time to get values at.
+            clan_tag (optional): Clan to get participants of. Defaults to primary clan.
+
+        Returns:
+            Dictionary mapping player tags to their values, or empty dict if no snapshots were recorded before that time.
+        """
+        keyframe_time = self.get_keyframe_time(time, clan_tag)
+
+        if keyframe_time is None:
+            return {}
+
+        with DB_POOL.cursor() as cursor:
+            cursor.execute("SELECT d.player_tag, MAX(s.snapshot_time) AS snapshot_time, SUM(d.fame) AS fame,\
+                                   SUM(d.decks_used) AS decks_used, SUM(d.decks_used_today) AS decks_used_today\
+                            FROM participant_deltas d INNER JOIN participant_snapshots s ON d.snapshot_id = s.id\
+                            WHERE s.clan_tag = %s AND s.snapshot_time BETWEEN %s AND %s\
+                            GROUP BY d.player_tag",
+                           (clan_tag, bot_utils.datetime_to_battletime(keyframe_time), bot_utils.datetime_to_battletime(time)))
+            query_result = cursor.fetchall()
+
+        state = {}
+
+        for row in query_result:
+            state[row['player_tag']] = {
+                'player_tag': row['player_tag'],
+                'snapshot_time': bot_utils.battletime_to_datetime(row['snapshot_time']),
+                'fame': int(row['fame']),
+                'decks_used': int(row['decks_used']),
+                'decks_used_today': int(row['decks_used_today'])
+            }
+
+        return state
+
+    def get_history(self,
+                    start_time: datetime.datetime,
+                    end_time: datetime.datetime=None,
+                    player_tag: str=None,
+                    clan_tag: str=PRIMARY_CLAN_TAG) -> List[ParticipantSnapshot]:
+        """Get every recorded change in participant values within a time range.
+
+        Args:
+            start_time: Include changes after this time.
+            end_time (optional): Include changes at or before this time. Defaults to now.
+            player_tag (optional): Only include changes of this player. Includes all players if not specified.
+            clan_tag (optional): Clan to get changes of. Defaults to primary clan.
+
+        Returns:
+            Values of each participant after each change, from oldest to newest.
+        """
+        if end_time is None:
+            end_time = datetime.datetime.now(datetime.timezone.utc)
+
+        current_values = {tag: tuple(snapshot[field] for field in SNAPSHOT_FIELDS)
+                          for tag, snapshot in self.get_state(start_time, clan_tag).items()}
+
+        with DB_POOL.cursor() as cursor:
+            query = "SELECT s.snapshot_time, s.is_keyframe, d.player_tag, d.fame, d.decks_used, d.decks_used_today\
+                     FROM participant_deltas d INNER JOIN participant_snapshots s ON d.snapshot_id = s.id\
+                     WHERE s.clan_tag = %s AND s.snapshot_time > %s AND s.snapshot_time <= %s"
+            args = [clan_tag, bot_utils.datetime_to_battletime(start_time), bot_utils.datetime_to_battletime(end_time)]
+
+            if player_tag is not None:
+                query += " AND d.player_tag = %s"
+                args.append(player_tag)
+
+            cursor.execute(query + " ORDER BY s.snapshot_time, s.id", args)
+            query_result = cursor.fetchall()
+
+        history = []
+
+        for row in query_result:
+            values = tuple(row[field] for field in SNAPSHOT_FIELDS)
+
+            if not row['is_keyframe']:
+                previous_values = current_values.get(row['player_tag'], (0,) * len(SNAPSHOT_FIELDS))
+                values = tuple(previous + delta for previous, delta in zip(previous_values, values))
+            elif values == current_values.get(row['player_tag']):
+                continue
+
+            current_values[row['player_tag']] = values
+            history.append({
+                'player_tag': row['player_tag'],
+                'snapshot_time': bot_utils.battletime_to_datetime(row['snapshot_time']),
+                **dict(zip(SNAPSHOT_FIELDS, values))
+            })
+
+        return history
+
+    def get_deck_usage_times(self,
+                             player_tag: str,
+                             start_time: datetime.datetime,
+                             end_time: datetime.datetime=None,
+                             clan_tag: str=PRIMARY_CLAN_TAG) -> List[Tuple[datetime.datetime, int]]:
+        """Get when a player used their decks within a time range. Times are accurate to the interval between polls.
+
+        Args:
+            player_tag: Player to check.
+            start_time: Include decks used after this time.
+            end_time (optional): Include decks used at or before this time. Defaults to now.
+            clan_tag (optional): Clan that the player is participating in. Defaults to primary clan.
+
+        Returns:
+            List of (time when usage was observed, number of decks used since previous observation) tuples.
+        """
+        start_snapshot = self.get_state(start_time, clan_tag).get(player_tag)
+        previous_decks_used = start_snapshot['decks_used'] if start_snapshot is not None else 0
+        usage_times = []
+
+        for snapshot in self.get_history(start_time, end_time, player_tag, clan_tag):
+            if snapshot['decks_used'] > previous_decks_used:
+                usage_times.append((snapshot['snapshot_time'], snapshot['decks_used'] - previous_decks_used))
+
+            previous_decks_used = snapshot['decks_used']
+
+        return usage_times
+
+    @staticmethod
+    def prune(before: datetime.datetime, clan_tag: str, cursor):
+        """Delete snapshots that are no longer needed to reconstruct values after a point in time.
+
+        Args:
+            before: Values after this time must remain available.
+            clan_tag: Clan to delete snapshots of.
+            cursor: Cursor of an open transaction to perform deletions in.
+        """
+        cursor.execute("SELECT snapshot_time FROM participant_snapshots\
+                        WHERE clan_tag = %s AND is_keyframe = TRUE AND snapshot_time <= %s\
+                        ORDER BY snapshot_time DESC LIMIT 1",
+                       (clan_tag, bot_utils.datetime_to_battletime(before)))
+        query_result = cursor.fetchone()
+
+        if query_result is not None:
+            cursor.execute("DELETE FROM participant_snapshots WHERE clan_tag = %s AND snapshot_time < %s",
+                           (clan_tag, query_result['snapshot_time']))
+
+
+SNAPSHOT_STORE = ParticipantSnapshotStore()
@@ -1,8 +1,9 @@
 """Custom types used by bot."""
 
+from collections.abc import Mapping
 from datetime import datetime
 from enum import auto, Enum
-from typing import Dict, List, Tuple, TypedDict, Union
+from typing import Any, Dict, Iterator, List, Tuple, TypedDict, Union
 
 
 class AutoName(Enum):
@@ -25,8 +26,64 @@ class Status(AutoName):
     DEPARTED = auto()
 
 
-class ClashData(TypedDict):
-    """Dictionary containing data about user from Clash Royale API."""
+class SlottedRecord(Mapping):
+    """Base class of compact records with a fixed set of fields. Fields can be accessed either as attributes or like a
+    dictionary, so records can be used anywhere the equivalent dictionary was expected. Subclasses list their fields in
+    __slots__.
+    """
+    __slots__ = ()
+
+    def __init__(self, **fields: Any):
+        """Create a record.
+
+        Args:
+            fields: Value of every field in __slots__.
+        """
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    def copy(self) -> "SlottedRecord":
+        """Create a shallow copy of the record.
+
+        Returns:
+            New record with the same field values.
+        """
+        return type(self)(**self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record into a dictionary, e.g. to pass it as named query parameters.
+
+        Returns:
+            Dictionary mapping field names to values.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ClashData(SlottedRecord):
+    """Record containing data about user from Clash Royale API."""
+    __slots__ = ("player_tag", "player_name", "role", "exp_level", "trophies", "best_trophies", "cards", "found_cards",
+                 "total_cards", "clan_name", "clan_tag")
     player_tag: str
     player_name: str
     role: str
@@ -40,6 +97,17 @@ class ClashData(TypedDict):
     clan_tag: str
 
 
+class ClanMember(SlottedRecord):
+    """Record containing data about a member of a clan from Clash Royale API."""
+    __slots__ = ("player_tag", "player_name", "role", "exp_level", "trophies", "clan_tag")
+    player_tag: str
+    player_name: str
+    role: str
+    exp_level: int
+    trophies: int
+    clan_tag: str
+
+
 class DiscordData(TypedDict):
     """Dictionary containing Discord data about user."""
     discord_name: str
@@ -47,12 +115,24 @@ class DiscordData(TypedDict):
     status: Status
 
 
-class CombinedData(ClashData, DiscordData):
+class CombinedData(DiscordData):
     """Dictionary containing Clash Royale and Discord data."""
+    player_tag: str
+    player_name: str
+    role: str
+    exp_level: int
+    trophies: int
+    best_trophies: int
+    cards: Dict[int, int]
+    found_cards: int
+    total_cards: int
+    clan_name: str
+    clan_tag: str
 
 
-class Participant(TypedDict):
-    """Dictionary containing data about a participant in a river race."""
+class Participant(SlottedRecord):
+    """Record containing data about a participant in a river race."""
+    __slots__ = ("player_tag", "player_name", "fame", "repair_points", "boat_attacks", "decks_used", "decks_used_today")
     player_tag: str
     player_name: str
     fame: int
@@ -62,8 +142,18 @@ class Participant(TypedDict):
     decks_used_today: int
 
 
-class RiverRaceClan(TypedDict):
-    """Dictionary containing data about a clan's stats in a river race."""
+class ParticipantSnapshot(TypedDict):
+    """Dictionary containing a participant's river race progress at a point in time."""
+    player_tag: str
+    snapshot_time: datetime
+    fame: int
+    decks_used: int
+    decks_used_today: int
+
+
+class RiverRaceClan(SlottedRecord):
+    """Record containing data about a clan's stats in a river race."""
+    __slots__ = ("clan_tag", "clan_name", "fame", "total_decks_used", "decks_used_today", "completed")
     clan_tag: str
     clan_name: str
     fame: int
@@ -72,6 +162,16 @@ class RiverRaceClan(TypedDict):
     completed: bool
 
 
+class SeasonParticipation(TypedDict):
+    """Dictionary containing a player's totals across the archived river races of a season."""
+    player_tag: str
+    player_name: str
+    races: int
+    fame: int
+    decks_used: int
+    boat_attacks: int
+
+
 class DatabaseClan(TypedDict):
     """Dictionary containing data about a clan saved in the river_race_clans table."""
     clan_tag: str
@@ -98,6 +198,20 @@ class RaceStats(TypedDict):
     duel_series_losses: int
 
 
+class BattlelogScanStats(TypedDict):
+    """Dictionary containing counts of how much of a battlelog was examined."""
+    scanned: int
+    skipped: int
+
+
+class BattlelogCheck(TypedDict):
+    """Dictionary containing a player's fame and the river race battles found in their battlelog during a check."""
+    player_tag: str
+    fame: int
+    battles: List[dict]
+    scan_stats: BattlelogScanStats
+
+
 class MatchTypeStats(TypedDict):
     """Dictionary containing a user's stats for a single game mode (e.g. regular matches or boat attacks)."""
     wins: int
@@ -166,3 +280,65 @@ class DecksReport(TypedDict):
     active_members_without_remaining_decks: List[Tuple[str, int]]
     inactive_members_with_decks_used: List[Tuple[str, int]]
     locked_out_active_members: List[Tuple[str, int]]
+
+
+class EndpointStats(TypedDict):
+    """Dictionary containing rolling statistics about calls to a single Clash Royale API endpoint."""
+    endpoint: str
+    calls: int
+    cache_hits: int
+    requests: int
+    latency_p50: float
+    latency_p95: float
+    latency_p99: float
+    status_codes: Dict[str, int]
+
+
+class RoutineStats(TypedDict):
+    """Dictionary containing rolling statistics about the Clash Royale API calls made by a command or automated routine."""
+    routine: str
+    calls: int
+    cache_hits: int
+    requests: int
+
+
+class PoolStats(TypedDict):
+    """Dictionary containing the state of the database connection pool and counts of what it has done."""
+    max_size: int
+    open: int
+    idle: int
+    in_use: int
+    peak_in_use: int
+    acquired: int
+    reused: int
+    opened: int
+    closed: int
+    recycled: int
+    failed_health_checks: int
+    waits: int
+    timeouts: int
+
+
+class ExecutorStats(TypedDict):
+    """Dictionary containing the queue depth of the database executor and timings of its recent jobs in seconds."""
+    workers: int
+    queued: int
+    running: int
+    peak_queued: int
+    submitted: int
+    completed: int
+    failed: int
+    cancelled: int
+    wait_p50: float
+    wait_p95: float
+    wait_max: float
+    run_p50: float
+    run_p95: float
+    run_max: float
+
+
+class ExecutorFunctionStats(TypedDict):
+    """Dictionary containing how many times a function ran on the database executor and its total run time in seconds."""
+    function: str
+    calls: int
+    run_time: float
@@ -177,6 +177,58 @@ CREATE TABLE `match_history_season` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `participant_deltas`
+--
+
+DROP TABLE IF EXISTS `participant_deltas`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `participant_deltas` (
+  `snapshot_id` int NOT NULL,
+  `player_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `fame` int NOT NULL,
+  `decks_used` int NOT NULL,
+  `decks_used_today` int NOT NULL,
+  PRIMARY KEY (`snapshot_id`,`player_tag`),
+  KEY `player_tag` (`player_tag`),
+  CONSTRAINT `participant_deltas_ibfk_1` FOREIGN KEY (`snapshot_id`) REFERENCES `participant_snapshots` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `participant_snapshots`
+--
+
+DROP TABLE IF EXISTS `participant_snapshots`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `participant_snapshots` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `snapshot_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `is_keyframe` tinyint(1) NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `clan_tag_snapshot_time` (`clan_tag`,`snapshot_time`)
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `processed_battles`
+--
+
+DROP TABLE IF EXISTS `processed_battles`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `processed_battles` (
+  `fingerprint` char(40) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `player_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `battle_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  PRIMARY KEY (`fingerprint`),
+  KEY `player_tag_battle_time` (`player_tag`,`battle_time`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `race_reset_times`
 --
@@ -185,21 +237,15 @@ DROP TABLE IF EXISTS `race_reset_times`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!50503 SET character_set_client = utf8mb4 */;
 CREATE TABLE `race_reset_times` (
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `thursday` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `friday` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `saturday` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `sunday` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
-  PRIMARY KEY (`thursday`,`friday`,`saturday`,`sunday`)
+  PRIMARY KEY (`clan_tag`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
-INSERT INTO `race_reset_times` VALUES (
-  '21000101T000000.000Z',
-  '21000101T000000.000Z',
-  '21000101T000000.000Z',
-  '21000101T000000.000Z'
-);
-
 --
 -- Table structure for table `race_status`
 --
@@ -208,16 +254,32 @@ DROP TABLE IF EXISTS `race_status`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!50503 SET character_set_client = utf8mb4 */;
 CREATE TABLE `race_status` (
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `completed_saturday` tinyint(1) NOT NULL,
   `colosseum_week` tinyint(1) NOT NULL,
   `war_time` tinyint(1) NOT NULL,
   `last_check_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `reset_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
-  PRIMARY KEY (`completed_saturday`,`colosseum_week`,`war_time`,`last_check_time`,`reset_time`)
+  `detected_reset_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL,
+  PRIMARY KEY (`clan_tag`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
-INSERT INTO `race_status` VALUES (0, 0, 0, '21000101T000000.000Z', '21000101T000000.000Z');
+--
+-- Table structure for table `reset_snapshots`
+--
+
+DROP TABLE IF EXISTS `reset_snapshots`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `reset_snapshots` (
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `player_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `decks_used_today` int NOT NULL,
+  `snapshot_time` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  PRIMARY KEY (`clan_tag`,`player_tag`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
 
 --
 -- Table structure for table `river_race_clans`
@@ -227,6 +289,7 @@ DROP TABLE IF EXISTS `river_race_clans`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!50503 SET character_set_client = utf8mb4 */;
 CREATE TABLE `river_race_clans` (
+  `tracked_clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `clan_name` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `fame` int NOT NULL,
@@ -234,8 +297,68 @@ CREATE TABLE `river_race_clans` (
   `total_decks_used` int NOT NULL,
   `war_decks_used` int NOT NULL,
   `num_days` int NOT NULL,
-  PRIMARY KEY (`clan_tag`),
-  UNIQUE KEY `clan_tag` (`clan_tag`)
+  PRIMARY KEY (`tracked_clan_tag`,`clan_tag`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `river_race_log`
+--
+
+DROP TABLE IF EXISTS `river_race_log`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `river_race_log` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `season_id` int NOT NULL,
+  `section_index` int NOT NULL,
+  `created_date` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `clan_tag_created_date` (`clan_tag`,`created_date`),
+  KEY `clan_tag_season_id` (`clan_tag`,`season_id`)
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `river_race_log_participants`
+--
+
+DROP TABLE IF EXISTS `river_race_log_participants`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `river_race_log_participants` (
+  `race_id` int NOT NULL,
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `player_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `player_name` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `fame` int NOT NULL,
+  `repair_points` int NOT NULL,
+  `boat_attacks` int NOT NULL,
+  `decks_used` int NOT NULL,
+  `decks_used_today` int NOT NULL,
+  PRIMARY KEY (`race_id`,`clan_tag`,`player_tag`),
+  KEY `player_tag` (`player_tag`),
+  CONSTRAINT `river_race_log_participants_ibfk_1` FOREIGN KEY (`race_id`) REFERENCES `river_race_log` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `river_race_log_standings`
+--
+
+DROP TABLE IF EXISTS `river_race_log_standings`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `river_race_log_standings` (
+  `race_id` int NOT NULL,
+  `clan_tag` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `clan_name` varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `clan_rank` int NOT NULL,
+  `trophy_change` int NOT NULL,
+  `fame` int NOT NULL,
+  PRIMARY KEY (`race_id`,`clan_tag`),
+  CONSTRAINT `river_race_log_standings_ibfk_1` FOREIGN KEY (`race_id`) REFERENCES `river_race_log` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
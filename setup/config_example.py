@@ -31,6 +31,25 @@ TIME_OFF_CHANNEL_NAME = "time-off"
 PRIMARY_CLAN_NAME = ""
 PRIMARY_CLAN_TAG = ""
 
+# Tags of other clans in the same family, e.g. ["#ABC123", "#XYZ123"]. Members of these clans are treated as active members and
+# their river races are tracked alongside the primary clan's. Leave empty to only track the primary clan.
+CLAN_FAMILY_TAGS = []
+
+# Clash Royale API. Change this to point the bot at a local stand-in server (see tools/mock_api.py).
+CLASH_API_BASE_URL = "https://api.clashroyale.com/v1"
+
+# Path of a SQLite file that API responses are cached in so that they are still available after a restart. Leave blank to only
+# cache responses in memory.
+API_CACHE_PATH = ""
+
+# Seconds before scheduled jobs (reminders and strikes) that the clans' members and river races are fetched so
+# that the jobs run from the cache. Must be between 1 and 59 so that the responses are still fresh when the jobs start.
+CACHE_PREWARM_LEAD_TIME = 30
+
+# Seconds that a player's profile is reused after it is fetched, e.g. when a player is looked up by several commands in a row.
+# Set to 0 to always fetch profiles.
+PLAYER_PROFILE_TTL = 600
+
 #Reactions
 CONFIRM_EMOJI = "✅"
 DECLINE_EMOJI = "❌"
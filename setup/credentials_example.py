@@ -1,6 +1,6 @@
 # This file is used to store credentials needed to use this bot.
 # Provide required information and rename file to credentials.py.
-# All fields should be strings.
+# All fields should be strings, except CLASH_API_KEYS which is a list of strings.
 
 # Discord
 BOT_TOKEN = ""
@@ -8,6 +8,9 @@ BOT_TOKEN = ""
 # Clash
 CLASH_API_KEY = ""
 
+# Additional API keys, e.g. ["key2", "key3"]. Requests are spread across CLASH_API_KEY and these keys.
+CLASH_API_KEYS = []
+
 # Database
 IP = ""
 USERNAME = ""
@@ -170,6 +170,12 @@ echo "PRIMARY_CLAN_NAME = \"$input\"" >> config.py
 echo -e "Clan tag (include # symbol): \c"
 read input
 echo "PRIMARY_CLAN_TAG = \"$input\"" >> config.py
+echo "CLAN_FAMILY_TAGS = []" >> config.py
+echo "" >> config.py
+echo "CLASH_API_BASE_URL = \"https://api.clashroyale.com/v1\"" >> config.py
+echo "API_CACHE_PATH = \"api_cache.sqlite3\"" >> config.py
+echo "CACHE_PREWARM_LEAD_TIME = 30" >> config.py
+echo "PLAYER_PROFILE_TTL = 600" >> config.py
 
 # Provide default emojis and reminder message
 echo "CONFIRM_EMOJI = \"✅\"" >> config.py
@@ -187,6 +193,7 @@ echo "BOT_TOKEN = \"$input\"" > credentials.py
 echo -e "Clash Royale API key: \c"
 read input
 echo "CLASH_API_KEY = \"$input\"" >> credentials.py
+echo "CLASH_API_KEYS = []" >> credentials.py
 
 echo -e "Database IP: \c"
 read database_ip
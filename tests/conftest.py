@@ -0,0 +1,89 @@
+"""Shared setup of the unit tests.
+
+The bot's modules are imported the same way the bot imports them, with the bot directory on the path. The example settings in
+setup/ stand in for the config files that the setup script generates, so the tests behave the same whether or not the bot has
+been configured. Tests run from a scratch directory so that the log file isn't written into the tree. Nothing here connects to
+MySQL, Discord, or the Clash Royale API.
+"""
+
+import atexit
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_DIR = os.path.join(REPO_DIR, "bot")
+SETUP_DIR = os.path.join(REPO_DIR, "setup")
+
+
+def load_example_config(name: str):
+    """Register one of the example config files as the config module of the same name.
+
+    Args:
+        name: Name of the config module, e.g. "credentials" for setup/credentials_example.py.
+    """
+    spec = importlib.util.spec_from_file_location(f"config.{name}", os.path.join(SETUP_DIR, f"{name}_example.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+
+def prepare_work_dir() -> str:
+    """Create a scratch directory laid out like the bot directory, with the logging config and a logs directory. It is removed
+    when the tests finish.
+
+    Returns:
+        Path of the directory.
+    """
+    work_dir = tempfile.mkdtemp(prefix="clashbot-tests-")
+    atexit.register(shutil.rmtree, work_dir, ignore_errors=True)
+    os.makedirs(os.path.join(work_dir, "config"))
+    os.makedirs(os.path.join(work_dir, "logs"))
+    shutil.copy(os.path.join(BOT_DIR, "config", "logging_config.json"), os.path.join(work_dir, "config"))
+    return work_dir
+
+
+sys.path.insert(0, BOT_DIR)
+
+for config_name in ("blacklist", "config", "credentials"):
+    load_example_config(config_name)
+
+os.chdir(prepare_work_dir())
+
+
+class FakeClock:
+    """Stand-in for the time module of a module under test. Time only moves when the test advances it."""
+
+    def __init__(self, start: float=1_000_000.0):
+        """Create a clock.
+
+        Args:
+            start (optional): Initial value returned by both time and monotonic.
+        """
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        """Move the clock forward.
+
+        Args:
+            seconds: Seconds to move forward by.
+        """
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Clock to patch in as the time module of the module under test, e.g.
+    monkeypatch.setattr(cache_utils, "time", clock).
+    """
+    return FakeClock()
@@ -0,0 +1,93 @@
+"""Tests of the API client's helpers and circuit breaker."""
+
+import utils.api_utils as api_utils
+from utils.api_utils import MAX_RETRY_WAIT, RETRY_BACKOFF, CircuitBreaker, CircuitState, encode_tag, retry_delay
+
+
+def make_breaker(monkeypatch, clock) -> CircuitBreaker:
+    """Create a breaker that uses the test's clock and opens after 3 failures for 10 to 40 seconds."""
+    monkeypatch.setattr(api_utils, "time", clock)
+    return CircuitBreaker(failure_threshold=3, open_duration=10, max_open_duration=40)
+
+
+def open_circuit(breaker: CircuitBreaker):
+    """Fail enough requests in a row to open a closed circuit."""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_encode_tag():
+    assert encode_tag("#ABC123") == "%23ABC123"
+
+
+def test_retry_delay_uses_retry_after_header():
+    assert retry_delay("2.5", 0) == 2.5
+    assert retry_delay("-1", 0) == 0
+    assert retry_delay(str(MAX_RETRY_WAIT * 2), 0) == MAX_RETRY_WAIT
+
+
+def test_retry_delay_backs_off_exponentially_without_header():
+    assert retry_delay(None, 0) == RETRY_BACKOFF
+    assert retry_delay(None, 2) == RETRY_BACKOFF * 4
+    assert retry_delay("soon", 1) == RETRY_BACKOFF * 2
+    assert retry_delay(None, 100) == MAX_RETRY_WAIT
+
+
+def test_circuit_opens_after_consecutive_failures(monkeypatch, clock):
+    breaker = make_breaker(monkeypatch, clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_open_circuit_allows_one_probe_after_open_duration(monkeypatch, clock):
+    breaker = make_breaker(monkeypatch, clock)
+    open_circuit(breaker)
+
+    clock.advance(9)
+    assert not breaker.allow_request()
+
+    clock.advance(1)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_failed_probes_double_open_duration_up_to_max(monkeypatch, clock):
+    breaker = make_breaker(monkeypatch, clock)
+    open_circuit(breaker)
+
+    for expected_duration in (20, 40, 40):
+        clock.advance(breaker.open_duration)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.open_duration == expected_duration
+
+    clock.advance(39)
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes_circuit(monkeypatch, clock):
+    breaker = make_breaker(monkeypatch, clock)
+    open_circuit(breaker)
+    clock.advance(10)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    clock.advance(20)
+    assert breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.open_duration == 10
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow_request()
+    assert breaker.allow_request()
@@ -0,0 +1,215 @@
+"""Tests of the API response cache."""
+
+import re
+
+import utils.cache_utils as cache_utils
+from utils.cache_utils import MAX_STALE_AGE, CacheEntry, ProfileCache, ResponseCache, ResponseStore
+
+TTL_POLICY = [
+    (re.compile(r"^/clans/[^/]+/members$"), 60),
+    (re.compile(r"^/players/[^/]+$"), 0),
+]
+
+
+def make_cache(monkeypatch, clock, **kwargs) -> ResponseCache:
+    """Create a cache that uses the test's clock and TTL_POLICY."""
+    monkeypatch.setattr(cache_utils, "time", clock)
+    return ResponseCache(ttl_policy=TTL_POLICY, **kwargs)
+
+
+def make_store(tmp_path) -> ResponseStore:
+    """Create a store whose background thread never flushes on its own during a test."""
+    return ResponseStore(str(tmp_path / "responses.sqlite"), flush_interval=60 * 60)
+
+
+def stored_keys(store: ResponseStore) -> list:
+    """Get the keys of every row written to a store's file."""
+    return [key for key, in store.connection.execute("SELECT cache_key FROM responses ORDER BY cache_key")]
+
+
+def test_make_key_sorts_params():
+    assert ResponseCache.make_key("/cards") == "/cards"
+    assert ResponseCache.make_key("/clans/%23ABC/riverracelog", {"limit": 5, "after": "x"}) == \
+        "/clans/%23ABC/riverracelog?after=x&limit=5"
+
+
+def test_fresh_response_is_served_until_it_expires(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock)
+    cache.put("/clans/%23ABC/members", None, {"items": []}, 10)
+
+    assert cache.get("/clans/%23ABC/members") == {"items": []}
+
+    clock.advance(60)
+    assert cache.get("/clans/%23ABC/members") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_response_is_served_stale_until_max_stale_age(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock)
+    cache.put("/clans/%23ABC/members", None, {"items": []}, 10)
+
+    clock.advance(120)
+    entry = cache.get_stale("/clans/%23ABC/members")
+    assert entry.payload == {"items": []}
+    assert entry.age() == 120
+
+    clock.advance(MAX_STALE_AGE)
+    assert cache.get_stale("/clans/%23ABC/members") is None
+
+
+def test_uncacheable_and_oversized_responses_are_not_stored(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock, max_bytes=100)
+    cache.put("/players/%23ABC", None, {"tag": "#ABC"}, 10)
+    cache.put("/cards", None, {"items": []}, 10)
+    cache.put("/clans/%23ABC/members", None, {"items": []}, 101)
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock, max_entries=2)
+    cache.put("/clans/%23A/members", None, "A", 1)
+    cache.put("/clans/%23B/members", None, "B", 1)
+    cache.get("/clans/%23A/members")
+    cache.put("/clans/%23C/members", None, "C", 1)
+
+    assert cache.get("/clans/%23A/members") == "A"
+    assert cache.get("/clans/%23B/members") is None
+    assert cache.get("/clans/%23C/members") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_are_evicted_to_stay_within_max_bytes(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock, max_bytes=100)
+    cache.put("/clans/%23A/members", None, "A", 60)
+    cache.put("/clans/%23B/members", None, "B", 30)
+    cache.put("/clans/%23C/members", None, "C", 30)
+
+    assert cache.get("/clans/%23A/members") is None
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 60
+
+
+def test_replacing_an_entry_updates_its_size(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock)
+    cache.put("/clans/%23A/members", None, "old", 60)
+    cache.put("/clans/%23A/members", None, "new", 20)
+
+    assert cache.get("/clans/%23A/members") == "new"
+    assert cache.stats()["bytes"] == 20
+
+
+def test_invalidate_by_prefix(monkeypatch, clock):
+    cache = make_cache(monkeypatch, clock)
+    cache.put("/clans/%23A/members", None, "A", 1)
+    cache.put("/clans/%23B/members", None, "B", 1)
+
+    assert cache.invalidate("/clans/%23A") == 1
+    assert cache.get("/clans/%23B/members") == "B"
+    assert cache.invalidate() == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_store_writes_queued_changes_in_one_flush(tmp_path):
+    store = make_store(tmp_path)
+    store.save("a", CacheEntry({"value": 1}, 10, 60))
+    store.save("b", CacheEntry({"value": 2}, 10, 60))
+    store.save("a", CacheEntry({"value": 3}, 10, 60))
+
+    assert stored_keys(store) == []
+    assert store.flush() == 2
+    assert stored_keys(store) == ["a", "b"]
+    assert store.flush() == 0
+
+    store.delete(["a"])
+    assert store.flush() == 1
+    assert stored_keys(store) == ["b"]
+    store.close()
+
+
+def test_store_close_writes_pending_changes(tmp_path):
+    store = make_store(tmp_path)
+    store.save("a", CacheEntry({"value": 1}, 10, 60))
+    store.close()
+
+    reopened = make_store(tmp_path)
+    assert [(key, entry.payload) for key, entry in reopened.load()] == [("a", {"value": 1})]
+    reopened.close()
+
+
+def test_store_load_discards_entries_older_than_max_stale_age(monkeypatch, clock, tmp_path):
+    monkeypatch.setattr(cache_utils, "time", clock)
+    store = make_store(tmp_path)
+    store.save("old", CacheEntry("old", 10, 60, stored_at=clock.now - MAX_STALE_AGE - 1))
+    store.save("new", CacheEntry("new", 10, 60, stored_at=clock.now - 120))
+    store.flush()
+
+    entries = dict(store.load())
+    assert list(entries) == ["new"]
+    assert entries["new"].age() == 120
+    assert not entries["new"].is_fresh()
+    assert stored_keys(store) == ["new"]
+    store.close()
+
+
+def test_cache_loads_from_store_and_queues_evictions(monkeypatch, clock, tmp_path):
+    store = make_store(tmp_path)
+    cache = make_cache(monkeypatch, clock, max_entries=2, store=store)
+    cache.put("/clans/%23A/members", None, "A", 1)
+    cache.put("/clans/%23B/members", None, "B", 1)
+    store.flush()
+    cache.put("/clans/%23C/members", None, "C", 1)
+    store.flush()
+    assert stored_keys(store) == ["/clans/%23B/members", "/clans/%23C/members"]
+
+    reloaded = make_cache(monkeypatch, clock, store=store)
+    assert reloaded.get("/clans/%23B/members") == "B"
+    assert reloaded.get("/clans/%23C/members") == "C"
+    store.close()
+
+
+def test_profile_cache_expires_profiles_after_ttl(monkeypatch, clock):
+    monkeypatch.setattr(cache_utils, "time", clock)
+    cache = ProfileCache(ttl=600)
+    cache.put("#A", "profile")
+
+    clock.advance(599)
+    assert cache.get("#A") == "profile"
+
+    clock.advance(1)
+    assert cache.get("#A") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 0}
+
+
+def test_profile_cache_evicts_least_recently_used_profile():
+    cache = ProfileCache(ttl=600, max_entries=2)
+    cache.put("#A", "A")
+    cache.put("#B", "B")
+    cache.get("#A")
+    cache.put("#C", "C")
+
+    assert cache.get("#B") is None
+    assert cache.get("#A") == "A"
+    assert cache.get("#C") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_profile_cache_is_disabled_by_ttl_of_zero():
+    cache = ProfileCache(ttl=0)
+    cache.put("#A", "A")
+
+    assert cache.get("#A") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_profile_cache_invalidate():
+    cache = ProfileCache(ttl=600)
+    cache.put("#A", "A")
+    cache.put("#B", "B")
+
+    assert cache.invalidate("#A") == 1
+    assert cache.invalidate("#A") == 0
+    assert cache.get("#B") == "B"
+    assert cache.invalidate() == 1
+    assert cache.get("#B") is None
@@ -0,0 +1,100 @@
+"""Tests of identifying battles found in battlelogs and of reading the most recently completed river race."""
+
+import asyncio
+import datetime
+
+import utils.clash_utils as clash_utils
+import utils.race_log_utils as race_log_utils
+from utils.clash_utils import battle_fingerprint
+
+
+def make_battle(battle_time: str="20220101T100000.000Z", opponent_tag: str="#B") -> dict:
+    """Create a battle as it appears in a battlelog."""
+    return {"type": "riverRacePvP", "battleTime": battle_time, "opponent": [{"tag": opponent_tag, "crowns": 1}]}
+
+
+def test_same_battle_has_same_fingerprint():
+    battle = make_battle()
+    refetched_battle = {**make_battle(), "team": [{"tag": "#A", "crowns": 3}]}
+    assert battle_fingerprint("#A", battle) == battle_fingerprint("#A", refetched_battle)
+
+
+def test_fingerprint_depends_on_time_player_and_opponent():
+    fingerprints = {
+        battle_fingerprint("#A", make_battle()),
+        battle_fingerprint("#C", make_battle()),
+        battle_fingerprint("#A", make_battle(opponent_tag="#C")),
+        battle_fingerprint("#A", make_battle(battle_time="20220101T100500.000Z")),
+    }
+    assert len(fingerprints) == 4
+
+
+def test_battle_without_opponent_has_fingerprint():
+    battle = {"type": "boatBattle", "battleTime": "20220101T100000.000Z", "opponent": []}
+    assert battle_fingerprint("#A", battle) == battle_fingerprint("#A", {"battleTime": "20220101T100000.000Z"})
+
+
+class FakeRaceLog:
+    """Stand-in for the river race log archive and the API's river race log."""
+
+    def __init__(self, archived: list, new: list=None):
+        """Create a log.
+
+        Args:
+            archived: Created dates of the archived races.
+            new (optional): Created dates of the races that a successful sync archives.
+        """
+        self.archived = list(archived)
+        self.new = new
+        self.syncs = 0
+
+    def get_latest_created_date(self, clan_tag: str) -> str:
+        return max(self.archived, default=None)
+
+    async def sync_river_race_log(self, clan_tag: str) -> int:
+        self.syncs += 1
+
+        if self.new is None:
+            return 0
+
+        self.archived.extend(self.new)
+        return len(self.new)
+
+
+def use_race_log(monkeypatch, race_log: FakeRaceLog):
+    """Archive races in a fake log for a race that started at the reset on January 6th, 2022."""
+    async def get_river_race_reset_times(clan_tag: str) -> dict:
+        return {"thursday": datetime.datetime(2022, 1, 6, 9, 35)}
+
+    async def run(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr(clash_utils.ASYNC_DB, "get_river_race_reset_times", get_river_race_reset_times, raising=False)
+    monkeypatch.setattr(clash_utils.DB_EXECUTOR, "run", run)
+    monkeypatch.setattr(race_log_utils, "get_latest_created_date", race_log.get_latest_created_date)
+    monkeypatch.setattr(race_log_utils, "sync_river_race_log", race_log.sync_river_race_log)
+
+
+def test_archived_race_that_ended_after_race_start_is_used_without_syncing(monkeypatch):
+    race_log = FakeRaceLog(["20220103T093500.000Z", "20220110T093500.000Z"])
+    use_race_log(monkeypatch, race_log)
+
+    assert asyncio.run(clash_utils.archive_last_river_race("#CLAN"))
+    assert race_log.syncs == 0
+
+
+def test_race_is_synced_when_archive_only_has_older_races(monkeypatch):
+    race_log = FakeRaceLog(["20220103T093500.000Z"], ["20220110T093500.000Z"])
+    use_race_log(monkeypatch, race_log)
+
+    assert asyncio.run(clash_utils.archive_last_river_race("#CLAN"))
+    assert race_log.syncs == 1
+
+
+def test_older_race_is_not_used_when_sync_fails(monkeypatch):
+    race_log = FakeRaceLog(["20220103T093500.000Z"])
+    use_race_log(monkeypatch, race_log)
+
+    assert asyncio.run(clash_utils.get_last_river_race_participants("#CLAN")) == []
+    assert asyncio.run(clash_utils.get_clans_in_race(True, "#CLAN")) == []
+    assert race_log.syncs == 2
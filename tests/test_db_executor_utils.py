@@ -0,0 +1,138 @@
+"""Tests of the executor that runs database work off of the event loop."""
+
+import asyncio
+import threading
+
+import pytest
+
+import utils.db_utils as db_utils
+from utils.db_executor_utils import AsyncDatabase, DatabaseExecutor
+from utils.logging_utils import CURRENT_ROUTINE
+
+
+@pytest.fixture
+def executor() -> DatabaseExecutor:
+    """Executor with a single thread, shut down after the test."""
+    executor = DatabaseExecutor(workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_result_from_executor_thread(executor):
+    def query(value: int, offset: int=0) -> tuple:
+        return value + offset, threading.current_thread().name
+
+    result, thread_name = asyncio.run(executor.run(query, 1, offset=2))
+    assert result == 3
+    assert thread_name.startswith("db")
+    assert executor.stats()["completed"] == 1
+
+
+def test_run_raises_exceptions_of_function(executor):
+    def query():
+        raise ValueError("bad query")
+
+    with pytest.raises(ValueError, match="bad query"):
+        asyncio.run(executor.run(query))
+
+    assert executor.stats()["failed"] == 1
+
+
+def test_function_runs_in_callers_context(executor):
+    async def run_as_command():
+        CURRENT_ROUTINE.set("test_command")
+        return await executor.run(CURRENT_ROUTINE.get)
+
+    assert asyncio.run(run_as_command()) == "test_command"
+    assert CURRENT_ROUTINE.get() == "other"
+
+
+def test_jobs_queue_while_every_thread_is_busy(executor):
+    started = threading.Event()
+    finish = threading.Event()
+
+    def blocking_query():
+        started.set()
+        finish.wait(5)
+
+    async def run_jobs():
+        first = asyncio.ensure_future(executor.run(blocking_query))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second = asyncio.ensure_future(executor.run(len, [1, 2]))
+        await asyncio.sleep(0)
+        queued = executor.stats()["queued"]
+        finish.set()
+        await first
+        return queued, await second
+
+    queued, result = asyncio.run(run_jobs())
+    stats = executor.stats()
+    assert queued == 1
+    assert result == 2
+    assert stats["peak_queued"] == 1
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    assert stats["completed"] == 2
+
+
+def test_cancelled_job_leaves_queue_without_running(executor):
+    started = threading.Event()
+    finish = threading.Event()
+    ran = []
+
+    def blocking_query():
+        started.set()
+        finish.wait(5)
+
+    async def run_jobs():
+        first = asyncio.ensure_future(executor.run(blocking_query))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second = asyncio.ensure_future(executor.run(ran.append, True))
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        finish.set()
+        await first
+
+    asyncio.run(run_jobs())
+    assert ran == []
+    assert executor.stats()["cancelled"] == 1
+    assert executor.stats()["queued"] == 0
+
+
+def test_function_stats_orders_by_total_run_time(executor):
+    def slow_query():
+        threading.Event().wait(0.02)
+
+    async def run_jobs():
+        await executor.run(slow_query)
+        await executor.run(len, [])
+        await executor.run(len, [])
+
+    asyncio.run(run_jobs())
+    function_stats = executor.function_stats()
+    assert [stats["function"] for stats in function_stats] == ["slow_query", "len"]
+    assert [stats["calls"] for stats in function_stats] == [1, 2]
+
+
+def test_async_database_wraps_synchronous_functions(monkeypatch):
+    def get_answer(question: str) -> str:
+        return f"{question}: {threading.current_thread().name}"
+
+    monkeypatch.setattr(db_utils, "get_answer", get_answer, raising=False)
+    async_db = AsyncDatabase()
+    wrapper = async_db.get_answer
+
+    assert asyncio.run(wrapper("thread")).startswith("thread: db")
+    assert async_db.get_answer is wrapper
+    assert wrapper.__name__ == "get_answer"
+
+
+def test_async_database_rejects_coroutines_and_unknown_names():
+    async_db = AsyncDatabase()
+
+    with pytest.raises(AttributeError):
+        async_db.kick_user
+
+    with pytest.raises(AttributeError):
+        async_db.not_a_function
@@ -0,0 +1,208 @@
+"""Tests of the database connection pool."""
+
+import threading
+
+import pymysql
+import pytest
+
+import utils.db_pool_utils as db_pool_utils
+from utils.db_pool_utils import ConnectionPool
+
+
+class FakeConnection:
+    """Stand-in for a pymysql connection that records what was done with it."""
+
+    def __init__(self, number: int):
+        """Create an open connection.
+
+        Args:
+            number: Order in which the connection was opened.
+        """
+        self.number = number
+        self.closed = False
+        self.healthy = True
+        self.rollback_fails = False
+        self.pings = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def ping(self, reconnect: bool=True):
+        self.pings += 1
+
+        if not self.healthy:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def cursor(self, cursor_class: type=None) -> str:
+        return f"cursor of connection {self.number}"
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+        if self.rollback_fails:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    """Connect function that opens fake connections and keeps track of them."""
+
+    def __init__(self):
+        """Create a connector that hasn't opened anything yet."""
+        self.connections = []
+        self.fail = False
+
+    def __call__(self) -> FakeConnection:
+        if self.fail:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+
+        connection = FakeConnection(len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def connector() -> FakeConnector:
+    """Connector to pass to ConnectionPool as connect_func."""
+    return FakeConnector()
+
+
+def make_pool(monkeypatch, clock, connector: FakeConnector, **kwargs) -> ConnectionPool:
+    """Create a pool that uses the test's clock and connector."""
+    monkeypatch.setattr(db_pool_utils, "time", clock)
+    return ConnectionPool(connect_func=connector, recycle=3600, health_check_interval=30, **kwargs)
+
+
+def test_released_connections_are_reused_most_recent_first(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    assert pool.acquire() is second
+    assert pool.acquire() is first
+    assert len(connector.connections) == 2
+
+    stats = pool.stats()
+    assert stats["opened"] == 2
+    assert stats["reused"] == 2
+    assert stats["in_use"] == 2
+    assert stats["peak_in_use"] == 2
+
+
+def test_old_connections_are_recycled(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+    pool.release(pool.acquire())
+    clock.advance(3600)
+
+    pooled = pool.acquire()
+    assert pooled.connection is connector.connections[1]
+    assert connector.connections[0].closed
+    assert pool.stats()["recycled"] == 1
+    assert pool.stats()["open"] == 1
+
+
+def test_idle_connections_are_pinged_before_reuse(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+    pool.release(pool.acquire())
+    clock.advance(29)
+    pool.release(pool.acquire())
+    assert connector.connections[0].pings == 0
+
+    clock.advance(30)
+    pool.release(pool.acquire())
+    assert connector.connections[0].pings == 1
+
+    connector.connections[0].healthy = False
+    clock.advance(30)
+    pooled = pool.acquire()
+    assert pooled.connection is connector.connections[1]
+    assert connector.connections[0].closed
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted(connector):
+    pool = ConnectionPool(connect_func=connector, max_size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    assert pool.stats()["waits"] == 1
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiting_acquire_gets_released_connection(connector):
+    pool = ConnectionPool(connect_func=connector, max_size=1, timeout=5)
+    pooled = pool.acquire()
+    releaser = threading.Timer(0.05, pool.release, (pooled,))
+    releaser.start()
+
+    assert pool.acquire() is pooled
+    releaser.join()
+    assert len(connector.connections) == 1
+
+
+def test_failed_connect_frees_its_slot(connector):
+    pool = ConnectionPool(connect_func=connector, max_size=1, timeout=0.05)
+    connector.fail = True
+
+    with pytest.raises(pymysql.Error):
+        pool.acquire()
+
+    connector.fail = False
+    assert pool.acquire().connection is connector.connections[0]
+
+
+def test_cursor_commits_and_returns_connection(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+
+    with pool.cursor() as cursor:
+        assert cursor == "cursor of connection 0"
+
+    assert connector.connections[0].commits == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_cursor_rolls_back_on_exception(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+
+    with pytest.raises(ValueError):
+        with pool.cursor():
+            raise ValueError
+
+    connection = connector.connections[0]
+    assert connection.commits == 0
+    assert connection.rollbacks == 1
+    assert not connection.closed
+    assert pool.stats()["idle"] == 1
+
+
+def test_connection_that_fails_to_roll_back_is_closed(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+    pool.release(pool.acquire())
+    connector.connections[0].rollback_fails = True
+
+    with pytest.raises(ValueError):
+        with pool.cursor():
+            raise ValueError
+
+    assert connector.connections[0].closed
+    assert pool.stats()["open"] == 0
+    assert pool.stats()["idle"] == 0
+
+
+def test_close_closes_idle_connections(monkeypatch, clock, connector):
+    pool = make_pool(monkeypatch, clock, connector)
+    in_use = pool.acquire()
+    pool.release(pool.acquire())
+    pool.close()
+
+    assert [connection.closed for connection in connector.connections] == [False, True]
+    assert pool.stats()["open"] == 1
+    pool.release(in_use)
@@ -0,0 +1,88 @@
+"""Tests of database functions that can run against a fake cursor."""
+
+import contextlib
+
+import utils.db_utils as db_utils
+from utils.clash_utils import battle_fingerprint
+from utils.db_utils import record_processed_battles
+from utils.util_types import RiverRaceClan
+
+
+class FakeLedgerCursor:
+    """Cursor that only supports the INSERT IGNORE into processed_battles, backed by a set of fingerprints."""
+
+    def __init__(self, fingerprints: set=None):
+        """Create a cursor.
+
+        Args:
+            fingerprints (optional): Fingerprints already in the ledger.
+        """
+        self.fingerprints = set() if fingerprints is None else fingerprints
+        self.rowcount = 0
+
+    def execute(self, query: str, args: tuple):
+        assert query.startswith("INSERT IGNORE INTO processed_battles")
+        self.rowcount = 0 if args[0] in self.fingerprints else 1
+        self.fingerprints.add(args[0])
+
+
+def make_battle(battle_time: str) -> dict:
+    """Create a river race battle fought at the specified time."""
+    return {"type": "riverRacePvP", "battleTime": battle_time, "opponent": [{"tag": "#B"}]}
+
+
+def test_only_battles_missing_from_ledger_are_returned():
+    counted_battle = make_battle("20220101T100000.000Z")
+    new_battle = make_battle("20220101T110000.000Z")
+    cursor = FakeLedgerCursor({battle_fingerprint("#A", counted_battle)})
+
+    assert record_processed_battles(cursor, "#A", [counted_battle, new_battle]) == [new_battle]
+    assert record_processed_battles(cursor, "#A", [counted_battle, new_battle]) == []
+
+
+def test_ledger_is_per_player():
+    battle = make_battle("20220101T100000.000Z")
+    cursor = FakeLedgerCursor()
+
+    assert record_processed_battles(cursor, "#A", [battle]) == [battle]
+    assert record_processed_battles(cursor, "#C", [battle]) == [battle]
+
+
+class FakeRecordingCursor:
+    """Cursor that records the arguments of every statement it executes."""
+
+    def __init__(self):
+        """Create a cursor that hasn't executed anything."""
+        self.executed = []
+
+    def execute(self, query: str, args: tuple):
+        self.executed.append(args)
+
+
+class FakePool:
+    """Pool whose cursor is always the same fake cursor."""
+
+    def __init__(self, cursor: FakeRecordingCursor):
+        """Create a pool.
+
+        Args:
+            cursor: Cursor to hand out.
+        """
+        self.fake_cursor = cursor
+
+    @contextlib.contextmanager
+    def cursor(self):
+        yield self.fake_cursor
+
+
+def test_clans_without_saved_info_are_skipped(monkeypatch):
+    cursor = FakeRecordingCursor()
+    saved_clan_info = {"#B": {"fame": 100, "total_decks_used": 10}}
+    monkeypatch.setattr(db_utils, "DB_POOL", FakePool(cursor))
+    monkeypatch.setattr(db_utils, "get_saved_clans_in_race_info", lambda clan_tag: saved_clan_info)
+    monkeypatch.setattr(db_utils, "is_colosseum_week", lambda clan_tag: False)
+    clans = [RiverRaceClan(clan_tag=tag, clan_name=tag, fame=300, total_decks_used=40, decks_used_today=30, completed=False)
+             for tag in ("#B", "#OLD")]
+
+    db_utils.save_clans_in_race_info(False, clans, "#CLAN")
+    assert cursor.executed == [(300, 200, 40, 30, "#CLAN", "#B")]
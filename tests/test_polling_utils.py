@@ -0,0 +1,163 @@
+"""Tests of scheduling battlelog polls."""
+
+import asyncio
+import datetime
+
+import utils.polling_utils as polling_utils
+from utils.polling_utils import (
+    ACTIVE_MAX_INTERVAL,
+    BATTLELOG_SIZE,
+    MAX_POLL_INTERVAL,
+    MIN_POLL_INTERVAL,
+    BattlelogPollScheduler,
+    PlayerPollState
+)
+from utils.util_types import Participant
+
+NOW = datetime.datetime(2022, 1, 6, 12, tzinfo=datetime.timezone.utc)
+
+
+def make_state(battles_per_hour: float, fame_per_hour: float) -> PlayerPollState:
+    """Create the state of a player with the specified activity."""
+    state = PlayerPollState("#CLAN", NOW)
+    state.battles_per_hour = battles_per_hour
+    state.fame_per_hour = fame_per_hour
+    return state
+
+
+def make_participant(player_tag: str, fame: int) -> Participant:
+    """Create a participant with the specified fame."""
+    return Participant(player_tag=player_tag, player_name=player_tag, fame=fame, repair_points=0, boat_attacks=0,
+                       decks_used=0, decks_used_today=0)
+
+
+def make_check(player_tag: str, fame: int, scanned: int, skipped: int) -> dict:
+    """Create the result of checking a player's battlelog."""
+    return {"player_tag": player_tag, "fame": fame, "battles": [], "scan_stats": {"scanned": scanned, "skipped": skipped}}
+
+
+def test_idle_players_are_polled_at_max_interval():
+    assert BattlelogPollScheduler.poll_interval(make_state(0, 0)) == MAX_POLL_INTERVAL
+    assert BattlelogPollScheduler.poll_interval(make_state(0, 100)) == ACTIVE_MAX_INTERVAL
+
+
+def test_interval_is_time_to_fill_half_of_battlelog():
+    assert BattlelogPollScheduler.poll_interval(make_state(BATTLELOG_SIZE, 0)) == datetime.timedelta(minutes=30)
+    assert BattlelogPollScheduler.poll_interval(make_state(BATTLELOG_SIZE / 4, 0)) == datetime.timedelta(hours=2)
+    assert BattlelogPollScheduler.poll_interval(make_state(BATTLELOG_SIZE / 4, 100)) == ACTIVE_MAX_INTERVAL
+
+
+def test_interval_is_never_below_minimum():
+    assert BattlelogPollScheduler.poll_interval(make_state(BATTLELOG_SIZE * 100, 100)) == MIN_POLL_INTERVAL
+
+
+def test_players_are_due_when_fame_changes_and_next_poll_time_passes():
+    scheduler = BattlelogPollScheduler()
+    participants = [make_participant("#A", 100), make_participant("#B", 0)]
+    assert scheduler.get_due_players(participants, "#CLAN", NOW) == participants
+
+    scheduler.update(make_check("#A", 100, 0, 0), NOW)
+    scheduler.update(make_check("#B", 0, 0, 0), NOW)
+    assert scheduler.players["#A"].next_poll_time == NOW + MAX_POLL_INTERVAL
+
+    later = NOW + ACTIVE_MAX_INTERVAL
+    participants = [make_participant("#A", 100), make_participant("#B", 200)]
+    assert scheduler.get_due_players(participants, "#CLAN", later) == [participants[1]]
+    assert scheduler.get_due_players(participants, "#CLAN", later - datetime.timedelta(seconds=1)) == []
+
+
+def test_players_moving_clans_are_due_immediately():
+    scheduler = BattlelogPollScheduler()
+    scheduler.get_due_players([make_participant("#A", 100)], "#CLAN", NOW)
+    scheduler.update(make_check("#A", 100, 0, 0), NOW)
+
+    participants = [make_participant("#A", 100)]
+    assert scheduler.get_due_players(participants, "#OTHER", NOW) == participants
+
+
+def test_update_measures_activity_between_polls():
+    scheduler = BattlelogPollScheduler()
+    scheduler.get_due_players([make_participant("#A", 0)], "#CLAN", NOW)
+    scheduler.update(make_check("#A", 0, 0, 0), NOW)
+    scheduler.update(make_check("#A", 400, 10, 5), NOW + datetime.timedelta(hours=2))
+
+    state = scheduler.players["#A"]
+    assert state.fame_per_hour == 100
+    assert state.battles_per_hour == 2.5
+    assert state.next_poll_time == NOW + datetime.timedelta(hours=2) + ACTIVE_MAX_INTERVAL
+
+
+def test_full_battlelog_counts_as_twice_as_many_battles():
+    scheduler = BattlelogPollScheduler()
+    scheduler.get_due_players([make_participant("#A", 0)], "#CLAN", NOW)
+    scheduler.update(make_check("#A", 0, 0, 0), NOW)
+    scheduler.update(make_check("#A", 0, BATTLELOG_SIZE, 0), NOW + datetime.timedelta(hours=1))
+
+    assert scheduler.players["#A"].battles_per_hour == BATTLELOG_SIZE
+
+
+def test_remaining_budget_frees_requests_after_an_hour(monkeypatch, clock):
+    monkeypatch.setattr(polling_utils, "time", clock)
+    scheduler = BattlelogPollScheduler(requests_per_hour=3)
+    scheduler.request_times.extend([clock.now, clock.now, clock.now])
+    assert scheduler.remaining_budget() == 0
+
+    clock.advance(60 * 60 + 1)
+    assert scheduler.remaining_budget() == 3
+
+
+def test_failed_polls_are_retried_with_backoff():
+    scheduler = BattlelogPollScheduler()
+    participants = [make_participant("#A", 100)]
+    scheduler.get_due_players(participants, "#CLAN", NOW)
+    scheduler.update(make_check("#A", 100, 0, 0), NOW)
+    later = NOW + ACTIVE_MAX_INTERVAL
+    participants = [make_participant("#A", 200)]
+
+    scheduler.postpone("#A", later)
+    assert scheduler.get_due_players(participants, "#CLAN", later + 2 * MIN_POLL_INTERVAL - datetime.timedelta(seconds=1)) == []
+    assert scheduler.get_due_players(participants, "#CLAN", later + 2 * MIN_POLL_INTERVAL) == participants
+
+    for _ in range(5):
+        scheduler.postpone("#A", later)
+
+    assert scheduler.players["#A"].retry_time == later + MAX_POLL_INTERVAL
+
+    scheduler.update(make_check("#A", 200, 0, 0), later)
+    assert scheduler.players["#A"].retry_time is None
+    assert scheduler.players["#A"].failed_polls == 0
+
+
+def test_poll_counts_failed_requests_against_budget(monkeypatch, clock):
+    monkeypatch.setattr(polling_utils, "time", clock)
+    participants = [make_participant("#A", 100), make_participant("#B", 100), make_participant("#C", 100)]
+    saved_checks = []
+
+    async def get_river_race_participants(clan_tag: str) -> list:
+        return participants
+
+    async def calculate_player_win_rate(player_tag: str, fame: int, now: datetime.datetime, clan_tag: str) -> tuple:
+        if player_tag == "#A":
+            return make_check(player_tag, fame, 5, 0), True
+
+        # #B's battlelog request fails and #C's battlelog is never requested.
+        return {}, player_tag == "#B"
+
+    async def run(func, *args):
+        pass
+
+    async def update_match_history(checks: list, now: datetime.datetime, clan_tag: str):
+        saved_checks.extend(checks)
+
+    monkeypatch.setattr(polling_utils.clash_utils, "get_river_race_participants", get_river_race_participants)
+    monkeypatch.setattr(polling_utils.clash_utils, "calculate_player_win_rate", calculate_player_win_rate)
+    monkeypatch.setattr(polling_utils.DB_EXECUTOR, "run", run)
+    monkeypatch.setattr(polling_utils.ASYNC_DB, "update_match_history", update_match_history, raising=False)
+    scheduler = BattlelogPollScheduler(requests_per_hour=10)
+    asyncio.run(scheduler.poll(["#CLAN"]))
+
+    assert [check["player_tag"] for check in saved_checks] == ["#A"]
+    assert scheduler.remaining_budget() == 8
+    assert scheduler.players["#A"].failed_polls == 0
+    assert scheduler.players["#B"].failed_polls == 1
+    assert scheduler.players["#C"].failed_polls == 1
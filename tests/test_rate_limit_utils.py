@@ -0,0 +1,133 @@
+"""Tests of the API rate limiter."""
+
+import asyncio
+
+import utils.rate_limit_utils as rate_limit_utils
+from utils.rate_limit_utils import ApiKeyPool, RequestPriority, TokenBucket, request_priority
+
+
+def test_bucket_refills_at_rate_up_to_capacity(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_utils, "time", clock)
+    bucket = TokenBucket(rate=2, capacity=4)
+    bucket.tokens = 0
+
+    clock.advance(1)
+    assert bucket.remaining() == 2
+
+    clock.advance(10)
+    assert bucket.remaining() == 4
+
+
+def test_burst_is_served_without_waiting(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_utils, "time", clock)
+    bucket = TokenBucket(rate=1, capacity=3)
+
+    async def burst():
+        for _ in range(3):
+            await asyncio.wait_for(bucket.acquire(), timeout=1)
+
+    asyncio.run(burst())
+    assert bucket.remaining() == 0
+
+
+def test_waiting_requests_are_released_in_priority_order():
+    bucket = TokenBucket(rate=200, capacity=1)
+    order = []
+
+    async def request(name: str, priority: RequestPriority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    async def requests():
+        await bucket.acquire()
+        await asyncio.gather(request("bulk", RequestPriority.BULK),
+                             request("normal", None),
+                             request("interactive", RequestPriority.INTERACTIVE),
+                             request("normal 2", RequestPriority.NORMAL))
+
+    asyncio.run(requests())
+    assert order == ["interactive", "normal", "normal 2", "bulk"]
+
+
+def test_cancelled_waiter_does_not_use_a_token():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    async def requests():
+        await bucket.acquire()
+        cancelled = asyncio.ensure_future(bucket.acquire())
+        waiting = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait_for(waiting, timeout=1)
+        return cancelled.cancelled()
+
+    assert asyncio.run(requests())
+    assert bucket.waiters == []
+
+
+def test_request_priority_context():
+    assert rate_limit_utils.REQUEST_PRIORITY.get() == RequestPriority.NORMAL
+
+    with request_priority(RequestPriority.BULK):
+        assert rate_limit_utils.REQUEST_PRIORITY.get() == RequestPriority.BULK
+
+    assert rate_limit_utils.REQUEST_PRIORITY.get() == RequestPriority.NORMAL
+
+
+def test_key_pool_ignores_duplicate_and_empty_keys():
+    pool = ApiKeyPool(["key-a", "", "key-b", "key-a"])
+    assert [api_key.key for api_key in pool.keys] == ["key-a", "key-b"]
+
+
+def test_key_pool_sends_with_key_that_has_most_tokens(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_utils, "time", clock)
+    pool = ApiKeyPool(["key-a", "key-b"], rate=1, capacity=2)
+
+    async def acquire_keys():
+        return [(await pool.acquire()).key for _ in range(4)]
+
+    keys = asyncio.run(acquire_keys())
+    assert sorted(keys) == ["key-a", "key-a", "key-b", "key-b"]
+    assert keys[0] != keys[1]
+    assert [api_key.requests for api_key in pool.keys] == [2, 2]
+
+
+def test_benched_key_is_out_of_rotation_until_cooldown_ends(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit_utils, "time", clock)
+    pool = ApiKeyPool(["key-a", "key-b"], rate=1, capacity=10)
+    key_a, key_b = pool.keys
+    pool.bench(key_a, 60)
+
+    async def acquire_keys():
+        return [await pool.acquire() for _ in range(3)]
+
+    assert asyncio.run(acquire_keys()) == [key_b] * 3
+    assert key_a.stats()["benched_for"] == 60
+    assert key_a.stats()["times_benched"] == 1
+
+    clock.advance(60)
+    assert not key_a.is_benched()
+    assert asyncio.run(pool.acquire()) is key_a
+
+
+def test_key_pool_waits_when_every_key_is_benched():
+    pool = ApiKeyPool(["key-a", "key-b"])
+    key_a, key_b = pool.keys
+    pool.bench(key_a, 60)
+    pool.bench(key_b, 0.05)
+
+    assert asyncio.run(asyncio.wait_for(pool.acquire(), timeout=1)) is key_b
+
+
+def test_key_pool_counts_responses_and_errors():
+    pool = ApiKeyPool(["key-a"])
+    api_key = pool.keys[0]
+    pool.record_response(api_key, 200)
+    pool.record_response(api_key, 200)
+    pool.record_response(api_key, 429)
+    pool.record_error(api_key)
+
+    stats = pool.stats()[0]
+    assert stats["key"] == "...ey-a"
+    assert stats["status_codes"] == {200: 2, 429: 1}
+    assert stats["errors"] == 1
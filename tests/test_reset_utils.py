@@ -0,0 +1,66 @@
+"""Tests of predicting and polling for the daily reset."""
+
+import asyncio
+import datetime
+
+import utils.reset_utils as reset_utils
+from utils.reset_utils import MAX_RESET_POLL_INTERVAL, MIN_RESET_POLL_INTERVAL, ResetDetector
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2022, 1, 6, 9, 30, tzinfo=UTC)
+
+
+def reset_at(day: int, hour: int, minute: int, second: int=0) -> datetime.datetime:
+    """Get a time in January 2022."""
+    return datetime.datetime(2022, 1, day, hour, minute, second, tzinfo=UTC)
+
+
+def test_poll_interval_without_prediction():
+    assert ResetDetector.poll_interval(NOW, None) == MAX_RESET_POLL_INTERVAL
+
+
+def test_poll_interval_shrinks_near_predicted_reset():
+    assert ResetDetector.poll_interval(NOW, NOW + datetime.timedelta(minutes=20)) == MAX_RESET_POLL_INTERVAL
+    assert ResetDetector.poll_interval(NOW, NOW + datetime.timedelta(seconds=200)) == 20
+    assert ResetDetector.poll_interval(NOW, NOW + datetime.timedelta(seconds=30)) == MIN_RESET_POLL_INTERVAL
+    assert ResetDetector.poll_interval(NOW, NOW) == MIN_RESET_POLL_INTERVAL
+
+
+def test_poll_interval_grows_again_when_reset_is_late():
+    assert ResetDetector.poll_interval(NOW, NOW - datetime.timedelta(seconds=200)) == 20
+    assert ResetDetector.poll_interval(NOW, NOW - datetime.timedelta(hours=1)) == MAX_RESET_POLL_INTERVAL
+
+
+def test_median_reset_time_is_today_at_median_time_of_day():
+    previous_resets = [reset_at(1, 9, 40), reset_at(2, 9, 31), reset_at(3, 9, 35, 30)]
+    assert ResetDetector.median_reset_time(previous_resets, NOW) == reset_at(6, 9, 35, 30)
+
+
+def test_median_reset_time_of_even_number_of_resets():
+    previous_resets = [reset_at(1, 9, 40), reset_at(2, 9, 30)]
+    assert ResetDetector.median_reset_time(previous_resets, NOW) == reset_at(6, 9, 35)
+
+
+def test_median_reset_time_ignores_resets_outside_window():
+    previous_resets = [reset_at(1, 9, 40), reset_at(2, 9, 59), reset_at(3, 9, 19), reset_at(4, 0, 0)]
+    assert ResetDetector.median_reset_time(previous_resets, NOW) == reset_at(6, 9, 40)
+    assert ResetDetector.median_reset_time(previous_resets[1:], NOW) is None
+    assert ResetDetector.median_reset_time([], NOW) is None
+
+
+def test_predict_reset_time_uses_saved_resets(monkeypatch):
+    async def get_reset_time(clan_tag: str) -> datetime.datetime:
+        return reset_at(5, 9, 36)
+
+    async def get_river_race_reset_times(clan_tag: str) -> dict:
+        return {0: reset_at(3, 9, 34), 1: reset_at(4, 9, 50)}
+
+    monkeypatch.setattr(reset_utils.ASYNC_DB, "get_reset_time", get_reset_time, raising=False)
+    monkeypatch.setattr(reset_utils.ASYNC_DB, "get_river_race_reset_times", get_river_race_reset_times, raising=False)
+    assert asyncio.run(ResetDetector().predict_reset_time("#CLAN", NOW)) == reset_at(6, 9, 36)
+
+
+def test_window_is_on_same_day_as_now():
+    window_start, window_end = ResetDetector.get_window(NOW)
+    assert window_start == reset_at(6, 9, 20)
+    assert window_end == reset_at(6, 9, 59)
@@ -0,0 +1,61 @@
+"""Tests of the slotted records."""
+
+import pytest
+
+from utils.util_types import Participant
+
+
+def make_participant(**fields) -> Participant:
+    """Create a participant, overriding any of its default fields."""
+    defaults = {"player_tag": "#A", "player_name": "Player", "fame": 100, "repair_points": 0, "boat_attacks": 1,
+                "decks_used": 8, "decks_used_today": 2}
+    return Participant(**{**defaults, **fields})
+
+
+def test_fields_are_attributes_and_items():
+    participant = make_participant()
+    assert participant.fame == participant["fame"] == 100
+
+    participant["fame"] = 200
+    assert participant.fame == 200
+
+
+def test_record_is_a_mapping_of_its_fields():
+    participant = make_participant()
+    assert len(participant) == len(Participant.__slots__)
+    assert list(participant) == list(Participant.__slots__)
+    assert participant == participant.to_dict()
+    assert dict(participant) == participant.to_dict()
+    assert {**participant}["player_tag"] == "#A"
+    assert participant.get("missing") is None
+    assert "fame" in participant
+
+
+def test_unknown_fields_are_rejected():
+    participant = make_participant()
+
+    with pytest.raises(KeyError):
+        participant["missing"]
+
+    with pytest.raises(KeyError):
+        participant["missing"] = 1
+
+    with pytest.raises(AttributeError):
+        participant.missing = 1
+
+
+def test_every_field_is_required():
+    fields = make_participant().to_dict()
+    del fields["fame"]
+
+    with pytest.raises(KeyError):
+        Participant(**fields)
+
+
+def test_copy_is_independent():
+    participant = make_participant()
+    copy = participant.copy()
+    copy["fame"] = 0
+
+    assert isinstance(copy, Participant)
+    assert participant.fame == 100
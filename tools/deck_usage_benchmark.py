@@ -0,0 +1,260 @@
+"""Benchmark of recording a day of deck usage one user at a time against the set-based update used by the bot.
+
+Fills a scratch table with synthetic users, then times shifting every user's usage history back a day and recording today's
+deck usage with the per-user SELECT and UPDATE loop that db_utils.record_deck_usage_today used to run, and with the temporary
+table and joined UPDATE that db_utils.apply_deck_usage_today runs now. Both are checked against the expected histories before
+their times are reported.
+
+Requires PyMySQL and a MySQL database that the benchmark can create and drop its own table in. Don't point it at the bot's
+database unless you're fine with a deck_usage_benchmark_users table appearing there while it runs.
+
+Examples:
+    python tools/deck_usage_benchmark.py --user clashbot --password {password} --database scratch
+    python tools/deck_usage_benchmark.py --user clashbot --database scratch --users 50000 --active 250 --missing-data
+"""
+
+import argparse
+import getpass
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pymysql
+
+from synthetic_data import make_tag
+
+# Same masks as db_utils.
+SIX_DAY_MASK = 0x3FFFF
+ONE_DAY_MASK = 0x7
+
+# Decks recorded for every user when the day's real usage is missing.
+MISSING_DECK_USAGE = 7
+
+# Scratch table holding the columns the update touches. Named so that it can't be mistaken for the bot's users table.
+TABLE = "deck_usage_benchmark_users"
+
+# Players in today's usage that aren't in the table, e.g. members that joined after their data could be added.
+UNKNOWN_PLAYERS = 5
+
+
+def create_table(connection: pymysql.Connection, histories: Dict[str, int]):
+    """Create the scratch table and fill it with users.
+
+    Args:
+        connection: Connection to the scratch database.
+        histories: Dictionary mapping player tags to usage histories.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"CREATE TABLE {TABLE} (\
+                         id int NOT NULL AUTO_INCREMENT,\
+                         player_tag varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,\
+                         usage_history int NOT NULL,\
+                         PRIMARY KEY (id),\
+                         UNIQUE KEY player_tag_UNIQUE (player_tag))\
+                         ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci")
+        cursor.executemany(f"INSERT INTO {TABLE} VALUES (DEFAULT, %s, %s)", list(histories.items()))
+
+    connection.commit()
+
+
+def reset_histories(connection: pymysql.Connection, histories: Dict[str, int]):
+    """Restore every user's usage history to its starting value.
+
+    Args:
+        connection: Connection to the scratch database.
+        histories: Dictionary mapping player tags to usage histories.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.executemany(f"INSERT INTO {TABLE} VALUES (DEFAULT, %s, %s)", list(histories.items()))
+
+    connection.commit()
+
+
+def read_histories(connection: pymysql.Connection) -> Dict[str, int]:
+    """Read every user's usage history.
+
+    Args:
+        connection: Connection to the scratch database.
+
+    Returns:
+        Dictionary mapping player tags to usage histories.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT player_tag, usage_history FROM {TABLE}")
+        return dict(cursor.fetchall())
+
+
+def record_per_user(connection: pymysql.Connection, deck_usage: Dict[str, int], default_deck_usage: int):
+    """Record deck usage the way record_deck_usage_today used to, with a SELECT and an UPDATE for every user.
+
+    Args:
+        connection: Connection to the scratch database.
+        deck_usage: Dictionary mapping player tags to number of decks used today.
+        default_deck_usage: Number of decks recorded for users that aren't in deck_usage.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT player_tag FROM {TABLE}")
+        db_users = {player_tag for player_tag, in cursor.fetchall()}
+
+        for player_tag in deck_usage:
+            db_users.discard(player_tag)
+            cursor.execute(f"SELECT player_tag, usage_history FROM {TABLE} WHERE player_tag = %s", (player_tag))
+            query_result = cursor.fetchone()
+
+            if query_result is None:
+                continue
+
+            updated_history = ((query_result[1] & SIX_DAY_MASK) << 3) | (deck_usage[player_tag] & ONE_DAY_MASK)
+            cursor.execute(f"UPDATE {TABLE} SET usage_history = %s WHERE player_tag = %s", (updated_history, player_tag))
+
+        for player_tag in db_users:
+            cursor.execute(f"SELECT usage_history FROM {TABLE} WHERE player_tag = %s", (player_tag))
+            query_result = cursor.fetchone()
+
+            updated_history = ((query_result[0] & SIX_DAY_MASK) << 3) | (default_deck_usage & ONE_DAY_MASK)
+            cursor.execute(f"UPDATE {TABLE} SET usage_history = %s WHERE player_tag = %s", (updated_history, player_tag))
+
+    connection.commit()
+
+
+def record_set_based(connection: pymysql.Connection, deck_usage: Dict[str, int], default_deck_usage: int):
+    """Record deck usage the way apply_deck_usage_today does, with a temporary table and a single joined UPDATE.
+
+    Args:
+        connection: Connection to the scratch database.
+        deck_usage: Dictionary mapping player tags to number of decks used today.
+        default_deck_usage: Number of decks recorded for users that aren't in deck_usage.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS deck_usage_today")
+        cursor.execute("CREATE TEMPORARY TABLE deck_usage_today (\
+                        player_tag varchar(128) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL PRIMARY KEY,\
+                        decks_used int NOT NULL) ENGINE=MEMORY")
+        cursor.executemany("INSERT INTO deck_usage_today VALUES (%s, %s)", list(deck_usage.items()))
+        cursor.execute(f"UPDATE {TABLE} LEFT JOIN deck_usage_today ON deck_usage_today.player_tag = {TABLE}.player_tag\
+                         SET {TABLE}.usage_history = (({TABLE}.usage_history & %s) << 3)\
+                                                     | (COALESCE(deck_usage_today.decks_used, %s) & %s)",
+                       (SIX_DAY_MASK, default_deck_usage, ONE_DAY_MASK))
+        cursor.execute("DROP TEMPORARY TABLE deck_usage_today")
+
+    connection.commit()
+
+
+def synthetic_usage(args: argparse.Namespace) -> Tuple[Dict[str, int], Dict[str, int], int]:
+    """Generate users and a day of deck usage.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Dictionary mapping player tags to starting usage histories, dictionary mapping player tags to decks used today, and the
+            number of decks recorded for users without usage today.
+    """
+    rng = random.Random(args.seed)
+    histories = {make_tag(index, "U"): rng.randrange(SIX_DAY_MASK << 3 | ONE_DAY_MASK) for index in range(args.users)}
+
+    if args.missing_data:
+        return histories, {}, MISSING_DECK_USAGE
+
+    active = rng.sample(list(histories), min(args.active, args.users))
+    deck_usage = {player_tag: rng.randint(0, 4) for player_tag in active}
+    deck_usage.update({make_tag(index, "N"): rng.randint(0, 4) for index in range(UNKNOWN_PLAYERS)})
+    return histories, deck_usage, 0
+
+
+def expected_histories(histories: Dict[str, int], deck_usage: Dict[str, int], default_deck_usage: int) -> Dict[str, int]:
+    """Compute what every user's usage history should be after today's usage is recorded.
+
+    Args:
+        histories: Dictionary mapping player tags to starting usage histories.
+        deck_usage: Dictionary mapping player tags to number of decks used today.
+        default_deck_usage: Number of decks recorded for users that aren't in deck_usage.
+
+    Returns:
+        Dictionary mapping player tags to updated usage histories.
+    """
+    return {player_tag: ((history & SIX_DAY_MASK) << 3) | (deck_usage.get(player_tag, default_deck_usage) & ONE_DAY_MASK)
+            for player_tag, history in histories.items()}
+
+
+def benchmark(connection: pymysql.Connection,
+              record: Callable[[pymysql.Connection, Dict[str, int], int], None],
+              histories: Dict[str, int],
+              deck_usage: Dict[str, int],
+              default_deck_usage: int,
+              repeat: int) -> List[float]:
+    """Time recording a day of deck usage, checking the result of every run.
+
+    Args:
+        connection: Connection to the scratch database.
+        record: Implementation to time.
+        histories: Dictionary mapping player tags to starting usage histories.
+        deck_usage: Dictionary mapping player tags to number of decks used today.
+        default_deck_usage: Number of decks recorded for users that aren't in deck_usage.
+        repeat: Number of timing runs.
+
+    Returns:
+        Seconds taken by each run.
+    """
+    expected = expected_histories(histories, deck_usage, default_deck_usage)
+    times = []
+
+    for _ in range(repeat):
+        reset_histories(connection, histories)
+        start_time = time.perf_counter()
+        record(connection, deck_usage, default_deck_usage)
+        times.append(time.perf_counter() - start_time)
+
+        if read_histories(connection) != expected:
+            raise AssertionError(f"{record.__name__} recorded the wrong usage histories")
+
+    return times
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark recording a day of deck usage per user against a set-based update.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", help="Prompted for if omitted.")
+    parser.add_argument("--database", required=True, help="Scratch database to create the benchmark table in.")
+    parser.add_argument("--users", type=int, default=10000, help="Users in the table.")
+    parser.add_argument("--active", type=int, default=250, help="Users with deck usage today.")
+    parser.add_argument("--missing-data", action="store_true", help="Record the missing data sentinel for every user instead.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per implementation.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-table", action="store_true", help="Leave the benchmark table in place afterwards.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    ARGS = parse_args()
+    PASSWORD = ARGS.password if ARGS.password is not None else getpass.getpass()
+    CONNECTION = pymysql.connect(host=ARGS.host, port=ARGS.port, user=ARGS.user, password=PASSWORD, database=ARGS.database,
+                                 charset="utf8mb4")
+    HISTORIES, DECK_USAGE, DEFAULT_DECK_USAGE = synthetic_usage(ARGS)
+
+    try:
+        create_table(CONNECTION, HISTORIES)
+        PER_USER_TIMES = benchmark(CONNECTION, record_per_user, HISTORIES, DECK_USAGE, DEFAULT_DECK_USAGE, ARGS.repeat)
+        SET_BASED_TIMES = benchmark(CONNECTION, record_set_based, HISTORIES, DECK_USAGE, DEFAULT_DECK_USAGE, ARGS.repeat)
+    finally:
+        if not ARGS.keep_table:
+            with CONNECTION.cursor() as CURSOR:
+                CURSOR.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+        CONNECTION.close()
+
+    # One SELECT of every user, then a SELECT and an UPDATE per user and a SELECT per player that isn't in the table.
+    PER_USER_STATEMENTS = 1 + 2 * len(HISTORIES) + len(DECK_USAGE.keys() - HISTORIES.keys())
+    print(f"{len(HISTORIES):,} users, {len(DECK_USAGE):,} with deck usage today, best of {ARGS.repeat} runs")
+    print(f"    per user:   {min(PER_USER_TIMES) * 1000:10.1f} ms  ({PER_USER_STATEMENTS:,} statements)")
+    print(f"    set based:  {min(SET_BASED_TIMES) * 1000:10.1f} ms  (5 statements, inserts batched)")
+    print(f"    speedup:    {min(PER_USER_TIMES) / min(SET_BASED_TIMES):10.2f}x")
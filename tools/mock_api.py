@@ -0,0 +1,308 @@
+"""Local stand-in for the Clash Royale API.
+
+Runs an HTTP server that answers the same requests as https://api.clashroyale.com/v1 in one of three modes:
+
+    record:     Forward every request to the real API, save the response to disk, and return it.
+    replay:     Serve responses previously saved by record mode. Requests that were never recorded get a 404.
+    synthetic:  Serve a generated river race (see synthetic_data.py). The race clock starts at Thursday's reset and can be
+                sped up, or moved with GET /_stub/time?set=yyyymmddThhmmss.
+
+Point the bot at the server by setting CLASH_API_BASE_URL in config.py, e.g. "http://localhost:8080/v1".
+
+Examples:
+    python tools/mock_api.py record --api-key $CLASH_API_KEY --data-dir recordings
+    python tools/mock_api.py replay --data-dir recordings
+    python tools/mock_api.py synthetic --speed 60 --start-hours 20
+"""
+
+import argparse
+import datetime
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Tuple
+
+from synthetic_data import SyntheticRace, most_recent_race_start
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+UPSTREAM_URL = "https://api.clashroyale.com/v1"
+PATH_PREFIX = "/v1"
+NOT_FOUND = {"reason": "notFound"}
+
+
+def recording_path(data_dir: str, path: str, query: str) -> str:
+    """Get the file that a response is recorded in.
+
+    Args:
+        data_dir: Directory containing recordings.
+        path: Request path relative to the API root.
+        query: Raw query string.
+
+    Returns:
+        Path of the recording file.
+    """
+    key = path + ("?" + query if query else "")
+    return os.path.join(data_dir, urllib.parse.quote(key, safe="") + ".json")
+
+
+class RaceClock:
+    """Maps wall clock time onto a synthetic race timeline."""
+
+    def __init__(self, start: datetime.datetime, speed: float):
+        """Start the clock.
+
+        Args:
+            start: Point in the race timeline that the clock starts at.
+            speed: Simulated seconds that pass per real second.
+        """
+        self.lock = threading.Lock()
+        self.speed = speed
+        self.set(start)
+
+    def set(self, start: datetime.datetime):
+        """Move the clock to a new point in the timeline.
+
+        Args:
+            start: New point in the timeline.
+        """
+        with self.lock:
+            self.start = start
+            self.started_at = time.monotonic()
+
+    def now(self) -> datetime.datetime:
+        """Get the current point in the timeline.
+
+        Returns:
+            Simulated current time.
+        """
+        with self.lock:
+            return self.start + datetime.timedelta(seconds=(time.monotonic() - self.started_at) * self.speed)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles API requests according to the server's mode."""
+
+    server: "StubServer"
+
+    def do_GET(self):
+        """Answer a GET request."""
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+
+        if path.startswith(PATH_PREFIX):
+            path = path[len(PATH_PREFIX):]
+
+        if path == "/_stub/time":
+            status, body = self.handle_time(url.query)
+        elif self.server.mode == "record":
+            status, body = self.handle_record(path, url.query)
+        elif self.server.mode == "replay":
+            status, body = self.handle_replay(path, url.query)
+        else:
+            status, body = self.handle_synthetic(path, url.query)
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_time(self, query: str) -> Tuple[int, Any]:
+        """Get or set the synthetic race clock.
+
+        Args:
+            query: Query string, optionally containing set=yyyymmddThhmmss.
+
+        Returns:
+            Status code and response body.
+        """
+        if self.server.clock is None:
+            return 404, NOT_FOUND
+
+        new_time = urllib.parse.parse_qs(query).get("set")
+
+        if new_time:
+            try:
+                moment = datetime.datetime.strptime(new_time[0][:15], "%Y%m%dT%H%M%S")
+            except ValueError:
+                return 400, {"reason": "badRequest", "message": "Expected set=yyyymmddThhmmss"}
+
+            self.server.clock.set(moment.replace(tzinfo=datetime.timezone.utc))
+
+        return 200, {"now": self.server.clock.now().strftime("%Y%m%dT%H%M%S.000Z")}
+
+    def handle_record(self, path: str, query: str) -> Tuple[int, Any]:
+        """Forward a request to the real API and save the response.
+
+        Args:
+            path: Request path relative to the API root.
+            query: Raw query string.
+
+        Returns:
+            Status code and response body. If the real API can't be reached or its response isn't JSON, a 502 is returned and
+                nothing is recorded.
+        """
+        url = self.server.upstream + urllib.parse.quote(path) + ("?" + query if query else "")
+        request = urllib.request.Request(url, headers={"Accept": "application/json",
+                                                       "authorization": f"Bearer {self.server.api_key}"})
+
+        try:
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    status, body = response.status, json.load(response)
+            except urllib.error.HTTPError as error:
+                status, body = error.code, json.load(error)
+        except (urllib.error.URLError, TimeoutError, ValueError) as error:
+            return 502, {"reason": "badGateway", "message": f"Upstream request failed: {error}"}
+
+        with open(recording_path(self.server.data_dir, path, query), "w") as recording:
+            json.dump({"status": status, "body": body}, recording)
+
+        return status, body
+
+    def handle_replay(self, path: str, query: str) -> Tuple[int, Any]:
+        """Serve a recorded response.
+
+        Args:
+            path: Request path relative to the API root.
+            query: Raw query string.
+
+        Returns:
+            Status code and response body.
+        """
+        try:
+            with open(recording_path(self.server.data_dir, path, query)) as recording:
+                saved = json.load(recording)
+        except FileNotFoundError:
+            return 404, NOT_FOUND
+
+        return saved["status"], saved["body"]
+
+    def handle_synthetic(self, path: str, query: str) -> Tuple[int, Any]:
+        """Serve a response from the synthetic race.
+
+        Args:
+            path: Request path relative to the API root.
+            query: Raw query string.
+
+        Returns:
+            Status code and response body.
+        """
+        race = self.server.race
+        now = self.server.clock.now()
+        parts = path.strip("/").split("/")
+        body = None
+
+        if parts == ["cards"]:
+            body = race.cards()
+        elif len(parts) == 3 and parts[0] == "clans" and parts[2] == "members":
+            body = race.members(parts[1])
+        elif len(parts) == 3 and parts[0] == "clans" and parts[2] == "currentriverrace":
+            body = race.current_river_race(parts[1], now)
+        elif len(parts) == 3 and parts[0] == "clans" and parts[2] == "riverracelog":
+            limit = urllib.parse.parse_qs(query).get("limit")
+            body = race.river_race_log(parts[1], now, int(limit[0]) if limit else None)
+        elif len(parts) == 2 and parts[0] == "players":
+            body = race.player(parts[1])
+        elif len(parts) == 3 and parts[0] == "players" and parts[2] == "battlelog":
+            body = race.battlelog(parts[1], now)
+
+        if body is None:
+            return 404, NOT_FOUND
+
+        return 200, body
+
+    def log_message(self, format: str, *args):
+        """Only log requests when running verbosely."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server that holds the state shared by every request."""
+
+    def __init__(self, address: Tuple[str, int], args: argparse.Namespace):
+        """Set up the server for the requested mode.
+
+        Args:
+            address: Host and port to listen on.
+            args: Parsed command line arguments.
+        """
+        super().__init__(address, StubHandler)
+        self.mode = args.mode
+        self.verbose = args.verbose
+        self.data_dir = args.data_dir
+        self.upstream = args.upstream
+        self.api_key = args.api_key
+        self.race = None
+        self.clock = None
+
+        if self.mode == "record":
+            os.makedirs(self.data_dir, exist_ok=True)
+        elif self.mode == "synthetic":
+            race_start = most_recent_race_start()
+            self.race = SyntheticRace(seed=args.seed,
+                                      race_start=race_start,
+                                      members=args.members,
+                                      clans=args.clans,
+                                      battlelog_size=args.battlelog_size,
+                                      ladder_battles_per_day=args.ladder_battles,
+                                      colosseum=args.colosseum)
+            self.clock = RaceClock(race_start + datetime.timedelta(hours=args.start_hours), args.speed)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in for the Clash Royale API.")
+    parser.add_argument("mode", choices=["record", "replay", "synthetic"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+
+    group = parser.add_argument_group("record/replay")
+    group.add_argument("--data-dir", default="recordings", help="Directory that responses are recorded to.")
+    group.add_argument("--upstream", default=UPSTREAM_URL, help="API to forward requests to in record mode.")
+    group.add_argument("--api-key", default=os.environ.get("CLASH_API_KEY", ""), help="Key used in record mode.")
+
+    group = parser.add_argument_group("synthetic")
+    group.add_argument("--seed", type=int, default=0)
+    group.add_argument("--members", type=int, default=50, help="Members in each clan.")
+    group.add_argument("--clans", type=int, default=5, help="Clans in the race.")
+    group.add_argument("--battlelog-size", type=int, default=25, help="Battles returned by each battlelog request.")
+    group.add_argument("--ladder-battles", type=int, default=3, help="Average non-war battles per player per day.")
+    group.add_argument("--colosseum", action="store_true", help="Generate a colosseum week race.")
+    group.add_argument("--start-hours", type=float, default=0, help="Hours after Thursday's reset to start the clock at.")
+    group.add_argument("--speed", type=float, default=1, help="Simulated seconds per real second.")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    ARGS = parse_args()
+    SERVER = StubServer((ARGS.host, ARGS.port), ARGS)
+
+    if SERVER.race is not None:
+        print(f"Primary clan tag: {SERVER.race.primary_clan_tag}")
+
+    print(f"Serving {ARGS.mode} API at http://{ARGS.host}:{ARGS.port}{PATH_PREFIX}")
+    SERVER.serve_forever()
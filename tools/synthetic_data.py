@@ -0,0 +1,563 @@
+"""Deterministic synthetic Clash Royale clans, river races, and battlelogs.
+
+Generates API shaped responses for a river race between several clans so that the bot can be run and profiled without access
+to the real Clash Royale API. A race runs from Thursday's reset through Monday's reset. Every battle fought during the race is
+generated up front from a seed, and each endpoint reports the state of the race at whatever point in that timeline is
+requested.
+"""
+
+import datetime
+import random
+from typing import Any, Dict, List
+
+######################################################
+#                                                    #
+#     _____                _              _          #
+#    / ____|              | |            | |         #
+#   | |     ___  _ __  ___| |_ __ _ _ __ | |_ ___    #
+#   | |    / _ \| '_ \/ __| __/ _` | '_ \| __/ __|   #
+#   | |___| (_) | | | \__ \ || (_| | | | | |_\__ \   #
+#    \_____\___/|_| |_|___/\__\__,_|_| |_|\__|___/   #
+#                                                    #
+######################################################
+
+# Characters that appear in real player and clan tags.
+TAG_ALPHABET = "0289PYLQGRJCUV"
+
+# Daily reset time in UTC and number of battle days in a river race (Thursday through Sunday).
+RESET_HOUR = 10
+BATTLE_DAYS = 4
+DECKS_PER_DAY = 4
+FINISH_LINE = 10000
+
+DEFAULT_MEMBERS = 50
+DEFAULT_CLANS = 5
+DEFAULT_BATTLELOG_SIZE = 25
+DEFAULT_LADDER_BATTLES_PER_DAY = 3
+TOTAL_CARDS = 107
+
+ROLES = ["leader", "coLeader", "elder", "member"]
+
+
+def make_tag(index: int, prefix: str="") -> str:
+    """Create a valid looking tag from an integer.
+
+    Args:
+        index: Unique integer to encode.
+        prefix (optional): Characters to put in front of the encoded value to separate different kinds of tags.
+
+    Returns:
+        Tag including the leading # symbol.
+    """
+    digits = ""
+
+    while True:
+        index, remainder = divmod(index, len(TAG_ALPHABET))
+        digits = TAG_ALPHABET[remainder] + digits
+
+        if index == 0:
+            break
+
+    return "#" + prefix + digits.rjust(4, TAG_ALPHABET[0])
+
+
+def battletime(time: datetime.datetime) -> str:
+    """Format a datetime as an API battleTime string.
+
+    Args:
+        time: Datetime to format.
+
+    Returns:
+        Time formatted as "yyyymmddThhmmss.000Z".
+    """
+    return time.strftime("%Y%m%dT%H%M%S.000Z")
+
+
+def most_recent_race_start(now: datetime.datetime=None) -> datetime.datetime:
+    """Get the Thursday reset that most recently started a river race.
+
+    Args:
+        now (optional): Time to search back from. Defaults to current time.
+
+    Returns:
+        Start of the most recent river race.
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+    start = now.replace(hour=RESET_HOUR, minute=0, second=0, microsecond=0)
+    start -= datetime.timedelta(days=(start.weekday() - 3) % 7)
+
+    if start > now:
+        start -= datetime.timedelta(days=7)
+
+    return start
+
+
+class SyntheticRace:
+    """A complete river race between several synthetic clans."""
+
+    def __init__(self,
+                 seed: int=0,
+                 race_start: datetime.datetime=None,
+                 members: int=DEFAULT_MEMBERS,
+                 clans: int=DEFAULT_CLANS,
+                 battlelog_size: int=DEFAULT_BATTLELOG_SIZE,
+                 ladder_battles_per_day: int=DEFAULT_LADDER_BATTLES_PER_DAY,
+                 colosseum: bool=False):
+        """Generate every clan, player, and battle in the race.
+
+        Args:
+            seed (optional): Seed for the random number generator. The same seed always produces the same race.
+            race_start (optional): Thursday reset that starts the race. Defaults to the most recent one.
+            members (optional): Number of members in each clan.
+            clans (optional): Number of clans in the race. The first clan is treated as the primary clan.
+            battlelog_size (optional): Maximum number of battles returned by the battlelog endpoint.
+            ladder_battles_per_day (optional): Average number of non-war battles each player fights per day.
+            colosseum (optional): Whether this race takes place during colosseum week.
+        """
+        self.rng = random.Random(seed)
+        self.race_start = race_start or most_recent_race_start()
+        self.race_end = self.race_start + datetime.timedelta(days=BATTLE_DAYS)
+        self.battlelog_size = battlelog_size
+        self.colosseum = colosseum
+        self.clans: List[Dict[str, Any]] = []
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.battles: Dict[str, List[Dict[str, Any]]] = {}
+
+        for clan_index in range(clans):
+            clan = {"tag": make_tag(clan_index, "C"), "name": f"Synthetic Clan {clan_index + 1}", "members": []}
+            self.clans.append(clan)
+
+            for member_index in range(members):
+                player_tag = make_tag(clan_index * members + member_index, "P")
+                player = {
+                    "tag": player_tag,
+                    "name": f"Player {clan_index + 1}-{member_index + 1}",
+                    "role": ROLES[min(member_index, len(ROLES) - 1)],
+                    "expLevel": self.rng.randint(20, 60),
+                    "trophies": self.rng.randint(4000, 7500),
+                    "clan": clan,
+                    "activity": self.rng.random()
+                }
+                player["bestTrophies"] = player["trophies"] + self.rng.randint(0, 500)
+                clan["members"].append(player)
+                self.players[player_tag] = player
+
+        for player_tag, player in self.players.items():
+            self.battles[player_tag] = self.generate_battles(player, ladder_battles_per_day)
+
+    @property
+    def primary_clan_tag(self) -> str:
+        """Tag of the clan that the bot should be configured to track."""
+        return self.clans[0]["tag"]
+
+    def generate_battles(self, player: Dict[str, Any], ladder_battles_per_day: int) -> List[Dict[str, Any]]:
+        """Generate every battle a player fights during the race, from newest to oldest.
+
+        Args:
+            player: Player to generate battles for.
+            ladder_battles_per_day: Average number of non-war battles fought per day.
+
+        Returns:
+            List of battles along with the fame and decks they are worth.
+        """
+        battles = []
+
+        for day in range(BATTLE_DAYS):
+            day_start = self.race_start + datetime.timedelta(days=day)
+            decks_remaining = DECKS_PER_DAY if self.rng.random() < 0.35 + player["activity"] * 0.6 else self.rng.randint(0, 3)
+
+            while decks_remaining > 0:
+                battle_type = self.rng.choices(["pvp", "duel", "boat"], weights=[70, 15, 15])[0]
+
+                if battle_type == "duel" and decks_remaining < 2:
+                    battle_type = "pvp"
+
+                time = day_start + datetime.timedelta(seconds=self.rng.randint(60, 86340))
+                battle = self.make_war_battle(player, battle_type, time, decks_remaining)
+                decks_remaining -= battle["decks"]
+                battles.append(battle)
+
+            for _ in range(self.rng.randint(0, ladder_battles_per_day * 2)):
+                time = day_start + datetime.timedelta(seconds=self.rng.randint(60, 86340))
+                battles.append(self.make_ladder_battle(player, time))
+
+        battles.sort(key=lambda battle: battle["time"], reverse=True)
+        return battles
+
+    def player_summary(self, player: Dict[str, Any], crowns: int) -> Dict[str, Any]:
+        """Create the team or opponent section of a battle.
+
+        Args:
+            player: Player that fought in the battle.
+            crowns: Crowns earned by the player.
+
+        Returns:
+            Team or opponent entry of a battle.
+        """
+        return {
+            "tag": player["tag"],
+            "name": player["name"],
+            "crowns": crowns,
+            "clan": {"tag": player["clan"]["tag"], "name": player["clan"]["name"]},
+            "cards": [{"name": f"Card {i}", "id": 26000000 + i} for i in range(8)],
+            "kingTowerHitPoints": self.rng.randint(1000, 5000),
+            "princessTowersHitPoints": [self.rng.randint(100, 3000) for _ in range(max(0, 2 - crowns))]
+        }
+
+    def random_opponent(self, player: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick a player from a different clan.
+
+        Args:
+            player: Player looking for an opponent.
+
+        Returns:
+            Opponent.
+        """
+        clan = self.rng.choice([clan for clan in self.clans if clan is not player["clan"]] or self.clans)
+        return self.rng.choice(clan["members"])
+
+    def make_war_battle(self,
+                        player: Dict[str, Any],
+                        battle_type: str,
+                        time: datetime.datetime,
+                        decks_remaining: int) -> Dict[str, Any]:
+        """Create a river race battle.
+
+        Args:
+            player: Player fighting the battle.
+            battle_type: One of "pvp", "duel", or "boat".
+            time: When the battle was fought.
+            decks_remaining: Decks the player has left today.
+
+        Returns:
+            Battle along with the fame and number of decks it was worth.
+        """
+        won = self.rng.random() < 0.5
+        opponent = self.random_opponent(player)
+        team = self.player_summary(player, 3 if won else self.rng.randint(0, 2))
+        enemy = self.player_summary(opponent, self.rng.randint(0, 2) if won else 3)
+
+        if battle_type == "boat":
+            return {
+                "time": time,
+                "fame": 125 if won else 75,
+                "decks": 1,
+                "battle": {
+                    "type": "boatBattle",
+                    "battleTime": battletime(time),
+                    "boatBattleSide": "attacker",
+                    "boatBattleWon": won,
+                    "gameMode": {"id": 72000061, "name": "ClanWar_BoatBattle"},
+                    "team": [team],
+                    "opponent": [enemy]
+                }
+            }
+
+        if battle_type == "duel":
+            decks = 2 if self.rng.random() < 0.5 or decks_remaining < 3 else 3
+            team["cards"] = team["cards"] * decks
+            fame = (250 * 2 + 100 * (decks - 2)) if won else (250 * (decks - 2) + 100 * 2)
+
+            if won:
+                enemy.pop("kingTowerHitPoints")
+            else:
+                team.pop("kingTowerHitPoints")
+
+            return {
+                "time": time,
+                "fame": fame,
+                "decks": decks,
+                "battle": {
+                    "type": "riverRaceDuelColosseum" if self.colosseum else "riverRaceDuel",
+                    "battleTime": battletime(time),
+                    "gameMode": {"id": 72000267, "name": "CW_Duel_1v1"},
+                    "team": [team],
+                    "opponent": [enemy]
+                }
+            }
+
+        special = self.rng.random() < 0.1
+        return {
+            "time": time,
+            "fame": 200 if won else 100,
+            "decks": 1,
+            "battle": {
+                "type": "riverRacePvP",
+                "battleTime": battletime(time),
+                "gameMode": {"id": 72000268, "name": "CW_Battle_1v1_Special" if special else "CW_Battle_1v1"},
+                "team": [team],
+                "opponent": [enemy]
+            }
+        }
+
+    def make_ladder_battle(self, player: Dict[str, Any], time: datetime.datetime) -> Dict[str, Any]:
+        """Create a battle that does not count towards the river race.
+
+        Args:
+            player: Player fighting the battle.
+            time: When the battle was fought.
+
+        Returns:
+            Battle that is worth no fame or decks.
+        """
+        won = self.rng.random() < 0.5
+        opponent = self.random_opponent(player)
+        return {
+            "time": time,
+            "fame": 0,
+            "decks": 0,
+            "battle": {
+                "type": "PvP",
+                "battleTime": battletime(time),
+                "gameMode": {"id": 72000006, "name": "Ladder"},
+                "team": [self.player_summary(player, 3 if won else 1)],
+                "opponent": [self.player_summary(opponent, 1 if won else 3)]
+            }
+        }
+
+    def battles_before(self, player_tag: str, now: datetime.datetime) -> List[Dict[str, Any]]:
+        """Get the battles a player had fought by a point in time, from newest to oldest.
+
+        Args:
+            player_tag: Player to get battles of.
+            now: Point in the timeline.
+
+        Returns:
+            Battles fought before the specified time.
+        """
+        return [battle for battle in self.battles.get(player_tag, []) if battle["time"] <= now]
+
+    def participant(self, player: Dict[str, Any], now: datetime.datetime) -> Dict[str, Any]:
+        """Build a river race participant entry for a player.
+
+        Args:
+            player: Player to summarize.
+            now: Point in the timeline.
+
+        Returns:
+            Participant entry as returned by the API.
+        """
+        battles = self.battles_before(player["tag"], min(now, self.race_end))
+        day_start = self.race_start + datetime.timedelta(days=max(0, min(BATTLE_DAYS - 1, (now - self.race_start).days)))
+        war_battles = [battle for battle in battles if battle["decks"] > 0]
+
+        return {
+            "tag": player["tag"],
+            "name": player["name"],
+            "fame": sum(battle["fame"] for battle in war_battles),
+            "repairPoints": 0,
+            "boatAttacks": sum(battle["battle"]["type"] == "boatBattle" for battle in war_battles),
+            "decksUsed": sum(battle["decks"] for battle in war_battles),
+            "decksUsedToday": 0 if now >= self.race_end else sum(battle["decks"]
+                                                                 for battle in war_battles if battle["time"] >= day_start)
+        }
+
+    def clan_summary(self, clan: Dict[str, Any], now: datetime.datetime) -> Dict[str, Any]:
+        """Build a clan entry for a river race.
+
+        Args:
+            clan: Clan to summarize.
+            now: Point in the timeline.
+
+        Returns:
+            Clan entry as returned by the API.
+        """
+        participants = [self.participant(player, now) for player in clan["members"]]
+        fame = sum(participant["fame"] for participant in participants)
+
+        # Clan fame stops at the finish line, except during colosseum week which has no finish line.
+        if not self.colosseum:
+            fame = min(fame, FINISH_LINE)
+
+        return {
+            "tag": clan["tag"],
+            "name": clan["name"],
+            "badgeId": 16000000,
+            "fame": fame,
+            "repairPoints": 0,
+            "clanScore": 4000,
+            "participants": participants
+        }
+
+    def members(self, clan_tag: str) -> Dict[str, Any]:
+        """Get the /clans/{tag}/members response.
+
+        Args:
+            clan_tag: Clan to get members of.
+
+        Returns:
+            Response body, or None if the clan does not exist.
+        """
+        for clan in self.clans:
+            if clan["tag"] == clan_tag:
+                return {"items": [{"tag": player["tag"],
+                                   "name": player["name"],
+                                   "role": player["role"],
+                                   "expLevel": player["expLevel"],
+                                   "trophies": player["trophies"],
+                                   "clanRank": rank + 1} for rank, player in enumerate(clan["members"])],
+                        "paging": {"cursors": {}}}
+
+        return None
+
+    def current_river_race(self, clan_tag: str, now: datetime.datetime) -> Dict[str, Any]:
+        """Get the /clans/{tag}/currentriverrace response.
+
+        Args:
+            clan_tag: Clan to get the current river race of.
+            now: Point in the timeline.
+
+        Returns:
+            Response body, or None if the clan does not exist.
+        """
+        if clan_tag not in {clan["tag"] for clan in self.clans}:
+            return None
+
+        if now >= self.race_end or now < self.race_start:
+            period_type = "training"
+            clans = [dict(self.clan_summary(clan, self.race_start), fame=0) for clan in self.clans]
+            period_logs = []
+        else:
+            period_type = "colosseum" if self.colosseum else "warDay"
+            clans = [self.clan_summary(clan, now) for clan in self.clans]
+            period_logs = self.period_logs(now)
+
+        return {
+            "state": "full",
+            "clan": next(clan for clan in clans if clan["tag"] == clan_tag),
+            "clans": clans,
+            "sectionIndex": 0,
+            "periodIndex": 3 + max(0, (now - self.race_start).days),
+            "periodType": period_type,
+            "periodLogs": period_logs
+        }
+
+    def period_logs(self, now: datetime.datetime) -> List[Dict[str, Any]]:
+        """Build the periodLogs of the current river race, which summarize each clan's progress on every finished battle day.
+
+        Args:
+            now: Point in the timeline.
+
+        Returns:
+            List of period log entries as returned by the API.
+        """
+        logs = []
+        start_fame = {clan["tag"]: 0 for clan in self.clans}
+
+        for day in range(BATTLE_DAYS):
+            day_end = self.race_start + datetime.timedelta(days=day + 1)
+
+            if day_end > now:
+                break
+
+            end_fame = {clan["tag"]: self.clan_summary(clan, day_end)["fame"] for clan in self.clans}
+            ranking = sorted(end_fame, key=lambda tag: end_fame[tag], reverse=True)
+            logs.append({
+                "periodIndex": 3 + day,
+                "items": [{"clan": {"tag": tag},
+                           "pointsEarned": end_fame[tag] - start_fame[tag],
+                           "progressStartOfDay": start_fame[tag],
+                           "progressEndOfDay": end_fame[tag],
+                           "endOfDayRank": ranking.index(tag),
+                           "progressEarned": end_fame[tag] - start_fame[tag],
+                           "numOfDefensesRemaining": 0,
+                           "progressEarnedFromDefenses": 0} for tag in end_fame]
+            })
+            start_fame = end_fame
+
+        return logs
+
+    def river_race_log(self, clan_tag: str, now: datetime.datetime, limit: int=None) -> Dict[str, Any]:
+        """Get the /clans/{tag}/riverracelog response. Contains this race once it has finished.
+
+        Args:
+            clan_tag: Clan to get the river race log of.
+            now: Point in the timeline.
+            limit (optional): Maximum number of races to return.
+
+        Returns:
+            Response body, or None if the clan does not exist.
+        """
+        if clan_tag not in {clan["tag"] for clan in self.clans}:
+            return None
+
+        items = []
+
+        if now >= self.race_end:
+            clans = sorted((self.clan_summary(clan, self.race_end) for clan in self.clans),
+                           key=lambda clan: clan["fame"],
+                           reverse=True)
+            items.append({
+                "seasonId": 1,
+                "sectionIndex": 0,
+                "createdDate": battletime(self.race_end),
+                "standings": [{"rank": rank + 1, "trophyChange": 20 - rank * 10, "clan": clan}
+                              for rank, clan in enumerate(clans)]
+            })
+
+        if limit is not None:
+            items = items[:limit]
+
+        return {"items": items, "paging": {"cursors": {}}}
+
+    def player(self, player_tag: str) -> Dict[str, Any]:
+        """Get the /players/{tag} response.
+
+        Args:
+            player_tag: Player to get.
+
+        Returns:
+            Response body, or None if the player does not exist.
+        """
+        player = self.players.get(player_tag)
+
+        if player is None:
+            return None
+
+        rng = random.Random(player_tag)
+        cards = []
+
+        for card_id in range(rng.randint(TOTAL_CARDS // 2, TOTAL_CARDS)):
+            max_level = rng.choice([14, 12, 9, 6])
+            cards.append({"name": f"Card {card_id}",
+                          "id": 26000000 + card_id,
+                          "level": rng.randint(max(1, max_level - 6), max_level),
+                          "maxLevel": max_level})
+
+        return {
+            "tag": player["tag"],
+            "name": player["name"],
+            "expLevel": player["expLevel"],
+            "trophies": player["trophies"],
+            "bestTrophies": player["bestTrophies"],
+            "role": player["role"],
+            "clan": {"tag": player["clan"]["tag"], "name": player["clan"]["name"], "badgeId": 16000000},
+            "cards": cards
+        }
+
+    def battlelog(self, player_tag: str, now: datetime.datetime) -> List[Dict[str, Any]]:
+        """Get the /players/{tag}/battlelog response.
+
+        Args:
+            player_tag: Player to get the battlelog of.
+            now: Point in the timeline.
+
+        Returns:
+            Response body, or None if the player does not exist.
+        """
+        if player_tag not in self.players:
+            return None
+
+        return [battle["battle"] for battle in self.battles_before(player_tag, now)[:self.battlelog_size]]
+
+    @staticmethod
+    def cards() -> Dict[str, Any]:
+        """Get the /cards response.
+
+        Returns:
+            Response body.
+        """
+        return {"items": [{"name": f"Card {card_id}", "id": 26000000 + card_id, "maxLevel": 14}
+                          for card_id in range(TOTAL_CARDS)]}